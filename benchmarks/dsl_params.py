@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+compare the dsl parameter parsers on the step parameters of the template
+features, every parameter is parsed several times like a step does
+
+usage: python -m benchmarks.dsl_params [--rounds 200] [--calls 3]
+"""
+import argparse
+import logging
+import os
+import re
+import time
+
+import flybirds
+from flybirds.utils import dsl_helper
+from flybirds.utils import flybirds_log as log
+
+LEGACY_PATTERN = re.compile(r"([\S\s]+),\s*([a-zA-Z0-9_]+)\s*=\s*(\S+)")
+
+
+def load_step_params():
+    """
+    the bracket parameters of every step in flybirds/template/features
+    """
+    feature_dir = os.path.join(os.path.dirname(flybirds.__file__),
+                               "template", "features")
+    params = []
+    for root, _, files in os.walk(feature_dir):
+        for file_name in sorted(files):
+            if not file_name.endswith(".feature"):
+                continue
+            with open(os.path.join(root, file_name), "r",
+                      encoding="utf-8") as f:
+                for line in f:
+                    params.extend(re.findall(r"\[([^\]]*)\]", line))
+    return params
+
+
+def timed(func, params, rounds, calls):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for param in params:
+            for _ in range(calls):
+                func(param)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=3)
+    args = parser.parse_args()
+    log.ch.setLevel(logging.INFO)
+
+    params = load_step_params()
+    for param in params:
+        legacy = dsl_helper.add_res_dic(param, LEGACY_PATTERN, "selector")
+        if legacy != dsl_helper.tokenize_params(param):
+            raise AssertionError(f"parse result differs for {param!r}")
+    print(f"step parameters: {len(params)}, {args.rounds} rounds, "
+          f"{args.calls} calls per step")
+    print("legacy regex:  {:.3f}s".format(timed(
+        lambda p: dsl_helper.add_res_dic(p, LEGACY_PATTERN, "selector"),
+        params, args.rounds, args.calls)))
+    print("tokenizer:     {:.3f}s".format(timed(
+        dsl_helper.tokenize_params, params, args.rounds, args.calls)))
+    dsl_helper.parse_params.cache_clear()
+    print("params_to_dic: {:.3f}s".format(timed(
+        dsl_helper.params_to_dic, params, args.rounds, args.calls)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+per-step logging overhead of the previous synchronous flybirds_log and the
+queue-backed one, a step logs a few large dicts at INFO and more at DEBUG
+while the configured level is INFO, output goes to a file
+
+usage: python -m benchmarks.log_overhead [--steps 2000]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import flybirds.core.global_resource as gr
+from flybirds.utils import flybirds_log as log
+
+INFO_CALLS = 4
+DEBUG_CALLS = 8
+
+
+def make_payload():
+    return {
+        "url": "https://example.com/api/list?page=1&size=20",
+        "headers": {f"x-header-{i}": "v" * 40 for i in range(20)},
+        "body": [{"id": i, "name": f"item-{i}", "tags": ["a", "b"]}
+                 for i in range(40)],
+    }
+
+
+def legacy_logger(stream):
+    """
+    the previous flybirds_log: logger at DEBUG, handler at the configured
+    level, every argument formatted and written by the caller
+    """
+    logger = logging.getLogger("flybirds_log_legacy")
+    logger.handlers = []
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    handler = logging.StreamHandler(stream)
+    handler.setLevel(logging.INFO)
+    handler.setFormatter(log.formatter)
+    logger.addHandler(handler)
+
+    def debug_debug(*args, level):
+        if gr.get_value("debug", False):
+            "".join(arg for arg in args if isinstance(arg, str))
+
+    def info(*args):
+        debug_debug(*args, level=0)
+        for arg in args:
+            logger.info(arg)
+
+    def debug(*args):
+        debug_debug(*args, level=2)
+        for arg in args:
+            logger.debug(arg)
+
+    return info, debug, handler.flush
+
+
+def legacy_step(info, debug, payload):
+    for _ in range(INFO_CALLS):
+        info(f"[request_compare] actualObj:{payload}")
+    for _ in range(DEBUG_CALLS):
+        debug("result_dic: {}".format(payload))
+
+
+def new_step(payload):
+    for _ in range(INFO_CALLS):
+        log.info(f"[request_compare] actualObj:{payload}")
+    for _ in range(DEBUG_CALLS):
+        log.debug(log.lazy("result_dic: {}".format, payload))
+
+
+def measure(step, steps, flush):
+    start = time.perf_counter()
+    for _ in range(steps):
+        step()
+    in_step = time.perf_counter() - start
+    flush()
+    return in_step, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=2000)
+    args = parser.parse_args()
+    gr.init_glb()
+    payload = make_payload()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with open(os.path.join(tmp_dir, "legacy.log"), "w",
+                  encoding="utf-8") as stream:
+            info, debug, flush = legacy_logger(stream)
+            legacy = measure(lambda: legacy_step(info, debug, payload),
+                             args.steps, flush)
+        with open(os.path.join(tmp_dir, "new.log"), "w",
+                  encoding="utf-8") as stream:
+            old_stream = log.ch.setStream(stream)
+            log.ch.setLevel(logging.INFO)
+            try:
+                new = measure(lambda: new_step(payload), args.steps,
+                              log.flush)
+            finally:
+                log.ch.setStream(old_stream)
+
+    print(f"steps: {args.steps}, {INFO_CALLS} info + {DEBUG_CALLS} debug "
+          f"calls per step, async writer: {log.writer is not None}")
+    for name, (in_step, total) in (("legacy", legacy), ("new", new)):
+        print(f"{name:7s} per step: {in_step / args.steps * 1e6:8.1f}us  "
+              f"total with flush: {total:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
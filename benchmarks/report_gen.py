@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+compare the python html report generator with the node reporter on a large
+synthetic report
+
+usage: python -m benchmarks.report_gen [--files 200] [--scenarios 20]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from flybirds.report.gen.cucumber_gen import CucumberGen
+from flybirds.report.gen.html_gen import HtmlGen
+
+
+def make_feature(index, scenarios, steps):
+    elements = []
+    for s_index in range(scenarios):
+        status = "failed" if s_index % 10 == 0 else "passed"
+        elements.append({
+            "type": "scenario",
+            "keyword": "Scenario",
+            "name": f"scenario {index}-{s_index}",
+            "tags": ["android"],
+            "location": f"features/f{index}.feature:{s_index * 10}",
+            "status": status,
+            "description": [],
+            "steps": [{
+                "keyword": "Then",
+                "step_type": "then",
+                "name": f"click text[button {i}]",
+                "location": f"features/f{index}.feature:{s_index * 10 + i}",
+                "match": {"location": "steps.py:1", "arguments": []},
+                "result": {
+                    "status": status if i == steps - 1 else "passed",
+                    "duration": 0.5,
+                    "error_message": "element not found"
+                    if status == "failed" and i == steps - 1 else None,
+                },
+                "embeddings": [{
+                    "mime_type": "text/html",
+                    "data": '<image class ="screenshot" width="375" '
+                            'src="../screenshot/f/fail.png" />',
+                }] if status == "failed" and i == steps - 1 else [],
+            } for i in range(steps)],
+        })
+    return {
+        "keyword": "Feature",
+        "name": f"feature {index}",
+        "tags": [],
+        "location": f"features/f{index}.feature:1",
+        "status": "failed",
+        "elements": elements,
+    }
+
+
+def make_report(report_dir, files, scenarios, steps):
+    for index in range(files):
+        path = os.path.join(report_dir, f"f{index}.chromium.{index}.json")
+        with open(path, "w") as f:
+            json.dump([make_feature(index, scenarios, steps)], f)
+
+
+def timed(gen, report_dir):
+    start = time.perf_counter()
+    gen.gen(report_dir, "android")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--scenarios", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=15)
+    args = parser.parse_args()
+
+    report_dir = tempfile.mkdtemp(prefix="flybirds_report_bench_")
+    try:
+        make_report(report_dir, args.files, args.scenarios, args.steps)
+        print(f"synthetic report: {args.files} files, "
+              f"{args.files * args.scenarios} scenarios")
+        print(f"html gen:     {timed(HtmlGen, report_dir):.2f}s")
+        if shutil.which("node") is None:
+            print("cucumber gen: skipped, node is not installed")
+        else:
+            print(f"cucumber gen: {timed(CucumberGen, report_dir):.2f}s")
+    finally:
+        shutil.rmtree(report_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+"""
+offline micro-benchmarks of the framework hot paths on synthetic fixtures,
+no device, browser or network is needed. a run writes the timings as json,
+compare checks a run against a stored baseline and exits with 1 when a case
+got slower than the threshold. timings depend on the machine, record the
+baseline where the comparison runs
+
+usage: python -m benchmarks.suite run [--output result.json] [--repeat 7]
+                                      [--case mock_rules]
+       python -m benchmarks.suite compare --baseline baseline.json
+                                          [--current result.json]
+                                          [--threshold 0.2]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from flybirds.utils import flybirds_log as log
+
+RESULT_VERSION = 1
+
+
+class Case:
+    """
+    setup builds the fixtures and returns the function to time, it is called
+    again before every repeat when the function changes its fixtures
+    """
+
+    def __init__(self, name, setup, number=1, fresh=False):
+        self.name = name
+        self.setup = setup
+        self.number = number
+        self.fresh = fresh
+
+
+CASES = []
+
+
+def case(name, number=1, fresh=False):
+    def register(setup):
+        CASES.append(Case(name, setup, number, fresh))
+        return setup
+
+    return register
+
+
+def set_config(**infos):
+    import flybirds.core.global_resource as gr
+
+    gr.init_glb()
+    gr.set_value("configManage", SimpleNamespace(**infos))
+
+
+@case("dsl.params_to_dic", number=5, fresh=True)
+def dsl_params():
+    from benchmarks.dsl_params import load_step_params
+    from flybirds.utils import dsl_helper
+
+    params = load_step_params()
+    dsl_helper.parse_params.cache_clear()
+
+    def run():
+        # a step parses its parameter more than once
+        for param in params:
+            for _ in range(3):
+                dsl_helper.params_to_dic(param)
+
+    return run
+
+
+def make_ocr_result(rows, columns, width, height):
+    rng = random.Random(1)
+    result = []
+    row_height = height / (rows + 2)
+    column_width = width / columns
+    for row in range(rows):
+        for column in range(columns):
+            left = column * column_width + rng.randint(0, 20)
+            top = (row + 1) * row_height + rng.randint(0, 5)
+            right = left + column_width * 0.6
+            bottom = top + row_height * 0.5
+            result.append([
+                [[left, top], [right, top], [right, bottom], [left, bottom]],
+                (f"text {row}-{column}", 0.95),
+            ])
+    return result
+
+
+@case("ocr.struct_ocr_result", number=5)
+def ocr_struct():
+    from flybirds.core.global_context import GlobalContext
+    from flybirds.core.plugin.plugins.default.screen import BaseScreen
+
+    GlobalContext.image_size = (1080, 2340)
+    result = make_ocr_result(40, 3, 1080, 2340)
+    return lambda: BaseScreen.struct_ocr_result(result)
+
+
+def make_mock_rules(count):
+    methods = [None, "contains", "equ", "reg"]
+    rules = []
+    for index in range(count):
+        method = methods[index % len(methods)]
+        key = f"/api/service{index}/list" if method != "reg" \
+            else rf"/api/service{index}/\w+"
+        rules.append({
+            "key": key, "value": f"case{index}", "max": 10 ** 9,
+            "method": method, "mockType": "request",
+            "requestPathes": ["filter.city"],
+            "requestBody": {"filter": {"city": index}},
+        })
+    return rules
+
+
+@case("web.mock_rules", number=200)
+def mock_rules():
+    from flybirds.core.plugin.plugins.default.web import page
+
+    rules = make_mock_rules(300)
+    url = "https://m.example.com/api/service299/list?page=1"
+
+    def run():
+        if page.mock_rules(url, rules) is None:
+            raise AssertionError("mock rule not matched")
+
+    return run
+
+
+@case("web.mock_rules_req_body", number=200)
+def mock_rules_req_body():
+    from flybirds.core.plugin.plugins.default.web import page
+
+    rules = make_mock_rules(300)
+    url = "https://m.example.com/api/service299/list?page=1"
+    body = {"filter": {"city": 299}, "page": 1}
+
+    def run():
+        if page.mock_rules_req_body(url, rules, body) is None:
+            raise AssertionError("mock rule not matched")
+
+    return run
+
+
+def make_service_body(items):
+    return {
+        "head": {"traceId": "t-1", "timestamp": 1700000000},
+        "list": [{
+            "id": index, "name": f"hotel {index}",
+            "price": {"amount": index * 10, "currency": "CNY"},
+            "tags": [f"tag{index % 7}", f"tag{index % 11}"],
+            "position": {"lat": 31.2 + index / 1000, "lng": 121.4},
+        } for index in range(items)],
+    }
+
+
+@case("web.handle_diff", number=3)
+def handle_diff():
+    from flybirds.core.plugin.plugins.default.web import interception
+
+    set_config(
+        web_info=SimpleNamespace(ignore_order=False),
+        ignore_node_info=SimpleNamespace(all_ignore_nodes={
+            "hotelList": ["head.traceId", "head.timestamp",
+                          r"regex:root\['list'\]\[\d+\]\['position'\]"]}))
+    actual = make_service_body(300)
+    expect = make_service_body(300)
+    expect["head"]["traceId"] = "t-2"
+    return lambda: interception.handle_diff(actual, expect, "hotelList",
+                                            "hotel.json", None)
+
+
+def make_hierarchy(depth, width, prefix="n"):
+    node = {"name": f"android.widget.{prefix}",
+            "payload": {"text": f"label {prefix}", "visible": True}}
+    if depth > 0:
+        node["children"] = [make_hierarchy(depth - 1, width,
+                                           f"{prefix}-{index}")
+                            for index in range(width)]
+    return node
+
+
+@case("poco.hierarchy_table", number=5)
+def hierarchy_table():
+    from flybirds.core.plugin.plugins.default.ui_driver.poco import \
+        hierarchy_transport
+
+    tree = make_hierarchy(5, 5)
+    return lambda: hierarchy_transport.HierarchyTable(tree)
+
+
+@case("poco.snap_find", number=20)
+def snap_find():
+    from flybirds.core.plugin.plugins.default.ui_driver.poco import findsnap
+    from flybirds.core.plugin.plugins.default.ui_driver.poco import \
+        hierarchy_transport
+
+    tree = make_hierarchy(5, 5)
+    last = "n-4-4-4-4-4"
+    configs = [{"text": f"label {last}"},
+               {"name": f"android.widget.{last}"},
+               {"textMatches": r"label n(-4){5}$"}]
+    findsnap.__SOURCE__ = hierarchy_transport.HierarchyTable(tree)
+
+    def run():
+        for config in configs:
+            if not findsnap.snap_find(tree, config):
+                raise AssertionError(f"{config} not found")
+
+    return run
+
+
+def make_images():
+    import numpy as np
+    from baseImage import Image
+
+    rng = np.random.RandomState(1)
+    source = rng.randint(0, 255, (720, 1280, 3)).astype(np.uint8)
+    return Image(source), Image(source[300:420, 500:700].copy())
+
+
+@case("opencv.match_template", number=3)
+def match_template():
+    from flybirds.core.plugin.plugins.default.ui_driver.opencv \
+        .matchTemplate import MatchTemplate
+
+    source, search = make_images()
+    match = MatchTemplate()
+    return lambda: match.find_best_result(source, search)
+
+
+@case("opencv.sift", number=3)
+def sift():
+    from flybirds.core.plugin.plugins.default.ui_driver.opencv.sift import \
+        SIFT
+
+    source, search = make_images()
+    match = SIFT()
+    return lambda: match.find_all_results(source, search)
+
+
+def make_report_dir(files, scenarios, steps):
+    from benchmarks.report_gen import make_feature
+
+    report_dir = tempfile.mkdtemp(prefix="flybirds_suite_")
+    for index in range(files):
+        feature = make_feature(index, scenarios, steps)
+        feature["language"] = "en"
+        with open(os.path.join(report_dir, f"f{index}.json"), "w") as f:
+            json.dump([feature], f)
+    return report_dir
+
+
+# fewer files than json_format_deal.POOL_MIN_FILES, the process pool would
+# make the timings depend on the machine
+REPORT_SIZE = (3, 30, 10)
+
+
+@case("report.parse_json_data", fresh=True)
+def parse_json_data():
+    from flybirds.report import json_format_deal
+
+    report_dir = make_report_dir(*REPORT_SIZE)
+
+    def run():
+        try:
+            json_format_deal.parse_json_data({"cur_platform": "android"},
+                                             report_dir)
+        finally:
+            shutil.rmtree(report_dir, ignore_errors=True)
+
+    return run
+
+
+@case("report.process_loop_block", fresh=True)
+def process_loop_block():
+    from flybirds.report import fail_feature_create
+
+    report_dir = make_report_dir(*REPORT_SIZE)
+    rerun_dir = os.path.join(report_dir, "rerun1")
+    os.makedirs(rerun_dir)
+
+    def run():
+        try:
+            fail_feature_create.process_loop_block(
+                report_dir, 0, 0, 0, [], fail_feature_create.FailScenarioSum(),
+                1, rerun_dir, "android")
+        finally:
+            shutil.rmtree(report_dir, ignore_errors=True)
+
+    return run
+
+
+def measure(bench, repeat):
+    """
+    seconds per call of every repeat
+    """
+    timings = []
+    func = None
+    for _ in range(repeat):
+        if func is None or bench.fresh:
+            func = bench.setup()
+        start = time.perf_counter()
+        for _ in range(bench.number):
+            func()
+        timings.append((time.perf_counter() - start) / bench.number)
+    return timings
+
+
+def run_cases(names=None, repeat=7):
+    cases = {}
+    for bench in CASES:
+        if names and bench.name not in names \
+                and bench.name.split(".")[0] not in names:
+            continue
+        try:
+            timings = measure(bench, repeat)
+        except ImportError as import_error:
+            cases[bench.name] = {"skipped": str(import_error)}
+            continue
+        cases[bench.name] = {
+            "median": statistics.median(timings),
+            "min": min(timings),
+            "repeat": repeat,
+            "number": bench.number,
+        }
+    return {
+        "version": RESULT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "cases": cases,
+    }
+
+
+def compare(baseline, current, threshold):
+    """
+    (name, baseline median, current median, ratio, status) of every case of
+    the baseline, status is regression when current is more than threshold
+    slower
+    """
+    rows = []
+    for name, base in sorted(baseline["cases"].items()):
+        cur = current["cases"].get(name)
+        if "median" not in base or cur is None or "median" not in cur:
+            rows.append((name, base.get("median"),
+                         cur and cur.get("median"), None, "skipped"))
+            continue
+        ratio = cur["median"] / base["median"] if base["median"] else 1.0
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, base["median"], cur["median"], ratio, status))
+    return rows
+
+
+def ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.3f}ms"
+
+
+def print_result(result):
+    for name, item in result["cases"].items():
+        if "skipped" in item:
+            print(f"{name:28} skipped: {item['skipped']}")
+        else:
+            print(f"{name:28} median {ms(item['median']):>12}  "
+                  f"min {ms(item['min']):>12}")
+
+
+def read_result(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_result(result, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--output")
+    run_parser.add_argument("--repeat", type=int, default=7)
+    run_parser.add_argument("--case", action="append")
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("--baseline", required=True)
+    compare_parser.add_argument("--current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2)
+    compare_parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+    log.ch.setLevel(logging.WARNING)
+
+    if args.command == "run":
+        result = run_cases(args.case, args.repeat)
+        print_result(result)
+        if args.output:
+            write_result(result, args.output)
+        return 0
+
+    baseline = read_result(args.baseline)
+    current = read_result(args.current) if args.current \
+        else run_cases(repeat=args.repeat)
+    rows = compare(baseline, current, args.threshold)
+    for name, base, cur, ratio, status in rows:
+        change = "-" if ratio is None else f"{(ratio - 1) * 100:+.1f}%"
+        print(f"{name:28} {ms(base):>12} -> {ms(cur):>12} {change:>8} "
+              f"{status}")
+    regressions = [row[0] for row in rows if row[4] == "regression"]
+    if regressions:
+        print(f"slower than {args.threshold * 100:.0f}%: "
+              f"{', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,8 @@ import typer
 import flybirds.utils.flybirds_log as log
 from flybirds.cli.create_project import create_demo, create_mini
 from flybirds.cli.parse_args import parse_args, default_report_path
+from flybirds.cli import perf
+from flybirds.cli import profile_import
 from flybirds.core.launch_cycle.run_manage import run_script
 
 app = typer.Typer(
@@ -67,7 +69,14 @@ def runner(
             4, "--processes", '-p',
             help="Maximum number of processes. Default = 4. Effective when  "
                  "test on web."
-        )
+        ),
+        changed_since: str = typer.Option(
+            None, "--changed-since",
+            help="Only run the scenarios whose feature file, element "
+                 "locators, schema urls, mock cases, interface ignore "
+                 "configs or referenced data files changed since this git "
+                 "ref. e.g. flybirds run --changed-since origin/main",
+        ),
 ):
     """
     Run the project.
@@ -75,7 +84,7 @@ def runner(
     # process args
     run_args = parse_args(
         feature_path, tag, report_format, report_path, define, rerun, es,
-        to_html, run_at, processes
+        to_html, run_at, processes, changed_since
     )
     log.info("============last run_args: {}".format(str(run_args)))
     run_script(run_args)
@@ -100,5 +109,56 @@ def create_project(
         create_demo()
 
 
+@app.command("profile-import")
+def profile_import_cost(
+        platform: str = typer.Option(
+            "web", "--platform", help="Platform whose worker startup is "
+                                      "profiled: web, android or ios."
+        ),
+        top: int = typer.Option(
+            20, "--top", help="Number of packages and modules to show."
+        ),
+        budget: float = typer.Option(
+            None, "--budget",
+            help="Exit with an error when the import time in seconds "
+                 "exceeds the budget."
+        ),
+):
+    """
+    Report the import cost of the modules a behave worker loads.
+    """
+    elapsed, entries = profile_import.profile_imports(platform)
+    typer.echo(profile_import.format_report(platform, elapsed, entries, top))
+    heavy = profile_import.heavy_imports(entries)
+    if len(heavy) > 0:
+        typer.echo(f"\nheavy packages imported at startup: {', '.join(heavy)}")
+    if budget is not None and elapsed > budget:
+        typer.secho(f"import time {elapsed:.3f}s exceeds the budget "
+                    f"{budget}s", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+
+@app.command("perf")
+def perf_report(
+        path: str = typer.Option(
+            "report", "--path", "-P",
+            help="Report directory of a run with perfTrace, or a trace file."
+        ),
+        top: int = typer.Option(
+            20, "--top", help="Number of steps and subsystems to show."
+        ),
+):
+    """
+    Report the slowest steps and subsystems of a traced run.
+    """
+    trace_paths = perf.find_traces(path)
+    if len(trace_paths) == 0:
+        typer.secho(f"no trace found in {path}, run with "
+                    f"--define perfTrace=true", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    typer.echo(perf.format_report(trace_paths, perf.load_spans(trace_paths),
+                                  top))
+
+
 if __name__ == "__main__":
     app()
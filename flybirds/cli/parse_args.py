@@ -33,7 +33,7 @@ def check_workspace_args(feature_path):
 
 def parse_args(
         feature_path, tag, report_format, report_path, define, rerun, es,
-        to_html, run_at, processes
+        to_html, run_at, processes, changed_since=None
 ):
     """
     process args
@@ -140,7 +140,8 @@ def parse_args(
         "run_at": run_at,
         "processes": processes,
         "feature_path": feature_path,
-        "parsed_tags": behave_tag_array
+        "parsed_tags": behave_tag_array,
+        "changed_since": changed_since
     }
 
 
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+slowest steps and subsystems of the perf traces written by perfTrace
+"""
+import os
+
+from flybirds.utils import trace
+
+TRACE_SUFFIX = ".trace.json"
+
+
+def find_traces(path):
+    """
+    trace files of a report dir, or the file itself
+    """
+    if os.path.isfile(path):
+        return [path]
+    traces = []
+    for root, _, files in os.walk(path):
+        for file_name in files:
+            if file_name.endswith(TRACE_SUFFIX):
+                traces.append(os.path.join(root, file_name))
+    return sorted(traces)
+
+
+def load_spans(trace_paths):
+    """
+    complete events of all traces, each with the trace file it came from
+    """
+    spans = []
+    for trace_path in trace_paths:
+        for event in trace.read_events(trace_path):
+            if event.get("ph") == "X":
+                event["trace"] = os.path.basename(trace_path)
+                spans.append(event)
+    return spans
+
+
+def aggregate(spans):
+    """
+    steps sorted by duration, step names and subsystems sorted by total
+    time, times in ms
+    """
+    steps = []
+    names = {}
+    subsystems = {}
+    for event in spans:
+        duration = event.get("dur", 0) / 1000
+        args = event.get("args") or {}
+        if event.get("cat") == trace.STEP:
+            steps.append((duration, event))
+            total = names.setdefault(event.get("name"),
+                                     {"count": 0, "ms": 0.0, "max": 0.0})
+            total["count"] += 1
+            total["ms"] += duration
+            total["max"] = max(total["max"], duration)
+            continue
+        calls = subsystems.setdefault(event.get("cat"), {})
+        for key in (None, event.get("name")):
+            total = calls.setdefault(key, {"calls": 0, "ms": 0.0, "bytes": 0})
+            total["calls"] += 1
+            total["ms"] += duration
+            total["bytes"] += args.get("bytes", 0)
+    steps.sort(key=lambda item: -item[0])
+    # (subsystem, total, [(call, total)])
+    subsystem_list = []
+    for cat, calls in subsystems.items():
+        total = calls.pop(None)
+        subsystem_list.append((cat, total, sorted(
+            calls.items(), key=lambda item: -item[1]["ms"])))
+    subsystem_list.sort(key=lambda item: -item[1]["ms"])
+    return (steps, sorted(names.items(), key=lambda item: -item[1]["ms"]),
+            subsystem_list)
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
+
+
+def format_report(trace_paths, spans, top=20):
+    steps, names, subsystems = aggregate(spans)
+    step_ms = sum(duration for duration, _ in steps)
+    lines = [f"traces: {len(trace_paths)}, steps: {len(steps)}, "
+             f"step time: {step_ms / 1000:.1f}s", "", "slowest steps:"]
+    for duration, event in steps[:top]:
+        args = event.get("args") or {}
+        lines.append(f"  {duration:10.1f}ms  {args.get('status')}  "
+                     f"{event.get('name')}  [{args.get('scenario')}] "
+                     f"{args.get('location')}")
+    lines.extend(["", "steps by total time (count, mean, max):"])
+    for name, total in names[:top]:
+        lines.append(f"  {total['ms']:10.1f}ms  {total['count']:5d}  "
+                     f"{total['ms'] / total['count']:9.1f}ms  "
+                     f"{total['max']:9.1f}ms  {name}")
+    lines.extend(["", "subsystems by total time (calls, bytes, share of "
+                      "step time):"])
+    for cat, total, calls in subsystems[:top]:
+        lines.append(format_subsystem("  ", cat, total, step_ms))
+        for name, call_total in calls:
+            lines.append(format_subsystem("    ", name, call_total, step_ms))
+    return "\n".join(lines)
+
+
+def format_subsystem(indent, name, total, step_ms):
+    share = total["ms"] / step_ms * 100 if step_ms > 0 else 0
+    return (f"{indent}{total['ms']:10.1f}ms  {total['calls']:6d}  "
+            f"{format_size(total['bytes']):>8s}  {share:5.1f}%  {name}")
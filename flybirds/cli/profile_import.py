@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+import cost of the modules a behave worker loads on startup
+"""
+import os
+import re
+import subprocess
+import sys
+
+import flybirds
+
+# packages that must only be imported when a step uses them on web
+HEAVY_PACKAGES = ("airtest", "cv2", "numpy", "baseImage", "PIL", "ffmpeg",
+                  "paddleocr", "deepdiff", "pkg_resources")
+
+STEP_MODULES = (
+    "flybirds.core.dsl.hook.control_hook",
+    "flybirds.core.dsl.step.step_loader",
+    "flybirds.core.dsl.step.app",
+    "flybirds.core.dsl.step.common",
+    "flybirds.core.dsl.step.element",
+    "flybirds.core.dsl.step.page",
+    "flybirds.core.dsl.step.device",
+    "flybirds.core.dsl.step.request",
+)
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    # importlib.import_module bypasses -X importtime, __import__ does not
+    __import__(name)
+print(time.perf_counter() - start)
+"""
+
+IMPORT_TIME_PATTERN = re.compile(
+    r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$")
+
+
+def list_modules(pkg, sub_dir):
+    base_dir = os.path.join(os.path.dirname(flybirds.__file__),
+                            *pkg.split(".")[1:], sub_dir)
+    if not os.path.isdir(base_dir):
+        return []
+    return [
+        f"{pkg}.{sub_dir}.{file_name[:-3]}"
+        for file_name in sorted(os.listdir(base_dir))
+        if file_name.endswith(".py") and file_name != "__init__.py"
+    ]
+
+
+def get_worker_modules(platform):
+    """
+    the same modules the plugin manager loads for the platform
+    """
+    modules = list(STEP_MODULES)
+    modules.extend(list_modules("flybirds.core.plugin", "event"))
+    modules.extend(list_modules("flybirds.core.plugin.event", platform))
+    modules.extend(
+        list_modules("flybirds.core.plugin.plugins.default", platform))
+    return modules
+
+
+def parse_import_time(output):
+    """
+    parse the -X importtime lines into (module, self us, cumulative us)
+    """
+    entries = []
+    for line in output.splitlines():
+        match_obj = IMPORT_TIME_PATTERN.match(line)
+        if match_obj is not None:
+            entries.append((match_obj.group(4), int(match_obj.group(1)),
+                            int(match_obj.group(2))))
+    return entries
+
+
+def profile_imports(platform="web", modules=None):
+    """
+    import the worker modules in a fresh interpreter, return the wall time
+    in seconds and the import time entries
+    """
+    if modules is None:
+        modules = get_worker_modules(platform)
+    # profile the same flybirds copy as the caller
+    env = dict(os.environ)
+    root_dir = os.path.dirname(os.path.dirname(flybirds.__file__))
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (root_dir, env.get("PYTHONPATH")) if p)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SCRIPT] + modules,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        cwd=os.getcwd(),
+        env=env,
+    )
+    if proc.returncode != 0:
+        error_lines = [line for line in proc.stderr.splitlines()
+                       if not line.startswith("import time:")]
+        raise RuntimeError("\n".join(error_lines[-10:]))
+    return float(proc.stdout.strip().splitlines()[-1]), \
+        parse_import_time(proc.stderr)
+
+
+def package_cost(entries):
+    """
+    self time summed per top level package
+    """
+    cost = {}
+    for name, self_us, _ in entries:
+        package = name.split(".")[0]
+        cost[package] = cost.get(package, 0) + self_us
+    return cost
+
+
+def heavy_imports(entries):
+    """
+    heavy packages that were imported
+    """
+    return sorted({name.split(".")[0] for name, _, _ in entries}
+                  & set(HEAVY_PACKAGES))
+
+
+def format_report(platform, elapsed, entries, top=20):
+    lines = [f"platform: {platform}, import time: {elapsed:.3f}s, "
+             f"modules: {len(entries)}", "", "top packages (self time):"]
+    packages = sorted(package_cost(entries).items(),
+                      key=lambda item: -item[1])
+    for package, self_us in packages[:top]:
+        flag = " (heavy)" if package in HEAVY_PACKAGES else ""
+        lines.append(f"  {self_us / 1000:9.1f}ms  {package}{flag}")
+    lines.extend(["", "top modules (cumulative time):"])
+    modules = sorted(entries, key=lambda item: -item[2])
+    for name, _, cumulative_us in modules[:top]:
+        lines.append(f"  {cumulative_us / 1000:9.1f}ms  {name}")
+    return "\n".join(lines)
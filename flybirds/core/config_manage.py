@@ -17,48 +17,53 @@ class ConfigManage:
     Manage all configuration information
     """
 
-    def __init__(self, user_data):
+    def __init__(self, user_data, snapshot=None):
+        # the snapshot written by the launcher replaces all file reads
+        config = None
+        if snapshot is not None:
+            config = snapshot.sections
+            log.info(f"load configuration from snapshot {snapshot.digest}")
         self.run_config = RunConfig(user_data)
         log.info(
             "run_config", str(self.run_config.__dict__)
         )
 
-        self.log_config = LogConfig(user_data, None)
+        self.log_config = LogConfig(user_data, config)
         log.info(
             "Logging configuration information", str(self.log_config.__dict__)
         )
-        self.app_info = AppConfig(user_data, None)
+        self.app_info = AppConfig(user_data, config)
         log.info("APP configuration information", str(self.app_info.__dict__))
-        self.device_info = DeviceConfig(user_data, None)
+        self.device_info = DeviceConfig(user_data, config)
         log.info(
             "Device configuration information", str(self.device_info.__dict__)
         )
         if self.device_info is not None \
                 and self.device_info.platform.lower() == "web":
-            self.web_info = WebConfig(user_data, None)
+            self.web_info = WebConfig(user_data, config)
             log.info(
                 "Web configuration information", str(self.web_info.__dict__)
             )
 
-        self.frame_info = FrameConfig(user_data, None)
+        self.frame_info = FrameConfig(user_data, config)
         log.info(
             "Frame parameter configuration information",
             str(self.frame_info.__dict__),
         )
-        self.schema_info = SchemaUrl()
-        self.report_info = ReportConfig(user_data, None)
+        self.schema_info = SchemaUrl(snapshot)
+        self.report_info = ReportConfig(user_data, config)
         log.info(
             "Test report configuration information",
             str(self.report_info.__dict__),
         )
-        self.flow_behave = FlowBehave(user_data, None)
+        self.flow_behave = FlowBehave(user_data, config)
         log.info(
             "Process control configuration information",
             str(self.flow_behave.__dict__),
         )
-        self.ele_locator_info = EleLocator()
-        self.ignore_node_info = IgnoreNodeConfig()
-        self.paddle_fix_info = PaddleFixConfig()
+        self.ele_locator_info = EleLocator(snapshot)
+        self.ignore_node_info = IgnoreNodeConfig(snapshot)
+        self.paddle_fix_info = PaddleFixConfig(snapshot)
         log.info(
             "Process paddle fix configuration information",
             str(self.paddle_fix_info.__dict__),
@@ -157,6 +162,9 @@ class DeviceConfig:
 
     Attributes:
         device_id: the unique identifier of the phone
+        device_list: devices of the device farm, [{"deviceId": ...}]
+        record_session: directory the mobile session is recorded to
+        replay_session: recorded session archive served instead of a device
     """
 
     def __init__(self, user_data, config):
@@ -167,7 +175,8 @@ class DeviceConfig:
                 device_info = file_helper.get_json_from_file(path)
 
         if device_info is not None:
-            self.device_id = user_data.get("deviceId", device_info["deviceId"])
+            self.device_id = user_data.get("deviceId",
+                                           device_info.get("deviceId"))
             platform = "android"
             device_driver = None
             if device_info.__contains__("platform"):
@@ -175,8 +184,54 @@ class DeviceConfig:
             if device_info.__contains__("webDriverAgent"):
                 device_driver = device_info["webDriverAgent"]
             self.platform = user_data.get("platform", platform).lower()
-            self.web_driver_agent = device_driver
-            self.screen_size = None
+            self.web_driver_agent = user_data.get("webDriverAgent",
+                                                  device_driver)
+            self.screen_size = parse_screen_size(
+                user_data.get("screenSize", device_info.get("screenSize")))
+            self.device_list = parse_device_list(
+                user_data.get("deviceList", device_info.get("deviceList")))
+            self.record_session = user_data.get(
+                "recordSession", device_info.get("recordSession"))
+            self.replay_session = user_data.get(
+                "replaySession", device_info.get("replaySession"))
+
+
+def parse_screen_size(value):
+    """
+    [width, height] from "1080x2400" or a list, None when not set
+    """
+    if not value:
+        return None
+    try:
+        if isinstance(value, str):
+            value = value.lower().replace("*", "x").split("x")
+        width, height = (int(float(item)) for item in value)
+        return [width, height]
+    except (TypeError, ValueError):
+        log.warn(f"[device_info] invalid screenSize: {value}")
+        return None
+
+
+def parse_device_list(value):
+    """
+    device farm entries from "id1,id2" or a list of ids or objects
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    devices = []
+    for item in value:
+        if isinstance(item, str):
+            item = {"deviceId": item}
+        device_id = str(item.get("deviceId") or "").strip()
+        if device_id and device_id not in [d["deviceId"] for d in devices]:
+            devices.append({
+                "deviceId": device_id,
+                "screenSize": parse_screen_size(item.get("screenSize")),
+                "webDriverAgent": item.get("webDriverAgent"),
+            })
+    return devices
 
 
 class WebConfig:
@@ -268,6 +323,20 @@ class WebConfig:
         self.ignore_order = user_data.get("ignoreOrder", ignore_order)
         self.abort_domain_list = user_data.get("abortDomainList",
                                                abort_domain_list)
+        # off, record or replay the xhr/fetch responses of each feature
+        self.network_archive = user_data.get(
+            "networkArchive", web_info.get("networkArchive", "off"))
+        self.network_archive_dir = user_data.get(
+            "networkArchiveDir",
+            web_info.get("networkArchiveDir", "network_archive"))
+        # login once per worker, later contexts start from the cached state
+        self.storage_state_cache = user_data.get(
+            "storageStateCache", web_info.get("storageStateCache", False))
+        self.storage_state_ttl = user_data.get(
+            "storageStateTtl", web_info.get("storageStateTtl", 1800))
+        if web_info.get("networkArchiveIgnoreParams") is not None:
+            self.network_archive_ignore_params = web_info.get(
+                "networkArchiveIgnoreParams")
 
 
 class FlowBehave:
@@ -317,6 +386,13 @@ class FlowBehave:
                                            False)
             self.max_fail_rerun_count = return_value(flow_config.get(
                 "maxFailRerunCount", 1.0), 1.0)
+            # process: rerun the failed scenarios in new behave processes
+            # after the run, immediate: retry them right away in the worker
+            self.fail_rerun_mode = user_data.get(
+                "failRerunMode",
+                return_value(flow_config.get("failRerunMode", "process"),
+                             "process")
+            )
 
             # Maximum number of retries
             self.max_retry_count = user_data.get(
@@ -350,6 +426,36 @@ class FlowBehave:
             self.max_fail_rerun_count = 1.0
         if not hasattr(self, "max_retry_count"):
             self.max_retry_count = 1
+        if not hasattr(self, "fail_rerun_mode"):
+            self.fail_rerun_mode = user_data.get("failRerunMode", "process")
+        # set by flybirds run for the behave workers
+        self.immediate_retry = str2bool(
+            str(user_data.get("immediateRetry", "false")))
+
+
+# (attribute, user data key, default) of the frame settings missing from
+# the frame config file
+OTHER_ATTR_DEFAULTS = (
+    ("search_swipe_duration", "searchSwipeDuration", 1),
+    ("swipe_search_count", "swipeSearchCount", 5),
+    ("swipe_search_distance", "swipeSearchDistance", 0.3),
+    ("swipe_search_still_limit", "swipeSearchStillLimit", 1),
+    ("hierarchy_cache_ttl", "hierarchyCacheTtl", 0.5),
+    ("page_render_timeout", "pageRenderTimeout", 30),
+    ("app_start_time", "appStartTime", 6),
+    ("app_ready_probe", "appReadyProbe", True),
+    ("app_ready_selector", "appReadySelector", None),
+    ("app_ready_interval", "appReadyInterval", 0.5),
+    ("verify_pos_not_change_count", "verifyPosNotChangeCount", 6),
+    ("screen_record_time", "screenRecordTime", 60),
+    ("use_snap", "useSnap", False),
+    ("use_airtest_record", "useAirtestRecord", False),
+    ("record_finalize_workers", "recordFinalizeWorkers", 2),
+    ("perf_trace", "perfTrace", False),
+    ("http_timeout", "httpTimeout", 30),
+    ("http_retries", "httpRetries", 2),
+    ("http_pool_size", "httpPoolSize", 10),
+)
 
 
 class FrameConfig:
@@ -418,6 +524,14 @@ class FrameConfig:
                 "swipeSearchDistance",
                 return_value(frame_config.get("swipeSearchDistance", 0.3), 0.3)
             )
+            self.swipe_search_still_limit = user_data.get(
+                "swipeSearchStillLimit",
+                return_value(frame_config.get("swipeSearchStillLimit", 1), 1)
+            )
+            self.hierarchy_cache_ttl = user_data.get(
+                "hierarchyCacheTtl",
+                return_value(frame_config.get("hierarchyCacheTtl", 0.5), 0.5)
+            )
             self.page_render_timeout = user_data.get(
                 "pageRenderTimeout",
                 return_value(frame_config.get("pageRenderTimeout", 30), 30)
@@ -426,6 +540,20 @@ class FrameConfig:
                 "appStartTime",
                 return_value(frame_config.get("appStartTime", 6), 6)
             )
+            # appStartTime and swipeReadyTime are the upper bound of the
+            # readiness probe, false keeps the fixed sleeps
+            self.app_ready_probe = user_data.get(
+                "appReadyProbe",
+                return_value(frame_config.get("appReadyProbe", True), True)
+            )
+            self.app_ready_selector = user_data.get(
+                "appReadySelector",
+                return_value(frame_config.get("appReadySelector", None), None)
+            )
+            self.app_ready_interval = user_data.get(
+                "appReadyInterval",
+                return_value(frame_config.get("appReadyInterval", 0.5), 0.5)
+            )
             self.swipe_ready_time = user_data.get(
                 "swipeReadyTime",
                 return_value(frame_config.get("swipeReadyTime", 3), 3)
@@ -463,6 +591,30 @@ class FrameConfig:
                 "airtestRecordMode",
                 return_value(frame_config.get("airtestRecordMode", "yosemite"), "yosemite")
             )
+            # screen recordings finalized in the background at the same time,
+            # 0 finalizes them before the next scenario starts
+            self.record_finalize_workers = user_data.get(
+                "recordFinalizeWorkers",
+                return_value(frame_config.get("recordFinalizeWorkers", 2), 2)
+            )
+            # step and subsystem spans written to the report trace dir
+            self.perf_trace = user_data.get(
+                "perfTrace",
+                return_value(frame_config.get("perfTrace", False), False)
+            )
+            # shared http session of the external api steps
+            self.http_timeout = user_data.get(
+                "httpTimeout",
+                return_value(frame_config.get("httpTimeout", 30), 30)
+            )
+            self.http_retries = user_data.get(
+                "httpRetries",
+                return_value(frame_config.get("httpRetries", 2), 2)
+            )
+            self.http_pool_size = user_data.get(
+                "httpPoolSize",
+                return_value(frame_config.get("httpPoolSize", 10), 10)
+            )
             self.use_detect_error = user_data.get(
                 "use_Detect_Error",
                 return_value(frame_config.get("use_Detect_Error", False),
@@ -508,32 +660,11 @@ class FrameConfig:
             )
 
     def set_other_attrs(self, user_data):
-        if not hasattr(self, "search_swipe_duration"):
-            self.search_swipe_duration = user_data.get(
-                "searchSwipeDuration", 1
-            )
-        if not hasattr(self, "swipe_search_count"):
-            self.swipe_search_count = user_data.get("swipeSearchCount", 5)
-        if not hasattr(self, "swipe_search_distance"):
-            self.swipe_search_distance = user_data.get(
-                "swipeSearchDistance", 0.3
-            )
-        if not hasattr(self, "page_render_timeout"):
-            self.page_render_timeout = user_data.get("pageRenderTimeout", 30)
-        if not hasattr(self, "app_start_time"):
-            self.app_start_time = user_data.get("appStartTime", 6)
         if not hasattr(self, "swipe_ready_time"):
             self.swipe_ready_time = None
-        if not hasattr(self, "verify_pos_not_change_count"):
-            self.verify_pos_not_change_count = user_data.get(
-                "verifyPosNotChangeCount", 6
-            )
-        if not hasattr(self, "screen_record_time"):
-            self.screen_record_time = user_data.get("screenRecordTime", 60)
-        if not hasattr(self, "use_snap"):
-            self.use_snap = user_data.get("useSnap", False)
-        if not hasattr(self, "use_airtest_record"):
-            self.use_airtest_record = user_data.get("useAirtestRecord", False)
+        for attr, key, default in OTHER_ATTR_DEFAULTS:
+            if not hasattr(self, attr):
+                setattr(self, attr, user_data.get(key, default))
 
 
 class LogConfig:
@@ -557,6 +688,11 @@ class LogConfig:
         if (not hasattr(self, "level")) or (not isinstance(self.level, str)):
             self.level = user_data.get("logLevel", "info")
 
+        # directory of the per worker json lines log, disabled when empty
+        self.json_dir = user_data.get("logJsonDir")
+        if self.json_dir is None and log_config is not None:
+            self.json_dir = log_config.get("logJsonDir")
+
 
 class ReportConfig:
     """
@@ -573,9 +709,22 @@ class ReportConfig:
             self.screen_shot_dir = user_data.get(
                 "screenShotDir", report_config.get("screenShotDir", None)
             )
+            # cucumber: node reporter, html: python streaming reporter
+            self.report_gen = user_data.get(
+                "reportGen", report_config.get("reportGen", "cucumber")
+            )
+            self.live_report = user_data.get(
+                "liveReport", report_config.get("liveReport", False)
+            )
 
         if not hasattr(self, "screen_shot_dir"):
             self.screen_shot_dir = user_data.get("screenShotDir", None)
+        if not hasattr(self, "report_gen"):
+            self.report_gen = user_data.get("reportGen", "cucumber")
+        if not hasattr(self, "live_report"):
+            self.live_report = user_data.get("liveReport", False)
+        if isinstance(self.live_report, str):
+            self.live_report = str2bool(self.live_report)
 
 
 class SchemaUrl:
@@ -583,7 +732,10 @@ class SchemaUrl:
     All schema urls used
     """
 
-    def __init__(self):
+    def __init__(self, snapshot=None):
+        if snapshot is not None and snapshot.schema_url is not None:
+            self.all_schema_url = snapshot.schema_url
+            return
         schema_url_path = os.path.join(
             os.getcwd(), "config", "schema_url.json"
         )
@@ -601,7 +753,10 @@ class PluginConfig:
     plugin config
     """
 
-    def __init__(self, user_data):
+    def __init__(self, user_data, snapshot=None):
+        if snapshot is not None and snapshot.plugin_info is not None:
+            self.plugin_info = snapshot.plugin_info
+            return
         path = os.path.join(os.getcwd(), "config", "plugin_info.json")
         if os.path.exists(path):
             plugin_info = file_helper.get_json_from_file(path)
@@ -632,8 +787,11 @@ class EleLocator:
     elementLocator/*.json (feature tag)>ele_locator.json > covert.json
     """
 
-    def __init__(self):
+    def __init__(self, snapshot=None):
         self.spec_ele_locator = None
+        if snapshot is not None and snapshot.ele_locator is not None:
+            self.all_ele_locator = snapshot.ele_locator
+            return
         ele_locator_path = os.path.join(
             os.getcwd(), "config", "ele_locator.json"
         )
@@ -652,7 +810,10 @@ class IgnoreNodeConfig:
     all interface ignore node config
     """
 
-    def __init__(self):
+    def __init__(self, snapshot=None):
+        if snapshot is not None and snapshot.ignore_nodes is not None:
+            self.all_ignore_nodes = snapshot.ignore_nodes
+            return
         interface_ignore_dir_path = os.path.join(
             os.getcwd(), "interfaceIgnoreConfig"
         )
@@ -665,7 +826,10 @@ class PaddleFixConfig:
     paddle ocr fix config
     """
 
-    def __init__(self):
+    def __init__(self, snapshot=None):
+        if snapshot is not None and snapshot.paddle_fix is not None:
+            self.paddle_fix_node = snapshot.paddle_fix
+            return
         paddle_fix_path = os.path.join(
             os.getcwd(), "config", "paddle_fix.json"
         )
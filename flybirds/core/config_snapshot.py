@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+config snapshot, the launcher resolves every configuration source once and
+behave workers load the result with a single read
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+
+from flybirds.utils import file_helper
+from flybirds.utils import flybirds_log as log
+
+SNAPSHOT_VERSION = 1
+
+# section name in flybirds_config.json -> legacy stand-alone file
+SECTION_FILES = {
+    "app_info": "app_info.json",
+    "device_info": "device_config.json",
+    "web_info": None,
+    "flow_behave": "flow_behave.json",
+    "frame_info": "frame_info.json",
+    "log": "log_config.json",
+    "report": "report_config.json",
+}
+
+OTHER_FILES = {
+    "schema_url": "schema_url.json",
+    "ele_locator": "ele_locator.json",
+    "paddle_fix": "paddle_fix.json",
+    "plugin_info": "plugin_info.json",
+}
+
+
+class ConfigSnapshot:
+    """
+    Immutable view of all parsed configuration sources
+
+    Attributes:
+        sections: resolved flybirds_config.json sections, can be passed as
+            the config parameter of the config classes
+        digest: sha256 of the serialized content
+    """
+
+    __slots__ = ("_data", "_digest")
+
+    def __init__(self, data, digest):
+        object.__setattr__(self, "_data", data)
+        object.__setattr__(self, "_digest", digest)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("config snapshot is read-only")
+
+    @property
+    def digest(self):
+        return self._digest
+
+    @property
+    def sections(self):
+        return self._data.get("sections")
+
+    @property
+    def schema_url(self):
+        return self._data.get("schema_url")
+
+    @property
+    def ele_locator(self):
+        return self._data.get("ele_locator")
+
+    @property
+    def paddle_fix(self):
+        return self._data.get("paddle_fix")
+
+    @property
+    def plugin_info(self):
+        return self._data.get("plugin_info")
+
+    @property
+    def ignore_nodes(self):
+        return self._data.get("ignore_nodes")
+
+
+def get_snapshot_path(base_dir=None):
+    """
+    snapshot file of the project, workers started from the same directory
+    resolve the same path
+    """
+    if base_dir is None:
+        base_dir = os.getcwd()
+    env_path = os.environ.get("FLYBIRDS_CONFIG_SNAPSHOT")
+    if env_path is not None and env_path != "":
+        return env_path
+    key = hashlib.sha1(
+        os.path.abspath(base_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), "flybirds",
+                        f"config_snapshot_{key}.pkl")
+
+
+def get_source_paths(base_dir=None):
+    """
+    all files whose content goes into the snapshot
+    """
+    if base_dir is None:
+        base_dir = os.getcwd()
+    config_dir = os.path.join(base_dir, "config")
+    paths = [os.path.join(config_dir, "flybirds_config.json")]
+    for file_name in SECTION_FILES.values():
+        if file_name is not None:
+            paths.append(os.path.join(config_dir, file_name))
+    for file_name in OTHER_FILES.values():
+        paths.append(os.path.join(config_dir, file_name))
+    ignore_dir = os.path.join(base_dir, "interfaceIgnoreConfig")
+    paths.append(ignore_dir)
+    paths.extend(sorted(file_helper.get_files_from_dir(ignore_dir)))
+    return paths
+
+
+def get_source_signature(base_dir=None):
+    """
+    stat based signature of the sources, a missing file is part of the
+    signature so that creating it also invalidates the snapshot
+    """
+    signature = []
+    for path in get_source_paths(base_dir):
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+def read_sources(base_dir=None):
+    """
+    parse every configuration source the same way the config classes do
+    """
+    if base_dir is None:
+        base_dir = os.getcwd()
+    config_dir = os.path.join(base_dir, "config")
+    main_config = file_helper.get_json_from_file(
+        os.path.join(config_dir, "flybirds_config.json"))
+
+    sections = {}
+    for name, file_name in SECTION_FILES.items():
+        value = main_config.get(name) if main_config is not None else None
+        if value is None and file_name is not None:
+            path = os.path.join(config_dir, file_name)
+            if os.path.exists(path):
+                value = file_helper.get_json_from_file(path)
+        sections[name] = value
+
+    data = {"sections": sections}
+    for name, file_name in OTHER_FILES.items():
+        path = os.path.join(config_dir, file_name)
+        data[name] = file_helper.get_json_from_file(path) \
+            if os.path.exists(path) else None
+    data["ignore_nodes"] = file_helper.read_json_data(
+        os.path.join(base_dir, "interfaceIgnoreConfig"))
+    return data
+
+
+def dump(base_dir=None, path=None):
+    """
+    build the snapshot and write it atomically, an up-to-date snapshot is
+    reused as is
+    """
+    if base_dir is None:
+        base_dir = os.getcwd()
+    if path is None:
+        path = get_snapshot_path(base_dir)
+    if not os.path.exists(
+            os.path.join(base_dir, "config", "flybirds_config.json")):
+        log.info("[config_snapshot] no flybirds_config.json, skip snapshot")
+        return None
+
+    signature = get_source_signature(base_dir)
+    snapshot = load(base_dir, path, signature)
+    if snapshot is not None:
+        log.info(f"[config_snapshot] reuse snapshot {snapshot.digest}")
+        return snapshot
+
+    data = read_sources(base_dir)
+    # sources changed while they were read, the next run will rebuild it
+    if get_source_signature(base_dir) != signature:
+        log.info("[config_snapshot] config changed during snapshot build")
+        return None
+    payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+    digest = hashlib.sha256(payload).hexdigest()
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "base_dir": os.path.abspath(base_dir),
+        "signature": signature,
+        "digest": digest,
+    }
+    file_helper.create_dirs_path_object(os.path.dirname(path))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump((header, payload), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    log.info(f"[config_snapshot] write snapshot {digest} to {path}")
+    return ConfigSnapshot(data, digest)
+
+
+def load(base_dir=None, path=None, signature=None):
+    """
+    load the snapshot, return None when it is missing, corrupt or any source
+    file has changed since it was written
+    """
+    if base_dir is None:
+        base_dir = os.getcwd()
+    if path is None:
+        path = get_snapshot_path(base_dir)
+    if not os.path.exists(path):
+        return None
+    # noinspection PyBroadException
+    try:
+        with open(path, "rb") as f:
+            header, payload = pickle.loads(f.read())
+        if header.get("version") != SNAPSHOT_VERSION \
+                or header.get("base_dir") != os.path.abspath(base_dir):
+            return None
+        if signature is None:
+            signature = get_source_signature(base_dir)
+        if header.get("signature") != signature:
+            log.info("[config_snapshot] config source changed, "
+                     "snapshot is stale")
+            return None
+        digest = hashlib.sha256(payload).hexdigest()
+        if digest != header.get("digest"):
+            log.warn("[config_snapshot] snapshot content hash mismatch")
+            return None
+        return ConfigSnapshot(pickle.loads(payload), digest)
+    except Exception as e:
+        log.warn(f"[config_snapshot] load snapshot error: {e}")
+        return None
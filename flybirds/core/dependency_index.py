@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+static index of the resources each scenario references, so that a run can
+be limited to the scenarios whose element locators, schema urls, mock cases,
+ignore configs or data files changed since a git ref
+"""
+import json
+import os
+import subprocess
+
+from behave.model import ScenarioOutline
+from behave.parser import parse_file
+
+from flybirds.utils import flybirds_log as log
+
+# resource name -> files or directories of json objects keyed by what the
+# steps reference
+RESOURCE_SOURCES = {
+    "ele_locator": ["config/ele_locator.json"],
+    "schema_url": ["config/schema_url.json"],
+    "mock_case": ["mockCaseData"],
+    "interface_ignore": ["interfaceIgnoreConfig"],
+}
+# changes to these files do not change what a scenario does
+IGNORED_SUFFIXES = (".md", ".rst", ".txt", ".log")
+IGNORED_DIRS = ("report",)
+
+
+def step_params(text):
+    """
+    contents of the top level brackets of a step, selectors like
+    [data-id='1'] inside a parameter stay in it
+    """
+    params = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(text):
+        if char == "[":
+            if depth == 0:
+                start = index + 1
+            depth += 1
+        elif char == "]" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                params.append(text[start:index])
+    return params
+
+
+def param_tokens(param):
+    """
+    the parameter and its comma separated parts, option parts like
+    timeout=10 are kept as they are and simply match nothing
+    """
+    tokens = {param.strip()}
+    for part in param.split(","):
+        part = part.strip()
+        if part:
+            tokens.add(part)
+            tokens.add(os.path.normpath(part))
+    return tokens
+
+
+def project_path(path):
+    """
+    path relative to the project (the working directory) like the paths git
+    reports, absolute feature paths included
+    """
+    if os.path.isabs(path):
+        try:
+            path = os.path.relpath(path)
+        except ValueError:
+            # another drive than the project
+            pass
+    return os.path.normpath(path)
+
+
+class ScenarioDeps:
+    """
+    a scenario and the tokens of its steps, background included
+    """
+
+    def __init__(self, filename, line, name, tokens):
+        self.filename = project_path(filename)
+        self.line = line
+        self.name = name
+        self.tokens = tokens
+
+    @property
+    def location(self):
+        return f"{self.filename}:{self.line}"
+
+
+def step_tokens(steps):
+    tokens = set()
+    for step in steps:
+        for param in step_params(step.name):
+            tokens |= param_tokens(param)
+    return tokens
+
+
+def feature_files(feature_path):
+    if os.path.isfile(feature_path):
+        return [feature_path]
+    paths = []
+    for main_dir, dirs, file_names in os.walk(feature_path):
+        dirs.sort()
+        for file_name in sorted(file_names):
+            if file_name.endswith(".feature"):
+                paths.append(os.path.join(main_dir, file_name))
+    return paths
+
+
+def index_features(feature_path):
+    """
+    ScenarioDeps of every scenario under the path, an outline is one entry
+    with the tokens of all its examples
+    """
+    scenarios = []
+    for path in feature_files(feature_path):
+        feature = parse_file(path)
+        if feature is None:
+            continue
+        background = step_tokens(feature.background.steps) \
+            if feature.background is not None else set()
+        for scenario in feature.scenarios:
+            tokens = background | step_tokens(scenario.steps)
+            if isinstance(scenario, ScenarioOutline):
+                for example in scenario.scenarios:
+                    tokens |= step_tokens(example.steps)
+            scenarios.append(ScenarioDeps(path, scenario.line, scenario.name,
+                                          tokens))
+    return scenarios
+
+
+def git(*args):
+    return subprocess.run(["git", *args], stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, check=True).stdout.decode(
+        "utf-8")
+
+
+def changed_files(ref):
+    """
+    files of the project (the working directory) that differ from ref,
+    untracked files included
+    """
+    changed = git("diff", "--name-only", "--relative", ref).splitlines()
+    changed += git("ls-files", "--others", "--exclude-standard").splitlines()
+    return sorted({os.path.normpath(path) for path in changed if path})
+
+
+def json_keys(content):
+    if content is None:
+        return {}
+    data = json.loads(content)
+    if not isinstance(data, dict):
+        raise ValueError("not a json object")
+    return data
+
+
+def read_at_ref(ref, path):
+    try:
+        return git("show", f"{ref}:./{path.replace(os.sep, '/')}")
+    except subprocess.CalledProcessError:
+        return None
+
+
+def read_current(path):
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def changed_keys(ref, path):
+    old = json_keys(read_at_ref(ref, path))
+    new = json_keys(read_current(path))
+    return {key for key in set(old) | set(new) if old.get(key) != new.get(key)}
+
+
+def resource_of(path):
+    for name, sources in RESOURCE_SOURCES.items():
+        for source in sources:
+            source = os.path.normpath(source)
+            if path == source or (path.startswith(source + os.sep)
+                                  and path.endswith(".json")):
+                return name
+    return None
+
+
+class ChangeSet:
+    """
+    what changed since ref: feature files, resource keys, other files that
+    steps may reference by path, and files no scenario can be mapped to
+    """
+
+    def __init__(self, ref):
+        self.ref = ref
+        self.files = []
+        self.features = set()
+        self.keys = {}
+        self.paths = set()
+        self.unmapped = []
+
+    @property
+    def full_run(self):
+        return len(self.unmapped) > 0
+
+
+def collect_changes(ref, feature_path, files=None):
+    changes = ChangeSet(ref)
+    changes.files = changed_files(ref) if files is None else files
+    feature_root = project_path(feature_path)
+    for path in changes.files:
+        resource = resource_of(path)
+        if path.endswith(".feature"):
+            changes.features.add(path)
+        elif resource is not None:
+            try:
+                for key in changed_keys(ref, path):
+                    changes.keys.setdefault(key, set()).add(resource)
+            except ValueError:
+                changes.unmapped.append(path)
+        elif path.endswith(".py") or path.split(os.sep)[0] == "config" \
+                or path.startswith(feature_root + os.sep):
+            # code and config change what any scenario does
+            changes.unmapped.append(path)
+        elif path.endswith(IGNORED_SUFFIXES) \
+                or path.split(os.sep)[0] in IGNORED_DIRS:
+            continue
+        else:
+            changes.paths.add(path)
+    return changes
+
+
+def depends_on(scenario, changes):
+    """
+    the reasons a scenario has to run, empty when it does not
+    """
+    if scenario.filename in changes.features:
+        return ["feature"]
+    reasons = [f"{resource}:{key}" for key in scenario.tokens & set(changes.keys)
+               for resource in sorted(changes.keys[key])]
+    reasons += [f"file:{path}" for path in scenario.tokens & changes.paths]
+    return sorted(reasons)
+
+
+def select(scenarios, changes):
+    """
+    (scenario, reasons) of the scenarios to run
+    """
+    selected = []
+    for scenario in scenarios:
+        reasons = depends_on(scenario, changes)
+        if reasons:
+            selected.append((scenario, reasons))
+    return selected
+
+
+def locations_by_feature(selected):
+    locations = {}
+    for scenario, _ in selected:
+        locations.setdefault(scenario.filename, []).append(scenario.location)
+    return locations
+
+
+def selection_report(changes, scenarios, selected):
+    total = len(scenarios)
+    skipped = total - len(selected)
+    return {
+        "ref": changes.ref,
+        "changedFiles": changes.files,
+        "changedKeys": {key: sorted(resources)
+                        for key, resources in sorted(changes.keys.items())},
+        "unmappedFiles": changes.unmapped,
+        "total": total,
+        "selected": len(selected),
+        "skipped": skipped,
+        "skippedPercent": round(skipped * 100.0 / total, 1) if total else 0.0,
+        "scenarios": [{"location": scenario.location, "name": scenario.name,
+                       "reasons": reasons} for scenario, reasons in selected],
+    }
+
+
+def log_report(report):
+    log.info(f"[changed since {report['ref']}] run {report['selected']} of "
+             f"{report['total']} scenarios, skipped {report['skipped']} "
+             f"({report['skippedPercent']}%)")
+    for item in report["scenarios"]:
+        log.info(f"  {item['location']} {item['name']}: "
+                 f"{', '.join(item['reasons'])}")
@@ -250,6 +250,9 @@ step_language = {
         "page not requested [{service}]": ["页面没有请求[{service}]"],
         "page requests some interfaces [{service}]": ["页面请求了接口[{service}]"],
         "wait interface [{service}] request finished": ["等待接口[{service}]请求结束"],
+        "wait network idle [{idle_time}]ms": ["等待网络空闲[{idle_time}]毫秒"],
+        "wait interface [{service}] network idle [{idle_time}]ms": [
+            "等待接口[{service}]网络空闲[{idle_time}]毫秒"],
         "remove all service record": ["移除所有请求记录"],
         "compare target element [{target_element}] with compared picture [{compared_picture_path}]": [
             "对比图片元素[{target_element}]和基准图片路径[{compared_picture_path}]"],
@@ -257,6 +260,8 @@ step_language = {
             "对比文本元素[{target_ele}]和基准文本路径[{compared_text_path}]"],
         "call external party api of method[{method}] and url[{url}] and data[{data}] and headers[{headers}]": [
             "调外部接口并传参请求方式[{method}]与请求链接[{url}]与请求内容[{data}]与请求标头[{headers}]"],
+        "call external party apis concurrently [{calls}]": [
+            "并发调外部接口[{calls}]"],
         "open service [{service}] bind mockCase[{mock_case_id}]": [
             "开启服务[{service}]绑定MockCase[{mock_case_id}]"],
         "touch[{selector}]": ["点触[{selector}]"],
@@ -135,6 +135,17 @@ def call_external_party_api(context, method, url, data, headers=None):
     g_Context.step.call_external_party_api(context, method, url, data, headers)
 
 
+@step("call external party apis concurrently [{calls}]")
+@ele_wrap
+def call_external_party_apis(context, calls):
+    """
+    call several external apis concurrently and wait for all of them
+
+    :param calls: json list of calls, each with method, url, data and headers
+    """
+    g_Context.step.call_external_party_apis(context, calls)
+
+
 @step(
     "compare service request [{service}] with json file [{target_data_path}]"
 )
@@ -235,6 +246,32 @@ def page_wait_interface_request_finished(context, service=None):
     g_Context.step.page_wait_interface_request_finished(context, service)
 
 
+@step("wait network idle [{idle_time}]ms")
+@ele_wrap
+def page_wait_network_idle(context, idle_time):
+    """
+    wait until no request was in flight for idle_time ms
+
+    :param context: step context
+    :param idle_time: quiet time in ms
+    """
+    g_Context.step.page_wait_network_idle(context, idle_time)
+
+
+@step("wait interface [{service}] network idle [{idle_time}]ms")
+@ele_wrap
+def page_wait_interface_network_idle(context, service, idle_time):
+    """
+    wait until the interfaces completed and none of them was in flight for
+    idle_time ms, interfaces that already completed count
+
+    :param context: step context
+    :param service: comma separated service request names
+    :param idle_time: quiet time in ms
+    """
+    g_Context.step.page_wait_network_idle(context, idle_time, service)
+
+
 @step("remove all service record")
 def clear_all_request_record(context):
     """
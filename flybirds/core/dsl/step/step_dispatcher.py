@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+index behave step definitions by the literal text before the first field,
+so a step only tries the definitions whose prefix it starts with
+"""
+from behave.matchers import ParseMatcher
+
+import flybirds.utils.flybirds_log as log
+
+STEP_TYPES = ("given", "when", "then", "step")
+
+
+def fold_char(char):
+    """
+    the trie key of a character, None when the character has case variants
+    outside ascii that re.IGNORECASE may treat as equal to another letter
+    """
+    if char.isascii():
+        return char.lower()
+    if char.lower() == char.upper():
+        return char
+    return None
+
+
+def literal_prefix(step_definition):
+    """
+    folded literal text the definition has to start with
+    """
+    if not isinstance(step_definition, ParseMatcher):
+        # regex matchers may match anything, keep them at the root
+        return ""
+    prefix = []
+    for char in step_definition.pattern:
+        if char in "{}":
+            break
+        key = fold_char(char)
+        if key is None:
+            break
+        prefix.append(key)
+    return "".join(prefix)
+
+
+class TrieNode:
+    __slots__ = ("children", "items")
+
+    def __init__(self):
+        self.children = {}
+        self.items = []
+
+    def walk(self):
+        yield self
+        for child in self.children.values():
+            yield from child.walk()
+
+
+class DispatchStats:
+    def __init__(self):
+        self.lookups = 0
+        self.memo_hits = 0
+        self.candidates = 0
+        self.definitions = 0
+        self.undefined = 0
+
+    def as_dict(self):
+        resolved = self.lookups - self.memo_hits
+        return {
+            "lookups": self.lookups,
+            "memo_hits": self.memo_hits,
+            "resolved": resolved,
+            "undefined": self.undefined,
+            "candidates_tried": self.candidates,
+            "avg_candidates": round(self.candidates / resolved, 2)
+            if resolved else 0,
+            "definitions": self.definitions,
+        }
+
+
+class StepDispatcher:
+    """
+    prefix trie over the definitions of a behave StepRegistry, resolved step
+    text is memoized for the whole run
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.roots = {}
+        self.sizes = {}
+        self.memo = {}
+        self.stats = DispatchStats()
+        self.rebuild()
+
+    def rebuild(self):
+        self.roots = {step_type: TrieNode() for step_type in STEP_TYPES}
+        self.sizes = {}
+        self.memo.clear()
+        for step_type in STEP_TYPES:
+            definitions = self.registry.steps.get(step_type, [])
+            for index, step_definition in enumerate(definitions):
+                self.insert(step_type, index, step_definition)
+            self.sizes[step_type] = len(definitions)
+        self.stats.definitions = sum(self.sizes.values())
+
+    def insert(self, step_type, index, step_definition):
+        node = self.roots[step_type]
+        for key in literal_prefix(step_definition):
+            node = node.children.setdefault(key, TrieNode())
+        node.items.append((index, step_definition))
+
+    def add(self, step_type, step_definition):
+        """
+        index a definition just appended to the registry
+        """
+        if self.sizes.get(step_type) != \
+                len(self.registry.steps[step_type]) - 1:
+            self.rebuild()
+            return
+        self.insert(step_type, self.sizes[step_type], step_definition)
+        self.sizes[step_type] += 1
+        self.stats.definitions += 1
+        self.memo.clear()
+
+    def check_fresh(self):
+        for step_type in STEP_TYPES:
+            if self.sizes.get(step_type) != \
+                    len(self.registry.steps.get(step_type, [])):
+                log.debug("step registry changed outside the dispatcher")
+                self.rebuild()
+                return
+
+    def candidates(self, step_type, text):
+        """
+        definitions on the trie path of the text, in registration order
+        """
+        found = []
+        node = self.roots[step_type]
+        found.extend(node.items)
+        for char in text:
+            key = fold_char(char)
+            if key is None:
+                # the text may still match any longer prefix below here
+                for sub_node in node.walk():
+                    if sub_node is not node:
+                        found.extend(sub_node.items)
+                break
+            node = node.children.get(key)
+            if node is None:
+                break
+            found.extend(node.items)
+        found.sort(key=lambda item: item[0])
+        return [step_definition for _, step_definition in found]
+
+    def ordered_candidates(self, step_type, text):
+        """
+        same order as behave: definitions of the step type, then "step" ones
+        """
+        result = self.candidates(step_type, text)
+        if step_type != "step":
+            result += self.candidates("step", text)
+        return result
+
+    def resolve(self, step_type, text):
+        """
+        (definition, match) of the step text, (None, None) when undefined
+        """
+        self.check_fresh()
+        self.stats.lookups += 1
+        key = (step_type, text)
+        resolved = self.memo.get(key)
+        if resolved is not None:
+            self.stats.memo_hits += 1
+            return resolved
+        resolved = (None, None)
+        for step_definition in self.ordered_candidates(step_type, text):
+            self.stats.candidates += 1
+            match = step_definition.match(text)
+            if match:
+                resolved = (step_definition, match)
+                break
+        if resolved[0] is None:
+            self.stats.undefined += 1
+        self.memo[key] = resolved
+        return resolved
+
+    def find_match(self, step_type, text):
+        return self.resolve(step_type, text)[1]
+
+    def find_step_definition(self, step_type, text):
+        return self.resolve(step_type, text)[0]
+
+
+def get_dispatcher(registry):
+    dispatcher = registry.__dict__.get("flybirds_dispatcher")
+    if dispatcher is None:
+        dispatcher = StepDispatcher(registry)
+        registry.flybirds_dispatcher = dispatcher
+    return dispatcher
+
+
+def get_stats():
+    """
+    lookup statistics of the behave step registry
+    """
+    from behave.step_registry import registry
+    dispatcher = registry.__dict__.get("flybirds_dispatcher")
+    if dispatcher is None:
+        return None
+    return dispatcher.stats.as_dict()
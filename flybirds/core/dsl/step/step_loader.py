@@ -6,7 +6,10 @@ behave cannot get language from json report,use this to change the behave func
 import six
 from behave.formatter.json import JSONFormatter
 from behave.i18n import languages
-from behave.step_registry import StepRegistry
+from behave.matchers import Match, get_matcher
+from behave.step_registry import AmbiguousStep, StepRegistry
+from behave.textutil import text as _text
+from flybirds.core.dsl.step.step_dispatcher import get_dispatcher
 from flybirds.core.extend.step import load_steps
 
 import flybirds.utils.flybirds_log as log
@@ -14,6 +17,8 @@ import flybirds.utils.language_helper as lge
 
 # hold behave add step func
 step_registry_add_step = StepRegistry.add_step_definition
+step_registry_find_match = StepRegistry.find_match
+step_registry_find_step = StepRegistry.find_step_definition
 language_list = lge.get_language_list()
 
 
@@ -31,6 +36,9 @@ def inject_behave():
             or StepRegistry.add_step_definition.__name__
                     .find("add_step_definition") >= 0):
         StepRegistry.add_step_definition = step_registry_add_step_wreap
+    log.info("change behave step lookup to the indexed step dispatcher")
+    StepRegistry.find_match = find_match_wreap
+    StepRegistry.find_step_definition = find_step_definition_wreap
 
 
 def feature_wreap(self, feature):
@@ -67,8 +75,48 @@ def step_registry_add_step_wreap(self, keyword, step_text, func):
             txt_list = lge.parse_glb_step(step_text, language_item)
             if txt_list is not None and len(txt_list) > 0:
                 for txt in txt_list:
-                    step_registry_add_step(self, keyword, txt, func)
-    step_registry_add_step(self, keyword, step_text, func)
+                    indexed_add_step(self, keyword, txt, func)
+    indexed_add_step(self, keyword, step_text, func)
+
+
+def indexed_add_step(self, keyword, step_text, func):
+    """
+    behave add_step_definition, the ambiguity check only looks at the
+    definitions on the trie path of the step text
+    """
+    step_location = Match.make_location(func)
+    step_type = keyword.lower()
+    step_text = _text(step_text)
+    dispatcher = get_dispatcher(self)
+    dispatcher.check_fresh()
+    for existing in dispatcher.candidates(step_type, step_text):
+        if self.same_step_definition(existing, step_text, step_location):
+            return
+        elif existing.match(step_text):
+            message = u"%s has already been defined in\n  existing step %s"
+            new_step = u"@%s('%s')" % (step_type, step_text)
+            existing.step_type = step_type
+            existing_step = existing.describe()
+            existing_step += u" at %s" % existing.location
+            raise AmbiguousStep(message % (new_step, existing_step))
+    step_definition = get_matcher(func, step_text)
+    self.steps[step_type].append(step_definition)
+    dispatcher.add(step_type, step_definition)
+
+
+def find_match_wreap(self, step):
+    """
+    wreap behave find_match
+    """
+    return get_dispatcher(self).find_match(step.step_type, step.name)
+
+
+def find_step_definition_wreap(self, step):
+    """
+    wreap behave find_step_definition
+    """
+    return get_dispatcher(self).find_step_definition(step.step_type,
+                                                     step.name)
 
 
 def inject_behave_language():
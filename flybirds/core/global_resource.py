@@ -17,6 +17,19 @@ def init_glb():
     global _global_dict
     _global_dict = {
         "configManage": None,
+        "configSnapshot": None,
+        "attachmentStore": None,
+        "recordFinalizer": None,
+        "scenarioRetry": None,
+        "appReadyStats": None,
+        "networkArchive": None,
+        "storageStateCache": None,
+        "storageStateAccount": None,
+        "requestTracker": None,
+        "eleSnapshots": None,
+        "sessionRecorder": None,
+        "sessionReplay": None,
+        "hierarchyTransport": None,
         "projectScript": None,
         "userData": {},
         "deviceInstance": None,
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+run only the scenarios whose dependencies changed since a git ref
+"""
+import json
+import os
+import traceback
+
+from flybirds.core import dependency_index
+from flybirds.core.launch_cycle.run_manage import RunManage
+from flybirds.utils import flybirds_log as log
+
+REPORT_FILE = "change_selection.json"
+
+
+class ChangeSelect:
+    """
+    replace the feature path of the behave command with the locations of
+    the selected scenarios
+    """
+
+    name = "ChangeSelect"
+    order = 17
+
+    @staticmethod
+    def can(context):
+        return context.get("changed_since") is not None \
+            and context.get("cmd_str") is not None
+
+    @staticmethod
+    def run(context):
+        ref = context["changed_since"]
+        feature_path = context.get("feature_path")
+        try:
+            scenarios = dependency_index.index_features(feature_path)
+            changes = dependency_index.collect_changes(ref, feature_path)
+        except Exception:
+            log.warn(f"[changed since {ref}] cannot select scenarios, run "
+                     f"all: {traceback.format_exc()}")
+            return
+        if changes.full_run:
+            log.info(f"[changed since {ref}] run all, changes that no "
+                     f"scenario can be mapped to: {changes.unmapped}")
+            return
+        selected = dependency_index.select(scenarios, changes)
+        report = dependency_index.selection_report(changes, scenarios,
+                                                   selected)
+        dependency_index.log_report(report)
+        ChangeSelect.write_report(context, report)
+        if len(selected) == 0:
+            log.info(f"[changed since {ref}] no scenario depends on the "
+                     f"changes, nothing to run")
+            context["no_args"] = True
+            return
+        locations = dependency_index.locations_by_feature(selected)
+        selected_path = " ".join(
+            location for feature_locations in locations.values()
+            for location in feature_locations)
+        context["cmd_str"] = context["cmd_str"].replace(
+            f"behave {feature_path} ", f"behave {selected_path} ", 1)
+        context["feature_path"] = selected_path
+        context["selected_locations"] = locations
+
+    @staticmethod
+    def write_report(context, report):
+        report_dir = context.get("report_dir_path")
+        if report_dir is None:
+            return
+        try:
+            with open(os.path.join(report_dir, REPORT_FILE), "w",
+                      encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        except OSError as write_error:
+            log.info(f"write change selection error: {write_error}")
+
+
+RunManage.join("before_run_processor", ChangeSelect, 1)
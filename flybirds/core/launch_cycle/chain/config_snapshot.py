@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+resolve the configuration once before behave workers start
+"""
+import traceback
+
+from flybirds.core import config_snapshot
+from flybirds.core.launch_cycle.run_manage import RunManage
+from flybirds.utils.flybirds_log import logger
+
+
+class ConfigSnapshotInit:
+    """
+    write the config snapshot that workers and reruns load
+    """
+
+    name = "ConfigSnapshotInit"
+    order = 16
+
+    @staticmethod
+    def can(context):
+        return True
+
+    @staticmethod
+    def run(context):
+        try:
+            snapshot = config_snapshot.dump()
+            if snapshot is not None:
+                context["config_snapshot"] = snapshot.digest
+        except Exception:
+            # workers fall back to reading the config files
+            logger.info(
+                f"create config snapshot error: {traceback.format_exc()}")
+
+
+RunManage.join("before_run_processor", ConfigSnapshotInit, 1)
@@ -2,7 +2,13 @@
 """
 launch init such as run args init
 """
+import base64
+import shutil
+
+from flybirds.core.config_manage import FlowBehave, ReportConfig
 from flybirds.core.launch_cycle.run_manage import RunManage
+from flybirds.utils import flybirds_log as log
+from flybirds.utils.dsl_helper import get_use_define_param
 
 
 class LaunchInit:
@@ -44,6 +50,7 @@ class LaunchInit:
             context["feature_path"] = run_args.get("feature_path")
             context["parsed_tags"] = run_args.get("parsed_tags")
             context["use_define"] = run_args.get("use_define")
+            context["changed_since"] = run_args.get("changed_since")
 
             is_html = run_args.get("html")
             run_at = run_args.get("run_at")
@@ -51,11 +58,61 @@ class LaunchInit:
             if is_html is not None and is_html is False:
                 context["report_format"] = None
             else:
-                context["report_format"] = "cucumber"
+                LaunchInit.init_report_gen(context)
             if run_at is not None and run_at != "":
                 context["run_at"] = run_at
             else:
                 context["run_at"] = "local"
+            LaunchInit.init_retry_mode(context)
+
+    @staticmethod
+    def init_report_gen(context):
+        """
+        choose the report generator, the python generator is used when the
+        node reporter cannot run
+        """
+        user_data = {}
+        if context.get("use_define") is not None:
+            user_data.update(get_use_define_param(context, "reportGen"))
+            user_data.update(get_use_define_param(context, "liveReport"))
+        report_gen = "cucumber"
+        live_report = False
+        # noinspection PyBroadException
+        try:
+            report_config = ReportConfig(user_data, None)
+            report_gen = report_config.report_gen
+            live_report = report_config.live_report
+        except Exception as config_error:
+            log.info(f"read report config error: {config_error}")
+        if report_gen == "cucumber" and shutil.which("node") is None:
+            log.info("node is not installed, use the html report generator")
+            report_gen = "html"
+        context["report_format"] = report_gen
+        context["live_report"] = live_report
+
+    @staticmethod
+    def init_retry_mode(context):
+        """
+        with failRerunMode immediate the behave workers retry a failed
+        scenario right away and no rerun process is started after the run
+        """
+        user_data = {}
+        if context.get("use_define") is not None:
+            user_data.update(get_use_define_param(context, "failRerunMode"))
+        # noinspection PyBroadException
+        try:
+            flow_behave = FlowBehave(user_data, None)
+        except Exception as config_error:
+            log.info(f"read flow behave config error: {config_error}")
+            return
+        need_rerun = context.get("need_rerun_args") or flow_behave.fail_rerun
+        if not need_rerun or flow_behave.fail_rerun_mode != "immediate":
+            return
+        context["immediate_retry"] = True
+        if context.get("cmd_str") is not None:
+            context["cmd_str"] += " --define immediateRetry={}".format(
+                str(base64.b64encode(b"true"), "utf-8"))
+        log.info("failed scenarios are retried immediately in the workers")
 
 
 # add event to processor, launch init should be first one
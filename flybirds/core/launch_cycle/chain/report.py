@@ -5,6 +5,7 @@ report generate
 import traceback
 
 from flybirds.core.launch_cycle.run_manage import RunManage
+from flybirds.report.gen.html_gen import LiveHtmlReport
 from flybirds.report.gen_factory import GenFactory
 from flybirds.utils.flybirds_log import logger
 
@@ -44,6 +45,9 @@ class OnGenerate:
         generate logical
         """
         try:
+            live_report = context.get("live_report_thread")
+            if live_report is not None:
+                live_report.stop()
             logger.info("start generate report")
             report_path = context["report_dir_path"]
             gen_type = context["report_format"]
@@ -54,5 +58,36 @@ class OnGenerate:
                 f"report task execute error: {traceback.format_exc()}")
 
 
+class OnLiveReport:
+    """
+    refresh the html report while the run is in progress
+    """
+
+    name = "OnLiveReport"
+    order = 30
+
+    @staticmethod
+    def can(context):
+        run_at = context.get("run_at")
+        if run_at is not None and run_at != "local":
+            return False
+        return context.get("report_format") == "html" \
+            and context.get("live_report") is True \
+            and context.get("report_dir_path") is not None
+
+    @staticmethod
+    def run(context):
+        try:
+            live_report = LiveHtmlReport(context["report_dir_path"],
+                                         context.get("cur_platform"))
+            live_report.start()
+            context["live_report_thread"] = live_report
+            logger.info("live html report started")
+        except Exception:
+            logger.error(
+                f"live report start error: {traceback.format_exc()}")
+
+
 # add event to processor
+RunManage.join("before_run_processor", OnLiveReport, 1)
 RunManage.join("after_run_processor", OnGenerate, 1)
@@ -5,6 +5,7 @@ import traceback
 from subprocess import Popen
 
 from flybirds.core.config_manage import DeviceConfig
+from flybirds.report import device_farm
 from flybirds.report.fail_feature_create import rerun_launch
 from flybirds.report.parallel_runner import parallel_run
 from flybirds.utils import flybirds_log as log
@@ -72,6 +73,9 @@ class RunManage:
                 is_parallel = need_parallel_run(context)
                 if is_parallel:
                     parallel_run(context)
+                elif need_device_farm(context):
+                    is_parallel = True
+                    device_farm.farm_run(context)
                 else:
                     cmd_str = context.get("cmd_str")
                     behave_process = Popen(
@@ -157,3 +161,17 @@ def need_parallel_run(context):
     if 'web' == platform.lower():
         return True
     return False
+
+
+def need_device_farm(context):
+    """
+    mobile runs with a deviceList run on the device farm
+    """
+    if context.get('cur_platform') not in ['ios', 'android']:
+        return False
+    devices = device_farm.get_farm_devices(context)
+    if len(devices) == 0:
+        return False
+    log.info(f'run on the device farm: {[d.device_id for d in devices]}')
+    context['farm_devices'] = devices
+    return True
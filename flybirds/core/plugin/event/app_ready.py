@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+log the fixed wait time the app readiness probe saved
+"""
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+from flybirds.core.global_context import GlobalContext
+
+
+class OnScenarioReadyStats:  # pylint: disable=too-few-public-methods
+    """
+    after scenario, after the app reset of a failed scenario
+    """
+
+    name = "OnScenarioReadyStats"
+    order = 1000
+
+    @staticmethod
+    def can(context, scenario):
+        return gr.get_value("appReadyStats") is not None
+
+    @staticmethod
+    def run(context, scenario):
+        saved = gr.get_value("appReadyStats").end_scenario()
+        log.info(f"[app ready] scenario [{scenario.name}] saved "
+                 f"{saved:.2f}s of fixed waits")
+
+
+class OnRunReadyStats:  # pylint: disable=too-few-public-methods
+    """
+    after event
+    """
+
+    name = "OnRunReadyStats"
+    order = 150
+
+    @staticmethod
+    def can(context):
+        return gr.get_value("appReadyStats") is not None
+
+    @staticmethod
+    def run(context):
+        stats = gr.get_value("appReadyStats")
+        log.info(f"[app ready] {stats.probes} probes saved "
+                 f"{stats.total_saved:.2f}s of fixed waits in this worker")
+
+
+var = GlobalContext.join("after_scenario_processor", OnScenarioReadyStats, 1)
+var1 = GlobalContext.join("after_run_processor", OnRunReadyStats, 1)
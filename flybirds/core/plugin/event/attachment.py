@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+open and close the attachment sidecar of the behave worker
+"""
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+from flybirds.core.global_context import GlobalContext
+from flybirds.report import attachment
+
+
+class OnAttachmentStoreOpen:  # pylint: disable=too-few-public-methods
+    """
+    before event
+    """
+
+    name = "OnAttachmentStoreOpen"
+    order = 2
+
+    @staticmethod
+    def run(context):
+        store = attachment.open_store(context)
+        gr.set_value("attachmentStore", store)
+        if store is not None:
+            log.info(f"attachment sidecar: {store.path}")
+
+
+class OnAttachmentStoreClose:  # pylint: disable=too-few-public-methods
+    """
+    after event
+    """
+
+    name = "OnAttachmentStoreClose"
+    order = 200
+
+    @staticmethod
+    def can(context):
+        return gr.get_value("attachmentStore") is not None
+
+    @staticmethod
+    def run(context):
+        gr.get_value("attachmentStore").close()
+
+
+var = GlobalContext.join("before_run_processor", OnAttachmentStoreOpen, 1)
+var1 = GlobalContext.join("after_run_processor", OnAttachmentStoreClose, 1)
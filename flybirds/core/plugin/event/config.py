@@ -38,11 +38,14 @@ class OnConfigLoad:  # pylint: disable=too-few-public-methods
             # it with the report later
             set_rerun_info(user_data, gr)
             # get configuration, user-defined priority and configuration file
-            config_manage = ConfigManage(user_data)
+            config_manage = ConfigManage(
+                user_data, gr.get_value("configSnapshot"))
             gr.set_value("configManage", config_manage)
             context.config_manage = config_manage
             log.info("configuration file read completed")
             log.ch.setLevel(gr.get_log_level())
+            if config_manage.log_config.json_dir:
+                log.enable_json_log(config_manage.log_config.json_dir)
 
             # config app runtime env
             app_env_config = AppEnvConfig(user_data, None)
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+log the poco hierarchy dumps of the behave worker
+"""
+import flybirds.core.global_resource as gr
+from flybirds.core.global_context import GlobalContext
+
+
+class OnHierarchyStats:  # pylint: disable=too-few-public-methods
+    """
+    after event
+    """
+
+    name = "OnHierarchyStats"
+    order = 160
+
+    @staticmethod
+    def can(context):
+        return gr.get_value("hierarchyTransport") is not None
+
+    @staticmethod
+    def run(context):
+        gr.get_value("hierarchyTransport").log_stats()
+
+
+var = GlobalContext.join("after_run_processor", OnHierarchyStats, 1)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+open the network archive of a web feature before it runs and write it
+after it ran
+"""
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+from flybirds.core.global_context import GlobalContext
+from flybirds.core.plugin.plugins.default.web import network_archive
+
+
+def is_archive_run():
+    platform = gr.get_platform()
+    return platform is not None and platform.lower() == "web" \
+        and network_archive.get_mode() != network_archive.OFF
+
+
+class OnNetworkArchiveOpen:  # pylint: disable=too-few-public-methods
+    """
+    feature before processor
+    """
+
+    name = "OnNetworkArchiveOpen"
+    order = 20
+
+    @staticmethod
+    def can(context, feature):
+        return is_archive_run()
+
+    @staticmethod
+    def run(context, feature):
+        network_archive.close_archive()
+        archive = network_archive.open_archive(feature.filename)
+        if archive is not None:
+            log.info(f"[network archive] {archive.mode} {archive.path}")
+
+
+class OnNetworkArchiveClose:  # pylint: disable=too-few-public-methods
+    """
+    feature after processor
+    """
+
+    name = "OnNetworkArchiveClose"
+    order = 90
+
+    @staticmethod
+    def can(context, feature):
+        return gr.get_value("networkArchive") is not None
+
+    @staticmethod
+    def run(context, feature):
+        network_archive.close_archive()
+
+
+var = GlobalContext.join("before_feature_processor", OnNetworkArchiveOpen, 1)
+var1 = GlobalContext.join("after_feature_processor", OnNetworkArchiveClose,
+                          1)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+perfTrace: write the step and subsystem spans of the behave worker to
+<report dir>/trace/<report name>.trace.json, read by flybirds perf
+"""
+import os
+
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+from flybirds.core.global_context import GlobalContext
+from flybirds.report import attachment
+from flybirds.utils import trace
+from flybirds.utils.dsl_helper import str2bool
+
+TRACE_DIR = "trace"
+TRACE_SUFFIX = ".trace.json"
+
+
+def get_trace_path(report_path):
+    report_dir, report_name = os.path.split(os.path.abspath(report_path))
+    stem = os.path.splitext(report_name)[0]
+    return os.path.join(report_dir, TRACE_DIR, f"{stem}{TRACE_SUFFIX}")
+
+
+def is_enabled():
+    enabled = gr.get_frame_config_value("perf_trace", False)
+    if isinstance(enabled, str):
+        enabled = str2bool(enabled)
+    return enabled is True
+
+
+class OnTraceStart:  # pylint: disable=too-few-public-methods
+    """
+    before event
+    """
+
+    name = "OnTraceStart"
+    order = 3
+
+    @staticmethod
+    def can(context):
+        return is_enabled()
+
+    @staticmethod
+    def run(context):
+        report_path = attachment.get_report_path(context)
+        if report_path is None:
+            log.info("perf trace needs a json report, trace is not written")
+            return
+        trace_path = get_trace_path(report_path)
+        trace.start(trace_path, os.path.basename(report_path))
+        log.info(f"perf trace: {trace_path}")
+
+
+class OnTraceStop:  # pylint: disable=too-few-public-methods
+    """
+    after event
+    """
+
+    name = "OnTraceStop"
+    order = 190
+
+    @staticmethod
+    def can(context):
+        return trace.get_tracer() is not None
+
+    @staticmethod
+    def run(context):
+        trace.stop()
+
+
+class OnStepTraceBegin:  # pylint: disable=too-few-public-methods
+    """
+    before step, first so the step span covers the other processors
+    """
+
+    name = "OnStepTraceBegin"
+    order = 1
+
+    @staticmethod
+    def can(context, step):
+        return trace.get_tracer() is not None
+
+    @staticmethod
+    def run(context, step):
+        scenario = getattr(context, "scenario", None)
+        trace.get_tracer().step_begin(step.name, {
+            "feature": getattr(getattr(context, "feature", None), "name",
+                               None),
+            "scenario": getattr(scenario, "name", None),
+            "location": str(step.location),
+        })
+
+
+class OnStepTraceEnd:  # pylint: disable=too-few-public-methods
+    """
+    after step
+    """
+
+    name = "OnStepTraceEnd"
+    order = 20000
+
+    @staticmethod
+    def can(context, step):
+        return trace.get_tracer() is not None
+
+    @staticmethod
+    def run(context, step):
+        trace.get_tracer().step_end(getattr(step.status, "name",
+                                            str(step.status)))
+
+
+var = GlobalContext.join("before_run_processor", OnTraceStart, 1)
+var1 = GlobalContext.join("after_run_processor", OnTraceStop, 1)
+var2 = GlobalContext.join("before_step_processor", OnStepTraceBegin, 1)
+var3 = GlobalContext.join("after_step_processor", OnStepTraceEnd, 1)
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+wait for the background screen record finalization before the attachments
+are closed and the report is generated
+"""
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+from flybirds.core.global_context import GlobalContext
+from flybirds.core.plugin.plugins.default import record_finalizer
+
+# seconds, a job is bounded by the adb pull and ffmpeg timeouts
+FLUSH_TIMEOUT = 300
+
+
+class OnRecordFinalizeFlush:  # pylint: disable=too-few-public-methods
+    """
+    after event
+    """
+
+    name = "OnRecordFinalizeFlush"
+    order = 5
+
+    @staticmethod
+    def can(context):
+        return gr.get_value("recordFinalizer") is not None
+
+    @staticmethod
+    def run(context):
+        not_done = record_finalizer.flush_finalizer(FLUSH_TIMEOUT)
+        if not_done > 0:
+            log.warn(f"{not_done} screen record finalize jobs not finished "
+                     f"in {FLUSH_TIMEOUT}s, their videos are not attached")
+        else:
+            gr.get_value("recordFinalizer").shutdown()
+        gr.set_value("recordFinalizer", None)
+
+
+var = GlobalContext.join("after_run_processor", OnRecordFinalizeFlush, 1)
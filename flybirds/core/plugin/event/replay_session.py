@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+record the hierarchy dumps, screenshots and ocr results of a mobile run
+into a session archive, or move a replayed session along with the steps
+"""
+import traceback
+
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+from flybirds.core.global_context import GlobalContext
+from flybirds.core.plugin.plugins.default.replay import session
+
+
+def is_app_run():
+    platform = gr.get_platform()
+    return platform is not None and platform.lower() != "web"
+
+
+def get_recorder():
+    if not is_app_run() or session.get_replay() is not None:
+        return None
+    return session.get_recorder()
+
+
+def record_hierarchy(recorder):
+    poco = gr.get_value("pocoInstance")
+    if poco is None:
+        return
+    try:
+        session.record_step_hierarchy(recorder, poco)
+    except Exception:
+        log.warn(f"[record session] dump hierarchy error: "
+                 f"{traceback.format_exc()}")
+
+
+class OnSessionRecordInit:  # pylint: disable=too-few-public-methods
+    """
+    before run, after the poco and ocr instances are created
+    """
+
+    name = "OnSessionRecordInit"
+    order = 52
+
+    @staticmethod
+    def can(context):
+        return get_recorder() is not None
+
+    @staticmethod
+    def run(context):
+        recorder = get_recorder()
+        poco = gr.get_value("pocoInstance")
+        if poco is None:
+            log.warn("[record session] no poco instance to record")
+            return
+        ocr = session.attach_recorder(recorder, poco,
+                                      GlobalContext.ocr_driver_instance)
+        if ocr is not None:
+            GlobalContext.ocr_driver_instance = ocr
+            gr.set_value("ocrInstance", ocr)
+        recorder.set_screen_size(gr.get_value("current_screen_size"))
+        log.info(f"[record session] recording to {recorder.path}")
+
+
+class OnSessionStep:  # pylint: disable=too-few-public-methods
+    """
+    before step, the recorded hierarchy is the screen the step starts on
+    """
+
+    name = "OnSessionStep"
+    order = 6
+
+    @staticmethod
+    def can(context, step):
+        return is_app_run() and (session.get_replay() is not None
+                                 or get_recorder() is not None)
+
+    @staticmethod
+    def run(context, step):
+        key = session.step_key(context, step)
+        replay = session.get_replay()
+        if replay is not None:
+            replay.begin_step(key)
+            return
+        recorder = get_recorder()
+        recorder.begin_step(key)
+        record_hierarchy(recorder)
+
+
+class OnSessionStepEnd:  # pylint: disable=too-few-public-methods
+    """
+    after step, the screen the step left
+    """
+
+    name = "OnSessionStepEnd"
+    order = 90
+
+    @staticmethod
+    def can(context, step):
+        return get_recorder() is not None
+
+    @staticmethod
+    def run(context, step):
+        record_hierarchy(get_recorder())
+
+
+class OnSessionSave:  # pylint: disable=too-few-public-methods
+    """
+    after run, before the driver is closed
+    """
+
+    name = "OnSessionSave"
+    order = 96
+
+    @staticmethod
+    def can(context):
+        return get_recorder() is not None
+
+    @staticmethod
+    def run(context):
+        try:
+            get_recorder().save()
+        except Exception:
+            log.error(f"[record session] save error: "
+                      f"{traceback.format_exc()}")
+
+
+var = GlobalContext.join("before_run_processor", OnSessionRecordInit, 1)
+var1 = GlobalContext.join("before_step_processor", OnSessionStep, 1)
+var2 = GlobalContext.join("after_step_processor", OnSessionStepEnd, 1)
+var3 = GlobalContext.join("after_run_processor", OnSessionSave, 1)
@@ -10,6 +10,7 @@ import flybirds.utils.flybirds_log as log
 from flybirds.core.driver import ui_driver
 from flybirds.core.global_context import GlobalContext
 from flybirds.core.plugin.event.device_prepare import OnPrepare
+from flybirds.core.plugin.plugins.default.replay import session
 from flybirds.utils import launch_helper
 
 
@@ -131,6 +132,10 @@ class OnOcrBefore:  # pylint: disable=too-few-public-methods
         """
         try:
             log.info("init ocr config")
+            if session.get_replay() is not None:
+                # the recorded results are served without paddleocr
+                OnBefore.init_ocr_driver(context)
+                return
             try:
                 importlib.import_module("paddleocr")
                 OnBefore.init_ocr_driver(context)
@@ -127,8 +127,14 @@ def scenario_fail(context, scenario):
     if need_copy_record >= 1 or context.scenario_screen_record \
             or cur_platform.strip().lower() == "web":
         screen_record = gr.get_value("screenRecord")
-        screen_record.stop_record()
-        link_record(scenario, context.cur_step_index - 1)
+        if cur_platform.strip().lower() == "android":
+            # the recording is pulled and cropped by the finalize pool while
+            # the next scenario runs
+            screen_record.stop_record(wait=False)
+            link_record(scenario, context.cur_step_index - 1, background=True)
+        else:
+            screen_record.stop_record()
+            link_record(scenario, context.cur_step_index - 1)
 
     # the processing of the current page after the scene fails
     launch_helper.app_start("scenario_fail_page")
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+failRerunMode immediate: a failed scenario is run again right away in the
+same behave worker, the before/after scenario hooks reset the app or page
+for every attempt and the final report element records the attempts
+"""
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+from flybirds.core.global_context import GlobalContext
+
+# length of the error message kept for an attempt
+ERROR_LENGTH = 500
+
+
+def failed_step(scenario):
+    """
+    (name, error message) of the first failed step
+    """
+    for step in getattr(scenario, "all_steps", scenario.steps):
+        if getattr(step.status, "name", step.status) == "failed":
+            return step.name, step.error_message
+    return None, getattr(scenario, "error_message", None)
+
+
+def json_elements(runner):
+    """
+    report element of the attempt that just ran, one per json formatter
+    """
+    elements = []
+    for formatter in getattr(runner, "formatters", None) or []:
+        data = getattr(formatter, "current_feature_data", None)
+        if isinstance(data, dict) and data.get("elements"):
+            elements.append(data["elements"][-1])
+    return elements
+
+
+def count_scenarios(runner):
+    total = 0
+    for feature in getattr(runner, "features", None) or []:
+        for scenario in feature.walk_scenarios():
+            try:
+                if scenario.should_run(runner.config):
+                    total += 1
+            except Exception:
+                total += 1
+    return total
+
+
+class ScenarioRetry:
+    """
+    retries of one worker, the gate is the one of the rerun process:
+    a float max_fail_count limits the share of failed scenarios, an int the
+    number, but it is checked on the failures seen so far
+    """
+
+    def __init__(self, max_retry_count=1, max_fail_count=1.0, total=0):
+        self.max_retry_count = max_retry_count
+        self.max_fail_count = max_fail_count
+        self.total = total
+        self.failed = 0
+
+    def allow(self):
+        if self.failed <= 0 or self.total <= 0:
+            return False
+        if isinstance(self.max_fail_count, float):
+            return self.failed / self.total <= self.max_fail_count
+        if isinstance(self.max_fail_count, int):
+            return self.failed <= self.max_fail_count
+        return True
+
+    def wrap(self, scenario):
+        if getattr(scenario, "flybirds_retry", False):
+            return
+        scenario_run = scenario.run
+
+        def run_with_retry(runner):
+            return self.run(scenario, scenario_run, runner)
+
+        scenario.run = run_with_retry
+        scenario.flybirds_retry = True
+
+    def run(self, scenario, scenario_run, runner):
+        description = list(scenario.description)
+        attempts = []
+        attempt = 1
+        while True:
+            scenario.flybirds_attempt = attempt
+            failed = scenario_run(runner)
+            if not failed:
+                break
+            step_name, error = failed_step(scenario)
+            attempts.append({
+                "attempt": attempt,
+                "status": "failed",
+                "step": step_name,
+                "error": str(error or "")[:ERROR_LENGTH],
+            })
+            if attempt == 1:
+                self.failed += 1
+            if attempt > self.max_retry_count or runner.aborted \
+                    or not self.allow():
+                break
+            for element in json_elements(runner):
+                element["attempt"] = attempt
+                element["retried"] = True
+            log.info(f"scenario [{scenario.name}] failed at step "
+                     f"[{step_name}], retry attempt {attempt + 1}")
+            scenario.description = list(description)
+            attempt += 1
+        if attempt > 1:
+            for element in json_elements(runner):
+                element["attempt"] = attempt
+                element["attempts"] = attempts
+                element.setdefault("description", []).append(
+                    f"retried in the worker, attempt {attempt}, failed "
+                    f"attempts at: "
+                    f"{', '.join(str(item['step']) for item in attempts)}")
+        return failed
+
+
+def get_scenario_retry(context):
+    scenario_retry = gr.get_value("scenarioRetry")
+    if scenario_retry is None:
+        try:
+            max_retry_count = int(
+                gr.get_flow_behave_value("max_retry_count", 1))
+        except (TypeError, ValueError):
+            max_retry_count = 1
+        scenario_retry = ScenarioRetry(
+            max_retry_count,
+            gr.get_flow_behave_value("max_fail_rerun_count", 1.0),
+            count_scenarios(getattr(context, "_runner", None)))
+        gr.set_value("scenarioRetry", scenario_retry)
+    return scenario_retry
+
+
+class OnScenarioRetry:  # pylint: disable=too-few-public-methods
+    """
+    feature before processor
+    """
+
+    name = "OnScenarioRetry"
+    order = 10
+
+    @staticmethod
+    def can(context, feature):
+        return gr.get_flow_behave_value("immediate_retry", False) is True
+
+    @staticmethod
+    def run(context, feature):
+        scenario_retry = get_scenario_retry(context)
+        for scenario in feature.walk_scenarios():
+            scenario_retry.wrap(scenario)
+
+
+var = GlobalContext.join("before_feature_processor", OnScenarioRetry, 1)
@@ -5,6 +5,8 @@ when run step will trigger this event
 from flybirds.core.exceptions import ele_error_parse, get_step_group, get_step_selector, set_error_info_cache, \
     set_page_info
 from flybirds.core.global_context import GlobalContext
+from flybirds.core.plugin.plugins.default.ui_driver.poco import \
+    hierarchy_transport
 from flybirds.utils import flybirds_log as log
 from flybirds.utils import launch_helper
 import flybirds.core.global_resource as gr
@@ -17,6 +19,10 @@ def step_init(context, step):
     # adjust the order of the current steps for use in associated screenshots
     context.cur_step_index += 1
     gr.set_value("stepName", step.name)
+    # web element snapshots are valid for one step
+    gr.set_value("eleSnapshots", None)
+    # a step starts on a screen the previous step may have changed
+    hierarchy_transport.invalidate()
 
 
 class OnBefore:  # pylint: disable=too-few-public-methods
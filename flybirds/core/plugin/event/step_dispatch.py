@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+log the step lookup statistics of the behave worker
+"""
+import flybirds.utils.flybirds_log as log
+from flybirds.core.dsl.step import step_dispatcher
+from flybirds.core.global_context import GlobalContext
+
+
+class OnStepDispatchStats:  # pylint: disable=too-few-public-methods
+    """
+    after event
+    """
+
+    name = "OnStepDispatchStats"
+    order = 190
+
+    @staticmethod
+    def can(context):
+        return step_dispatcher.get_stats() is not None
+
+    @staticmethod
+    def run(context):
+        log.info(f"step lookup stats: {step_dispatcher.get_stats()}")
+
+
+var = GlobalContext.join("after_run_processor", OnStepDispatchStats, 1)
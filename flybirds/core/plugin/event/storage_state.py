@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+log in before a web scenario unless its browser context was seeded with the
+cached storage state, and drop the state when a failed scenario turns out
+to be logged out
+"""
+import traceback
+
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+from flybirds.core.global_context import GlobalContext
+from flybirds.core.plugin.plugins.default.web import storage_state
+from flybirds.utils import launch_helper
+
+
+def is_web_cache_run():
+    platform = gr.get_platform()
+    return platform is not None and platform.lower() == "web" \
+        and storage_state.is_enabled()
+
+
+class OnWebLogin:  # pylint: disable=too-few-public-methods
+    """
+    scenario before processor, after the page of the scenario is opened
+    """
+
+    name = "OnWebLogin"
+    order = 6
+
+    @staticmethod
+    def can(context, scenario):
+        return is_web_cache_run()
+
+    @staticmethod
+    def run(context, scenario):
+        page_obj = gr.get_value("plugin_page")
+        if page_obj is None or getattr(page_obj, "context", None) is None:
+            log.info("[storage state] no browser context to log in")
+            return
+        try:
+            storage_state.ensure_login(page_obj.context, launch_helper.login)
+        except Exception:
+            log.error(f"[storage state] login error: "
+                      f"{traceback.format_exc()}")
+
+
+class OnLoggedOutCheck:  # pylint: disable=too-few-public-methods
+    """
+    scenario after processor, before the failed page is closed
+    """
+
+    name = "OnLoggedOutCheck"
+    order = -10
+
+    @staticmethod
+    def can(context, scenario):
+        return scenario.status == "failed" and is_web_cache_run()
+
+    @staticmethod
+    def run(context, scenario):
+        page_obj = gr.get_value("plugin_page")
+        storage_state.check_logged_out(getattr(page_obj, "page", None))
+
+
+class OnStorageStateStats:  # pylint: disable=too-few-public-methods
+    """
+    run after processor
+    """
+
+    name = "OnStorageStateStats"
+    order = 95
+
+    @staticmethod
+    def can(context):
+        return gr.get_value("storageStateCache") is not None
+
+    @staticmethod
+    def run(context):
+        cache = storage_state.get_cache()
+        log.info(f"[storage state] logins: {cache.logins}, scenarios "
+                 f"started logged in: {cache.hits}")
+
+
+var = GlobalContext.join("before_scenario_processor", OnWebLogin, 1)
+var1 = GlobalContext.join("after_scenario_processor", OnLoggedOutCheck, 1)
+var2 = GlobalContext.join("after_run_processor", OnStorageStateStats, 1)
@@ -10,10 +10,12 @@ from flybirds.utils.pkg_helper import load_pkg_by_ns, load_pkg_by_ns_file
 import flybirds.core.global_resource as gr
 import flybirds.utils.flybirds_log as log
 from flybirds.utils.flybirds_log import logger
+from flybirds.core import config_snapshot
 from flybirds.core.config_manage import DeviceConfig
 from flybirds.core.config_manage import PluginConfig
 from flybirds.core.global_context import GlobalContext
 from flybirds.core.plugin.plugin_manager import DirectoryPluginManager
+from flybirds.core.plugin.plugins.default.replay import session
 from flybirds.utils.dsl_helper import str2bool
 
 
@@ -75,7 +77,11 @@ class PluginManager:  # pylint: disable=too-few-public-methods
             cur_browser = user_data.get('cur_browser')
         gr.set_value("cur_browser", cur_browser)
 
-        p_info = PluginConfig(user_data).plugin_info
+        snapshot = config_snapshot.load()
+        gr.set_value("configSnapshot", snapshot)
+        config = snapshot.sections if snapshot is not None else None
+
+        p_info = PluginConfig(user_data, snapshot).plugin_info
         if p_info is not None and p_info.__contains__("active"):
             GlobalContext.active_plugin = p_info.get("active")
 
@@ -85,9 +91,16 @@ class PluginManager:  # pylint: disable=too-few-public-methods
             raise Exception(
                 f"not exist this plugin {GlobalContext.active_plugin}"
             )
-        GlobalContext.platform = DeviceConfig(user_data, None).platform
+        device_config = DeviceConfig(user_data, config)
+        GlobalContext.platform = device_config.platform
         log.info(
             f"[loader] run platform: {GlobalContext.platform}")
+        if getattr(device_config, "replay_session", None) \
+                and GlobalContext.platform != "web":
+            GlobalContext.plugin_info = session.replay_plugin_info(
+                GlobalContext.plugin_info, GlobalContext.platform)
+            log.info(f"[loader] replay session: "
+                     f"{device_config.replay_session}")
         plugin_manager = DirectoryPluginManager()
         plugin_manager.load_plugins()
 
@@ -2,13 +2,16 @@
 """
 plugin load mannger
 """
+import importlib
+import importlib.util
 import os
 import sys
-from imp import find_module, load_module, acquire_lock, release_lock
+from functools import partial
 
 import flybirds.utils.flybirds_log as log
 from flybirds.core.global_context import GlobalContext
-from flybirds.core.plugin.plugin_proxy import PluginProxy
+from flybirds.core.plugin.plugin_manifest import PluginManifest
+from flybirds.core.plugin.plugin_proxy import LazyPlugin, PluginProxy
 
 
 def append_prex(name, sub_pkg):
@@ -47,6 +50,57 @@ def find_exsit_name(plugins, name, group):
     return 0
 
 
+def import_plugin_module(name, dir_name):
+    """
+    import the plugin module with importlib, a module already imported is
+    reused, a module outside sys.path is loaded from its file
+    """
+    mod = sys.modules.get(name)
+    if mod is not None:
+        return mod
+    file_path = os.path.join(dir_name, name.split(".")[-1] + ".py")
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        spec = None
+    if spec is not None and spec.origin is not None and \
+            os.path.realpath(spec.origin) == os.path.realpath(file_path):
+        return importlib.import_module(name)
+    spec = importlib.util.spec_from_file_location(name, file_path)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[name] = mod
+    try:
+        spec.loader.exec_module(mod)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return mod
+
+
+def create_plugin(p_key, mod):
+    """
+    instantiate the open classes of the module and put the last one into
+    the GlobalContext slot
+    """
+    plugin_instance = None
+    for plug in [getattr(mod, x) for x in mod.__open__]:
+        if hasattr(plug, "instantiation_timing") and \
+                plug.instantiation_timing == "plugin":
+            plugin_instance = plug
+        else:
+            plugin_instance = plug()
+        setattr(GlobalContext, p_key, plugin_instance)
+    return plugin_instance
+
+
+def resolve_plugin(p_key, name, dir_name):
+    """
+    LazyPlugin loader
+    """
+    log.debug(f"load plugin {p_key} from {name}")
+    return create_plugin(p_key, import_plugin_module(name, dir_name))
+
+
 class PluginModule:
     """
     plugin  add find and remove func
@@ -148,6 +202,7 @@ class DirectoryPluginManager(PluginModule):
         if config is None:
             config = {}
         self.directories = config.get("directories", (default_directory,))
+        self.manifest = PluginManifest(config.get("manifest_path"))
         PluginModule.__init__(self, plugins, config)
 
     def find_default_run_event_dir(self, plugins, group):
@@ -162,7 +217,7 @@ class DirectoryPluginManager(PluginModule):
                     f"{dir_name}/event/"
                     f"{GlobalContext.platform}"
                 )
-                for f_p in os.listdir(dir_name):
+                for f_p in self.manifest.list_dir(dir_name):
                     if f_p.endswith(".py") and f_p != "__init__.py":
                         exsit_index = find_exsit_name(plugins, f_p[:-3], group)
                         if exsit_index == 0:
@@ -178,7 +233,7 @@ class DirectoryPluginManager(PluginModule):
         for dir_name in base_dir_list:
             try:
                 dir_name = f"{dir_name}/event"
-                for f_p in os.listdir(dir_name):
+                for f_p in self.manifest.list_dir(dir_name):
                     if f_p.endswith(".py") and f_p != "__init__.py":
                         exsit_index = find_exsit_name(plugins, f_p[:-3], group)
                         if exsit_index == 0:
@@ -201,7 +256,7 @@ class DirectoryPluginManager(PluginModule):
         for d_n in self.directories:
             try:
                 d_n = d_n + "/default/" + GlobalContext.platform
-                for f_p in os.listdir(d_n):
+                for f_p in self.manifest.list_dir(d_n):
                     if f_p.endswith(".py") and f_p != "__init__.py":
                         exsit_index = find_exsit_name(plugins, f_p[:-3], group)
                         if exsit_index == 0:
@@ -231,7 +286,8 @@ class DirectoryPluginManager(PluginModule):
             for name, value in vars(GlobalContext).items():
                 if (
                         value is not None
-                        and not hasattr(value, "__call__")
+                        and (isinstance(value, LazyPlugin)
+                             or not hasattr(value, "__call__"))
                         and isinstance(value, PluginProxy)
                 ):
                     all_plugin.append(name)
@@ -281,29 +337,16 @@ class DirectoryPluginManager(PluginModule):
         DirectoryPluginManager.find_config_dir(plugins, "driver")
         self.find_default_dir(plugins, "driver")
 
-        fh = None
-        mod = None
         for (p_key, name, dir, group) in plugins:
-            try:
-                acquire_lock()
-                fh, filename, desc = find_module(p_key, [dir])
-                old = sys.modules.get(name)
-                if old is not None:
-                    del sys.modules[name]
-
-                mod = load_module(name, fh, filename, desc)
-
-                if hasattr(mod, "__open__"):
-                    # get class
-                    attrs = [getattr(mod, x) for x in mod.__open__]
-                    for plug in attrs:
-                        if hasattr(plug, "instantiation_timing") and \
-                                plug.instantiation_timing == "plugin":
-                            plugin_instance = plug
-                        else:
-                            plugin_instance = plug()
-                        setattr(GlobalContext, p_key, plugin_instance)
-            finally:
-                if fh:
-                    fh.close()
-                release_lock()
+            info = self.manifest.module_info(
+                os.path.join(dir, name.split(".")[-1] + ".py"))
+            classes = info.get("classes")
+            if group != "event" and classes:
+                # driver plugins are imported on first use
+                setattr(GlobalContext, p_key, LazyPlugin(
+                    p_key, partial(resolve_plugin, p_key, name, dir)))
+                continue
+            mod = import_plugin_module(name, dir)
+            if hasattr(mod, "__open__"):
+                create_plugin(p_key, mod)
+        self.manifest.save()
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+cached manifest of the plugin directories, the exported classes of a plugin
+module are read from its source so the module is only imported when used
+"""
+import ast
+import json
+import os
+import tempfile
+
+import flybirds.utils.flybirds_log as log
+
+MANIFEST_VERSION = 1
+
+
+def get_manifest_path():
+    """
+    manifest cache file, FLYBIRDS_PLUGIN_MANIFEST overrides the default
+    """
+    path = os.environ.get("FLYBIRDS_PLUGIN_MANIFEST")
+    if path:
+        return path
+    return os.path.join(tempfile.gettempdir(), "flybirds",
+                        "plugin_manifest.json")
+
+
+def get_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def literal_strings(node):
+    if isinstance(node, (ast.List, ast.Tuple)) and all(
+            isinstance(item, ast.Constant) and isinstance(item.value, str)
+            for item in node.elts):
+        return [item.value for item in node.elts]
+    return None
+
+
+def scan_module(file_path):
+    """
+    read __open__ and the instantiation_timing of every open class,
+    classes is None when __open__ is not a literal list
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), file_path)
+    classes = []
+    timing = {}
+    has_open = False
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+                isinstance(target, ast.Name) and target.id == "__open__"
+                for target in node.targets):
+            has_open = True
+            classes = literal_strings(node.value)
+        elif isinstance(node, ast.ClassDef):
+            for item in node.body:
+                if isinstance(item, ast.Assign) and any(
+                        isinstance(target, ast.Name)
+                        and target.id == "instantiation_timing"
+                        for target in item.targets) \
+                        and isinstance(item.value, ast.Constant):
+                    timing[node.name] = item.value.value
+    if not has_open:
+        classes = []
+    elif classes is None:
+        return {"classes": None, "timing": {}}
+    return {
+        "classes": classes,
+        "timing": {name: timing.get(name, "instance") for name in classes},
+    }
+
+
+class PluginManifest:
+    """
+    plugin files of a directory keyed by the directory mtime, module info
+    keyed by the file mtime
+    """
+
+    def __init__(self, path=None):
+        self.path = path or get_manifest_path()
+        self.dirty = False
+        self.data = {"version": MANIFEST_VERSION, "directories": {},
+                     "modules": {}}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.data = data
+        except (OSError, ValueError):
+            pass
+
+    def list_dir(self, dir_name):
+        """
+        plugin file names of the directory, raise OSError when it is missing
+        """
+        dir_name = os.path.realpath(dir_name)
+        mtime = get_mtime(dir_name)
+        cached = self.data["directories"].get(dir_name)
+        if cached is not None and mtime is not None \
+                and cached["mtime"] == mtime:
+            return cached["files"]
+        files = sorted(f_p for f_p in os.listdir(dir_name)
+                       if f_p.endswith(".py") and f_p != "__init__.py")
+        self.data["directories"][dir_name] = {"mtime": mtime, "files": files}
+        self.dirty = True
+        return files
+
+    def module_info(self, file_path):
+        """
+        {"classes": [...], "timing": {...}} of a plugin module
+        """
+        file_path = os.path.realpath(file_path)
+        mtime = get_mtime(file_path)
+        cached = self.data["modules"].get(file_path)
+        if cached is not None and mtime is not None \
+                and cached["mtime"] == mtime:
+            return cached["info"]
+        try:
+            info = scan_module(file_path)
+        except (OSError, SyntaxError, ValueError) as scan_ex:
+            log.debug(f"scan plugin module {file_path} error: {scan_ex}")
+            return {"classes": None, "timing": {}}
+        self.data["modules"][file_path] = {"mtime": mtime, "info": info}
+        self.dirty = True
+        return info
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as save_ex:
+            log.debug(f"save plugin manifest error: {save_ex}")
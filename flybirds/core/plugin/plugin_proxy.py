@@ -2,6 +2,7 @@
 """
 this class just a flag that help to find plugin
 """
+from threading import Lock
 
 
 class PluginProxy:  # pylint: disable=too-few-public-methods
@@ -11,3 +12,46 @@ class PluginProxy:  # pylint: disable=too-few-public-methods
 
     def __init__(self):
         pass
+
+
+class LazyPlugin(PluginProxy):
+    """
+    plugin slot that imports and instantiates the plugin on first attribute
+    access, loader returns the plugin object
+    """
+
+    def __init__(self, slot, loader):
+        super().__init__()
+        object.__setattr__(self, "_slot", slot)
+        object.__setattr__(self, "_loader", loader)
+        object.__setattr__(self, "_target", None)
+        object.__setattr__(self, "_lock", Lock())
+
+    def resolve(self):
+        target = object.__getattribute__(self, "_target")
+        if target is None:
+            with object.__getattribute__(self, "_lock"):
+                target = object.__getattribute__(self, "_target")
+                if target is None:
+                    target = object.__getattribute__(self, "_loader")()
+                    object.__setattr__(self, "_target", target)
+        return target
+
+    def __getattr__(self, name):
+        # keep hasattr(slot, "__call__") and friends from loading the plugin
+        if name.startswith("__") and name.endswith("__"):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.resolve(), name, value)
+
+    def __call__(self, *args, **kwargs):
+        # plugins with instantiation_timing "plugin" are classes
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        target = object.__getattribute__(self, "_target")
+        if target is None:
+            return f"<LazyPlugin {object.__getattribute__(self, '_slot')}>"
+        return repr(target)
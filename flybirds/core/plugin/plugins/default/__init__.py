@@ -1,3 +1,10 @@
 #! usr/bin/python
 # -*- coding:utf-8 -*-
-from .ui_driver import SIFT
+import importlib
+
+
+def __getattr__(name):
+    # the opencv matcher is only imported when it is used
+    if name == "SIFT":
+        return importlib.import_module(f"{__name__}.ui_driver").SIFT
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
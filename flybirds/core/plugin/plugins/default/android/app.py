@@ -4,6 +4,8 @@ android app core api implement
 
 from airtest.core.api import (time, start_app, stop_app, install, uninstall, home)
 
+from flybirds.core.plugin.plugins.default import app_ready
+
 __open__ = ["App"]
 
 
@@ -17,8 +19,7 @@ class App:
         Start the target application on device
         """
         start_app(package_name)
-        if not (wait_time is None):
-            time.sleep(wait_time)
+        app_ready.wait_app_ready(package_name, wait_time, "android")
 
     def shut_app(self, package_name):
         """
@@ -54,8 +55,7 @@ class App:
             >>> uninstall("com.flyBirds.music")
         """
         uninstall(package_name)
-        if not (wait_time is None):
-            time.sleep(wait_time)
+        app_ready.wait_app_removed(package_name, wait_time)
 
     def return_home(self):
         """
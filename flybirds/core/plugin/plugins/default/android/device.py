@@ -3,6 +3,10 @@
 android device core api implement.
 """
 from airtest.core.api import (connect_device, shell)
+from airtest.core.error import AdbShellError
+
+import flybirds.core.global_resource as gr
+from flybirds.utils import adb_channel
 
 __open__ = ["Device"]
 
@@ -22,6 +26,15 @@ class Device:
     def use_shell(self, cmd):
         """
         Start remote shell in the target device and execute the command
+        through the device shell channel
         :platforms: Android
         """
-        return shell(cmd)
+        device_id = gr.get_device_id()
+        if device_id is None or not isinstance(cmd, str):
+            return shell(cmd)
+        # a user command runs as long as it needs, like airtest shell
+        code, output, error = adb_channel.shell(device_id, cmd, timeout=None,
+                                                with_stderr=True)
+        if code != 0:
+            raise AdbShellError(output, error)
+        return output
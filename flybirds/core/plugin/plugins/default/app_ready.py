@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+readiness probe that replaces the fixed sleeps after an app start, an
+uninstall and before a swipe. cheap signals are polled until the app is
+interactive, the configured sleep stays the upper bound
+"""
+import time
+
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+from flybirds.core.plugin.plugins.default.ui_driver.poco import \
+    hierarchy_transport
+from flybirds.utils import trace
+from flybirds.utils.dsl_helper import str2bool
+
+DEFAULT_INTERVAL = 0.5
+# shortest adb timeout of a check near the end of the wait
+MIN_CHECK_TIMEOUT = 0.1
+
+
+class ReadyProbe:
+    """
+    polls the checks in order until all of them pass, a check is a
+    callable that returns True when its signal is ready
+    """
+
+    def __init__(self, checks, interval=DEFAULT_INTERVAL,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.checks = checks
+        self.interval = interval
+        self.clock = clock
+        self.sleep = sleep
+
+    def ready(self):
+        for check in self.checks:
+            try:
+                if not check():
+                    return False
+            except Exception as check_error:
+                log.debug(f"[app ready] check error: {check_error}")
+                return False
+        return True
+
+    def wait(self, timeout):
+        """
+        (ready, elapsed seconds), waits the whole timeout when not ready
+        """
+        start = self.clock()
+        while True:
+            if self.ready():
+                return True, self.clock() - start
+            remaining = timeout - (self.clock() - start)
+            if remaining <= 0:
+                return False, self.clock() - start
+            self.sleep(min(self.interval, remaining))
+
+
+class HierarchyStable:
+    """
+    ready when two dumps in a row have the same visible content
+    """
+
+    def __init__(self, poco):
+        self.poco = poco
+        self.last = None
+
+    def __call__(self):
+        fingerprint = hierarchy_transport.get_table(
+            self.poco, fresh=True).fingerprint()
+        stable = fingerprint is not None and fingerprint == self.last
+        self.last = fingerprint
+        return stable
+
+
+def get_deadline(wait_time):
+    return time.monotonic() + float(wait_time)
+
+
+def check_timeout(deadline):
+    """
+    adb timeout of a check, a check does not run past the wait time
+    """
+    return max(MIN_CHECK_TIMEOUT, deadline - time.monotonic())
+
+
+def foreground_check(device_id, package_name, deadline):
+    """
+    android: the package has the focused window
+    """
+    from flybirds.utils import adb_channel
+
+    def check():
+        _, output = adb_channel.shell(
+            device_id, "dumpsys window | grep -E 'mCurrentFocus|mFocusedApp'",
+            timeout=check_timeout(deadline))
+        return f"{package_name}/" in output
+
+    return check
+
+
+def package_removed_check(device_id, package_name, deadline):
+    from flybirds.utils import adb_channel
+
+    def check():
+        code, output = adb_channel.shell(
+            device_id, f"pm path {adb_channel.quote(package_name)}",
+            timeout=check_timeout(deadline))
+        return code != 0 or "package:" not in output
+
+    return check
+
+
+def selector_check(poco, selector):
+    import flybirds.core.plugin.plugins.default.ui_driver.poco.poco_manage \
+        as pm
+
+    def check():
+        return pm.create_poco_object_by_dsl(poco, selector, None).exists()
+
+    return check
+
+
+def is_enabled():
+    enabled = gr.get_frame_config_value("app_ready_probe", True)
+    if isinstance(enabled, str):
+        enabled = str2bool(enabled)
+    return enabled is not False
+
+
+def get_interval():
+    try:
+        return float(gr.get_frame_config_value("app_ready_interval",
+                                               DEFAULT_INTERVAL))
+    except (TypeError, ValueError):
+        return DEFAULT_INTERVAL
+
+
+class ReadyStats:
+    """
+    seconds of fixed waits the probe saved, per scenario and per run
+    """
+
+    def __init__(self):
+        self.scenario_saved = 0.0
+        self.total_saved = 0.0
+        self.probes = 0
+
+    def add(self, saved):
+        self.probes += 1
+        self.scenario_saved += saved
+        self.total_saved += saved
+
+    def end_scenario(self):
+        saved, self.scenario_saved = self.scenario_saved, 0.0
+        return saved
+
+
+def get_stats():
+    stats = gr.get_value("appReadyStats")
+    if stats is None:
+        stats = ReadyStats()
+        gr.set_value("appReadyStats", stats)
+    return stats
+
+
+def wait_ready(name, checks, wait_time):
+    """
+    wait until the checks pass, at most wait_time seconds. without probe
+    or checks this is the fixed sleep
+    """
+    if wait_time is None:
+        return
+    wait_time = float(wait_time)
+    if not checks or not is_enabled():
+        time.sleep(wait_time)
+        return
+    with trace.span("ready", name):
+        ready, elapsed = ReadyProbe(checks, get_interval()).wait(wait_time)
+    saved = max(0.0, wait_time - elapsed)
+    get_stats().add(saved)
+    log.info(f"[app ready] {name} ready: {ready} in {elapsed:.2f}s, "
+             f"saved {saved:.2f}s of {wait_time}s")
+
+
+def get_poco():
+    return gr.get_value("pocoInstance")
+
+
+def app_checks(package_name, platform, wait_time):
+    checks = []
+    if platform == "android":
+        device_id = gr.get_device_id()
+        if device_id is not None:
+            checks.append(foreground_check(device_id, package_name,
+                                           get_deadline(wait_time)))
+    poco = get_poco()
+    if poco is not None:
+        checks.append(HierarchyStable(poco))
+        selector = gr.get_frame_config_value("app_ready_selector", None)
+        if selector:
+            checks.append(selector_check(poco, selector))
+    return checks
+
+
+def wait_app_ready(package_name, wait_time, platform):
+    """
+    after a start: the app is in the foreground, its hierarchy is stable
+    and the appReadySelector element exists when one is configured
+    """
+    if wait_time is None:
+        return
+    wait_ready("app_start", app_checks(package_name, platform, wait_time),
+               wait_time)
+
+
+def wait_app_removed(package_name, wait_time):
+    if wait_time is None:
+        return
+    device_id = gr.get_device_id()
+    checks = [] if device_id is None \
+        else [package_removed_check(device_id, package_name,
+                                    get_deadline(wait_time))]
+    wait_ready("uninstall", checks, wait_time)
+
+
+def wait_stable(poco, wait_time):
+    """
+    before a swipe: the content stopped moving
+    """
+    if wait_time is None:
+        return
+    checks = [] if poco is None else [HierarchyStable(poco)]
+    wait_ready("swipe", checks, wait_time)
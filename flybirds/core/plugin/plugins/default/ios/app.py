@@ -3,7 +3,9 @@
 ios app core api implement
 """
 
-from airtest.core.api import (time, start_app, stop_app, home)
+from airtest.core.api import (start_app, stop_app, home)
+
+from flybirds.core.plugin.plugins.default import app_ready
 
 __open__ = ["App"]
 
@@ -18,8 +20,7 @@ class App:
         Start the target application on device
         """
         start_app(package_name)
-        if not (wait_time is None):
-            time.sleep(wait_time)
+        app_ready.wait_app_ready(package_name, wait_time, "ios")
 
     def shut_app(self, package_name):
         """
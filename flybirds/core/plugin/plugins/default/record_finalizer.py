@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+bounded background pool that finalizes screen recordings (pull, crop,
+attach) while the next scenario already runs on the device
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+
+DEFAULT_WORKERS = 2
+
+
+class RecordFinalizer:
+    """
+    at most `workers` jobs run at the same time and at most `workers * 2`
+    are pending, submit blocks when the backlog is full
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="record-finalize")
+        self.slots = threading.BoundedSemaphore(workers * 2)
+        self.futures = set()
+        self.lock = threading.Lock()
+
+    def submit(self, func, *args):
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(self.run_job, func, *args)
+        except Exception:
+            self.slots.release()
+            raise
+        with self.lock:
+            self.futures.add(future)
+        future.add_done_callback(self.job_done)
+        return future
+
+    @staticmethod
+    def run_job(func, *args):
+        try:
+            return func(*args)
+        except Exception as job_error:
+            log.error(f"record finalize error: {str(job_error)}")
+            return None
+
+    def job_done(self, future):
+        with self.lock:
+            self.futures.discard(future)
+        self.slots.release()
+
+    def pending(self):
+        with self.lock:
+            return len(self.futures)
+
+    def flush(self, timeout=None):
+        """
+        barrier: wait for every submitted job, returns the number of jobs
+        still running when the timeout is reached
+        """
+        with self.lock:
+            futures = set(self.futures)
+        if not futures:
+            return 0
+        log.info(f"wait for {len(futures)} screen record finalize jobs")
+        _, not_done = wait(futures, timeout)
+        return len(not_done)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+def get_finalizer():
+    """
+    finalizer of the worker, None when recordFinalizeWorkers is 0 and
+    recordings are finalized in place
+    """
+    finalizer = gr.get_value("recordFinalizer")
+    if finalizer is not None:
+        return finalizer
+    try:
+        workers = int(gr.get_frame_config_value("record_finalize_workers",
+                                                DEFAULT_WORKERS))
+    except (TypeError, ValueError):
+        workers = DEFAULT_WORKERS
+    if workers <= 0:
+        return None
+    finalizer = RecordFinalizer(workers)
+    gr.set_value("recordFinalizer", finalizer)
+    return finalizer
+
+
+def flush_finalizer(timeout=None):
+    finalizer = gr.get_value("recordFinalizer")
+    if finalizer is None:
+        return 0
+    return finalizer.flush(timeout)
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+replay app, the app state is the recorded one
+"""
+import flybirds.utils.flybirds_log as log
+
+__open__ = ["App"]
+
+
+class App:
+    """Replay App Class"""
+
+    name = "replay_app"
+
+    def wake_app(self, package_name, wait_time=None):
+        log.info(f"[replay session] start {package_name} skipped")
+
+    def shut_app(self, package_name):
+        log.info(f"[replay session] stop {package_name} skipped")
+
+    def install_app(self, package_path, wait_time=None):
+        log.info(f"[replay session] install {package_path} skipped")
+
+    def uninstall_app(self, package_name, wait_time=None):
+        log.info(f"[replay session] uninstall {package_name} skipped")
+
+    def return_home(self):
+        log.info("[replay session] home skipped")
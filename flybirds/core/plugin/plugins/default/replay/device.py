@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+replay device, nothing is connected
+"""
+import flybirds.utils.flybirds_log as log
+from flybirds.core.plugin.plugins.default.replay import session
+
+__open__ = ["Device"]
+
+
+class ReplayDevice:
+    """
+    stands in for the airtest device, touches are only counted
+    """
+
+    def __init__(self, device_id, replay):
+        self.uuid = device_id
+        self.replay = replay
+        self.touch_proxy = self
+
+    def swipe(self, *args, **kwargs):
+        self.replay.add_input()
+
+    def touch(self, *args, **kwargs):
+        self.replay.add_input()
+
+
+class Device:
+    """Replay Device Class"""
+
+    name = "replay_device"
+
+    def device_connect(self, device_id):
+        log.info(f"[replay session] device {device_id} is replayed")
+        return ReplayDevice(device_id, session.get_replay())
+
+    def use_shell(self, cmd):
+        log.info(f"[replay session] shell skipped: {cmd}")
+        return ""
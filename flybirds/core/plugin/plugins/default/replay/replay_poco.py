@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+poco instance served from a replayed session, selectors are evaluated
+locally on the recorded hierarchy dumps and input is only counted
+"""
+from poco.agent import PocoAgent
+from poco.freezeui.hierarchy import FrozenUIDumper, FrozenUIHierarchy
+from poco.pocofw import Poco
+from poco.sdk.Attributor import Attributor
+from poco.sdk.interfaces.input import InputInterface
+from poco.sdk.interfaces.screen import ScreenInterface
+
+# the recorded frames already contain the waits of the real run
+POLL_INTERVAL = 0.05
+
+
+class ReplayDumper(FrozenUIDumper):
+    def __init__(self, replay):
+        super().__init__()
+        self.replay = replay
+
+    def dumpHierarchy(self, onlyVisibleNode=True):
+        return self.replay.hierarchy()
+
+
+class ReplayAttributor(Attributor):
+    """
+    set_text of the recorded elements is accepted and not applied
+    """
+
+    def __init__(self, replay):
+        self.replay = replay
+
+    def setAttr(self, node, attrName, attrVal):
+        self.replay.add_input()
+
+
+class ReplayInput(InputInterface):
+    def __init__(self, replay):
+        super().__init__()
+        self.replay = replay
+        self.touch_down_duration = 0.01
+
+    def click(self, x, y):
+        self.replay.add_input()
+
+    def double_click(self, x, y):
+        self.replay.add_input()
+
+    def swipe(self, x1, y1, x2, y2, duration):
+        self.replay.add_input()
+
+    def longClick(self, x, y, duration):
+        self.replay.add_input()
+
+    def setTouchDownDuration(self, duration):
+        self.touch_down_duration = duration
+
+    def getTouchDownDuration(self):
+        return self.touch_down_duration
+
+    def keyevent(self, keycode):
+        self.replay.add_input()
+
+    def applyMotionEvents(self, events):
+        self.replay.add_input()
+
+
+class ReplayScreen(ScreenInterface):
+    def __init__(self, replay):
+        super().__init__()
+        self.replay = replay
+
+    def getScreen(self, width):
+        return self.replay.screen()
+
+    def getPortSize(self):
+        return self.replay.screen_size
+
+
+class ReplayOcr:
+    """
+    ocr engine that returns the recorded results
+    """
+
+    def __init__(self, replay):
+        self.replay = replay
+
+    def ocr(self, img, *args, **kwargs):
+        return self.replay.ocr()
+
+
+def create_poco(replay):
+    agent = PocoAgent(
+        FrozenUIHierarchy(ReplayDumper(replay), ReplayAttributor(replay)),
+        ReplayInput(replay), ReplayScreen(replay))
+    return Poco(agent, action_interval=0, poll_interval=POLL_INTERVAL)
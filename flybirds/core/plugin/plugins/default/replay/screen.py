@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+replay screen imp
+"""
+from base64 import b64decode
+
+import flybirds.utils.flybirds_log as log
+from flybirds.core.global_context import GlobalContext as g_Context
+from flybirds.core.plugin.plugins.default.screen import BaseScreen
+from flybirds.utils import trace
+
+__open__ = ["Screen"]
+
+
+class Screen(BaseScreen):
+    """
+    screenshots are the recorded ones, there is no adb fallback
+    """
+    name = "replay_screen"
+
+    @staticmethod
+    @trace.traced("screenshot")
+    def screen_shot(path, file_name):
+        try:
+            b64img, fmt = g_Context.ui_driver_instance.snapshot()
+            with open(path, "wb") as f:
+                f.write(b64decode(b64img))
+        except Exception as e:
+            log.warn(f"[replay session] screenshot {path} error: {e}")
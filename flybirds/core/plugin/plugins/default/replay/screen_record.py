@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+replay screen record, a replayed session has no video
+"""
+
+__open__ = ["ScreenRecordInfo"]
+
+
+class ScreenRecordInfo:
+    name = "replay_screen_record"
+    instantiation_timing = "plugin"
+
+    def __init__(self):
+        self.support = False
+        self.status = 0
+        self.stop_deadline = 0
+
+    def start_record(self, timeout, bit_rate_level=1, bit_rate=None):
+        pass
+
+    def stop_record(self, wait=True):
+        pass
+
+    def copy_record(self, save_path):
+        pass
+
+    def crop_record(self, src_path):
+        pass
+
+    def destroy(self):
+        pass
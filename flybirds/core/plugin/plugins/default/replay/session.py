@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+"""
+session archive of a mobile run: the poco hierarchy dumps, screenshots and
+ocr results the framework consumed, grouped by the step that asked for them.
+a recorded archive is served back by the replay plugins so feature files
+run without a device
+"""
+import json
+import os
+import time
+import zipfile
+from base64 import b64decode, b64encode
+
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+
+SESSION_VERSION = 1
+MANIFEST = "session.json"
+KINDS = ("hierarchy", "screen", "ocr")
+# dumps around a step, kept out of the hierarchy frames the step is served
+STEP_HIERARCHY = "step_hierarchy"
+# plugins that talk to the device, replaced when a session is replayed
+REPLAY_PLUGINS = ("device", "ui_driver", "screen", "app", "screen_record")
+EMPTY_HIERARCHY = {"name": "<Root>", "payload": {}, "children": []}
+
+
+def step_key(context, step):
+    """
+    location of the step in its scenario, background steps are keyed by
+    the scenario that runs them
+    """
+    scenario = getattr(context, "scenario", None)
+    return f"{getattr(scenario, 'location', '')}|{step.location}"
+
+
+def new_visit():
+    return {kind: [] for kind in KINDS}
+
+
+class SessionRecorder:
+    """
+    writes the archive directory, frames recorded outside a step belong to
+    the step that ran last
+    """
+
+    def __init__(self, path, platform=None, device_id=None):
+        self.path = path
+        self.manifest = {
+            "version": SESSION_VERSION,
+            "platform": platform,
+            "deviceId": device_id,
+            "screenSize": None,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "initial": new_visit(),
+            "steps": {},
+        }
+        self.visit = self.manifest["initial"]
+        self.count = 0
+        for kind in KINDS + (STEP_HIERARCHY,):
+            os.makedirs(os.path.join(path, kind), exist_ok=True)
+
+    def begin_step(self, key):
+        self.visit = new_visit()
+        self.manifest["steps"].setdefault(key, []).append(self.visit)
+
+    def write(self, kind, suffix, data):
+        self.count += 1
+        name = f"{kind}/{self.count:06d}.{suffix}"
+        with open(os.path.join(self.path, name), "wb") as f:
+            f.write(data)
+        self.visit.setdefault(kind, []).append(name)
+
+    def add_hierarchy(self, dump, kind="hierarchy"):
+        self.write(kind, "json",
+                   json.dumps(dump, ensure_ascii=False).encode("utf-8"))
+
+    def add_screen(self, b64img, fmt):
+        self.write("screen", fmt or "png", b64decode(b64img))
+
+    def add_ocr(self, result):
+        self.write("ocr", "json", json.dumps(result).encode("utf-8"))
+
+    def set_screen_size(self, size):
+        self.manifest["screenSize"] = list(size) if size else None
+
+    def save(self):
+        with open(os.path.join(self.path, MANIFEST), "w",
+                  encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        log.info(f"[record session] {len(self.manifest['steps'])} steps, "
+                 f"{self.count} frames saved to {self.path}")
+
+
+class SessionReplay:
+    """
+    serves the frames of a recorded archive, a directory or a zip of it.
+    every request advances in the frames of the current visit of the step
+    and keeps returning the last one when they run out, so polling sees the
+    screen change as it did in the recorded run
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = {}
+        self.zip = zipfile.ZipFile(path) if zipfile.is_zipfile(path) \
+            else None
+        self.prefix = ""
+        if self.zip is not None and MANIFEST not in self.zip.namelist():
+            # a zip of the archive directory
+            self.prefix = next(
+                name[:-len(MANIFEST)] for name in self.zip.namelist()
+                if name.endswith("/" + MANIFEST))
+        self.manifest = json.loads(self.read(MANIFEST).decode("utf-8"))
+        if self.manifest.get("version") != SESSION_VERSION:
+            raise ValueError(f"unsupported session version in {path}")
+        self.visits = {}
+        self.visit = self.manifest["initial"]
+        self.positions = {kind: 0 for kind in KINDS}
+        self.last = {kind: None for kind in KINDS}
+        self.stats = {"steps": 0, "missing_steps": 0, "served": 0,
+                      "repeated": 0, "inputs": 0}
+
+    @property
+    def screen_size(self):
+        return self.manifest.get("screenSize")
+
+    def read(self, name):
+        data = self.data.get(name)
+        if data is None:
+            if self.zip is not None:
+                data = self.zip.read(self.prefix + name)
+            else:
+                with open(os.path.join(self.path, name), "rb") as f:
+                    data = f.read()
+            self.data[name] = data
+        return data
+
+    def begin_step(self, key):
+        visits = self.manifest["steps"].get(key)
+        index = self.visits.get(key, 0)
+        self.visits[key] = index + 1
+        self.stats["steps"] += 1
+        if not visits:
+            self.stats["missing_steps"] += 1
+            log.info(f"[replay session] step {key} was not recorded, the "
+                     f"last frames are served")
+            self.visit = new_visit()
+        else:
+            self.visit = visits[min(index, len(visits) - 1)]
+        self.positions = {kind: 0 for kind in KINDS}
+
+    def next_frame(self, kind):
+        """
+        name of the frame to serve, None when nothing was recorded yet
+        """
+        frames = self.visit[kind]
+        position = self.positions[kind]
+        if position < len(frames):
+            self.positions[kind] = position + 1
+            self.last[kind] = frames[position]
+            self.stats["served"] += 1
+        else:
+            self.stats["repeated"] += 1
+        return self.last[kind]
+
+    def hierarchy(self):
+        name = self.next_frame("hierarchy")
+        if name is None:
+            return json.loads(json.dumps(EMPTY_HIERARCHY))
+        return json.loads(self.read(name).decode("utf-8"))
+
+    def screen(self):
+        """
+        (base64 image, format) like poco snapshot
+        """
+        name = self.next_frame("screen")
+        if name is None:
+            raise FileNotFoundError(
+                f"no screenshot recorded in {self.path} before this step")
+        return b64encode(self.read(name)).decode("ascii"), \
+            os.path.splitext(name)[1][1:]
+
+    def ocr(self):
+        name = self.next_frame("ocr")
+        if name is None:
+            return []
+        return json.loads(self.read(name).decode("utf-8"))
+
+    def add_input(self):
+        self.stats["inputs"] += 1
+
+    def log_stats(self):
+        log.info(f"[replay session] {self.path}: {self.stats}")
+
+
+class RecordingHierarchy:
+    """
+    poco hierarchy that records every dump it returns
+    """
+
+    def __init__(self, hierarchy, recorder):
+        self.hierarchy = hierarchy
+        self.recorder = recorder
+
+    def dump(self):
+        data = self.hierarchy.dump()
+        self.recorder.add_hierarchy(data)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self.hierarchy, name)
+
+
+class RecordingScreen:
+    """
+    poco screen that records every screenshot and the screen size
+    """
+
+    def __init__(self, screen, recorder):
+        self.screen = screen
+        self.recorder = recorder
+
+    def getScreen(self, width):
+        b64img, fmt = self.screen.getScreen(width)
+        self.recorder.add_screen(b64img, fmt)
+        return b64img, fmt
+
+    def getPortSize(self):
+        size = self.screen.getPortSize()
+        self.recorder.set_screen_size(size)
+        return size
+
+    def __getattr__(self, name):
+        return getattr(self.screen, name)
+
+
+class RecordingOcr:
+    """
+    ocr engine that records every result
+    """
+
+    def __init__(self, engine, recorder):
+        self.engine = engine
+        self.recorder = recorder
+
+    def ocr(self, img, *args, **kwargs):
+        result = self.engine.ocr(img, *args, **kwargs)
+        self.recorder.add_ocr(to_json(result))
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.engine, name)
+
+
+def to_json(value):
+    """
+    ocr results hold numpy arrays and tuples
+    """
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    return value
+
+
+def attach_recorder(recorder, poco, ocr=None):
+    """
+    record what the framework reads from the poco instance and the ocr
+    engine, returns the ocr engine to use
+    """
+    poco.agent.hierarchy = RecordingHierarchy(poco.agent.hierarchy, recorder)
+    poco.agent.screen = RecordingScreen(poco.agent.screen, recorder)
+    if ocr is None:
+        return None
+    return RecordingOcr(ocr, recorder)
+
+
+def record_step_hierarchy(recorder, poco):
+    """
+    dump the screen a step starts on or left, the dump is not one of the
+    frames the replay serves the step
+    """
+    hierarchy = poco.agent.hierarchy
+    if isinstance(hierarchy, RecordingHierarchy):
+        hierarchy = hierarchy.hierarchy
+    recorder.add_hierarchy(hierarchy.dump(), STEP_HIERARCHY)
+
+
+def record_poco(poco):
+    """
+    attach the recorder of the run to a poco instance that replaces the
+    recorded one
+    """
+    if poco is None or get_replay() is not None:
+        return poco
+    recorder = get_recorder()
+    if recorder is not None \
+            and not isinstance(poco.agent.hierarchy, RecordingHierarchy):
+        attach_recorder(recorder, poco)
+        log.info("[record session] recording the new poco instance")
+    return poco
+
+
+def get_device_value(name):
+    config_manage = gr.get_value("configManage")
+    if config_manage is None:
+        return None
+    return getattr(config_manage.device_info, name, None)
+
+
+def get_recorder():
+    """
+    the recorder of the run, None when recordSession is not set
+    """
+    recorder = gr.get_value("sessionRecorder")
+    if recorder is None:
+        path = get_device_value("record_session")
+        if not path:
+            return None
+        recorder = SessionRecorder(path, gr.get_platform(),
+                                   gr.get_device_id())
+        gr.set_value("sessionRecorder", recorder)
+    return recorder
+
+
+def get_replay():
+    """
+    the replayed session, None when replaySession is not set
+    """
+    replay = gr.get_value("sessionReplay")
+    if replay is None:
+        path = get_device_value("replay_session")
+        if not path:
+            return None
+        replay = SessionReplay(path)
+        gr.set_value("sessionReplay", replay)
+        log.info(f"[replay session] serving {path}, recorded "
+                 f"{replay.manifest.get('created')} on "
+                 f"{replay.manifest.get('deviceId')}")
+    return replay
+
+
+def replay_plugin_info(plugin_info, platform):
+    """
+    plugin_info with the device plugins of the platform replaced by the
+    replay plugins
+    """
+    plugin_dir = os.path.dirname(os.path.abspath(__file__))
+    ns = __name__.rsplit(".", 1)[0]
+    platform_info = dict(plugin_info.get(platform) or {})
+    for key in REPLAY_PLUGINS:
+        platform_info[key] = {"path": os.path.join(plugin_dir, f"{key}.py"),
+                              "ns": ns}
+    return {**plugin_info, platform: platform_info}
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+replay ui driver
+"""
+import flybirds.utils.flybirds_log as log
+from flybirds.core.plugin.plugins.default.replay import session
+
+__open__ = ["UIDriver"]
+
+
+class UIDriver:
+    name = "replay_ui_driver"
+
+    @staticmethod
+    def init_driver():
+        from flybirds.core.plugin.plugins.default.replay.replay_poco import \
+            create_poco
+        return create_poco(session.get_replay())
+
+    @staticmethod
+    def init_ocr(lang=None):
+        from flybirds.core.plugin.plugins.default.replay.replay_poco import \
+            ReplayOcr
+        return ReplayOcr(session.get_replay())
+
+    @staticmethod
+    def air_bdd_screen_size(dr_instance):
+        return dr_instance.get_screen_size()
+
+    @staticmethod
+    def close_driver():
+        replay = session.get_replay()
+        if replay is not None:
+            replay.log_stats()
+        log.info("[replay session] closed")
@@ -1,33 +1,30 @@
 # -*- coding: utf-8 -*-
 """
 Device screenshot method.
+the image, ocr and device stacks are imported on first use, web runs only
+load what they call
 """
 import os
+import subprocess
 import time
 import traceback
 from operator import itemgetter
-from airtest.core.android.adb import ADB
-from flybirds.utils.image import draw_ocr
-from baseImage import Image, Rect
 from base64 import b64decode
-from .ui_driver import SIFT
 
 import flybirds.core.global_resource as gr
 import flybirds.utils.file_helper as file_helper
 import flybirds.utils.flybirds_log as log
 import flybirds.utils.uuid_helper as uuid_helper
+from flybirds.report.attachment import add_attachment
 from flybirds.core.global_context import GlobalContext as g_Context
-from flybirds.core.plugin.plugins.default.ios_snapshot import get_screen
 from flybirds.core.exceptions import FlybirdsException
-from PIL import Image as Img
-from flybirds.core.driver.device import use_shell
-
-airtest_adb_path = ADB.builtin_adb_path()
+from flybirds.utils import trace
 
 
 class BaseScreen:
 
     @staticmethod
+    @trace.traced("screenshot")
     def screen_shot(path, file_name):
         """
         Take a screenshot and save
@@ -42,20 +39,29 @@ class BaseScreen:
             poco = g_Context.ui_driver_instance
             screen_size = gr.get_device_size()
             if cur_platform.strip().lower() == "ios":
+                from flybirds.core.plugin.plugins.default.ios_snapshot \
+                    import get_screen
                 b64img, fmt = get_screen()
             else:
                 b64img, fmt = poco.snapshot(width=screen_size[1])
 
-            open(path, "wb").write(b64decode(b64img))
+            image_data = b64decode(b64img)
+            open(path, "wb").write(image_data)
+            trace.add_bytes(len(image_data))
         except Exception as e:
             try:
                 if cur_platform.strip().lower() == "android":
-                    # device_id = gr.get_device_id()
+                    from flybirds.utils import adb_channel
+                    from flybirds.utils.snippet import get_adb_path
+                    device_id = gr.get_device_id()
                     img_save_path = "/sdcard/" + file_name
-                    cmd = " screencap -p {}".format(img_save_path)
-                    use_shell(cmd)
-                    cmd = " pull {} {}".format(img_save_path, path)
-                    use_shell(cmd)
+                    adb_channel.shell(
+                        device_id, "screencap -p {}".format(img_save_path))
+                    # file transfer is not a shell command
+                    subprocess.run([get_adb_path(), "-s", device_id, "pull",
+                                    img_save_path, path], timeout=30,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, check=True)
             except Exception as e:
                 log.error(
                     "adb screenshot failed path: {}, error: {}".format(path, str(e)),
@@ -116,26 +122,29 @@ class BaseScreen:
                 log.info("[screen_link_to_behave] fail_image_id: {}".format(fail_image_id))
                 print("fail_image_id data start")
                 data = (
-                    'embeddingsTags, stepIndex={}, <image id={} class ="screenshot"'
-                    ' width="375" , src="{}" />'.format(step_index, fail_image_id, src_path, )
+                    '<image id={} class ="screenshot"'
+                    ' width="375" src="{}" />'.format(fail_image_id, src_path)
                 )
                 print("fail_image_id data: {}".format(data))
             else:
                 print("image_id data start")
                 data = (
-                    'embeddingsTags, stepIndex={}, <image class ="screenshot"'
-                    ' width="375" src="{}" />'.format(step_index, src_path)
+                    '<image class ="screenshot"'
+                    ' width="375" src="{}" />'.format(src_path)
                 )
                 print("image_id data: {}".format(data))
 
-            if link is True:
-                scenario.description.append(data)
             screen_path = os.path.join(current_screen_dir, file_name)
             g_Context.screen.screen_shot(screen_path, file_name)
+            if link is True:
+                add_attachment(scenario, step_index, data, "image/png",
+                               screen_path)
             if tag == "fail_" and len(g_Context.ocr_result) >= 1:
                 from paddleocr.tools.infer.utility import draw_boxes
+                from PIL import Image as Img
                 ocr = g_Context.ocr_driver_instance
-                result = ocr.ocr(screen_path, cls=True)
+                with trace.span("ocr", "ocr"):
+                    result = ocr.ocr(screen_path, cls=True)
                 image = Img.open(screen_path).convert('RGB')
                 boxes = [line[0] for line in result]
                 im_show = draw_boxes(image, boxes)
@@ -187,12 +196,13 @@ class BaseScreen:
             src_path = "../screenshot/{}/{}".format(feature_name, file_name)
             log.debug("[screen_link_to_behave] src_path: {}".format(src_path))
             data = (
-                'embeddingsTags, stepIndex={}, <a style="display: block;">{}</a><image class ="screenshot"'
-                ' width="375" src="{}" /><a style="display: block;">{}</a>'.format(step_index, diff_discription, src_path, fail_discription)
+                '<a style="display: block;">{}</a><image class ="screenshot"'
+                ' width="375" src="{}" /><a style="display: block;">{}</a>'.format(diff_discription, src_path, fail_discription)
             )
-            if link is True:
-                scenario.description.append(data)
             screen_path = os.path.join(current_screen_dir, file_name)
+            if link is True:
+                add_attachment(scenario, step_index, data, "image/png",
+                               screen_path)
 
             return screen_path
 
@@ -215,7 +225,12 @@ class BaseScreen:
                       "----------------------------------------------------\n "
             raise FlybirdsException(message)
 
-        g_Context.ocr_result = ocr.ocr(img_path, cls=True)
+        from baseImage import Image
+        from PIL import Image as Img
+        from flybirds.utils.image import draw_ocr
+
+        with trace.span("ocr", "ocr"):
+            g_Context.ocr_result = ocr.ocr(img_path, cls=True)
         g_Context.image_size = Image(img_path).size
         log.debug(f"[image ocr path] image size is:{g_Context.image_size}")
         regional_box, txts = BaseScreen.struct_ocr_result(g_Context.ocr_result, right_gap_max,
@@ -236,10 +251,14 @@ class BaseScreen:
         im_show.save(img_path)
 
     @staticmethod
+    @trace.traced("sift")
     def image_verify(img_source_path, img_search_path):
         """
         Take a screenshot and verify image
         """
+        from baseImage import Image
+        from .ui_driver import SIFT
+
         match = SIFT()
         img_source = Image(img_source_path)
         img_search = Image(img_search_path)
@@ -248,7 +267,11 @@ class BaseScreen:
         return result
 
     @staticmethod
+    @trace.traced("sift")
     def white_screen_detect(img_path):
+        from baseImage import Image, Rect
+        from .ui_driver import SIFT
+
         match = SIFT()
         img = Image(img_path)
         start_time = time.time()
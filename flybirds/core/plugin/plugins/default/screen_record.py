@@ -6,20 +6,18 @@ import datetime
 import os
 import time
 import shutil
-import ffmpeg
-import airtest
-from airtest.core.android.adb import ADB
 
 import flybirds.core.global_resource as gr
 import flybirds.utils.file_helper as file_helper
 import flybirds.utils.flybirds_log as log
 import flybirds.utils.snippet as cmd_helper
+from flybirds.utils import adb_channel
+from flybirds.core.plugin.plugins.default import record_finalizer
 import flybirds.utils.uuid_helper as uuid_helper
+from flybirds.report.attachment import add_attachment, scenario_key
 from flybirds.core.exceptions import ScreenRecordException
 from flybirds.core.global_context import GlobalContext as g_context
 
-airtest_adb_path = ADB.builtin_adb_path()
-
 
 class ScreenRecord:
     def __init__(self):
@@ -29,6 +27,8 @@ class ScreenRecord:
         self.process = None
         # 0 Just created 1 Reset state 2 Start recording
         self.status = 0
+        # time after which a recording stopped without waiting is complete
+        self.stop_deadline = 0
 
         self.use_airtest_record = gr.get_frame_config_value(
             "use_airtest_record", False
@@ -51,6 +51,7 @@ class ScreenRecord:
             self.output_ffmpeg_file = None
             self.airtest_version_high = False
 
+            import airtest
             airtest_version = airtest.__version__
             v1 = tuple(map(int, airtest_version.split('.')))
             v2 = tuple(map(int, "1.2.9".split('.')))
@@ -71,6 +72,10 @@ class ScreenRecord:
             if proc_code is None:
                 self.process.terminate()
                 time.sleep(2)
+        # the previous recording may still be written on the device
+        remaining = self.stop_deadline - time.time()
+        if remaining > 0:
+            time.sleep(remaining)
         self.clear_record()
 
     def destroy(self):
@@ -87,7 +92,7 @@ class ScreenRecord:
     def record_support(self):
         device_id = gr.get_device_id()
 
-        cmd = "{} -s {} shell screenrecord --help".format(airtest_adb_path,
+        cmd = "{} -s {} shell screenrecord --help".format(cmd_helper.get_adb_path(),
                                                           device_id)
         proc = cmd_helper.create_sub_process(cmd)
         try:
@@ -142,26 +147,25 @@ class ScreenRecord:
                         dirs = get_all_dir(copy_target_file)
 
                         target_exist_code = len(dirs) - 1
-                        for i, dir_path in enumerate(reversed(dirs)):
-                            if dir_path != '':
-                                cmd = "{} -s {} shell ls {}".format(airtest_adb_path, device_id, dir_path)
-                                check_exists_code = execute_cmd(cmd, False)
-
-                                if check_exists_code == 0:
-                                    target_exist_code = len(dirs) - 1 - i
-                                    break
+                        # check every level in one round trip, deepest first
+                        check_dirs = [(i, dir_path) for i, dir_path in enumerate(reversed(dirs)) if dir_path != '']
+                        check_results = adb_channel.shell_batch(
+                            device_id, ["ls {}".format(dir_path) for _, dir_path in check_dirs])
+                        for (i, _), (check_exists_code, _) in zip(check_dirs, check_results):
+                            if check_exists_code == 0:
+                                target_exist_code = len(dirs) - 1 - i
+                                break
 
                         if target_exist_code < len(dirs) - 1:
+                            create_cmds = []
                             for i, dir_path in enumerate(dirs):
                                 if dir_path != '':
                                     if i > target_exist_code:
                                         if i == len(dirs) - 1:
-                                            cmd = "{} -s {} shell touch {}".format(airtest_adb_path, device_id,
-                                                                                   dir_path)
+                                            create_cmds.append("touch {}".format(dir_path))
                                         else:
-                                            cmd = "{} -s {} shell mkdir -p {}".format(airtest_adb_path, device_id,
-                                                                                      dir_path)
-                                        execute_cmd(cmd, False)
+                                            create_cmds.append("mkdir -p {}".format(dir_path))
+                            adb_channel.shell_batch(device_id, create_cmds)
             else:
                 self.dev.start_recording(max_time, bit_rate)
         else:
@@ -175,7 +179,7 @@ class ScreenRecord:
             if ":" in device_id:
                 cmd = "{} -s {} shell screenrecord --bugreport " \
                       "--size {}x{} --time-limit {} --bit-rate {} " \
-                      "--verbose sdcard/flybirds.mp4".format(airtest_adb_path,
+                      "--verbose sdcard/flybirds.mp4".format(cmd_helper.get_adb_path(),
                                                              device_id,
                                                              screen_size[0],
                                                              screen_size[1],
@@ -186,7 +190,7 @@ class ScreenRecord:
                       "--time-limit {} " \
                       "--bit-rate {}" \
                       " --verbose " \
-                      "sdcard/flybirds.mp4".format(airtest_adb_path, device_id,
+                      "sdcard/flybirds.mp4".format(cmd_helper.get_adb_path(), device_id,
                                                    screen_size[0],
                                                    screen_size[1], timeout,
                                                    bit_rate)
@@ -212,9 +216,10 @@ class ScreenRecord:
             self.status = 2
             self.start_time = time.time()
 
-    def stop_record(self):
+    def stop_record(self, wait=True):
         """
-        Stop the current screen recording
+        Stop the current screen recording, with wait=False the device is
+        given its finalize time by the caller instead of sleeping here
         """
         log.info("stop_record")
         if self.use_airtest_record:
@@ -233,7 +238,10 @@ class ScreenRecord:
             proc_code = proc.poll()
             if proc_code is None:
                 proc.terminate()
-                time.sleep(2)
+                if wait:
+                    time.sleep(2)
+                else:
+                    self.stop_deadline = time.time() + 2
                 message = "Stop recording"
             else:
                 message = "Recording is over，code={}".format(proc_code)
@@ -292,12 +300,64 @@ class ScreenRecord:
         else:
             copy_target_file = self.recording_file
 
-        cmd = "{} -s {} pull {} {}".format(airtest_adb_path,
+        cmd = "{} -s {} pull {} {}".format(cmd_helper.get_adb_path(),
                                            device_id, copy_target_file,
                                            save_path
                                            )
         execute_cmd(cmd, True)
 
+    def detach_record(self):
+        """
+        Move the finished recording aside so the next recording can start
+        while this one is finalized, None when it has to be copied in place
+        """
+        if self.use_airtest_record and self.airtest_version_high:
+            if self.airtest_record_mode == 'ffmpeg':
+                source_file = self.output_ffmpeg_file
+                if source_file is None or not os.path.exists(source_file):
+                    return None
+                detached_file = "{}.{}.mp4".format(
+                    source_file, uuid_helper.create_short_uuid())
+                os.replace(source_file, detached_file)
+                self.output_ffmpeg_file = None
+                return {"local_file": detached_file}
+            elif self.airtest_record_mode == 'yosemite':
+                device_file = self.dev.yosemite_recorder.recording_file
+            else:
+                return None
+        else:
+            device_file = self.recording_file
+        if not device_file:
+            return None
+        device_id = gr.get_device_id()
+        detached_file = "{}.{}.mp4".format(
+            device_file, uuid_helper.create_short_uuid())
+        code, output = adb_channel.shell(
+            device_id, "mv {} {}".format(device_file, detached_file))
+        if code != 0:
+            log.info(f"detach record failed: {output}")
+            return None
+        return {"device_id": device_id, "device_file": detached_file,
+                "ready_at": self.stop_deadline}
+
+    def finalize_detached(self, job, save_path):
+        """
+        Copy a detached recording to save_path and remove the detached file
+        """
+        if "local_file" in job:
+            shutil.copy(job["local_file"], save_path)
+            os.remove(job["local_file"])
+            return
+        remaining = job["ready_at"] - time.time()
+        if remaining > 0:
+            time.sleep(remaining)
+        cmd = "{} -s {} pull {} {}".format(cmd_helper.get_adb_path(),
+                                           job["device_id"],
+                                           job["device_file"], save_path)
+        execute_cmd(cmd, True)
+        adb_channel.shell(job["device_id"],
+                          "rm -f {}".format(job["device_file"]))
+
     def clear_record(self):
         """
         Delete the existing screen recording file
@@ -327,12 +387,11 @@ class ScreenRecord:
         else:
             copy_target_file = self.recording_file
 
-        cmd = "{} -s {} shell rm -r {}".format(airtest_adb_path, device_id,
-                                               copy_target_file)
-        proc = cmd_helper.create_sub_process(cmd)
-        # message = ""
         try:
-            proc.communicate(timeout=15)
+            proc_code, _ = adb_channel.shell(
+                device_id, "rm -r {}".format(copy_target_file), timeout=15)
+            if proc_code == 0:
+                log.info("clear record success")
         except Exception as e:
             log.error(
                 "Screen record deletion {} not end in "
@@ -340,15 +399,13 @@ class ScreenRecord:
                     self.recording_file, str(e)
                 )
             )
-        proc_code = proc.poll()
-        if int(proc_code) == 0:
-            log.info("clear record success")
-        proc.terminate()
 
     def crop_record(self, src_path):
         if self.use_airtest_record and self.airtest_record_mode != 'ffmpeg':
-            target = 'tmp.mp4'
+            # recordings may be cropped by several finalize workers
+            target = '{}.tmp.mp4'.format(src_path)
             try:
+                import ffmpeg
                 log.info("crop_record start")
                 screen_size = gr.get_device_size()
                 source = src_path
@@ -372,9 +429,11 @@ class ScreenRecord:
                     os.remove(target)
 
 
-def link_record(scenario, step_index):
+def link_record(scenario, step_index, background=False):
     """
-    Associate screenshots to report
+    Associate screenshots to report, with background=True the recording is
+    copied and attached by the finalize pool when the worker has an
+    attachment sidecar
     """
     screen_record = gr.get_value("screenRecord")
     log.info(
@@ -387,10 +446,9 @@ def link_record(scenario, step_index):
         )
     )
     if not screen_record.support:
-        data = "embeddingsTags, stepIndex={}, " \
-               "<label>the device does not " \
-               "support screen recording</label>".format(step_index)
-        scenario.description.append(data)
+        add_attachment(scenario, step_index,
+                       "<label>the device does not "
+                       "support screen recording</label>")
         return
     feature_name = file_helper.valid_file_name(scenario.feature.name)
     scenario_name = file_helper.valid_file_name(scenario.name)
@@ -410,28 +468,44 @@ def link_record(scenario, step_index):
 
         src_path = "../screenshot/{}/{}".format(feature_name, file_name)
         data = (
-            'embeddingsTags, stepIndex={}, <video controls width="375">'
-            '<source src="{}" type="video/mp4"></video>'.format(
-                step_index, src_path
-            )
+            '<video controls width="375">'
+            '<source src="{}" type="video/mp4"></video>'.format(src_path)
         )
-        scenario.description.append(data)
         src_path = os.path.join(current_screen_dir, file_name)
         gr.set_value("record_url", src_path)
         log.info(
             f'default screen_record [link_record] src_path: {src_path}')
 
-        try:
-            screen_record.copy_record(src_path)
-            if gr.get_platform().lower() == "android":
-                screen_record.crop_record(src_path)
-        except Exception as e:
-            log.error(
-                "Screen record copy error "
-                "innerError:{}".format(
-                    str(e)
+        finalizer = None
+        job = None
+        if background and gr.get_value("attachmentStore") is not None \
+                and hasattr(screen_record, "detach_record"):
+            finalizer = record_finalizer.get_finalizer()
+        if finalizer is not None:
+            try:
+                job = screen_record.detach_record()
+            except Exception as e:
+                log.info(f"detach record error: {str(e)}")
+        if job is not None:
+            finalizer.submit(finalize_record, screen_record, job, scenario,
+                             step_index, data, src_path,
+                             scenario_key(scenario))
+        else:
+            remaining = getattr(screen_record, "stop_deadline", 0) - time.time()
+            if remaining > 0:
+                time.sleep(remaining)
+            try:
+                screen_record.copy_record(src_path)
+                if gr.get_platform().lower() == "android":
+                    screen_record.crop_record(src_path)
+            except Exception as e:
+                log.error(
+                    "Screen record copy error "
+                    "innerError:{}".format(
+                        str(e)
+                    )
                 )
-            )
+            add_attachment(scenario, step_index, data, "video/mp4", src_path)
 
         try:
             g_context.set_global_cache('current_record_path', src_path)
@@ -439,6 +513,25 @@ def link_record(scenario, step_index):
             pass
 
 
+def finalize_record(screen_record, job, scenario, step_index, data,
+                    src_path, key=None):
+    """
+    finalize pool job: copy and crop the detached recording, then attach it
+    """
+    try:
+        screen_record.finalize_detached(job, src_path)
+        if gr.get_platform().lower() == "android":
+            screen_record.crop_record(src_path)
+    except Exception as e:
+        log.error(
+            "Screen record copy error "
+            "innerError:{}".format(
+                str(e)
+            )
+        )
+    add_attachment(scenario, step_index, data, "video/mp4", src_path, key)
+
+
 def get_all_dir(file_path):
     if not file_path:
         return []
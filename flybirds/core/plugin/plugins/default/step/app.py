@@ -6,6 +6,7 @@ import flybirds.core.global_resource as gr
 import flybirds.core.plugin.plugins.default.ui_driver.poco.poco_ele as poco_ele
 import flybirds.utils.flybirds_log as log
 from flybirds.core.global_context import GlobalContext as g_Context
+from flybirds.core.plugin.plugins.default.replay import session
 
 
 def init_device(context, param=None):
@@ -15,7 +16,7 @@ def init_device(context, param=None):
     log.info("device connected:{}".format(device_id))
 
     # Get the globally defined poco object
-    poco_instance = g_Context.element.ui_driver_init()
+    poco_instance = session.record_poco(g_Context.element.ui_driver_init())
     gr.set_value("pocoInstance", poco_instance)
     context.poco_instance = poco_instance
     log.info("poco initial complete")
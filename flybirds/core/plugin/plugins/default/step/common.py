@@ -13,7 +13,7 @@ import flybirds.utils.dsl_helper as dsl_helper
 from flybirds.core.plugin.plugins.default.screen import BaseScreen
 from flybirds.core.driver import ui_driver
 from flybirds.core.global_context import GlobalContext
-from baseImage import Image
+from flybirds.report.attachment import add_attachment
 
 
 def sleep(context, param):
@@ -34,7 +34,7 @@ def ocr(context, param=None):
     height_gap_max = None
     skip_height_max = None
     if param is not None:
-        param_dict = dsl_helper.params_to_dic(param)
+        param_dict = dict(dsl_helper.params_to_dic(param))
         selector_str = param_dict["selector"]
         if "right_gap_max=" in selector_str \
                 or "left_gap_max=" in selector_str \
@@ -87,10 +87,16 @@ def prev_fail_scenario_relevance(context, param1, param2):
                     fail_info["feature_name"], fail_info["scenario_name"]
                 )
                 scenario_uri = scenario_uri.replace(",", "#")
-                data = "embeddingsTags, stepIndex={}, <p>{}</p>".format(
-                    step_index, scenario_uri
-                )
-                scenario.description.append(data)
+                add_attachment(scenario, step_index,
+                               "<p>{}</p>".format(scenario_uri))
+
+                for record in fail_info.get("attachments") or []:
+                    data = record.get("data") or ""
+                    if "<image" in data and "/screen_" in data:
+                        continue
+                    add_attachment(scenario, step_index, data,
+                                   record.get("mime_type", "text/html"),
+                                   record.get("path"))
 
                 if isinstance(fail_info["description"], list):
                     # fail_description = fail_info["description"]
@@ -119,6 +125,7 @@ def img_verify(context, search_image_path):
     """
     verify image exist or not
     """
+    from baseImage import Image
     step_index = context.cur_step_index - 1
     source_image_path = BaseScreen.screen_link_to_behave(context.scenario, step_index, "screen_", False)
     GlobalContext.image_size = Image(source_image_path).size
@@ -6,13 +6,10 @@ import time
 import flybirds.core.global_resource as gr
 import flybirds.utils.dsl_helper as dsl_helper
 from flybirds.core.global_resource import get_device_id
-from airtest.core.android.adb import *
 
 from flybirds.core.global_context import GlobalContext as g_Context
 from flybirds.core.plugin.plugins.default.step.click import click_ocr_text
 
-airtest_adb_path = ADB.builtin_adb_path()
-
 
 def ele_input(context, param1, param2):
     poco_instance = gr.get_value("pocoInstance")
@@ -69,6 +66,7 @@ def ocr_text_input(context, param1, param2):
 
 def keyboard_clear(context):
     time.sleep(1)
+    from airtest.core.android.adb import ADB
     dev = ADB()
     device_id = get_device_id()
     move_end = "-s {} shell input keyevent KEYCODE_MOVE_END".format(device_id)
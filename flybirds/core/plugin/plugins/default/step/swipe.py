@@ -12,6 +12,8 @@ from airtest.utils.snippet import (on_method_ready)
 import flybirds.core.global_resource as g_res
 import flybirds.core.global_resource as gr
 import flybirds.core.plugin.plugins.default.ui_driver.poco.findsnap as findsnap
+from flybirds.core.plugin.plugins.default.ui_driver.poco import \
+    hierarchy_transport
 import flybirds.core.plugin.plugins.default.ui_driver.poco.poco_manage as pm
 import flybirds.core.plugin.plugins.default.ui_driver.poco.poco_swipe as ps
 import flybirds.utils.dsl_helper as dsl_helper
@@ -152,8 +154,8 @@ class FlyBirdsEvent:
             if search_result is False:
                 # find selector in poco domtree
                 if "element=" in selector:
-                    data = poco.agent.hierarchy.dump()
-                    result = find_payload_with_resource_id(data, selector)
+                    table = hierarchy_transport.get_table(poco)
+                    result = find_payload_with_resource_id(table, selector)
                     if result is None:
                         log.info(f"Element not found: {selector}")
                         return False
@@ -207,6 +209,8 @@ def handle_str(un_handle_str):
 def find_payload_with_resource_id(data, target_resource_id):
     if "=" in target_resource_id:
         target_resource_id = target_resource_id.split("=")[1]
+    if isinstance(data, hierarchy_transport.HierarchyTable):
+        return data.find_payload(target_resource_id)
     if isinstance(data, dict):
         if data.get("payload", {}).get("name") == target_resource_id:
             return data["payload"]
@@ -378,6 +382,8 @@ def perform(self, motion_events, interval=0.02, event_obj=None):
     event_count = 0
     for event in motion_events:
         if event_count % 10 == 0 and event_obj is not None:
+            # the screen moved since the last search
+            hierarchy_transport.invalidate()
             search_result = event_obj["action"](event_obj)
             if search_result:
                 break
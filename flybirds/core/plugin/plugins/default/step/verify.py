@@ -18,6 +18,7 @@ import flybirds.utils.dsl_helper as dsl_helper
 import flybirds.utils.verify_helper as verify
 from flybirds.core.exceptions import FlybirdVerifyException
 from flybirds.core.plugin.plugins.default.step.common import ocr, img_verify
+from flybirds.report.attachment import add_attachment
 
 
 def wait_text_exist(context, param):
@@ -402,10 +403,11 @@ def img_exist(context, param, islog=True):
         if islog is True:
             src_path = "../../../{}".format(param)
             data = (
-                'embeddingsTags, stepIndex={}, <image class ="screenshot"'
-                ' width="375" src="{}" />'.format(step_index, src_path)
+                '<image class ="screenshot"'
+                ' width="375" src="{}" />'.format(src_path)
             )
-            context.scenario.description.append(data)
+            add_attachment(context.scenario, step_index, data, "image/png",
+                           param)
         raise Exception("[image exist verify] image not found !")
     else:
         log.info(f"[image exist verify] cost time:{time.time() - start}")
@@ -423,10 +425,10 @@ def img_not_exist(context, param):
     else:
         src_path = "../../../{}".format(param)
         data = (
-            'embeddingsTags, stepIndex={}, <image class ="screenshot"'
-            ' width="375" src="{}" />'.format(step_index, src_path)
+            '<image class ="screenshot"'
+            ' width="375" src="{}" />'.format(src_path)
         )
-        context.scenario.description.append(data)
+        add_attachment(context.scenario, step_index, data, "image/png", param)
         # context.cur_step_index += 1
         raise Exception("[image not exist verify] image found !")
 
@@ -2,10 +2,10 @@
 """
 Snapshots API
 """
-import re
-
 from flybirds.core.global_context import GlobalContext as g_context
 import flybirds.core.global_resource as gr
+from flybirds.core.plugin.plugins.default.ui_driver.poco import \
+    hierarchy_transport
 
 __SOURCE__ = None
 __IS_NEED_REFRESH__ = False
@@ -50,9 +50,9 @@ def refresh_snap():
     """
     # poco = g_context.element.ui_driver_init()
     poco = gr.get_value("pocoInstance")
-    frozen_poco = poco.freeze()
     global __SOURCE__
-    __SOURCE__ = frozen_poco.agent.hierarchy.dump()
+    # a new snapshot of the screen for every search attempt
+    __SOURCE__ = hierarchy_transport.get_table(poco, fresh=True)
 
 
 def snap_find(source, config):
@@ -62,51 +62,11 @@ def snap_find(source, config):
     name: name, id
     textMatches: Regular
     """
-    # print("config", config)
-    text = config.get("text")
-    name = config.get("name")
-    textMatches = config.get("textMatches")
-    elements = []
-
-    def find(data):
-        if data:
-            if name:
-                isMatch = data.get("name") == name
-            elif text:
-                isMatch = (
-                    data.get("payload").get("text") or ""
-                ).strip().replace(u"\u200b", "") == text.strip().replace(
-                    u"\u200b", ""
-                )
-            elif textMatches:
-                matchResult = re.search(
-                    textMatches, data.get("payload").get("text") or ""
-                )
-                isMatch = not (matchResult is None)
-            else:
-                print("nothing to find")
-            children = data.get("children") or []
-            if isMatch:
-                elements.append(data)
-            elif children:
-                nextEle = []
-                if isinstance(
-                    children,
-                    (
-                        frozenset,
-                        list,
-                        set,
-                        tuple,
-                    ),
-                ):
-                    nextEle = children
-                else:
-                    nextEle.append(children)
-                for child in nextEle:
-                    find(child)
-            return elements
-        else:
-            print("not find data")
-
-    return __SOURCE__ and find(__SOURCE__) or None
-    # return source and find(source) or None
+    global __SOURCE__
+    if __SOURCE__ is None:
+        return None
+    if not isinstance(__SOURCE__, hierarchy_transport.HierarchyTable):
+        __SOURCE__ = hierarchy_transport.HierarchyTable(__SOURCE__)
+    rows = __SOURCE__.find(name=config.get("name"), text=config.get("text"),
+                           text_matches=config.get("textMatches"))
+    return [__SOURCE__.node(row) for row in rows] or None
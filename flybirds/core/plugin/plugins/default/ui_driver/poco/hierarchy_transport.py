@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+poco hierarchy dumps shared by the lookups of a device. a dump is decoded
+once into a HierarchyTable, columns of the attributes flybirds reads with
+the parent and the subtree end of every node in preorder, and is reused
+until an input action, the next step or the cache ttl. the number and
+time of the dumps are kept per device, and their json size while tracing
+or debug logging
+"""
+import hashlib
+import json
+import logging
+import re
+import time
+
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+from flybirds.utils import trace
+
+# payload attributes kept in the table, the others are dropped on decode
+TABLE_ATTRIBUTES = ("name", "type", "text", "desc", "resourceId", "visible",
+                    "pos", "size", "anchorPoint", "enabled", "selected",
+                    "checked")
+DEFAULT_TTL = 0.5
+
+
+def clean_text(value):
+    return (value or "").strip().replace(u"\u200b", "")
+
+
+class HierarchyTable:
+    """
+    node i of the dump is row i, its subtree is the rows i + 1 to ends[i]
+    """
+
+    def __init__(self, dump, attributes=TABLE_ATTRIBUTES):
+        self.attributes = attributes
+        self.names = []
+        self.parents = []
+        self.ends = []
+        self.columns = {attr: [] for attr in attributes}
+        if dump:
+            self.decode(dump)
+
+    def decode(self, dump):
+        columns = [self.columns[attr] for attr in self.attributes]
+        # an int on the stack closes the subtree of that row
+        stack = [(dump, -1)]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, int):
+                self.ends[item] = len(self.names)
+                continue
+            node, parent = item
+            if not isinstance(node, dict):
+                continue
+            index = len(self.names)
+            payload = node.get("payload") or {}
+            self.names.append(node.get("name"))
+            self.parents.append(parent)
+            self.ends.append(index + 1)
+            for attr, column in zip(self.attributes, columns):
+                column.append(payload.get(attr))
+            children = node.get("children") or []
+            if isinstance(children, dict):
+                children = [children]
+            stack.append(index)
+            stack.extend((child, index) for child in reversed(list(children)))
+
+    def __len__(self):
+        return len(self.names)
+
+    def get(self, index, attr):
+        return self.columns[attr][index]
+
+    def children(self, index):
+        child = index + 1
+        while child < self.ends[index]:
+            yield child
+            child = self.ends[child]
+
+    def payload(self, index):
+        return {attr: self.columns[attr][index] for attr in self.attributes
+                if self.columns[attr][index] is not None}
+
+    def node(self, index=0):
+        """
+        the dump of the subtree with the table attributes
+        """
+        if index >= len(self.names):
+            return {}
+        node = {"name": self.names[index], "payload": self.payload(index)}
+        children = [self.node(child) for child in self.children(index)]
+        if children:
+            node["children"] = children
+        return node
+
+    def find(self, name=None, text=None, text_matches=None):
+        """
+        rows of the matching nodes, the subtree of a match is not searched
+        """
+        if name:
+            values, match = self.names, lambda value: value == name
+        elif text:
+            text = clean_text(text)
+            values = self.columns["text"]
+            match = lambda value: clean_text(value) == text  # noqa: E731
+        elif text_matches:
+            pattern = re.compile(text_matches)
+            values = self.columns["text"]
+            match = lambda value: pattern.search(value or "") is not None  # noqa: E731
+        else:
+            return []
+        rows = []
+        index = 0
+        while index < len(values):
+            if match(values[index]):
+                rows.append(index)
+                index = self.ends[index]
+            else:
+                index += 1
+        return rows
+
+    def find_payload(self, target):
+        """
+        payload of the first node whose name or text is target
+        """
+        names, texts = self.columns["name"], self.columns["text"]
+        for index in range(len(self.names)):
+            if names[index] == target or texts[index] == target:
+                return self.payload(index)
+        return None
+
+    def fingerprint(self):
+        """
+        same digest as swipe_probe.hierarchy_fingerprint of the dump
+        """
+        if not self.names:
+            return None
+        digest = hashlib.sha1()
+        visible, texts, positions = self.columns["visible"], \
+            self.columns["text"], self.columns["pos"]
+        for index, name in enumerate(self.names):
+            if visible[index] is not False:
+                pos = positions[index] or (0, 0)
+                digest.update("{}|{}|{:.3f},{:.3f}\n".format(
+                    name, texts[index],
+                    float(pos[0]), float(pos[1])).encode("utf-8"))
+        return digest.hexdigest()
+
+
+def new_stats():
+    # bytes: compact json size of the measured dumps, an estimate of the
+    # transfer that is only counted while it is reported
+    return {"requests": 0, "dumps": 0, "hits": 0, "bytes": 0,
+            "measured": 0, "seconds": 0.0, "nodes": 0}
+
+
+def is_size_reported():
+    return trace.get_tracer() is not None \
+        or log.logger.isEnabledFor(logging.DEBUG)
+
+
+def dump_size(dump):
+    return len(json.dumps(dump, ensure_ascii=False,
+                          separators=(",", ":")).encode("utf-8"))
+
+
+class HierarchyTransport:
+    """
+    the last table of every device, a request within ttl seconds of the
+    dump is served from it. ttl 0 dumps on every request
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = {}
+        self.stats = {}
+
+    def table(self, poco, device_id=None, fresh=False):
+        stats = self.stats.setdefault(device_id, new_stats())
+        stats["requests"] += 1
+        entry = self.entries.get(device_id)
+        if not fresh and entry is not None \
+                and self.clock() - entry[1] < self.ttl:
+            stats["hits"] += 1
+            return entry[0]
+        start = time.perf_counter()
+        with trace.span("hierarchy", "dump"):
+            dump = poco.agent.hierarchy.dump()
+            table = HierarchyTable(dump)
+            elapsed = time.perf_counter() - start
+            if is_size_reported():
+                size = dump_size(dump)
+                trace.add_bytes(size)
+                stats["bytes"] += size
+                stats["measured"] += 1
+                log.debug(f"[hierarchy] {device_id} dump {len(table)} "
+                          f"nodes, ~{size} json bytes, {elapsed:.3f}s")
+        stats["dumps"] += 1
+        stats["seconds"] += elapsed
+        stats["nodes"] += len(table)
+        if self.ttl > 0:
+            self.entries[device_id] = (table, self.clock())
+        return table
+
+    def invalidate(self, device_id=None):
+        if device_id is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(device_id, None)
+
+    def log_stats(self):
+        for device_id, stats in self.stats.items():
+            size = ""
+            if stats["measured"]:
+                size = f"~{stats['bytes']} json bytes of " \
+                       f"{stats['measured']} dumps, "
+            log.info(f"[hierarchy] {device_id}: {stats['requests']} "
+                     f"requests, {stats['dumps']} dumps, {stats['hits']} "
+                     f"from cache, {stats['nodes']} nodes, {size}"
+                     f"{stats['seconds']:.3f}s")
+
+
+class InvalidatingInput:
+    """
+    poco input that drops the cached tables before every action
+    """
+
+    def __init__(self, poco_input):
+        self.poco_input = poco_input
+
+    def __getattr__(self, name):
+        attr = getattr(self.poco_input, name)
+        if not callable(attr) or name.startswith("get"):
+            return attr
+
+        def action(*args, **kwargs):
+            invalidate()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                invalidate()
+
+        return action
+
+
+def get_ttl():
+    try:
+        return float(gr.get_frame_config_value("hierarchy_cache_ttl",
+                                               DEFAULT_TTL))
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return DEFAULT_TTL
+
+
+def get_device_key():
+    try:
+        return gr.get_device_id()
+    except (AttributeError, KeyError):
+        return None
+
+
+def get_transport():
+    transport = gr.get_value("hierarchyTransport")
+    if transport is None:
+        transport = HierarchyTransport(get_ttl())
+        gr.set_value("hierarchyTransport", transport)
+    return transport
+
+
+def watch_input(poco):
+    agent = getattr(poco, "agent", None)
+    poco_input = getattr(agent, "input", None)
+    if poco_input is not None \
+            and not isinstance(poco_input, InvalidatingInput):
+        agent.input = InvalidatingInput(poco_input)
+
+
+def get_table(poco=None, fresh=False):
+    """
+    table of the current screen of the device, fresh skips the cache
+    """
+    if poco is None:
+        poco = gr.get_value("pocoInstance")
+    watch_input(poco)
+    return get_transport().table(poco, get_device_key(), fresh)
+
+
+def invalidate():
+    """
+    the screen may have changed, the next request dumps again
+    """
+    transport = gr.get_value("hierarchyTransport")
+    if transport is not None:
+        transport.invalidate()
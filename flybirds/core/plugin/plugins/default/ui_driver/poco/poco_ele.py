@@ -14,7 +14,10 @@ import flybirds.utils.flybirds_log as log
 from flybirds.core.exceptions import FlybirdEleExistsException, ErrorName
 from flybirds.core.exceptions import FlybirdVerifyException
 from flybirds.core.global_context import GlobalContext as g_Context
+from flybirds.core.plugin.plugins.default.ui_driver.poco import \
+    hierarchy_transport
 from flybirds.utils import language_helper as lan
+from flybirds.utils import trace
 from flybirds.core.plugin.plugins.default.step.common import img_verify
 from flybirds.core.plugin.plugins.default.step.click import click_image
 
@@ -42,11 +45,10 @@ def wait_exists(poco, selector_str, optional):
             if search_time > 3:
                 search_time = 3
             ele_exists = poco_target.exists()
-            log.info(
-                "wait_exists: {}, ele_exists: {}, timeout: {}, current_wait_second:{}".format(
-                    selector_str, ele_exists, timeout, current_wait_second
-                )
-            )
+            log.info(log.lazy(
+                "wait_exists: {}, ele_exists: {}, timeout: {}, current_wait_second:{}".format,
+                selector_str, ele_exists, timeout, current_wait_second
+            ))
 
             if ele_exists:
                 find_success = True
@@ -63,7 +65,7 @@ def wait_exists(poco, selector_str, optional):
         except Exception:
             if not create_success:
                 log.info(f"time sleep current_wait_second {current_wait_second}")
-                time.sleep(current_wait_second)
+                trace.sleep(current_wait_second, "wait_exists")
         if current_wait_second == 3:
             # modal error detection
             try:
@@ -73,10 +75,10 @@ def wait_exists(poco, selector_str, optional):
                     break
             except Exception:
                 log.info("detect_error exception")
-            time.sleep(1)
+            trace.sleep(1, "wait_exists")
             log.info(f"time sleep 1")
         if current_wait_second > 3:
-            time.sleep(current_wait_second - 3)
+            trace.sleep(current_wait_second - 3, "wait_exists")
             log.info(f"time sleep current_wait_second -3: {current_wait_second - 3}")
         timeout -= current_wait_second
         current_wait_second += 1
@@ -91,7 +93,7 @@ def wait_exists(poco, selector_str, optional):
             else:
                 selector_str = selector_str.replace("textMatches=", "")
             poco_instance = gr.get_value("pocoInstance")
-            poco_tree = poco_instance.agent.hierarchy.dump()
+            poco_tree = hierarchy_transport.get_table(poco_instance).node()
             poco_tree_uft8 = decode_unicode_in_json(poco_tree)
             if selector_str in poco_tree_uft8:
                 log.info(f"poco tree contains selector_str: {selector_str}")
@@ -148,9 +150,9 @@ def wait_disappear(poco, selector_str, optional):
             break
         except Exception:
             if not create_success:
-                time.sleep(current_wait_second)
+                trace.sleep(current_wait_second, "wait_disappear")
         if current_wait_second > 3:
-            time.sleep(current_wait_second - 3)
+            trace.sleep(current_wait_second - 3, "wait_disappear")
         timeout -= current_wait_second
         current_wait_second += 1
     if not disappear_success:
@@ -2,17 +2,23 @@
 """
 Swipe apis
 """
-import time
+import os
 
 import flybirds.core.global_resource as gr
 import flybirds.core.plugin.plugins.default.ui_driver.poco.findsnap as findsnap
 import flybirds.core.plugin.plugins.default.ui_driver.poco.poco_ele as poco_ele
 import flybirds.core.plugin.plugins.default.ui_driver.poco.poco_manage as pm
+import flybirds.core.plugin.plugins.default.ui_driver.poco.swipe_probe \
+    as swipe_probe
 import flybirds.utils.point_helper as point_helper
 from flybirds.core.exceptions import FlybirdNotFoundException
 from flybirds.core.global_context import GlobalContext as g_Context
 from flybirds.utils import language_helper as lan
-from flybirds.core.plugin.plugins.default.step.verify import ocr, ocr_txt_contain, img_exist
+from flybirds.utils import trace
+from flybirds.core.plugin.plugins.default import app_ready
+from flybirds.core.plugin.plugins.default.screen import BaseScreen
+from flybirds.core.plugin.plugins.default.step.verify import ocr_txt_contain
+from flybirds.report.attachment import add_attachment
 import flybirds.utils.flybirds_log as log
 
 
@@ -34,8 +40,7 @@ def air_bdd_full_screen_swipe(
     direct_left = lan.parse_glb_str("left", language)
     direct_right = lan.parse_glb_str("right", language)
 
-    if not (ready_time is None):
-        time.sleep(ready_time)
+    app_ready.wait_stable(poco, ready_time)
     if start_point[0] > 1:
         start_point[0] = start_point[0] / screen_size[0]
     if start_point[1] > 1:
@@ -66,12 +71,25 @@ def air_bdd_ele_swipe(
     """
     poco_ele.wait_exists(poco, container_dsl_str, optional)
 
-    if not (ready_time is None):
-        time.sleep(ready_time)
+    app_ready.wait_stable(poco, ready_time)
 
     poco_object = pm.create_poco_object_by_dsl(
         poco, container_dsl_str, optional
     )
+    start_point, distance, bounds = ele_swipe_points(
+        poco_object, start_point, screen_size, direction, distance
+    )
+    air_bdd_direction_swipe(poco, start_point, direction, distance, duration,
+                            in_ele, *bounds)
+
+
+def ele_swipe_points(poco_object, start_point, screen_size, direction,
+                     distance):
+    """
+    start point, distance and (max_x, min_x, max_y, min_y) bounds of a
+    swipe inside an element
+    """
+    start_point = list(start_point)
     # 获取目标元素的位置和大小
     target_position = poco_object.get_position()
 
@@ -139,7 +157,7 @@ def air_bdd_ele_swipe(
             # if distance < min_y:
             #     distance = min_y
 
-    air_bdd_direction_swipe(poco, start_point, direction, distance, duration, in_ele, max_x, min_x, max_y, min_y)
+    return start_point, distance, (max_x, min_x, max_y, min_y)
 
 
 def air_bdd_direction_swipe(
@@ -227,6 +245,26 @@ def air_bdd_percent_point_swipe(poco, start_point, end_point, duration=None):
         findsnap.fix_refresh_status(True)
 
 
+def freeze_poco(poco):
+    """
+    one hierarchy dump per search round, the query and the fingerprint of
+    the round both use it
+    """
+    try:
+        with trace.span("hierarchy", "freeze"):
+            frozen_poco = poco.freeze()
+            hierarchy = frozen_poco.agent.hierarchy.dump()
+        return frozen_poco, swipe_probe.hierarchy_fingerprint(hierarchy)
+    except Exception as freeze_ex:
+        log.debug(f"[swipe search] freeze hierarchy error: {freeze_ex}")
+        return poco, None
+
+
+def remove_strip(strip_path, image_path):
+    if strip_path != image_path and os.path.exists(strip_path):
+        os.remove(strip_path)
+
+
 def full_screen_swipe_search(
         poco,
         search_dsl_str,
@@ -250,13 +288,14 @@ def full_screen_swipe_search(
     if distance is None:
         distance = 0.3
 
+    probe = swipe_probe.SwipeProbe()
     log_count = swipe_count
     searched = False
     while swipe_count >= 0:
-        print("swipe_count", swipe_count)
+        snap_poco, fingerprint = freeze_poco(poco)
         try:
             search_poco_object = pm.create_poco_object_by_dsl(
-                poco, search_dsl_str, search_optional
+                snap_poco, search_dsl_str, search_optional
             )
             if search_poco_object.exists():
                 searched = True
@@ -267,13 +306,17 @@ def full_screen_swipe_search(
             pass
         if swipe_count == 0:
             break
+        if not probe.update(fingerprint) and probe.stopped():
+            log.info(f"[swipe search] screen not changed by the swipe, "
+                     f"stop searching {search_dsl_str}")
+            break
         air_bdd_full_screen_swipe(
             poco, start_point, screen_size, direction, distance, duration
         )
         swipe_count -= 1
     if not searched:
         message = "swipe to {} {} times，not find {}".format(
-            direction, log_count, search_dsl_str
+            direction, log_count - swipe_count, search_dsl_str
         )
         raise FlybirdNotFoundException(message, {})
     if gr.get_frame_config_value("use_snap", False):
@@ -308,12 +351,15 @@ def air_bdd_swipe_search(
     if distance is None:
         distance = 0.3
 
+    probe = swipe_probe.SwipeProbe()
+    swipe_points = None
     log_count = swipe_count
     searched = False
     while swipe_count >= 0:
+        snap_poco, fingerprint = freeze_poco(poco)
         try:
             search_poco_object = pm.create_poco_object_by_dsl(
-                poco, search_dsl_str, search_optional
+                snap_poco, search_dsl_str, search_optional
             )
             if search_poco_object.exists():
                 searched = True
@@ -322,27 +368,79 @@ def air_bdd_swipe_search(
             pass
         if swipe_count == 0:
             break
-        air_bdd_ele_swipe(
-            poco,
-            container_dsl_str,
-            container_optional,
-            start_point,
-            screen_size,
-            direction,
-            distance,
-            duration,
-            in_ele
-        )
+        if not probe.update(fingerprint) and probe.stopped():
+            log.info(f"[swipe search] {container_dsl_str} not changed by the "
+                     f"swipe, stop searching {search_dsl_str}")
+            break
+        if swipe_points is None:
+            # the container keeps its place while its content scrolls
+            container_object = pm.create_poco_object_by_dsl(
+                snap_poco, container_dsl_str, container_optional
+            )
+            swipe_points = ele_swipe_points(
+                container_object, start_point, screen_size, direction,
+                distance
+            )
+        swipe_start, swipe_distance, bounds = swipe_points
+        air_bdd_direction_swipe(poco, list(swipe_start), direction,
+                                swipe_distance, duration, in_ele, *bounds)
         swipe_count -= 1
     if not searched:
         message = "{} swipe to {} {} times，not find {}".format(
-            container_dsl_str, direction, log_count, search_dsl_str
+            container_dsl_str, direction, log_count - swipe_count,
+            search_dsl_str
         )
         raise FlybirdNotFoundException(message, {})
     if gr.get_frame_config_value("use_snap", False):
         findsnap.fix_refresh_status(True)
 
 
+def ocr_revealed_strip(context, scan):
+    """
+    screenshot and ocr the part of it the last swipe revealed, the region
+    searched or None when the screen did not change
+    """
+    step_index = context.cur_step_index - 1
+    image_path = BaseScreen.screen_link_to_behave(
+        context.scenario, step_index, "screen_", True)
+    region = scan.update(image_path)
+    if region is None:
+        return None
+    strip_path, offset = scan.crop(image_path, region)
+    try:
+        BaseScreen.image_ocr(strip_path)
+    finally:
+        remove_strip(strip_path, image_path)
+    if offset:
+        from baseImage import Image
+        g_Context.ocr_result = scan.offset_ocr_result(g_Context.ocr_result,
+                                                      offset)
+        g_Context.image_size = Image(image_path).size
+    return region
+
+
+def img_revealed_strip(context, scan, search_image_path):
+    """
+    screenshot and match the image in the part of it the last swipe
+    revealed, (region, result), region is None when nothing changed
+    """
+    from baseImage import Image
+    step_index = context.cur_step_index - 1
+    image_path = BaseScreen.screen_link_to_behave(
+        context.scenario, step_index, "screen_", False)
+    region = scan.update(image_path)
+    if region is None:
+        return None, []
+    strip_path, _ = scan.crop(image_path, region,
+                              scan.template_margin(search_image_path))
+    try:
+        result = BaseScreen.image_verify(strip_path, search_image_path)
+    finally:
+        remove_strip(strip_path, image_path)
+    g_Context.image_size = Image(image_path).size
+    return region, result
+
+
 def full_screen_swipe_search_ocr(
         context,
         poco,
@@ -366,19 +464,29 @@ def full_screen_swipe_search_ocr(
     if distance is None:
         distance = 0.3
 
+    scan = swipe_probe.FrameScan(direction)
+    probe = swipe_probe.SwipeProbe()
     log_count = swipe_count
     searched = False
     while swipe_count >= 0:
         try:
-            ocr(context)
-            searched = ocr_txt_contain(context, search_dsl_str, islog=False)
-            if searched is True:
-                log.info("[full_screen_swipe_search_ocr]txt found")
-                break
+            region = ocr_revealed_strip(context, scan)
+            probe.record(region is not None)
+            # an empty strip result must not trigger a full screen ocr
+            if region is not None and len(g_Context.ocr_result) > 0:
+                searched = ocr_txt_contain(context, search_dsl_str,
+                                           islog=False)
+                if searched is True:
+                    log.info("[full_screen_swipe_search_ocr]txt found")
+                    break
         except Exception:
             pass
         if swipe_count == 0:
             break
+        if probe.stopped():
+            log.info(f"[swipe search] screen not changed by the swipe, "
+                     f"stop searching {search_dsl_str}")
+            break
         air_bdd_full_screen_swipe(
             poco, start_point, screen_size, direction, distance, duration
         )
@@ -387,7 +495,7 @@ def full_screen_swipe_search_ocr(
         for line in g_Context.ocr_result:
             log.info(f"[image ocr result] scan line info is:{line}")
         message = "swipe to {} {} times，not find {}".format(
-            direction, log_count, search_dsl_str
+            direction, log_count - swipe_count, search_dsl_str
         )
         raise FlybirdNotFoundException(message, {})
 
@@ -415,17 +523,26 @@ def full_screen_swipe_search_img(
     if distance is None:
         distance = 0.3
 
+    scan = swipe_probe.FrameScan(direction)
+    probe = swipe_probe.SwipeProbe()
     log_count = swipe_count
     searched = False
     while swipe_count >= 0:
         try:
-            searched = img_exist(context, search_dsl_str, islog=False)
-            if searched is True:
+            region, result = img_revealed_strip(context, scan, search_dsl_str)
+            probe.record(region is not None)
+            if len(result) > 0:
+                log.info(f"[full_screen_swipe_search_img] result:{result}")
+                searched = True
                 break
         except Exception:
             pass
         if swipe_count == 0:
             break
+        if probe.stopped():
+            log.info(f"[swipe search] screen not changed by the swipe, "
+                     f"stop searching {search_dsl_str}")
+            break
         air_bdd_full_screen_swipe(
             poco, start_point, screen_size, direction, distance, duration
         )
@@ -434,12 +551,13 @@ def full_screen_swipe_search_img(
         step_index = context.cur_step_index - 1
         src_path = "../../../{}".format(search_dsl_str)
         data = (
-            'embeddingsTags, stepIndex={}, <image class ="screenshot"'
-            ' width="375" src="{}" />'.format(step_index, src_path)
+            '<image class ="screenshot"'
+            ' width="375" src="{}" />'.format(src_path)
         )
-        context.scenario.description.append(data)
+        add_attachment(context.scenario, step_index, data, "image/png",
+                       search_dsl_str)
 
         message = "swipe to {} {} times，not find {}".format(
-            direction, log_count, search_dsl_str
+            direction, log_count - swipe_count, search_dsl_str
         )
         raise FlybirdNotFoundException(message, {})
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+change detection between the swipes of a swipe search, the visible content
+is fingerprinted after every swipe so the search stops when the list does
+not move any more and ocr/image searches only look at the revealed strip
+"""
+import hashlib
+import os
+
+import flybirds.core.global_resource as gr
+from flybirds.core.global_context import GlobalContext as g_Context
+from flybirds.utils import language_helper as lan
+
+# thumbnail size along the swipe axis and across it
+THUMB_LENGTH = 160
+THUMB_WIDTH = 48
+# mean gray level difference under which two rows are the same
+ROW_TOLERANCE = 4.0
+# share of the moving area that has to overlap to trust a scroll offset
+MIN_OVERLAP = 0.2
+# extra context kept around the revealed strip, text cut by the edge of
+# the strip is found again
+STRIP_MARGIN = 0.05
+
+
+def get_still_limit():
+    try:
+        return int(gr.get_frame_config_value("swipe_search_still_limit", 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+def hierarchy_fingerprint(hierarchy):
+    """
+    digest of the name, text and rounded position of the visible nodes of
+    a dump or a hierarchy table
+    """
+    if hasattr(hierarchy, "fingerprint"):
+        return hierarchy.fingerprint()
+    if not hierarchy:
+        return None
+    digest = hashlib.sha1()
+    nodes = [hierarchy]
+    while nodes:
+        node = nodes.pop()
+        if not isinstance(node, dict):
+            continue
+        payload = node.get("payload") or {}
+        if payload.get("visible", True) is not False:
+            pos = payload.get("pos") or (0, 0)
+            digest.update("{}|{}|{:.3f},{:.3f}\n".format(
+                node.get("name"), payload.get("text"),
+                float(pos[0]), float(pos[1])).encode("utf-8"))
+        children = node.get("children") or []
+        if isinstance(children, dict):
+            children = [children]
+        nodes.extend(reversed(list(children)))
+    return digest.hexdigest()
+
+
+class SwipeProbe:
+    """
+    counts the swipes in a row that left the fingerprint unchanged
+    """
+
+    def __init__(self, still_limit=None):
+        self.still_limit = get_still_limit() if still_limit is None \
+            else still_limit
+        self.last = None
+        self.still = 0
+
+    def record(self, moved):
+        self.still = 0 if moved else self.still + 1
+        return moved
+
+    def update(self, fingerprint):
+        """
+        False when the content did not change since the previous call
+        """
+        if fingerprint is None:
+            self.last = None
+            return self.record(True)
+        moved = fingerprint != self.last
+        self.last = fingerprint
+        return self.record(moved)
+
+    def stopped(self):
+        return 0 < self.still_limit <= self.still
+
+
+def is_horizontal(direction):
+    language = g_Context.get_current_language()
+    return direction in (lan.parse_glb_str("left", language),
+                         lan.parse_glb_str("right", language))
+
+
+def frame_thumbnail(image_path, horizontal=False):
+    """
+    small gray image of the frame, axis 0 is the swipe axis
+    """
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(image_path) as image:
+        size = image.size
+        if horizontal:
+            thumb = image.convert("L").resize((THUMB_LENGTH, THUMB_WIDTH))
+        else:
+            thumb = image.convert("L").resize((THUMB_WIDTH, THUMB_LENGTH))
+    pixels = np.asarray(thumb, dtype=np.int16)
+    if horizontal:
+        pixels = pixels.T
+    return pixels, size
+
+
+def revealed_range(prev, cur):
+    """
+    (start, end) share of the frame along the swipe axis that shows new
+    content, None when nothing moved
+    """
+    import numpy as np
+
+    row_diff = np.abs(cur - prev).mean(axis=1)
+    moving = np.nonzero(row_diff > ROW_TOLERANCE)[0]
+    if len(moving) == 0:
+        return None
+    length = len(row_diff)
+    # fixed bars around the list stay out of the offset estimate
+    low, high = int(moving[0]), int(moving[-1]) + 1
+    old, new = prev[low:high], cur[low:high]
+    span = high - low
+    best = None
+    for shift in range(1, int(span * (1 - MIN_OVERLAP)) + 1):
+        # content moved towards the start, new rows at the end
+        score = np.abs(new[:span - shift] - old[shift:]).mean()
+        if best is None or score < best[0]:
+            best = (score, high - shift, high)
+        # content moved towards the end, new rows at the start
+        score = np.abs(new[shift:] - old[:span - shift]).mean()
+        if score < best[0]:
+            best = (score, low, low + shift)
+    if best is None or best[0] > ROW_TOLERANCE:
+        return low / length, high / length
+    return best[1] / length, best[2] / length
+
+
+class FrameScan:
+    """
+    keeps the thumbnail of the previous frame of a swipe search
+    """
+
+    def __init__(self, direction):
+        self.horizontal = is_horizontal(direction)
+        self.last = None
+        self.size = None
+
+    def update(self, image_path):
+        """
+        (start, end) share of the frame to search, None when the frame is
+        the same as the previous one
+        """
+        try:
+            thumb, self.size = frame_thumbnail(image_path, self.horizontal)
+        except Exception:
+            self.last = None
+            return 0.0, 1.0
+        prev, self.last = self.last, thumb
+        if prev is None or prev.shape != thumb.shape:
+            return 0.0, 1.0
+        return revealed_range(prev, thumb)
+
+    def crop(self, image_path, region, margin=STRIP_MARGIN):
+        """
+        path of the image cut to the region plus margin and the pixel
+        offset of the cut, the original path when the region is the frame
+        """
+        from PIL import Image
+
+        start = max(0.0, region[0] - margin)
+        end = min(1.0, region[1] + margin)
+        if start <= 0.0 and end >= 1.0:
+            return image_path, 0
+        with Image.open(image_path) as image:
+            width, height = image.size
+            if self.horizontal:
+                box = (int(width * start), 0, int(round(width * end)), height)
+            else:
+                box = (0, int(height * start), width,
+                       int(round(height * end)))
+            root, ext = os.path.splitext(image_path)
+            strip_path = f"{root}_strip{ext or '.png'}"
+            image.crop(box).save(strip_path)
+        return strip_path, box[0] if self.horizontal else box[1]
+
+    def template_margin(self, template_path):
+        """
+        margin that keeps a template cut by the edge of the strip inside
+        the strip, sift also matches it somewhat larger than the file
+        """
+        from PIL import Image
+
+        axis = 0 if self.horizontal else 1
+        try:
+            with Image.open(template_path) as template:
+                length = template.size[axis]
+            return max(STRIP_MARGIN, 1.5 * length / self.size[axis])
+        except Exception:
+            return 1.0
+
+    def offset_ocr_result(self, ocr_result, offset):
+        """
+        move the boxes of an ocr result on a strip back to frame positions
+        """
+        if not offset:
+            return ocr_result
+        dx, dy = (offset, 0) if self.horizontal else (0, offset)
+        return [[[[x + dx, y + dy] for x, y in line[0]]] + list(line[1:])
+                for line in ocr_result]
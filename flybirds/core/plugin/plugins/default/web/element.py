@@ -12,6 +12,7 @@ from flybirds.core.exceptions import FlybirdVerifyException, \
     FlybirdsVerifyEleException, ErrorName
 from flybirds.core.global_context import GlobalContext as g_Context
 from flybirds.core.plugin.plugins.default.screen import BaseScreen
+from flybirds.core.plugin.plugins.default.web import element_snapshot
 from flybirds.utils import language_helper as lan, dsl_helper
 from flybirds.utils.dsl_helper import handle_str, params_to_dic
 import re
@@ -132,17 +133,16 @@ class Element:
         ele_locator = self.page.locator(selector_str)
         return ele_locator, float(timeout) * 1000
 
+    def get_ele_snapshot(self, param):
+        """
+        text, value, attributes, visibility and box of the element in one
+        round trip, cached for the step
+        """
+        return element_snapshot.get_snapshot(
+            self.page, param, lambda: self.get_ele_locator(param))
+
     def get_ele_text(self, param):
-        locator, timeout = self.get_ele_locator(param)
-        e_text = locator.inner_text(timeout=timeout)
-        if e_text is None or e_text.strip() == '':
-            e_text = locator.get_attribute('value')
-            if e_text is None or e_text.strip() == '':
-                e_text = locator.evaluate('(element) => { console.log("element.value");return element.value}',
-                                          timeout=timeout)
-                if e_text is None or e_text.strip() == '':
-                    e_text = ""
-        return e_text
+        return self.get_ele_snapshot(param).display_text()
 
     def ele_hover(self, context, param):
         locator, timeout = self.get_ele_locator(param)
@@ -274,7 +274,6 @@ class Element:
         verify_helper.text_equal(param_2, e_text)
 
     def ele_exist(self, context, param):
-        locator, timeout = self.get_ele_locator(param)
         if "get_by_role" in param:
             param_temp = handle_str(param)
             param_dict = params_to_dic(param_temp)
@@ -282,21 +281,22 @@ class Element:
             name = param_dict["name"]
             aria = param_dict["aria"]
             assert_ele = param_dict["assert"]
+            snapshot = self.get_ele_snapshot(param)
             if aria is not None and assert_ele is not None:
-                if locator.get_attribute(aria) == assert_ele:
+                if snapshot.get_attribute(aria) == assert_ele:
                     log.info(f"element aria {aria} exists and name is {name}")
                     return
                 else:
                     message = f"expect [{selector_str}] element with aria " \
                               f"{aria} exists in page, but actual not find it."
                     raise FlybirdVerifyException(message, error_name=ErrorName.ElementNotFoundError)
-            if locator.get_attribute('role') == selector_str:
+            if snapshot.get_attribute('role') == selector_str:
                 log.info(f"element role {selector_str} exists and name is {name}")
                 return
             message = f"expect [{selector_str}] element with role " \
                       f"{name} exists in page, but actual not find it."
             raise FlybirdVerifyException(message, error_name=ErrorName.ElementNotFoundError)
-        locator.element_handle(timeout=timeout)
+        self.get_ele_snapshot(param)
 
     def ele_not_exist(self, context, param):
         try:
@@ -314,29 +314,21 @@ class Element:
             raise FlybirdVerifyException(message, error_name=ErrorName.ElementFoundError)
 
     def ele_exist_value(self, context, selector, param):
-        locator, timeout = self.get_ele_locator(selector)
-        ele_value = locator.evaluate('(element) => { console.log("element.value");return element.value}',
-                                     timeout=timeout)
+        ele_value = self.get_ele_snapshot(selector).value
         verify_helper.text_equal(param, ele_value)
 
     def ele_contain_value(self, context, selector, param):
-        locator, timeout = self.get_ele_locator(selector)
-        ele_value = locator.evaluate('(element) => { console.log("element.value");return element.value}',
-                                     timeout=timeout)
+        ele_value = self.get_ele_snapshot(selector).value
         if 'exclusive_space=true' in selector.lower():
             ele_value = "".join(ele_value.split())
         verify_helper.text_container(param, ele_value)
 
     def ele_not_contain_value(self, context, selector, param):
-        locator, timeout = self.get_ele_locator(selector)
-        ele_value = locator.evaluate('(element) => { console.log("element.value");return element.value}',
-                                     timeout=timeout)
+        ele_value = self.get_ele_snapshot(selector).value
         verify_helper.text_not_container(param, ele_value)
 
     def ele_with_param_value_equal_attr(self, context, selector, attr_value):
-        locator, timeout = self.get_ele_locator(selector)
-        ele_value = locator.evaluate('(element) => { console.log("element.value");return element.value}',
-                                     timeout=timeout)
+        ele_value = self.get_ele_snapshot(selector).value
         verify_helper.text_equal(attr_value, ele_value)
 
     def wait_for_ele(self, context, param):
@@ -475,8 +467,7 @@ class Element:
 
     def get_ele_attr(self, selector, attr_name, params_deal_module=None,
                      deal_method=None):
-        locator, timeout = self.get_ele_locator(selector)
-        ele_attr = locator.get_attribute(attr_name, timeout=timeout)
+        ele_attr = self.get_ele_snapshot(selector).get_attribute(attr_name)
         if deal_method is not None:
             deal_method = getattr(params_deal_module, deal_method)
             ele_attr = deal_method(ele_attr)
@@ -564,9 +555,12 @@ class Element:
         sub_locator, c_timeout = self.is_parent_exist_child(context,
                                                             parent_selector,
                                                             child_selector)
-        e_text = sub_locator.inner_text(timeout=c_timeout)
+        snapshot = element_snapshot.get_snapshot(
+            self.page, (parent_selector, child_selector),
+            lambda: (sub_locator, c_timeout))
+        e_text = snapshot.text
         if e_text is None or e_text.strip() == '':
-            e_text = sub_locator.get_attribute('value', timeout=c_timeout)
+            e_text = snapshot.get_attribute('value')
         verify_helper.text_equal(target_text, e_text)
 
     def ele_touch(self, context, param):
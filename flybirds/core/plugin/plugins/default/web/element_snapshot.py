@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+text, value, attributes, visibility and box of a web element in a single
+evaluate, cached until the step ends or is retried
+"""
+import flybirds.core.global_resource as gr
+
+SNAPSHOT_SCRIPT = """(element) => {
+    const attributes = {};
+    for (const attr of element.attributes || []) {
+        attributes[attr.name] = attr.value;
+    }
+    const rect = element.getBoundingClientRect();
+    const style = window.getComputedStyle(element);
+    const value = element.value;
+    return {
+        text: typeof element.innerText === "string" ? element.innerText
+            : element.textContent,
+        value: value === undefined || value === null ? null : String(value),
+        attributes: attributes,
+        visible: rect.width > 0 && rect.height > 0
+            && style.visibility !== "hidden",
+        box: {x: rect.x, y: rect.y, width: rect.width, height: rect.height}
+    };
+}"""
+
+
+class EleSnapshot:
+    """
+    state of the element when it was taken, box is relative to the
+    viewport of the frame
+    """
+
+    def __init__(self, data):
+        self.text = data.get("text")
+        self.value = data.get("value")
+        self.attributes = data.get("attributes") or {}
+        self.visible = bool(data.get("visible"))
+        self.box = data.get("box")
+
+    def get_attribute(self, name):
+        """
+        like getAttribute, html attribute names are matched in lowercase
+        """
+        value = self.attributes.get(name.lower())
+        if value is None:
+            value = self.attributes.get(name)
+        return value
+
+    def display_text(self):
+        """
+        inner text, for inputs the value attribute or the value
+        """
+        for text in (self.text, self.get_attribute("value"), self.value):
+            if text is not None and text.strip() != '':
+                return text
+        return ""
+
+
+def get_cache():
+    cache = gr.get_value("eleSnapshots")
+    if cache is None:
+        cache = {}
+        gr.set_value("eleSnapshots", cache)
+    return cache
+
+
+def clear():
+    gr.set_value("eleSnapshots", None)
+
+
+def take(locator, timeout):
+    """
+    waits like the other locator calls until the element is attached
+    """
+    return EleSnapshot(locator.evaluate(SNAPSHOT_SCRIPT, timeout=timeout))
+
+
+def get_snapshot(page, key, get_locator):
+    """
+    cached snapshot of the element, get_locator returns (locator, timeout)
+    """
+    cache = get_cache()
+    cache_key = (id(page), key)
+    snapshot = cache.get(cache_key)
+    if snapshot is None:
+        locator, timeout = get_locator()
+        snapshot = take(locator, timeout)
+        cache[cache_key] = snapshot
+    return snapshot
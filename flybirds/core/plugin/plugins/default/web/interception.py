@@ -3,18 +3,15 @@
 # @Author : hyx
 # @File : interception.py
 # @desc :web request interception related operations
+import html
 import json
 import os
 import re
-import cv2
-import requests
-from PIL import Image
 import io
-from flybirds.utils import dsl_helper, uuid_helper
+from flybirds.utils import dsl_helper, http_helper, uuid_helper
 from urllib.parse import parse_qs
 
 from flybirds.core.plugin.plugins.default.screen import BaseScreen
-from deepdiff import DeepDiff
 from jsonpath_ng import parse as parse_path
 
 import xml.etree.ElementTree as et
@@ -26,6 +23,8 @@ __open__ = ["Interception"]
 
 from flybirds.utils import file_helper
 from flybirds.utils.file_helper import read_json_data, read_json_data_by_key
+from flybirds.report.attachment import add_attachment
+from flybirds.core.plugin.plugins.default.web import network_idle
 import xmltodict
 
 
@@ -298,6 +297,28 @@ class Interception:
             log.error(message)
             raise FlybirdsException(message, error_name=ErrorName.RequestError)
 
+    @staticmethod
+    def page_wait_network_idle(idle_time, operation=None):
+        """
+        idle_time in ms, operation is a comma separated list of the
+        operations to wait for, all requests when None
+        """
+        if not dsl_helper.is_number(idle_time):
+            message = f'[page wait network idle] idle time [{idle_time}] is not a number'
+            raise FlybirdsException(message, error_name=ErrorName.RequestParamsError)
+        operations = None
+        if operation is not None:
+            operations = {item.strip() for item in operation.split(',') if item.strip()}
+        ele = gr.get_value("plugin_ele")
+        page_render_timeout = float(gr.get_frame_config_value("page_render_timeout", 30))
+        idle, waited = network_idle.wait_idle(ele.page, float(idle_time) / 1000,
+                                              page_render_timeout, operations)
+        if not idle:
+            message = f'[page wait network idle] the network of [{operation or "all requests"}] ' \
+                      f'is not idle for {idle_time}ms within {page_render_timeout}s'
+            raise FlybirdsException(message, error_name=ErrorName.RequestError)
+        log.info(f'[page wait network idle] idle after {waited * 1000:.0f}ms')
+
     @staticmethod
     def request_query_string_compare(operation, target_data_path, contains_key):
         # Define function request_query_string_compare with two parameters, operation and target_data_path
@@ -468,6 +489,9 @@ class Interception:
 
     @staticmethod
     def compare_images(context, target_element, compared_picture_path, threshold=None):
+        # opencv and pillow are only needed by this step
+        import cv2
+        from PIL import Image
 
         # default threshold value
         threshold = 0.95
@@ -634,7 +658,11 @@ class Interception:
         return same, diff
 
     @staticmethod
-    def call_external_party_api(method, url, data=None, headers=None):
+    def external_party_call(method, url, data=None, headers=None):
+        """
+        request arguments of an external api call, data and headers are
+        json strings
+        """
         # Initialize variables to hold the content and headers
         datacontent = None
         dataheaders = None
@@ -647,17 +675,29 @@ class Interception:
             message = f'The content of data and headers is not json format: ' \
                       f' [{data}] - [{headers}]'
             raise FlybirdsException(message, error_name=ErrorName.RequestParamsError)
+        if not isinstance(datacontent, (dict, list, type(None))) \
+                or not isinstance(dataheaders, (dict, type(None))):
+            message = f'The content of data and headers is not a json ' \
+                      f'object: [{data}] - [{headers}]'
+            raise FlybirdsException(message, error_name=ErrorName.RequestParamsError)
 
         # Set the content and headers to None if they are empty
-        if len(datacontent) == 0:
+        if not datacontent:
             datacontent = None
 
-        if len(dataheaders) == 0:
+        if not dataheaders:
             dataheaders = None
 
+        return {"method": method, "url": url,
+                "kwargs": {"params": datacontent, "json": data,
+                           "headers": dataheaders, "verify": False}}
+
+    @staticmethod
+    def call_external_party_api(method, url, data=None, headers=None):
+        call = Interception.external_party_call(method, url, data, headers)
         try:
-            response = requests.request(method.upper(), url, params=datacontent, json=data, headers=dataheaders,
-                                        verify=False)
+            response = http_helper.request(call["method"], url,
+                                           **call["kwargs"])
             # Check if the response was successful
             response.raise_for_status()
             # Return the response text
@@ -667,6 +707,44 @@ class Interception:
                       f' [{url}] - [{data}] - [{headers}]:'
             raise FlybirdsException(message, error_name=ErrorName.RequestParamsError)
 
+    @staticmethod
+    def call_external_party_apis(context, calls_str):
+        """
+        calls_str is a json list of {"method", "url", "data", "headers"},
+        the calls run concurrently and all of them must succeed. the status
+        and latency of every call are attached to the step
+        """
+        try:
+            call_list = json.loads(calls_str)
+        except ValueError:
+            call_list = None
+        if not isinstance(call_list, list) or len(call_list) == 0:
+            message = f'The calls are not a json list: [{calls_str}]'
+            raise FlybirdsException(message, error_name=ErrorName.RequestParamsError)
+        calls = []
+        for item in call_list:
+            if not isinstance(item, dict) or not item.get("url"):
+                message = f'The call has no url: [{item}]'
+                raise FlybirdsException(message, error_name=ErrorName.RequestParamsError)
+            # a null data or headers is sent without them
+            data = item.get("data") or {}
+            headers = item.get("headers") or {}
+            calls.append(Interception.external_party_call(
+                item.get("method", "GET"), item["url"],
+                data if isinstance(data, str) else json.dumps(data),
+                headers if isinstance(headers, str) else json.dumps(headers)))
+        results = http_helper.request_batch(calls)
+        add_attachment(context.scenario, context.cur_step_index - 1,
+                       batch_report(results))
+        failed = [result for result in results if not result.ok]
+        if len(failed) > 0:
+            message = "external party api calls failed: " + ", ".join(
+                f"{result.call['method'].upper()} {result.call['url']} "
+                f"{getattr(result.response, 'status_code', result.error)}"
+                for result in failed)
+            raise FlybirdsException(message, error_name=ErrorName.RequestError)
+        return results
+
     @staticmethod
     def open_web_request_mock(service_str, mock_case_id_str, mock_key_list_str, request_mock_key_value: list):
         if service_str is None or mock_case_id_str is None or mock_key_list_str is None:
@@ -934,6 +1012,7 @@ def get_matched_json(refered_json, matched_json):
 
 def handle_diff(actual_request_obj, expect_request_obj, operation,
                 target_file_name, contains_key):
+    from deepdiff import DeepDiff
     log.info('run in handle_diff')
     exclude_paths, exclude_regex_paths = handle_ignore_node(operation)
     ignore_order = gr.get_web_info_value("ignore_order", False)
@@ -1003,3 +1082,19 @@ def delete_values(data):
         elif isinstance(value, str):
             log.info("String dict value", value)
     return data
+
+
+def batch_report(results):
+    """
+    html table of the calls of a batch for the step report
+    """
+    rows = "".join(
+        "<tr><td>{}</td><td>{}</td><td>{}</td><td>{:.0f}ms</td></tr>".format(
+            html.escape(result.call["method"].upper()),
+            html.escape(result.call["url"]),
+            html.escape(str(getattr(result.response, "status_code",
+                                    result.error))),
+            result.elapsed * 1000)
+        for result in results)
+    return "<table><tr><th>method</th><th>url</th><th>status</th>" \
+           "<th>latency</th></tr>{}</table>".format(rows)
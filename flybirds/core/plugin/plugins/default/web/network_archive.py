@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+network record and replay of the xhr/fetch requests of a feature.
+record stores the real responses, replay fulfills the requests from the
+archive and only goes to the network on a miss.
+
+an archive is <networkArchiveDir>/<browser>/<feature path>.dat with the
+compressed responses one after another, and .idx with the offsets by key.
+the feature path is relative to the workspace and without .feature
+"""
+import hashlib
+import json
+import os
+import struct
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+MODES = (OFF, RECORD, REPLAY)
+
+DATA_SUFFIX = ".dat"
+INDEX_SUFFIX = ".idx"
+DEFAULT_DIR = "network_archive"
+# cache busters that change on every request
+DEFAULT_IGNORE_PARAMS = ["_", "t", "ts", "timestamp"]
+# set again by route.fulfill for the replayed body
+SKIP_HEADERS = {"content-length", "content-encoding", "transfer-encoding",
+                "connection"}
+ARCHIVED_TYPES = ("xhr", "fetch")
+
+
+def normalize_body(body, ignore_params):
+    """
+    json bodies are compared by content, keys in any order
+    """
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    try:
+        data = json.loads(body)
+    except (ValueError, UnicodeDecodeError):
+        return body
+    if isinstance(data, dict):
+        data = {k: v for k, v in data.items() if k not in ignore_params}
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode(
+        "utf-8")
+
+
+def request_key(method, url, body=None, ignore_params=None):
+    """
+    METHOD host/path?sorted query #body hash
+    """
+    if ignore_params is None:
+        ignore_params = DEFAULT_IGNORE_PARAMS
+    parsed = urlparse(url)
+    query = sorted((k, v) for k, v in parse_qsl(parsed.query,
+                                                keep_blank_values=True)
+                   if k not in ignore_params)
+    body_hash = hashlib.sha1(normalize_body(body, ignore_params)).hexdigest()
+    key = f"{method.upper()} {parsed.hostname}{parsed.path}"
+    if query:
+        key += f"?{urlencode(query)}"
+    return f"{key} #{body_hash[:16]}"
+
+
+def encode_response(status, headers, body):
+    meta = json.dumps({"status": status, "headers": headers},
+                      separators=(",", ":")).encode("utf-8")
+    return zlib.compress(struct.pack(">I", len(meta)) + meta + body)
+
+
+def decode_response(blob):
+    raw = zlib.decompress(blob)
+    meta_length = struct.unpack(">I", raw[:4])[0]
+    meta = json.loads(raw[4:4 + meta_length].decode("utf-8"))
+    return meta["status"], meta["headers"], raw[4 + meta_length:]
+
+
+class NetworkArchive:
+    """
+    archive of one feature, a key can hold several responses that are
+    replayed in recorded order, the last one is repeated
+    """
+
+    def __init__(self, path, mode, ignore_params=None):
+        self.path = path
+        self.mode = mode
+        self.ignore_params = DEFAULT_IGNORE_PARAMS if ignore_params is None \
+            else ignore_params
+        self.index = {}
+        self.cursor = {}
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._data = None
+        if mode == RECORD:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._data = open(path + DATA_SUFFIX, "wb")
+        elif os.path.isfile(path + INDEX_SUFFIX):
+            with open(path + INDEX_SUFFIX, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+            self._data = open(path + DATA_SUFFIX, "rb")
+
+    def key(self, method, url, body=None):
+        return request_key(method, url, body, self.ignore_params)
+
+    def record(self, method, url, body, status, headers, response_body):
+        if self._data is None or self.mode != RECORD:
+            return
+        headers = {k: v for k, v in (headers or {}).items()
+                   if k.lower() not in SKIP_HEADERS}
+        blob = encode_response(status, headers, response_body or b"")
+        offset = self._data.tell()
+        self._data.write(blob)
+        self.index.setdefault(self.key(method, url, body), []).append(
+            [offset, len(blob)])
+        self.recorded += 1
+
+    def lookup(self, method, url, body=None):
+        """
+        (status, headers, body) or None
+        """
+        key = self.key(method, url, body)
+        entries = self.index.get(key)
+        if not entries or self._data is None:
+            self.misses += 1
+            return None
+        position = self.cursor.get(key, 0)
+        self.cursor[key] = position + 1
+        offset, length = entries[min(position, len(entries) - 1)]
+        self._data.seek(offset)
+        self.hits += 1
+        return decode_response(self._data.read(length))
+
+    def close(self):
+        if self._data is None:
+            return
+        self._data.close()
+        self._data = None
+        if self.mode == RECORD:
+            tmp_path = f"{self.path}{INDEX_SUFFIX}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.index, f, ensure_ascii=False,
+                          separators=(",", ":"))
+            os.replace(tmp_path, self.path + INDEX_SUFFIX)
+
+
+def get_mode():
+    mode = str(gr.get_web_info_value("network_archive", OFF)).lower()
+    return mode if mode in MODES else OFF
+
+
+def archive_path(feature_filename):
+    """
+    every browser of a parallel run records its own archive, features with
+    the same file name in different directories do not share one
+    """
+    archive_dir = gr.get_web_info_value("network_archive_dir", DEFAULT_DIR)
+    feature = os.path.abspath(feature_filename)
+    try:
+        relative = os.path.relpath(feature)
+    except ValueError:
+        # another drive than the workspace
+        relative = os.pardir
+    if relative.startswith(os.pardir):
+        relative = os.path.splitdrive(feature)[1].lstrip("\\/")
+    browser = gr.get_value("cur_browser", "chromium")
+    return os.path.join(archive_dir, browser,
+                        os.path.splitext(relative)[0])
+
+
+def open_archive(feature_filename):
+    mode = get_mode()
+    if mode == OFF:
+        return None
+    archive = NetworkArchive(
+        archive_path(feature_filename), mode,
+        gr.get_web_info_value("network_archive_ignore_params", None))
+    if mode == REPLAY and not archive.index:
+        log.warn(f"[network archive] no archive at {archive.path}, requests "
+                 f"go to the network")
+    gr.set_value("networkArchive", archive)
+    return archive
+
+
+def close_archive():
+    archive = gr.get_value("networkArchive")
+    if archive is None:
+        return
+    gr.set_value("networkArchive", None)
+    archive.close()
+    log.info(f"[network archive] {archive.mode} {archive.path}: recorded "
+             f"{archive.recorded}, hits {archive.hits}, misses "
+             f"{archive.misses}")
+
+
+def fulfill(route):
+    """
+    replay: fulfill the route from the archive, False on a miss
+    """
+    archive = gr.get_value("networkArchive")
+    if archive is None or archive.mode != REPLAY:
+        return False
+    request = route.request
+    if request.resource_type not in ARCHIVED_TYPES:
+        return False
+    response = archive.lookup(request.method, request.url,
+                              request.post_data_buffer)
+    if response is None:
+        return False
+    status, headers, body = response
+    route.fulfill(status=status, headers=headers, body=body)
+    return True
+
+
+def record_response(response):
+    """
+    record: store the response of a finished xhr/fetch request
+    """
+    archive = gr.get_value("networkArchive")
+    if archive is None or archive.mode != RECORD:
+        return
+    request = response.request
+    if request.resource_type not in ARCHIVED_TYPES \
+            or 300 <= response.status < 400:
+        return
+    try:
+        archive.record(request.method, request.url,
+                       request.post_data_buffer, response.status,
+                       response.headers, response.body())
+    except Exception as record_error:
+        log.info(f"[network archive] record {request.url} error: "
+                 f"{record_error}")
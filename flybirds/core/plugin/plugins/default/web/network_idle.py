@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+in-flight request tracking of the web page and the wait for the network to
+be quiet, optionally only for some operations
+"""
+import threading
+import time
+
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+
+# streams stay open and would never let the network be idle
+UNTRACKED_TYPES = ("websocket", "eventsource", "media")
+POLL_INTERVAL = 0.05
+
+
+class RequestTracker:
+    """
+    requests that started and did not finish yet, and when the operations
+    were last active
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.completed = {}
+        self.last_active = {}
+        self.last_any = clock()
+
+    def start(self, request, operation):
+        with self.lock:
+            now = self.clock()
+            # the request is kept, its id is not reused while in flight
+            self.inflight[id(request)] = (request, operation)
+            self.last_active[operation] = now
+            self.last_any = now
+
+    def finish(self, request):
+        with self.lock:
+            entry = self.inflight.pop(id(request), None)
+            if entry is None:
+                return
+            operation = entry[1]
+            now = self.clock()
+            self.completed[operation] = self.completed.get(operation, 0) + 1
+            self.last_active[operation] = now
+            self.last_any = now
+
+    def pending(self, operations=None):
+        with self.lock:
+            return [op for _, op in self.inflight.values()
+                    if operations is None or op in operations]
+
+    def quiet_time(self, operations=None):
+        """
+        seconds since the last start or end of a request, 0 while one is
+        in flight, None while an operation never completed
+        """
+        with self.lock:
+            now = self.clock()
+            if operations is None:
+                if self.inflight:
+                    return 0.0
+                return now - self.last_any
+            for operation in operations:
+                if operation not in self.completed:
+                    return None
+            if any(op in operations for _, op in self.inflight.values()):
+                return 0.0
+            return now - max(self.last_active[op] for op in operations)
+
+
+def get_tracker():
+    tracker = gr.get_value("requestTracker")
+    if tracker is None:
+        tracker = RequestTracker()
+        gr.set_value("requestTracker", tracker)
+    return tracker
+
+
+def reset_tracker():
+    """
+    requests of closed pages never finish, a new page starts empty
+    """
+    gr.set_value("requestTracker", RequestTracker())
+
+
+def on_request(request, operation):
+    if request.resource_type in UNTRACKED_TYPES:
+        return
+    get_tracker().start(request, operation)
+
+
+def on_request_done(request):
+    get_tracker().finish(request)
+
+
+def wait_idle(page, idle_time, timeout, operations=None,
+              poll_interval=POLL_INTERVAL):
+    """
+    wait until no request of the operations (all requests when None) was
+    in flight for idle_time seconds. completed requests are remembered, so
+    it returns at once when the network is already quiet. page is only used
+    to wait, the sync playwright api dispatches its events in its own calls.
+    returns (idle, waited seconds)
+    """
+    tracker = get_tracker()
+    start = tracker.clock()
+    while True:
+        quiet = tracker.quiet_time(operations)
+        waited = tracker.clock() - start
+        if quiet is not None and quiet >= idle_time:
+            return True, waited
+        remaining = timeout - waited
+        if remaining <= 0:
+            log.info(f"[network idle] still pending after {timeout}s: "
+                     f"{tracker.pending(operations)}")
+            return False, waited
+        if quiet is None or quiet == 0:
+            step = poll_interval
+        else:
+            step = max(poll_interval, idle_time - quiet)
+        page.wait_for_timeout(min(step, remaining) * 1000)
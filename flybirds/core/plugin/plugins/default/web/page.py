@@ -15,11 +15,15 @@ import flybirds.core.global_resource as gr
 from flybirds.core.global_context import GlobalContext
 import flybirds.utils.flybirds_log as log
 import flybirds.utils.verify_helper as verify_helper
+from flybirds.core.plugin.plugins.default.web import network_archive
+from flybirds.core.plugin.plugins.default.web import network_idle
+from flybirds.core.plugin.plugins.default.web import storage_state
 from flybirds.core.plugin.plugins.default.web.interception import \
     get_case_response_body
 from flybirds.utils import dsl_helper
 from flybirds.utils.dsl_helper import is_number, params_to_dic, handle_str
 from flybirds.utils import file_helper
+from flybirds.utils import trace
 from flybirds.core.exceptions import FlybirdsException
 import urllib.parse
 import threading
@@ -53,6 +57,10 @@ class Page:
             gr.set_value("browser_context", context)
 
         page = context.new_page()
+        network_idle.reset_tracker()
+        context.on("request", track_request)
+        context.on("requestfinished", network_idle.on_request_done)
+        context.on("requestfailed", network_idle.on_request_done)
         request_interception = gr.get_web_info_value("request_interception",
                                                      True)
         if request_interception:
@@ -77,6 +85,7 @@ class Page:
     @staticmethod
     def new_browser_context(dic=None):
         log.info("new_browser_context")
+        storage_state.forget_context()
         browser = gr.get_value('browser')
         operation_module = gr.get_value("projectScript").custom_operation
 
@@ -135,7 +144,9 @@ class Page:
                 **optional_config
             }
 
+        launch_config = storage_state.seed_context_options(launch_config)
         context = browser.new_context(**launch_config)
+        storage_state.seed_context(context)
 
         if gr.get_web_info_value("exportWebTrace") is True:
             GlobalContext.set_global_cache('export_web_trace_path', trace_path)
@@ -477,6 +488,14 @@ def handle_page_error(msg):
                 print(f"=====================page console==================:\n {msg.text}")
 
 
+def track_request(request):
+    try:
+        operation = get_operation(urlparse(request.url), request.post_data)
+    except Exception:
+        operation = urlparse(request.url).path.split('/')[-1]
+    network_idle.on_request(request, operation)
+
+
 def handle_request(request):
     network_key = uuid.uuid4()
     network_key = f"{network_key}_{time.time_ns()}"
@@ -631,6 +650,7 @@ def mock_rules_req_body(url: str, request_mock_key_value: list, request_body_rea
     return match_mock_key
 
 
+@trace.traced("route")
 def handle_route(route):
     abort_domain_list = gr.get_web_info_value("abort_domain_list", [])
     parsed_uri = urlparse(route.request.url)
@@ -751,7 +771,8 @@ def handle_route(route):
                                       body=mock_body)
                     return
             else:
-                if gr.get_value("debug", False) is False:
+                if gr.get_value("debug", False) is False and \
+                        log.sampled("handle_route.no_match", 20):
                     log.info(f"url:{route.request.url}===== no match request mock==================================")
 
         except Exception as mock_error:
@@ -789,6 +810,8 @@ def handle_route(route):
     else:
         if gr.get_value("mock_request_match_list") is not None:
             gr.get_value("mock_request_match_list").append(route.request.url)
+        if network_archive.fulfill(route):
+            return
         route.continue_()
 
 
@@ -914,6 +937,7 @@ def handle_dialog(dialog):
 def handle_request_finished(response):
     try:
         if response.request.resource_type == 'xhr' or response.request.resource_type == 'fetch':
+            network_archive.record_response(response)
             post_data = None
             try:
                 post_data = response.request.post_data
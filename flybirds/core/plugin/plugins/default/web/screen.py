@@ -6,6 +6,7 @@ web screen impl
 import flybirds.core.global_resource as gr
 import flybirds.utils.flybirds_log as log
 from flybirds.core.plugin.plugins.default.screen import BaseScreen
+from flybirds.utils import trace
 
 __open__ = ["Screen"]
 
@@ -17,6 +18,7 @@ class Screen(BaseScreen):
     name = "web_screen"
 
     @staticmethod
+    @trace.traced("screenshot")
     def screen_shot(path, file_name):
         try:
             log.info(f"[web screen_shot] screen shot start. path is:{path}")
@@ -524,6 +524,10 @@ class Step:
     def page_wait_interface_request_finished(context, operation):
         request_op.page_wait_interface_request_finished(operation)
 
+    @staticmethod
+    def page_wait_network_idle(context, idle_time, operation=None):
+        request_op.page_wait_network_idle(idle_time, operation)
+
     @staticmethod
     def request_query_str_compare_from_path(context, operation,
                                             target_data_path):
@@ -563,6 +567,10 @@ class Step:
     def call_external_party_api(context, method, url, data, headers):
         request_op.call_external_party_api(method, url, data, headers)
 
+    @staticmethod
+    def call_external_party_apis(context, calls):
+        request_op.call_external_party_apis(context, calls)
+
     @staticmethod
     def open_web_mock(context, service_str, mock_case_id_str):
         request_mock_key_value = GlobalContext.get_global_cache("request_mock_key_value")
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+login once per worker: the playwright storage state (cookies and local
+storage) and the session storage of the pages after the first login of an
+account seed the browser contexts of the next scenarios, until it expires
+or the scenario finds itself logged out
+"""
+import json
+import time
+
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+
+DEFAULT_TTL = 1800
+# key of the session storage in the cached state, playwright storage_state
+# does not cover it
+SESSION_KEY = "sessionStorage"
+READ_SESSION_STORAGE = \
+    "() => ({origin: location.origin, items: {...sessionStorage}})"
+RESTORE_SESSION_STORAGE = """
+(session => {
+  if (location.origin !== session.origin) return;
+  for (const [key, value] of Object.entries(session.items)) {
+    if (sessionStorage.getItem(key) === null) {
+      sessionStorage.setItem(key, value);
+    }
+  }
+})(%s);
+"""
+
+
+class StorageStateCache:
+    """
+    storage state by account, in memory of the worker only
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, clock=time.time):
+        self.ttl = ttl
+        self.clock = clock
+        self.states = {}
+        self.hits = 0
+        self.logins = 0
+
+    def get(self, account):
+        entry = self.states.get(account)
+        if entry is None:
+            return None
+        state, saved_at = entry
+        if self.ttl and self.clock() - saved_at > self.ttl:
+            log.info(f"[storage state] state of {account} expired")
+            del self.states[account]
+            return None
+        return state
+
+    def save(self, account, state):
+        self.states[account] = (state, self.clock())
+
+    def invalidate(self, account=None):
+        if account is None:
+            self.states.clear()
+        else:
+            self.states.pop(account, None)
+
+
+def is_enabled():
+    return str(gr.get_web_info_value("storage_state_cache", False)).lower() \
+        == "true" and gr.get_flow_behave_value("before_run_login", False)
+
+
+def get_cache():
+    cache = gr.get_value("storageStateCache")
+    if cache is None:
+        cache = StorageStateCache(float(gr.get_web_info_value(
+            "storage_state_ttl", DEFAULT_TTL)))
+        gr.set_value("storageStateCache", cache)
+    return cache
+
+
+def current_account():
+    return str(gr.get_app_config_value("default_user"))
+
+
+def forget_context():
+    """
+    a new browser context is not logged in
+    """
+    gr.set_value("storageStateAccount", None)
+
+
+def read_session_storage(browser_context):
+    """
+    session storage of the pages of the context, one entry per origin
+    """
+    sessions = {}
+    for page in getattr(browser_context, "pages", []):
+        try:
+            session = page.evaluate(READ_SESSION_STORAGE)
+        except Exception as read_error:
+            log.info(f"[storage state] read session storage error: "
+                     f"{read_error}")
+            continue
+        if session and session.get("items") \
+                and session.get("origin") not in (None, "null"):
+            sessions.setdefault(session["origin"], {}).update(
+                session["items"])
+    return [{"origin": origin, "items": items}
+            for origin, items in sessions.items()]
+
+
+def seed_context_options(launch_config):
+    """
+    add the cached state of the account to the new_context options,
+    the account is remembered as logged in for the new context. called
+    after forget_context
+    """
+    if not is_enabled():
+        return launch_config
+    account = current_account()
+    state = get_cache().get(account)
+    if state is None:
+        return launch_config
+    log.info(f"[storage state] seed browser context with the state of "
+             f"{account}")
+    gr.set_value("storageStateAccount", account)
+    state = {k: v for k, v in state.items() if k != SESSION_KEY}
+    return {**launch_config, "storage_state": state}
+
+
+def seed_context(browser_context):
+    """
+    restore the cached session storage in the pages of a seeded context
+    """
+    account = gr.get_value("storageStateAccount")
+    if account is None:
+        return
+    state = get_cache().get(account)
+    for session in (state or {}).get(SESSION_KEY) or []:
+        browser_context.add_init_script(
+            script=RESTORE_SESSION_STORAGE % json.dumps(session))
+
+
+def ensure_login(browser_context, login):
+    """
+    run login unless the context already has the state of the account,
+    then cache the state it left
+    """
+    account = current_account()
+    if gr.get_value("storageStateAccount") == account:
+        get_cache().hits += 1
+        log.info(f"[storage state] {account} is logged in, skip login")
+        return False
+    login()
+    state = dict(browser_context.storage_state())
+    sessions = read_session_storage(browser_context)
+    if sessions:
+        state[SESSION_KEY] = sessions
+    get_cache().save(account, state)
+    get_cache().logins += 1
+    gr.set_value("storageStateAccount", account)
+    log.info(f"[storage state] cached the state of {account}")
+    return True
+
+
+def invalidate(account=None):
+    """
+    drop the state, the next scenario logs in again
+    """
+    if account is None:
+        account = current_account()
+    get_cache().invalidate(account)
+    gr.set_value("storageStateAccount", None)
+    log.info(f"[storage state] invalidated the state of {account}")
+
+
+def check_logged_out(page):
+    """
+    ask the is_logged_out(page) of the project operation module, the state
+    is invalidated when it says the page is logged out
+    """
+    operation_module = gr.get_value("projectScript").custom_operation
+    is_logged_out = getattr(operation_module, "is_logged_out", None)
+    if is_logged_out is None or page is None:
+        return False
+    try:
+        logged_out = bool(is_logged_out(page))
+    except Exception as check_error:
+        log.info(f"[storage state] is_logged_out error: {check_error}")
+        return False
+    if logged_out:
+        invalidate()
+    return logged_out
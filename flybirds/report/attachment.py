@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+structured attachments, every behave worker appends typed records to its own
+sidecar file next to the json report and the report post-processing merges
+them into the step embeddings by scenario location and step index
+"""
+import json
+import os
+import threading
+
+import flybirds.core.global_resource as gr
+from flybirds.utils import flybirds_log as log
+
+ATTACHMENT_DIR = "attachments"
+SIDECAR_SUFFIX = ".jsonl"
+MERGED_SUFFIX = ".merged"
+
+
+def get_sidecar_path(report_path):
+    """
+    sidecar of a json report: <report dir>/attachments/<report name>.jsonl
+    """
+    report_dir, report_name = os.path.split(os.path.abspath(report_path))
+    stem = os.path.splitext(report_name)[0]
+    return os.path.join(report_dir, ATTACHMENT_DIR,
+                        f"{stem}{SIDECAR_SUFFIX}")
+
+
+class AttachmentStore:
+    """
+    append-only jsonl sidecar of one behave worker, one record per line
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def add(self, scenario_key, step_index, data, mime_type="text/html",
+            path=None):
+        """
+        append a record, data is the html snippet shown in the report and
+        path the attached file when there is one
+        """
+        size = None
+        if path is not None and os.path.isfile(path):
+            size = os.path.getsize(path)
+        record = {
+            "scenario": scenario_key,
+            "step_index": step_index,
+            "mime_type": mime_type,
+            "data": data,
+            "path": path,
+            "size": size,
+        }
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            # a worker that is killed keeps every finished attachment
+            self._file.flush()
+        return record
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def get_report_path(context):
+    """
+    json report of the current worker, None when behave writes to stdout
+    """
+    outputs = getattr(context.config, "outputs", None) or []
+    for output in outputs:
+        report_path = getattr(output, "name", None)
+        if report_path is not None and report_path.endswith(".json"):
+            return report_path
+    return None
+
+
+def open_store(context):
+    """
+    create the store of the current worker from the behave json output,
+    None when behave writes to stdout
+    """
+    try:
+        report_path = get_report_path(context)
+        if report_path is not None:
+            return AttachmentStore(get_sidecar_path(report_path))
+    except Exception as e:
+        log.info(f"[attachment] init attachment store error: {e}")
+    return None
+
+
+def scenario_key(scenario):
+    """
+    record key of the current run of a scenario, a scenario retried in the
+    worker gets location#attempt from the second attempt on
+    """
+    return attempt_key(str(scenario.location),
+                       getattr(scenario, "flybirds_attempt", 1))
+
+
+def element_key(element):
+    """
+    record key of a scenario element of the json report
+    """
+    return attempt_key(element.get("location"), element.get("attempt", 1))
+
+
+def attempt_key(location, attempt):
+    if not isinstance(attempt, int) or attempt <= 1:
+        return location
+    return f"{location}#{attempt}"
+
+
+def add_attachment(scenario, step_index, data, mime_type="text/html",
+                   path=None, key=None):
+    """
+    attach data to a step of the scenario, the description tag is kept as
+    fallback when the worker has no sidecar. key is the record key taken
+    when the attachment was started, the scenario may be retried meanwhile
+    """
+    store = gr.get_value("attachmentStore")
+    if store is None:
+        scenario.description.append(
+            f"embeddingsTags, stepIndex={step_index}, {data}")
+        return None
+    if key is None:
+        key = scenario_key(scenario)
+    return store.add(key, step_index, data, mime_type, path)
+
+
+def load_records(sidecar_path):
+    """
+    records of a sidecar grouped by scenario location, a partially written
+    last line is ignored
+    """
+    records = {}
+    if not os.path.isfile(sidecar_path):
+        return records
+    with open(sidecar_path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            records.setdefault(record.get("scenario"), []).append(record)
+    return records
+
+
+def merge_records(scenario, records):
+    """
+    add the records to the step embeddings of a report scenario
+    """
+    steps = scenario.get("steps")
+    if not isinstance(steps, list):
+        return
+    for record in records:
+        step_index = record.get("step_index")
+        if not isinstance(step_index, int) \
+                or step_index < 0 or step_index >= len(steps):
+            continue
+        steps[step_index].setdefault("embeddings", []).append({
+            "mime_type": "text/html",
+            "data": record.get("data"),
+        })
+
+
+def merge_report_attachments(report_dir, file_item, report_json):
+    """
+    merge the sidecar of a report file into its scenarios and return the
+    records by scenario key
+    """
+    sidecar_path = get_sidecar_path(os.path.join(report_dir, file_item))
+    records = load_records(sidecar_path)
+    if len(records) == 0:
+        return records
+    for feature in report_json:
+        for scenario in feature.get("elements") or []:
+            if scenario.get("type") == "background":
+                continue
+            merge_records(scenario, records.get(element_key(scenario), []))
+    return records
+
+
+def mark_merged(report_dir, file_item):
+    """
+    called once the merged report is written, a report that is processed
+    again is not merged twice
+    """
+    sidecar_path = get_sidecar_path(os.path.join(report_dir, file_item))
+    if os.path.isfile(sidecar_path):
+        os.replace(sidecar_path, f"{sidecar_path}{MERGED_SUFFIX}")
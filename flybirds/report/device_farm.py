@@ -0,0 +1,436 @@
+# -*- coding: utf-8 -*-
+"""
+device farm: run the features of a mobile suite on several android or ios
+devices at the same time, one worker per device. devices are health checked
+before every feature and a feature whose device drops offline goes back to
+the queue for the remaining devices.
+"""
+import base64
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime
+from timeit import default_timer as timer
+
+import flybirds.utils.flybirds_log as log
+from flybirds.core.config_manage import DeviceConfig
+from flybirds.report.parallel_runner import dry_run_features, \
+    get_features_num, logger
+from flybirds.utils import file_helper
+from flybirds.utils.dsl_helper import get_use_define_param
+from flybirds.utils.uuid_helper import report_name
+
+PASSED = "Passed"
+FAILED = "Failed"
+NOT_RUN = "NotRun"
+# times a feature goes back to the queue after its device dropped offline
+MAX_REQUEUE = 2
+HEALTH_TIMEOUT = 15
+
+FeatureRun = namedtuple("FeatureRun", ["status", "report_path"])
+FeatureRun.__new__.__defaults__ = (None,)
+
+
+class FarmDevice:
+    """
+    one device of the farm
+    """
+
+    def __init__(self, device_id, screen_size=None, web_driver_agent=None):
+        self.device_id = device_id
+        self.screen_size = screen_size
+        self.web_driver_agent = web_driver_agent
+        self.online = True
+        self.features = []
+
+    @property
+    def tag(self):
+        """
+        device id usable in a report file name
+        """
+        return re.sub(r"[^0-9A-Za-z_-]", "_", self.device_id)
+
+    def __repr__(self):
+        return f"FarmDevice({self.device_id})"
+
+
+class AdbBackend:
+    """
+    android devices through adb
+    """
+
+    name = "android"
+
+    def __init__(self, adb_path=None):
+        self.adb_path = adb_path
+
+    def health_check(self, device):
+        from flybirds.utils.adb_channel import get_adb_cmd
+        try:
+            proc = subprocess.run(
+                get_adb_cmd(self.adb_path)
+                + ["-s", device.device_id, "get-state"],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                timeout=HEALTH_TIMEOUT,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        return proc.returncode == 0 and b"device" in proc.stdout
+
+    def screen_size(self, device):
+        from flybirds.utils.adb_channel import run_adb_shell
+        try:
+            code, output = run_adb_shell(device.device_id, "wm size",
+                                         self.adb_path, HEALTH_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        # an override size follows the physical size
+        sizes = re.findall(r"(\d+)x(\d+)", output)
+        if code != 0 or len(sizes) == 0:
+            return None
+        width, height = sizes[-1]
+        return [int(width), int(height)]
+
+
+class TideviceBackend:
+    """
+    ios devices through tidevice
+    """
+
+    name = "ios"
+
+    @staticmethod
+    def connected():
+        try:
+            proc = subprocess.run(
+                [sys.executable, "-m", "tidevice", "list", "--json"],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                timeout=HEALTH_TIMEOUT,
+            )
+            return {item.get("udid") for item in
+                    json.loads(proc.stdout.decode("utf-8") or "[]")}
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            return set()
+
+    def health_check(self, device):
+        return device.device_id in self.connected()
+
+    def screen_size(self, device):
+        # read from webDriverAgent when the driver starts
+        return None
+
+
+class FakeDeviceBackend:
+    """
+    devices without hardware, used to test the farm: a device in drop_after
+    goes offline while running its n-th feature, features in failing fail
+    """
+
+    name = "fake"
+
+    def __init__(self, sizes=None, drop_after=None, failing=(),
+                 duration=0.0):
+        self.sizes = dict(sizes or {})
+        self.drop_after = dict(drop_after or {})
+        self.failing = set(failing)
+        self.duration = duration
+        self.offline = set()
+        self.runs = []
+        self.lock = threading.Lock()
+
+    def health_check(self, device):
+        return device.device_id not in self.offline
+
+    def screen_size(self, device):
+        return self.sizes.get(device.device_id)
+
+    def run_feature(self, device, feature):
+        with self.lock:
+            self.runs.append((device.device_id, feature))
+            count = len([1 for device_id, _ in self.runs
+                         if device_id == device.device_id])
+        time.sleep(self.duration)
+        drop = self.drop_after.get(device.device_id)
+        if drop is not None and count >= drop:
+            self.offline.add(device.device_id)
+            return FeatureRun(FAILED)
+        return FeatureRun(FAILED if feature in self.failing else PASSED)
+
+
+BACKENDS = {
+    "android": AdbBackend,
+    "ios": TideviceBackend,
+}
+
+
+def get_backend(platform):
+    backend = BACKENDS.get((platform or "android").lower())
+    if backend is None:
+        raise Exception(f"[device_farm] no device backend for {platform}")
+    return backend()
+
+
+class DeviceFarm:
+    """
+    feature queue shared by one worker thread per device
+    """
+
+    def __init__(self, backend, devices, runner, max_requeue=MAX_REQUEUE):
+        self.backend = backend
+        self.devices = list(devices)
+        self.runner = runner
+        self.max_requeue = max_requeue
+        self.queue = deque()
+        self.cond = threading.Condition()
+        self.running = 0
+        self.attempts = {}
+        self.results = {}
+
+    def prepare(self):
+        """
+        health check every device and read its screen size, returns the
+        online devices
+        """
+        online = []
+        for device in self.devices:
+            device.online = self.backend.health_check(device)
+            if not device.online:
+                log.warn(f"[device_farm] device {device.device_id} is "
+                         f"offline, skip it")
+                continue
+            if device.screen_size is None:
+                device.screen_size = self.backend.screen_size(device)
+            log.info(f"[device_farm] device {device.device_id} online, "
+                     f"screen size {device.screen_size}")
+            online.append(device)
+        return online
+
+    def run(self, features):
+        """
+        run the features, {feature: (status, device id)}
+        """
+        self.queue.extend(features)
+        online = self.prepare()
+        workers = [
+            threading.Thread(target=self.worker, args=(device,),
+                             name=f"device-farm-{device.tag}", daemon=True)
+            for device in online
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if len(self.queue) > 0:
+            log.error(f"[device_farm] no device left online, "
+                      f"{len(self.queue)} features not run")
+        while self.queue:
+            self.results[self.queue.popleft()] = (NOT_RUN, None)
+        return self.results
+
+    def next_feature(self):
+        with self.cond:
+            # a running feature can still come back to the queue
+            while len(self.queue) == 0 and self.running > 0:
+                self.cond.wait()
+            if len(self.queue) == 0:
+                return None
+            self.running += 1
+            return self.queue.popleft()
+
+    def finish(self, feature, status, device):
+        with self.cond:
+            self.results[feature] = (status, device.device_id)
+            self.running -= 1
+            self.cond.notify_all()
+
+    def give_back(self, feature):
+        with self.cond:
+            self.queue.appendleft(feature)
+            self.running -= 1
+            self.cond.notify_all()
+
+    def requeue(self, feature, device, run):
+        """
+        the device dropped while running the feature, its partial report is
+        removed and the feature runs again on another device
+        """
+        if run.report_path is not None and os.path.exists(run.report_path):
+            os.remove(run.report_path)
+        with self.cond:
+            attempts = self.attempts.get(feature, 0) + 1
+            self.attempts[feature] = attempts
+            self.running -= 1
+            if attempts > self.max_requeue:
+                log.error(f"[device_farm] {feature} lost its device "
+                          f"{attempts} times, mark it failed")
+                self.results[feature] = (FAILED, device.device_id)
+            else:
+                log.warn(f"[device_farm] device {device.device_id} dropped "
+                         f"while running {feature}, requeue it")
+                self.queue.appendleft(feature)
+            self.cond.notify_all()
+
+    def retire(self, device):
+        device.online = False
+        log.warn(f"[device_farm] device {device.device_id} is offline, "
+                 f"remove it from the farm")
+
+    def worker(self, device):
+        while True:
+            feature = self.next_feature()
+            if feature is None:
+                return
+            if not self.backend.health_check(device):
+                self.give_back(feature)
+                self.retire(device)
+                return
+            try:
+                run = self.runner(device, feature)
+            except Exception as run_ex:
+                log.error(f"[device_farm] run {feature} on "
+                          f"{device.device_id} error: {run_ex}")
+                run = FeatureRun(FAILED)
+            if run.status != PASSED and not self.backend.health_check(device):
+                self.requeue(feature, device, run)
+                self.retire(device)
+                return
+            device.features.append(feature)
+            self.finish(feature, run.status, device)
+
+
+def encode_define(value):
+    return str(base64.b64encode(str(value).encode("utf-8")), "utf-8")
+
+
+def tag_report_device(report_path, device_id):
+    """
+    add the device to the features of a report, shown like the browser of
+    a parallel web run
+    """
+    report_json = file_helper.get_json_from_file_path(report_path)
+    if not isinstance(report_json, list):
+        return
+    for feature in report_json:
+        if feature.get("metadata") is None:
+            feature["metadata"] = [{"name": "Device", "value": device_id}]
+    file_helper.store_compact_json_to_file_path(report_json, report_path)
+
+
+class BehaveRunner:
+    """
+    run one feature with behave on one device, the report of the feature
+    is written next to report.json
+    """
+
+    def __init__(self, behave_cmd, feature_path, locations=None):
+        self.behave_cmd = behave_cmd
+        self.feature_path = feature_path
+        # scenario locations by feature file when only some are selected
+        self.locations = locations
+        report = re.search(r"-o\s+(\S*)report\.json", behave_cmd)
+        self.report_dir = report.group(1) if report is not None else None
+
+    def device_cmd(self, device, feature):
+        file_name = report_name(feature, device.tag)
+        target = feature
+        if self.locations is not None \
+                and os.path.normpath(feature) in self.locations:
+            target = " ".join(self.locations[os.path.normpath(feature)])
+        cmd = self.behave_cmd.replace(self.feature_path, target, 1) \
+            .replace("report.json", file_name, 1)
+        defines = {"deviceId": device.device_id}
+        if device.screen_size:
+            defines["screenSize"] = "{}x{}".format(*device.screen_size)
+        if device.web_driver_agent:
+            defines["webDriverAgent"] = device.web_driver_agent
+        for key, value in defines.items():
+            cmd += f" --define {key}={encode_define(value)}"
+        report_path = None
+        if self.report_dir is not None:
+            report_path = f"{self.report_dir}{file_name}"
+        return cmd, report_path
+
+    def __call__(self, device, feature):
+        feature_start_time = datetime.now()
+        start_timer = timer()
+        cmd, report_path = self.device_cmd(device, feature)
+        log.info(f"[device_farm] {device.device_id} execute cmd str: {cmd}")
+
+        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, shell=True)
+        output, _ = p.communicate()
+        status = PASSED if p.returncode == 0 else FAILED
+
+        logger.info(f'{feature.split("/")[-1].split(".")[0]};'
+                    f'{feature_start_time};'
+                    f'{datetime.now()};'
+                    f'{timer() - start_timer};'
+                    f'{status};'
+                    f'{device.device_id}')
+        if status == FAILED and output:
+            log.info(f"[device_farm] {feature} output: "
+                     f"{output.decode('utf-8', errors='replace')[-2000:]}")
+        if report_path is not None and os.path.exists(report_path):
+            try:
+                tag_report_device(report_path, device.device_id)
+            except Exception as tag_ex:
+                log.warn(f"[device_farm] tag report error: {tag_ex}")
+        return FeatureRun(status, report_path)
+
+
+def get_farm_devices(context):
+    """
+    devices of deviceList in the config or -D deviceList=id1,id2
+    """
+    user_data = get_use_define_param(context, "deviceList")
+    device_config = DeviceConfig(user_data, None)
+    return [
+        FarmDevice(item["deviceId"], item["screenSize"],
+                   item["webDriverAgent"])
+        for item in getattr(device_config, "device_list", None) or []
+    ]
+
+
+def run_features(context, behave_cmd, feature_path, features,
+                 locations=None):
+    devices = context.get("farm_devices") or get_farm_devices(context)
+    farm = DeviceFarm(get_backend(context.get("cur_platform")), devices,
+                      BehaveRunner(behave_cmd, feature_path, locations))
+    results = farm.run(features)
+    summary = {}
+    for status, _ in results.values():
+        summary[status] = summary.get(status, 0) + 1
+    log.info(f"[device_farm] result: {summary}, devices: "
+             f"{[(d.device_id, len(d.features)) for d in devices]}")
+    return results
+
+
+def farm_run(context):
+    """
+    run the selected features on the device farm
+    """
+    features = dry_run_features(context)
+    if not features:
+        return {}
+    return run_features(context, context.get("cmd_str"),
+                        context.get("feature_path"), features,
+                        context.get("selected_locations"))
+
+
+def farm_rerun(rerun_cmd_str, rerun_feature_path, context):
+    """
+    rerun the failed scenarios on the device farm
+    """
+    dry_cmd = f"behave {rerun_feature_path} -d -k -f json --no-summary"
+    features = get_features_num(dry_cmd)
+    if not features:
+        return {}
+    return run_features(context, rerun_cmd_str, rerun_feature_path, features)
@@ -14,7 +14,9 @@ from multiprocessing import Pool
 from subprocess import Popen
 
 from flybirds.core.config_manage import FlowBehave
+from flybirds.report import attachment
 from flybirds.report import json_format_deal
+from flybirds.report.device_farm import farm_rerun
 from flybirds.report.parallel_runner import get_features_num, \
     execute_parallel_feature
 from flybirds.report.rerun_params import get_rerun_params
@@ -32,7 +34,8 @@ class FailScenarioSum:
     def __init__(self):
         self.fail_scenarios = {}
 
-    def add_scenario(self, feature_name, scenario_name, description):
+    def add_scenario(self, feature_name, scenario_name, description,
+                     attachments=None):
         """
         Add the failure scenario to the current failure set, the key is the
         only one
@@ -45,7 +48,7 @@ class FailScenarioSum:
             )
             scenario_key = str(uuid_helper.create_uuid())
         scenario_value = FailScenarioInfo(
-            feature_name, scenario_name, description
+            feature_name, scenario_name, description, attachments
         )
         # fail_relevance message
         self.fail_scenarios[scenario_key] = json.dumps(scenario_value.__dict__)
@@ -69,13 +72,18 @@ class FailScenarioInfo:
     the failure information in the report when re-run
     """
 
-    def __init__(self, feature_name, scenario_name, description):
+    def __init__(self, feature_name, scenario_name, description,
+                 attachments=None):
         self.feature_name = feature_name
         self.scenario_name = scenario_name
         if not isinstance(description, list):
             self.description = []
         else:
             self.description = description
+        if not isinstance(attachments, list):
+            self.attachments = []
+        else:
+            self.attachments = attachments
 
 
 def rerun_launch(context, is_parallel):
@@ -97,6 +105,9 @@ def rerun_launch(context, is_parallel):
         need_rerun = flow_behave_config.fail_rerun
     else:
         need_rerun = need_rerun_args
+    if context.get("immediate_retry"):
+        # failed scenarios were already retried in the behave workers
+        need_rerun = False
     if need_rerun:
         max_retry_count = flow_behave_config.max_retry_count
         run_count = 1
@@ -107,6 +118,8 @@ def rerun_launch(context, is_parallel):
             rerun_dir_path,
             run_count,
             max_fail_rerun_count,
+            context.get("cur_platform"),
+            is_parallel,
         )
         # The number of failures is not higher than the limited value and
         # needs to be re-run
@@ -129,6 +142,8 @@ def rerun_launch(context, is_parallel):
                             rerun_dir_path,
                             run_count,
                             max_fail_rerun_count,
+                            context.get("cur_platform"),
+                            is_parallel,
                         )
                     rerun_feature_path = (
                         f"{report_dir_path}{os.sep}rerun" f"{run_count}"
@@ -198,7 +213,8 @@ def rerun_launch(context, is_parallel):
                                      is_parallel)
 
 
-def create_rerun(report_dir, rerun_dir, run_count, max_fail_count=1.0):
+def create_rerun(report_dir, rerun_dir, run_count, max_fail_count=1.0,
+                 cur_platform=None, is_parallel=False):
     """
     Feature to re-run after creation failure
     Some information after failure (such as screenshots) falls into the file
@@ -226,7 +242,7 @@ def create_rerun(report_dir, rerun_dir, run_count, max_fail_count=1.0):
                            fail_count,
                            exist_scenario_name, fail_scenario_static,
                            run_count,
-                           rerun_root_dir)
+                           rerun_root_dir, cur_platform, is_parallel)
     if sum_count <= 0 or fail_count <= 0:
         log.info(
             "Feature sum_count rerun after creation"
@@ -260,135 +276,191 @@ def create_rerun(report_dir, rerun_dir, run_count, max_fail_count=1.0):
 
 def process_loop_block(report_dir, rerun_feature_index, sum_count, fail_count,
                        exist_scenario_name, fail_scenario_static, run_count,
-                       rerun_root_dir):
+                       rerun_root_dir, cur_platform=None, is_parallel=False):
     """
     iterate through all json in the report_dir
     1.find  the cases that need to be rerun and write them to the feature file
     2.modify failed status to rerun status,and re-write json file
+    the json files are handled by extract_rerun_file in a process pool, the
+    feature files are written here in the directory order
     """
-    for file_item in os.listdir(report_dir):
-        if re.search(r"\.json", str(file_item)) is not None:
-            # noinspection PyBroadException
-            try:
-                file_path = os.path.join(report_dir, file_item)
-                report_json = file_helper.get_json_from_file_path(file_path)
-                if isinstance(report_json, list):
-                    # 1. to find need to be rerun case
-                    for feature in report_json:
-                        cur_feature_array = get_init_feature_array_tags(
-                            rerun_feature_index, feature.get("language"),
-                            feature.get("tags")
-                        )
-                        rerun_feature_location = feature["location"]
-                        rerun_match_obj = re.match(
-                            r"(.*\/)*([^.]+).feature", rerun_feature_location
+    file_items = json_format_deal.list_report_files(report_dir)
+    tasks = [
+        (report_dir, file_item, cur_platform, is_parallel)
+        for file_item in file_items
+    ]
+    results = json_format_deal.map_report_files(extract_rerun_file, tasks)
+    for file_item, result in zip(file_items, results):
+        if result is None:
+            continue
+        features, normalized_mtime = result
+        if normalized_mtime is not None:
+            json_format_deal.normalized_report_files[
+                os.path.join(report_dir, file_item)] = normalized_mtime
+        # noinspection PyBroadException
+        try:
+            for feature in features:
+                sum_count += feature["sum_count"]
+                cur_feature_array = get_init_feature_array_tags(
+                    rerun_feature_index, feature.get("language"),
+                    feature.get("tags")
+                )
+                rerun_feature_location = feature["location"]
+                rerun_match_obj = re.match(
+                    r"(.*\/)*([^.]+).feature", rerun_feature_location
+                )
+
+                # Because the path of the failed file should be
+                # displayed in the report,
+                # the failure case is named using the original feature,
+                # not integrated into one file
+
+                rerun_feature_name = (
+                    f"flybirdsARFeature" f"{rerun_feature_index}"
+                )
+                if rerun_match_obj is not None:
+                    rerun_feature_name = rerun_match_obj.group(2)
+                log.info(f"rerun_feature_name: {rerun_feature_name}")
+                for scenario in feature["scenarios"]:
+                    fail_count += 1
+                    if isinstance(scenario["tags"], list):
+                        cur_tags = ""
+                        for tag_item in scenario["tags"]:
+                            cur_tags += f" @{tag_item}"
+                        cur_feature_array.append(
+                            f" {cur_tags}\n"
                         )
+                    rerun_scenario_name = scenario["name"]
+                    while rerun_scenario_name in exist_scenario_name:
+                        rerun_scenario_name += str(random.randint(0, 10))
+                    exist_scenario_name.append(rerun_scenario_name)
+                    log.info(
+                        "exist_scenario_name: "
+                        f"{str(exist_scenario_name)}"
+                    )
+                    f_language = feature.get("language")
+                    scenario_key = lge.parse_keyword(
+                        "scenario", f_language
+                    )
 
-                        # Because the path of the failed file should be
-                        # displayed in the report,
-                        # the failure case is named using the original feature,
-                        # not integrated into one file
+                    cur_feature_array.append(
+                        f"  {scenario_key}: "
+                        f"{rerun_scenario_name}\n"
+                    )
 
-                        rerun_feature_name = (
-                            f"flybirdsARFeature" f"{rerun_feature_index}"
+                    relevance_key = fail_scenario_static.add_scenario(
+                        feature["name"],
+                        scenario["name"],
+                        scenario["description"],
+                        scenario.get("attachments"),
+                    )
+                    if relevance_key:
+                        g_step_name = lge.parse_glb_str(
+                            "information association of failed"
+                            " operation",
+                            feature.get("language"),
+                        )
+                        then_key = lge.parse_keyword(
+                            "then", feature.get("language")
                         )
-                        if rerun_match_obj is not None:
-                            rerun_feature_name = rerun_match_obj.group(2)
-                        log.info(f"rerun_feature_name: {rerun_feature_name}")
-                        if isinstance(feature.get("elements", None), list):
-                            for scenario in feature["elements"]:
-                                if scenario["type"] == "background":
-                                    continue
-                                sum_count += 1
-                                if scenario["status"] == "failed":
-                                    fail_count += 1
-                                    if isinstance(scenario["tags"], list):
-                                        cur_tags = ""
-                                        for tag_item in scenario["tags"]:
-                                            cur_tags += f" @{tag_item}"
-                                        cur_feature_array.append(
-                                            f" {cur_tags}\n"
-                                        )
-                                    rerun_scenario_name = scenario["name"]
-                                    while (
-                                            rerun_scenario_name
-                                            in exist_scenario_name):
-                                        rerun_scenario_name += str(
-                                            random.randint(0, 10))
-                                    exist_scenario_name.append(
-                                        rerun_scenario_name
-                                    )
-                                    log.info(
-                                        "exist_scenario_name: "
-                                        f"{str(exist_scenario_name)}"
-                                    )
-                                    f_language = feature.get("language")
-                                    scenario_key = lge.parse_keyword(
-                                        "scenario", f_language
-                                    )
-
-                                    cur_feature_array.append(
-                                        f"  {scenario_key}: "
-                                        f"{rerun_scenario_name}\n"
-                                    )
-
-                                    relevance_key = (
-                                        fail_scenario_static.add_scenario(
-                                            feature["name"],
-                                            scenario["name"],
-                                            scenario["description"],
-                                        )
-                                    )
-                                    if relevance_key:
-                                        g_step_name = lge.parse_glb_str(
-                                            "information association of failed"
-                                            " operation",
-                                            feature.get("language"),
-                                        )
-                                        then_key = lge.parse_keyword(
-                                            "then", feature.get("language")
-                                        )
-                                        f_d = f"{then_key} {g_step_name}\n"
-                                        l_f_d = f_d.format(
-                                            run_count, relevance_key
-                                        )
-                                        cur_feature_array.append(l_f_d)
-
-                                    if isinstance(scenario["steps"], list):
-                                        for step in scenario["steps"]:
-                                            keyword = step["keyword"]
-                                            name = step["name"]
-                                            cur_feature_array.append(
-                                                f"    {keyword} {name}\n"
-                                            )
-                                    cur_feature_array.append("\n")
-                                    scenario["status"] = "rerun"
-                                    print(
-                                        "rerun_feature_name",
-                                        rerun_feature_name,
-                                        "cur_feature_array",
-                                        cur_feature_array,
-                                    )
-                                    file_helper.array_to_file(
-                                        os.path.join(
-                                            rerun_root_dir,
-                                            f"{rerun_feature_name}.feature",
-                                        ),
-                                        cur_feature_array,
-                                    )
-
-                    # 2.re-write json file
-                    file_helper.store_json_to_file_path(
-                        report_json, file_path, "w"
+                        f_d = f"{then_key} {g_step_name}\n"
+                        l_f_d = f_d.format(
+                            run_count, relevance_key
+                        )
+                        cur_feature_array.append(l_f_d)
+
+                    if isinstance(scenario["steps"], list):
+                        for keyword, name in scenario["steps"]:
+                            cur_feature_array.append(
+                                f"    {keyword} {name}\n"
+                            )
+                    cur_feature_array.append("\n")
+                    file_helper.array_to_file(
+                        os.path.join(
+                            rerun_root_dir,
+                            f"{rerun_feature_name}.feature",
+                        ),
+                        cur_feature_array,
                     )
-            except Exception as e:
-                raise Exception(
-                    f"{file_item} Parsing is an error, innerError: {str(e)}"
-                ) from e
+        except Exception as e:
+            raise Exception(
+                f"{file_item} Parsing is an error, innerError: {str(e)}"
+            ) from e
 
     return sum_count, fail_count, fail_scenario_static, rerun_root_dir
 
 
+def extract_rerun_file(report_dir, file_item, cur_platform=None,
+                       is_parallel=False):
+    """
+    collect the failed scenarios of one report file and mark them as rerun.
+    the embeddings and platform information are normalized in the same
+    write, the returned mtime marks a file without failures as final so
+    parse_json_data skips it
+    """
+    # noinspection PyBroadException
+    try:
+        file_path = os.path.join(report_dir, file_item)
+        report_json = file_helper.get_json_from_file_path(file_path)
+        if not isinstance(report_json, list):
+            return None
+        records = attachment.merge_report_attachments(report_dir, file_item,
+                                                      report_json)
+        features = []
+        has_failed = False
+        for feature in report_json:
+            feature_info = {
+                "name": feature["name"],
+                "language": feature.get("language"),
+                "tags": feature.get("tags"),
+                "location": feature["location"],
+                "sum_count": 0,
+                "scenarios": [],
+            }
+            if isinstance(feature.get("elements", None), list):
+                for scenario in feature["elements"]:
+                    if scenario["type"] == "background" \
+                            or scenario.get("retried"):
+                        continue
+                    feature_info["sum_count"] += 1
+                    if scenario["status"] == "failed":
+                        has_failed = True
+                        steps = None
+                        if isinstance(scenario["steps"], list):
+                            steps = [(step["keyword"], step["name"])
+                                     for step in scenario["steps"]]
+                        # the raw description keeps the embeddings tags
+                        # that the rerun associates with the failure
+                        description = scenario["description"]
+                        if isinstance(description, list):
+                            description = list(description)
+                        feature_info["scenarios"].append({
+                            "name": scenario["name"],
+                            "tags": scenario["tags"],
+                            "description": description,
+                            "attachments": records.get(
+                                attachment.element_key(scenario), []),
+                            "steps": steps,
+                        })
+                        scenario["status"] = "rerun"
+            features.append(feature_info)
+
+        report_json = json_format_deal.normalize_report(
+            report_json, file_item, None, cur_platform, is_parallel,
+            resolve_rerun=False)
+        # 2.re-write json file
+        file_helper.store_compact_json_to_file_path(report_json, file_path)
+        attachment.mark_merged(report_dir, file_item)
+        normalized_mtime = None
+        if not has_failed and cur_platform is not None:
+            normalized_mtime = os.stat(file_path).st_mtime_ns
+        return features, normalized_mtime
+    except Exception as e:
+        raise Exception(
+            f"{file_item} Parsing is an error, innerError: {str(e)}"
+        ) from e
+
+
 def get_init_feature_array(index, language):
     """
     generate failed info
@@ -494,7 +566,9 @@ def set_rerun_info(user_data, gr):
 
 def failed_rerun(rerun_cmd_str: str, rerun_feature_path, context,
                  is_parallel):
-    if is_parallel:
+    if is_parallel and context.get("farm_devices"):
+        farm_rerun(rerun_cmd_str, rerun_feature_path, context)
+    elif is_parallel:
         parallel_rerun(rerun_cmd_str, rerun_feature_path, context)
     else:
         rerun_behave_process = Popen(
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+report gen without node, feature json files are streamed one at a time
+into paginated html pages
+"""
+import html
+import json
+import os
+import re
+import threading
+import traceback
+
+from flybirds.report.gen_factory import GenFactory
+from flybirds.utils.flybirds_log import logger
+
+PAGE_SIZE = 50
+PAGE_DIR = "features"
+
+STYLE = """
+body{font-family:Arial,Helvetica,sans-serif;margin:20px;color:#333}
+table{border-collapse:collapse;width:100%}
+th,td{border:1px solid #ddd;padding:4px 8px;text-align:left}
+.passed{color:#1a7f37}.failed{color:#cf222e}.skipped,.undefined{color:#9a6700}
+details{margin:6px 0}summary{cursor:pointer}
+.step{margin-left:24px}.error{white-space:pre-wrap;background:#fff0f0}
+.pager a{margin-right:8px}
+"""
+
+
+def _duration(seconds):
+    """
+    behave writes the step duration in seconds
+    """
+    return round(float(seconds or 0), 3)
+
+
+def _status(item):
+    status = item.get("status")
+    if status is None and isinstance(item.get("result"), dict):
+        status = item["result"].get("status")
+    return status or "skipped"
+
+
+def _page_name(page_index):
+    return f"page-{page_index + 1:04d}.html"
+
+
+def _write_atomic(path, content):
+    """
+    readers of a live report never see a half written page
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def iter_report_files(report_path):
+    """
+    json report files in a stable order
+    """
+    if not os.path.isdir(report_path):
+        return []
+    return sorted(
+        os.path.join(report_path, file_item)
+        for file_item in os.listdir(report_path)
+        if re.search(r"\.json$", file_item) is not None
+    )
+
+
+def iter_features(report_path):
+    """
+    yield the features of one json file at a time, files that are still
+    being written by a running worker are skipped
+    """
+    for file_path in iter_report_files(report_path):
+        try:
+            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+                report_json = json.load(f, strict=False)
+        except (OSError, ValueError):
+            logger.debug(f"[html_gen] skip unreadable report {file_path}")
+            continue
+        if not isinstance(report_json, list):
+            continue
+        for feature in report_json:
+            if isinstance(feature, dict):
+                yield feature
+
+
+def render_embedding(embedding):
+    mime_type = embedding.get("mime_type", "")
+    data = embedding.get("data", "")
+    if mime_type == "text/html":
+        return f"<div>{data}</div>"
+    if mime_type.startswith("image/"):
+        return f'<img width="375" src="data:{mime_type};base64,{data}"/>'
+    return f"<pre>{html.escape(str(data))}</pre>"
+
+
+def render_step(step):
+    result = step.get("result") or {}
+    status = _status(step)
+    parts = [
+        f'<div class="step {status}">{html.escape(step.get("keyword", ""))}'
+        f' {html.escape(step.get("name", ""))}'
+        f' <small>({_duration(result.get("duration"))}s)</small></div>'
+    ]
+    if result.get("error_message"):
+        error_message = result["error_message"]
+        if isinstance(error_message, list):
+            error_message = "\n".join(error_message)
+        parts.append(
+            f'<div class="step error">{html.escape(error_message)}</div>')
+    for embedding in step.get("embeddings") or []:
+        parts.append(
+            f'<div class="step">{render_embedding(embedding)}</div>')
+    return "".join(parts)
+
+
+def render_feature(feature, anchor):
+    """
+    render one feature and return it with its summary counters
+    """
+    summary = {
+        "name": feature.get("name", ""),
+        "status": _status(feature),
+        "anchor": anchor,
+        "passed": 0,
+        "failed": 0,
+        "skipped": 0,
+        "steps": 0,
+        "duration": 0.0,
+    }
+    parts = [
+        f'<h2 id="{anchor}" class="{summary["status"]}">'
+        f'{html.escape(summary["name"])}</h2>'
+        f'<div><small>{html.escape(feature.get("location", ""))}'
+        "</small></div>"
+    ]
+    for scenario in feature.get("elements") or []:
+        if scenario.get("type") == "background":
+            continue
+        status = _status(scenario)
+        if status in ("passed", "failed"):
+            summary[status] += 1
+        else:
+            summary["skipped"] += 1
+        steps = scenario.get("steps") or []
+        summary["steps"] += len(steps)
+        duration = sum(
+            _duration((step.get("result") or {}).get("duration"))
+            for step in steps)
+        summary["duration"] += duration
+        parts.append(
+            f'<details{" open" if status == "failed" else ""}>'
+            f'<summary class="{status}">'
+            f'{html.escape(scenario.get("keyword", ""))}: '
+            f'{html.escape(scenario.get("name", ""))}'
+            f' <small>({round(duration, 3)}s)</small></summary>'
+        )
+        parts.extend(render_step(step) for step in steps)
+        parts.append("</details>")
+    return "".join(parts), summary
+
+
+def page_html(title, body, page_index, page_count):
+    pager = "".join(
+        f'<a href="{_page_name(i)}">{i + 1}</a>' if i != page_index
+        else f"<b>{i + 1}</b>"
+        for i in range(page_count)
+    )
+    return (
+        f"<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+        f"<title>{html.escape(title)}</title><style>{STYLE}</style>"
+        f'</head><body><div class="pager"><a href="../index.html">'
+        f"overview</a>{pager}</div>{body}</body></html>"
+    )
+
+
+class HtmlReportWriter:
+    """
+    write the paginated report, only the per-feature summary is kept in
+    memory
+    """
+
+    def __init__(self, report_path, platform, page_size=PAGE_SIZE):
+        self.report_path = report_path
+        self.platform = platform
+        self.page_size = page_size
+        self.page_dir = os.path.join(report_path, PAGE_DIR)
+        self._signature = None
+
+    def source_signature(self):
+        signature = []
+        for file_path in iter_report_files(self.report_path):
+            try:
+                stat = os.stat(file_path)
+                signature.append((file_path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                continue
+        return tuple(signature)
+
+    def write(self, force=True):
+        """
+        regenerate the report, skipped when no json changed since the last
+        write unless force is set
+        """
+        signature = self.source_signature()
+        if not force and signature == self._signature:
+            return False
+        self._signature = signature
+        if not os.path.isdir(self.page_dir):
+            os.makedirs(self.page_dir)
+
+        summaries = []
+        page_bodies = []
+        body = []
+        for feature in iter_features(self.report_path):
+            page_index = len(summaries) // self.page_size
+            anchor = f"feature-{len(summaries) + 1}"
+            fragment, summary = render_feature(feature, anchor)
+            summary["page"] = _page_name(page_index)
+            summaries.append(summary)
+            body.append(fragment)
+            if len(body) >= self.page_size:
+                page_bodies.append(self._flush_page(len(page_bodies), body))
+                body = []
+        if len(body) > 0 or len(page_bodies) == 0:
+            page_bodies.append(self._flush_page(len(page_bodies), body))
+
+        # the pager needs the final page count, so only the small page
+        # wrapper is rewritten here
+        page_count = len(page_bodies)
+        for page_index, tmp_path in enumerate(page_bodies):
+            with open(tmp_path, "r", encoding="utf-8") as f:
+                content = page_html("flybirds test report", f.read(),
+                                    page_index, page_count)
+            _write_atomic(
+                os.path.join(self.page_dir, _page_name(page_index)), content)
+            os.remove(tmp_path)
+        self._remove_stale_pages(page_count)
+        self._write_index(summaries)
+        return True
+
+    def _flush_page(self, page_index, body):
+        tmp_path = os.path.join(self.page_dir,
+                                f"{_page_name(page_index)}.body")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for fragment in body:
+                f.write(fragment)
+        return tmp_path
+
+    def _remove_stale_pages(self, page_count):
+        for file_item in os.listdir(self.page_dir):
+            match = re.match(r"page-(\d+)\.html$", file_item)
+            if match is not None and int(match.group(1)) > page_count:
+                os.remove(os.path.join(self.page_dir, file_item))
+
+    def _write_index(self, summaries):
+        totals = {"passed": 0, "failed": 0, "skipped": 0, "steps": 0,
+                  "duration": 0.0}
+        rows = []
+        for summary in summaries:
+            for key in totals.keys():
+                totals[key] += summary[key]
+            rows.append(
+                f'<tr><td><a href="{PAGE_DIR}/{summary["page"]}'
+                f'#{summary["anchor"]}">{html.escape(summary["name"])}</a>'
+                f'</td><td class="{summary["status"]}">{summary["status"]}'
+                f'</td><td>{summary["passed"]}</td><td>{summary["failed"]}'
+                f'</td><td>{summary["skipped"]}</td><td>{summary["steps"]}'
+                f'</td><td>{round(summary["duration"], 3)}</td></tr>'
+            )
+        platform = ""
+        if self.platform is not None:
+            platform = f"platform: {html.escape(str(self.platform))}, "
+        body = (
+            f"<h1>flybirds test report</h1><p>{platform}"
+            f"features: {len(summaries)}, scenarios passed: "
+            f'{totals["passed"]}, failed: {totals["failed"]}, skipped: '
+            f'{totals["skipped"]}, steps: {totals["steps"]}, duration: '
+            f'{round(totals["duration"], 3)}s</p>'
+            "<table><tr><th>feature</th><th>status</th><th>passed</th>"
+            "<th>failed</th><th>skipped</th><th>steps</th>"
+            "<th>duration(s)</th></tr>" + "".join(rows) + "</table>"
+        )
+        content = (
+            "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+            f"<title>flybirds test report</title><style>{STYLE}</style>"
+            f"</head><body>{body}</body></html>"
+        )
+        _write_atomic(os.path.join(self.report_path, "index.html"), content)
+
+
+class LiveHtmlReport(threading.Thread):
+    """
+    refresh the html report while behave workers are still writing json
+    """
+
+    def __init__(self, report_path, platform, interval=10):
+        threading.Thread.__init__(self, name="flybirds-live-report",
+                                  daemon=True)
+        self.writer = HtmlReportWriter(report_path, platform)
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.writer.write(force=False)
+            except Exception:
+                logger.info(
+                    f"live report refresh error: {traceback.format_exc()}")
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class HtmlGen:
+    """
+    html gen
+    """
+    name = "html"
+
+    @staticmethod
+    def gen(report_path, platform):
+        """
+        report gen
+        """
+        logger.info(f"generate html report in {report_path}")
+        HtmlReportWriter(report_path, platform).write()
+
+
+GenFactory.add(HtmlGen)
@@ -6,14 +6,60 @@ import os
 import re
 import shutil
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 from json import JSONDecodeError
 
+from flybirds.report import attachment
 from flybirds.utils import file_helper
 from flybirds.utils import flybirds_log as log
 import flybirds.core.global_resource as gr
 from flybirds.core.global_context import GlobalContext
 from flybirds.core.config_manage import PluginConfig
 
+# report directories with fewer files are processed in the main process
+POOL_MIN_FILES = 4
+
+# report file path -> mtime of the files that were fully normalized while
+# extracting the failed scenarios, parse_json_data does not rewrite them
+normalized_report_files = {}
+
+
+def map_report_files(func, tasks):
+    """
+    run func for every report file task, large report directories are fanned
+    out across a process pool
+    """
+    tasks = list(tasks)
+    workers = min(len(tasks), os.cpu_count() or 1)
+    if workers <= 1 or len(tasks) < POOL_MIN_FILES:
+        return [func(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, *zip(*tasks)))
+
+
+def list_report_files(report_dir):
+    """
+    json report files in the report directory
+    """
+    return [
+        file_item for file_item in os.listdir(report_dir)
+        if re.search(r"\.json", str(file_item)) is not None
+    ]
+
+
+def is_normalized(file_path):
+    """
+    whether the file is unchanged since it was normalized
+    """
+    mtime = normalized_report_files.get(file_path)
+    if mtime is None:
+        return False
+    try:
+        return os.stat(file_path).st_mtime_ns == mtime
+    except OSError:
+        return False
+
+
 def parse_json_data(context, report_dir, rerun_report_dir=None, is_parallel=False):
     """
     Parse the screenshot address in the behave json report,
@@ -21,7 +67,6 @@ def parse_json_data(context, report_dir, rerun_report_dir=None, is_parallel=Fals
     the follow-up cucumber json report into an html report
     """
     rerun_features = None
-    not_aggregation = False
     cur_platform = context['cur_platform']
 
     if rerun_report_dir is not None:
@@ -34,62 +79,96 @@ def parse_json_data(context, report_dir, rerun_report_dir=None, is_parallel=Fals
         # move_rerun_screen(report_dir, rerun_report_dir)
         # copy_rerun_screen(report_dir, rerun_report_dir)
 
+    file_items = list_report_files(report_dir)
     if isinstance(rerun_features, list) and len(rerun_features) > 0:
-        not_aggregation = True
-
-    for file_item in os.listdir(report_dir):
-        if re.search(r"\.json", str(file_item)) is not None:
-            # noinspection PyBroadException
-            try:
-                file_path = os.path.join(report_dir, file_item)
-                report_json = file_helper.get_json_from_file_path(file_path)
-                if isinstance(report_json, list):
-                    cur_json = []
-                    cur_features = []
-                    if not_aggregation:
-                        report_json.extend(rerun_features)
-                        not_aggregation = False
-                    for feature in report_json:
-                        parse_feature(feature, rerun_report_dir)
-                        if (
-                                isinstance(feature.get("elements"), list)
-                                and len(feature.get("elements")) > 0
-                        ):
-                            if is_parallel and feature.get('metadata') is None:
-                                browser_name = file_item.split('.')[1]
-                                feature["metadata"] = [
-                                    {"name": "Browser",
-                                     "value": browser_name
-                                     }
-                                ]
-                            if cur_platform is not None:
-                                feature["platform"]  = cur_platform.lower()
+        # the rerun results are aggregated into the first valid report, it
+        # is processed here so the remaining files are independent
+        while len(file_items) > 0:
+            file_item = file_items.pop(0)
+            merged, error = parse_report_file(
+                report_dir, file_item, rerun_report_dir, cur_platform,
+                is_parallel, rerun_features)
+            if error is not None:
+                log.warn(*error)
+            if merged:
+                break
 
-                            cur_features.append(feature)
-                    cur_json.extend(cur_features)
+    tasks = [
+        (report_dir, file_item, rerun_report_dir, cur_platform, is_parallel)
+        for file_item in file_items
+        if not is_normalized(os.path.join(report_dir, file_item))
+    ]
+    for merged, error in map_report_files(parse_report_file, tasks):
+        if error is not None:
+            log.warn(*error)
 
-                    file_helper.store_json_to_file_path(
-                        cur_json, file_path, "w"
-                    )
-            except JSONDecodeError:
-                log.warn('[parse_json_data] has error: Invalid json.')
-            except Exception:
-                log.warn(
-                    f"error processing image address in {file_item}",
-                    traceback.format_exc(),
-                )
+
+def parse_report_file(report_dir, file_item, rerun_report_dir, cur_platform,
+                      is_parallel, extra_features=None):
+    """
+    normalize one report file and write it back, return whether it was a
+    valid report and the warning to log
+    """
+    # noinspection PyBroadException
+    try:
+        file_path = os.path.join(report_dir, file_item)
+        report_json = file_helper.get_json_from_file_path(file_path)
+        if not isinstance(report_json, list):
+            return False, None
+        attachment.merge_report_attachments(report_dir, file_item,
+                                            report_json)
+        if extra_features is not None:
+            report_json.extend(extra_features)
+        cur_json = normalize_report(report_json, file_item, rerun_report_dir,
+                                    cur_platform, is_parallel)
+        file_helper.store_compact_json_to_file_path(cur_json, file_path)
+        attachment.mark_merged(report_dir, file_item)
+        return True, None
+    except JSONDecodeError:
+        return False, ('[parse_json_data] has error: Invalid json.',)
+    except Exception:
+        return False, (f"error processing image address in {file_item}",
+                       traceback.format_exc())
+
+
+def normalize_report(report_json, file_item, rerun_report_dir, cur_platform,
+                     is_parallel, resolve_rerun=True):
+    """
+    move the legacy description embeddings into the steps, drop the features
+    without scenarios and add the platform and browser information
+    """
+    cur_features = []
+    for feature in report_json:
+        parse_feature(feature, rerun_report_dir, resolve_rerun)
+        if (
+                isinstance(feature.get("elements"), list)
+                and len(feature.get("elements")) > 0
+        ):
+            if is_parallel and feature.get('metadata') is None:
+                browser_name = file_item.split('.')[1]
+                feature["metadata"] = [
+                    {"name": "Browser",
+                     "value": browser_name
+                     }
+                ]
+            if cur_platform is not None:
+                feature["platform"] = cur_platform.lower()
+
+            cur_features.append(feature)
+    return cur_features
 
 
-def parse_feature(feature, rerun_report_dir):
+def parse_feature(feature, rerun_report_dir, resolve_rerun=True):
     """
-    parse feature: exclude the data with status=rerun
+    parse feature: exclude the data with status=rerun and the attempts that
+    were retried in the worker
     """
     if isinstance(feature.get("elements"), list):
         cur_scenarios = []
         for scenario in feature.get("elements"):
-            if scenario["type"] == "background":
+            if scenario["type"] == "background" or scenario.get("retried"):
                 continue
-            if scenario["status"] == "rerun":
+            if resolve_rerun and scenario["status"] == "rerun":
                 if rerun_report_dir is None:
                     scenario["status"] = "failed"
                 else:
@@ -156,6 +235,10 @@ def get_rerun_feature(context, report_dir, is_parallel):
                         file_path
                     )
                     if isinstance(report_json, list):
+                        # the rerun file is not rewritten, so its sidecar
+                        # stays unmarked
+                        attachment.merge_report_attachments(
+                            report_dir, file_item, report_json)
                         for feature in report_json:
                             if is_parallel and feature.get('metadata') is None:
                                 browser_name = file_item.split('.')[1]
@@ -2,6 +2,7 @@ import base64
 import json
 import logging
 import multiprocessing
+import os
 from concurrent.futures.thread import ThreadPoolExecutor
 from datetime import datetime
 from functools import partial
@@ -41,6 +42,20 @@ def parallel_run(context):
     """
     Parallel Behave Runner
     """
+    features = dry_run_features(context)
+
+    log.info('start thread...')
+    with ThreadPoolExecutor(max_workers=3) as t_pool:
+        browser_types = get_browser_types(context)
+        for b_type in browser_types:
+            t_pool.submit(multiplication, b_type, context, features)
+    log.info('all thread done...')
+
+
+def dry_run_features(context):
+    """
+    feature files selected by the feature path and tags
+    """
     behave_cmd = context.get("cmd_str")
     feature_path = context.get("feature_path")
 
@@ -55,14 +70,7 @@ def parallel_run(context):
               f'--no-summary'
     else:
         cmd = f'behave {feature_path} -d -k -f json --no-summary'
-    features = get_features_num(cmd)
-
-    log.info('start thread...')
-    with ThreadPoolExecutor(max_workers=3) as t_pool:
-        browser_types = get_browser_types(context)
-        for b_type in browser_types:
-            t_pool.submit(multiplication, b_type, context, features)
-    log.info('all thread done...')
+    return get_features_num(cmd)
 
 
 def multiplication(browser_type, context, features):
@@ -82,26 +90,33 @@ def multiplication(browser_type, context, features):
         len(features))
     results = pool.map(
         partial(execute_parallel_feature, behave_cmd=behave_cmd,
-                feature_path=feature_path, browser_type=browser_type),
+                feature_path=feature_path, browser_type=browser_type,
+                locations=context.get("selected_locations")),
         features)
     pool.close()
     pool.join()
     log.info(f'parallel run result: {results}')
 
 
-def execute_parallel_feature(feature, behave_cmd, feature_path, browser_type):
+def execute_parallel_feature(feature, behave_cmd, feature_path, browser_type,
+                             locations=None):
     """
     Runs features in parallel
     :param feature: feature to run
     :param behave_cmd: behave cmd string
     :param feature_path: feature path
     :param browser_type: browser_type
+    :param locations: scenario locations by feature file when only some
+    scenarios are selected
     """
     feature_start_time = datetime.now()
     start_timer = timer()
     file_name = report_name(feature, browser_type)
-    cmd = behave_cmd.replace(feature_path, feature, 1).replace('report.json',
-                                                               file_name, 1)
+    target = feature
+    if locations is not None and os.path.normpath(feature) in locations:
+        target = " ".join(locations[os.path.normpath(feature)])
+    cmd = behave_cmd.replace(feature_path, target, 1).replace('report.json',
+                                                              file_name, 1)
     log.info(f'execute cmd str: {cmd}')
 
     p = Popen(cmd, stdout=PIPE, shell=True)
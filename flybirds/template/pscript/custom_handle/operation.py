@@ -66,6 +66,17 @@ def logout():
     pass
 
 
+def is_logged_out(page):
+    """
+    whether the page of a failed web scenario shows the logged out state,
+    the cached storage state is dropped and the next scenario logs in again
+
+    :param page: the playwright page of the scenario
+    """
+    # e.g. return "/login" in page.url
+    return False
+
+
 def get_mock_case_body(mock_case_id):
     """
     custom get mockCase response body
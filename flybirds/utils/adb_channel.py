@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+long-lived adb shell session per device, commands are written to the shell
+stdin and their output is delimited by a sentinel line carrying the exit
+code, so a device command does not spawn a new adb client process. the
+stderr of a command is kept in a file on the device and framed after its
+output, the output is the stdout like with adb shell
+"""
+import atexit
+import queue
+import shlex
+import subprocess
+import threading
+import uuid
+
+import flybirds.utils.flybirds_log as log
+from flybirds.utils import trace
+
+SENTINEL = "__flybirds_cmd_end__"
+# device directory of the stderr files, writable by the adb shell user
+ERR_DIR = "/data/local/tmp"
+DEFAULT_TIMEOUT = 30
+# seconds a new shell session has to answer its first command
+START_TIMEOUT = 10
+# consecutive failures after which the device only uses per-call adb
+MAX_FAILURES = 3
+
+_channels = {}
+_channels_lock = threading.Lock()
+
+
+class ChannelError(Exception):
+    """
+    the shell session could not be started or written to, no command of the
+    batch ran and the caller falls back to per-call adb
+    """
+
+
+def shell_error(message):
+    """
+    AdbShellError like airtest shell, airtest is imported on failure only
+    """
+    from airtest.core.error import AdbShellError
+    return AdbShellError("", message)
+
+
+def get_adb_cmd(adb_path=None):
+    """
+    adb command prefix as a list
+    """
+    if adb_path is None:
+        from flybirds.utils.snippet import get_adb_path
+        adb_path = get_adb_path()
+    if isinstance(adb_path, (list, tuple)):
+        return list(adb_path)
+    return [adb_path]
+
+
+def wrap_cmd(cmd, token):
+    # the subshell keeps cd/exit local, stdin is detached so the command
+    # cannot read the following commands
+    err_file = f"{ERR_DIR}/flybirds_{token}.err"
+    return (f"( {cmd} ) </dev/null 2>{err_file}; __flybirds_code=$?; "
+            f"printf '\\n{SENTINEL}{token}:err\\n'; cat {err_file}; "
+            f"rm -f {err_file}; "
+            f"printf '\\n{SENTINEL}{token}:%d\\n' $__flybirds_code\n")
+
+
+def decode_output(output):
+    text = b"".join(output).decode("utf-8", errors="replace")
+    # drop the newline printed before the sentinel
+    if text.endswith("\r\n"):
+        return text[:-2]
+    if text.endswith("\n"):
+        return text[:-1]
+    return text
+
+
+class ShellChannel:
+    """
+    one `adb -s <device> shell` process, commands run one after another
+    """
+
+    def __init__(self, device_id, adb_path=None):
+        self.device_id = device_id
+        self.adb_cmd = get_adb_cmd(adb_path)
+        self.proc = None
+        self.lines = None
+        self.lock = threading.Lock()
+        self.commands = 0
+        self.failures = 0
+
+    def start(self):
+        try:
+            self.proc = subprocess.Popen(
+                self.adb_cmd + ["-s", self.device_id, "shell"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+        except OSError as start_ex:
+            raise ChannelError(f"start adb shell error: {start_ex}")
+        self.lines = queue.Queue()
+        threading.Thread(target=self.read_loop, args=(self.proc, self.lines),
+                         name=f"adb-shell-{self.device_id}",
+                         daemon=True).start()
+        # a session that cannot reach the device exits before it answers
+        token = uuid.uuid4().hex
+        self.proc.stdin.write(wrap_cmd("true", token).encode("utf-8"))
+        self.proc.stdin.flush()
+        code, _, error = self.read_result(token, START_TIMEOUT)
+        if code != 0:
+            raise ChannelError(f"adb shell cannot run commands: {error}")
+
+    @staticmethod
+    def read_loop(proc, lines):
+        for line in iter(proc.stdout.readline, b""):
+            lines.put(line)
+        lines.put(None)
+
+    def is_alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def read_result(self, token, timeout):
+        """
+        (exit code, stdout, stderr) of the command sent with token
+        """
+        output, error = [], []
+        lines = output
+        marker = f"{SENTINEL}{token}:".encode()
+        while True:
+            try:
+                line = self.lines.get(timeout=timeout)
+            except queue.Empty:
+                raise ChannelError(f"no output in {timeout}s")
+            if line is None:
+                raise ChannelError("adb shell exited")
+            if marker in line:
+                value = line.split(marker, 1)[1].strip()
+                if value == b"err":
+                    lines = error
+                    continue
+                return (int(value or b"0"), decode_output(output),
+                        decode_output(error))
+            lines.append(line)
+
+    def run_batch(self, cmds, timeout=DEFAULT_TIMEOUT):
+        """
+        write all commands at once and read their results in order,
+        return [(exit code, stdout, stderr)]. timeout None waits for the
+        commands as long as they run. ChannelError when the commands could
+        not be sent, AdbShellError when they were sent and did not finish
+        """
+        with self.lock:
+            if self.failures >= MAX_FAILURES:
+                raise ChannelError("channel disabled after repeated failures")
+            tokens = [uuid.uuid4().hex for _ in cmds]
+            try:
+                if not self.is_alive():
+                    self.start()
+                self.proc.stdin.write("".join(
+                    wrap_cmd(cmd, token)
+                    for cmd, token in zip(cmds, tokens)).encode("utf-8"))
+                self.proc.stdin.flush()
+            except (OSError, ValueError, ChannelError) as send_ex:
+                self.failures += 1
+                self.close_proc()
+                raise ChannelError(str(send_ex))
+            try:
+                results = [self.read_result(token, timeout)
+                           for token in tokens]
+            except ChannelError as read_ex:
+                # the commands may have run, they are not sent again
+                self.failures += 1
+                self.close_proc(wait=0)
+                raise shell_error(f"adb shell of {self.device_id}: {read_ex}")
+            self.failures = 0
+            self.commands += len(cmds)
+            return results
+
+    def run(self, cmd, timeout=DEFAULT_TIMEOUT):
+        return self.run_batch([cmd], timeout)[0]
+
+    def close_proc(self, wait=3):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=wait)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        self.proc = None
+
+    def close(self):
+        with self.lock:
+            self.close_proc()
+
+
+def get_channel(device_id, adb_path=None):
+    with _channels_lock:
+        channel = _channels.get(device_id)
+        if channel is None:
+            channel = ShellChannel(device_id, adb_path)
+            _channels[device_id] = channel
+        return channel
+
+
+def run_adb_shell(device_id, cmd, adb_path=None, timeout=DEFAULT_TIMEOUT):
+    """
+    per-call `adb shell`, the fallback of the channel
+    """
+    proc = subprocess.run(
+        get_adb_cmd(adb_path) + ["-s", device_id, "shell", cmd],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=timeout,
+    )
+    return (proc.returncode,
+            proc.stdout.decode("utf-8", errors="replace"),
+            proc.stderr.decode("utf-8", errors="replace"))
+
+
+def shell_batch(device_id, cmds, adb_path=None, timeout=DEFAULT_TIMEOUT,
+                with_stderr=False):
+    """
+    run independent shell commands on the device, [(exit code, stdout)],
+    with_stderr adds the stderr to every result, otherwise it is logged.
+    the batch is run with per-call adb only when the channel could not send
+    it, every failure is raised as AdbShellError
+    """
+    cmds = list(cmds)
+    if not cmds:
+        return []
+    with trace.span("adb", "shell", commands=len(cmds)):
+        try:
+            results = get_channel(device_id, adb_path).run_batch(cmds,
+                                                                 timeout)
+        except ChannelError as channel_ex:
+            log.warn(f"adb shell channel of {device_id} failed: "
+                     f"{channel_ex}, run the commands with adb directly")
+            try:
+                results = [run_adb_shell(device_id, cmd, adb_path, timeout)
+                           for cmd in cmds]
+            except (OSError, subprocess.SubprocessError) as adb_ex:
+                raise shell_error(f"adb shell of {device_id}: {adb_ex}")
+        trace.add_bytes(sum(len(output) + len(error)
+                            for _, output, error in results))
+        if with_stderr:
+            return results
+        for cmd, (_, _, error) in zip(cmds, results):
+            if error:
+                log.debug(f"adb shell of {device_id} `{cmd}` stderr: "
+                          f"{error}")
+        return [(code, output) for code, output, _ in results]
+
+
+def shell(device_id, cmd, adb_path=None, timeout=DEFAULT_TIMEOUT,
+          with_stderr=False):
+    """
+    run a shell command on the device, (exit code, stdout) or with_stderr
+    (exit code, stdout, stderr)
+    """
+    return shell_batch(device_id, [cmd], adb_path, timeout, with_stderr)[0]
+
+
+def quote(arg):
+    return shlex.quote(str(arg))
+
+
+def close_all():
+    with _channels_lock:
+        channels = list(_channels.values())
+        _channels.clear()
+    for channel in channels:
+        channel.close()
+
+
+atexit.register(close_all)
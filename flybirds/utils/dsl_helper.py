@@ -6,7 +6,7 @@ import base64
 import json
 import re
 import uuid
-from functools import wraps
+from functools import lru_cache, wraps
 
 import six
 
@@ -91,23 +91,95 @@ def add_res_dic(dsl_params, functin_pattern, def_key):
     return result_dic
 
 
+# trailing "key=value" item of a dsl parameter, matched after a comma
+PARAM_ITEM_PATTERN = re.compile(r"\s*([a-zA-Z0-9_]+)\s*=\s*(\S+)")
+PARAM_CACHE_SIZE = 1024
+
+
+class ParamDict(dict):
+    """
+    read-only parse result, it is shared by every caller of the same dsl
+    parameter. use dict(param_dict) to get a mutable copy
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("dsl params are read-only, copy them with dict()")
+
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    __ior__ = _read_only
+    clear = _read_only
+    pop = _read_only
+    popitem = _read_only
+    setdefault = _read_only
+    update = _read_only
+
+    def __reduce__(self):
+        return ParamDict, (dict(self),)
+
+
+def match_last_param(text):
+    """
+    find the last ", key=value" item of text, the same item the greedy
+    pattern of add_res_dic matches. return (comma index, key, value) or None
+    """
+    comma = text.rfind(",")
+    # the part before the comma must not be empty
+    while comma >= 1:
+        match_obj = PARAM_ITEM_PATTERN.match(text, comma + 1)
+        if match_obj is not None:
+            return comma, match_obj.group(1), match_obj.group(2)
+        comma = text.rfind(",", 0, comma)
+    return None
+
+
+def tokenize_params(dsl_params, def_key="selector"):
+    """
+    split a dsl parameter into its items, scanning the commas from the end
+    once. text=freshmode, timeout=15, swipeCount=40 gives
+    {swipeCount: 40, timeout: 15, selector: text=freshmode}
+    """
+    result_dic = {}
+    text = dsl_params
+    matched = False
+    item = match_last_param(text)
+    while item is not None:
+        matched = True
+        comma, key, value = item
+        result_dic[key] = value
+        text = text[:comma].strip().replace(u"\u200b", "")
+        item = match_last_param(text)
+    if not matched:
+        text = text.strip().replace(u"\u200b", "")
+    result_dic[def_key] = text
+    return result_dic
+
+
+@lru_cache(maxsize=PARAM_CACHE_SIZE)
+def parse_params(dsl_params, def_key="selector"):
+    """
+    cached parse of a dsl parameter, the placeholders of the selector are
+    replaced
+    """
+    result_dic = tokenize_params(dsl_params, def_key)
+    selector = result_dic.get("selector")
+    if selector is not None:
+        selector = selector.replace("@@空格@@", " ")
+        selector = selector.replace("@#@换行#符号@#@", "\n")
+        result_dic["selector"] = selector
+    log.debug(log.lazy("result_dic: {}".format, result_dic))
+    return ParamDict(result_dic)
+
+
 # generate result_dic
 def params_to_dic(dsl_params, def_key="selector"):
     """
     Convert the parameters in the dsl statement into dict format for use in
-    subsequent processes
+    subsequent processes. The result is cached and read-only
     """
-    result_dic = {}
-    function_pattern = re.compile(r"([\S\s]+),\s*([a-zA-Z0-9_]+)\s*=\s*(\S+)")
     if isinstance(dsl_params, str):
-        result_dic = add_res_dic(dsl_params, function_pattern, def_key)
-    selector = result_dic.get("selector")
-    if selector is not None and "@@空格@@" in selector:
-        result_dic["selector"] = re.sub(r'@@空格@@', ' ', selector)
-    if selector is not None and "@#@换行#符号@#@" in selector:
-        result_dic["selector"] = re.sub(r'@#@换行#符号@#@', '\n', selector)
-    log.info("result_dic: {}".format(result_dic))
-    return result_dic
+        return parse_params(dsl_params, def_key)
+    return ParamDict()
 
 
 def split_must_param(dsl_params):
@@ -302,6 +374,8 @@ class RetryType:
                     f'retry start retryTimeOut: {self.retryTimeOut}s, self.waitTimeInterval: {self.waitTimeInterval}s, maxRetryTimes: {self.recordMaxRetryTimes}')
                 while self.retryTimes > 0:
                     try:
+                        # every attempt reads the page again
+                        gr.set_value("eleSnapshots", None)
                         func(*args, **kwargs)
                         self.runSuccess = True
                         if self.runSuccess == True:
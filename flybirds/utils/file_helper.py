@@ -18,6 +18,14 @@ def store_json_to_file_path(data, path, write_type):
         json.dump(data, fw)
 
 
+def store_compact_json_to_file_path(data, path):
+    """
+    json save to file without whitespace between items
+    """
+    with open(path, "w") as fw:
+        json.dump(data, fw, separators=(",", ":"))
+
+
 def get_json_from_file_path(path):
     """
     Get the content of the json file and convert it into an object
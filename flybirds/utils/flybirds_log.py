@@ -1,29 +1,265 @@
 # -*- coding: utf-8 -*-
 """
 log helper
+
+records are rendered in the calling thread and written by a background
+writer, calls below the handler levels return before any formatting.
+set FLYBIRDS_LOG_ASYNC=0 to write synchronously.
 """
+import atexit
+import json
 import logging
+import os
+import queue
+import sys
+import threading
+
 from flybirds.core.global_context import GlobalContext
 import flybirds.core.global_resource as gr
 
+
+class Lazy:
+    """
+    log argument rendered only when the record is emitted
+    """
+
+    __slots__ = ("func", "args")
+
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return str(self.func(*self.args))
+
+
+def lazy(func, *args):
+    """
+    log.debug(log.lazy("result: {}".format, big_dict))
+    """
+    return Lazy(func, args)
+
+
+class AsyncWriter:
+    """
+    background thread that passes queued records to the real handlers
+    """
+
+    def __init__(self, handlers):
+        self.handlers = list(handlers)
+        self.queue = queue.SimpleQueue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.loop, name="flybirds-log-writer", daemon=True)
+                self.thread.start()
+
+    def put(self, record):
+        if self.thread is None:
+            self.start()
+        self.queue.put(record)
+
+    def loop(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if isinstance(item, threading.Event):
+                for handler in self.handlers:
+                    handler.flush()
+                item.set()
+                continue
+            for handler in self.handlers:
+                if item.levelno >= handler.level:
+                    handler.handle(item)
+
+    def flush(self, timeout=5):
+        """
+        wait until the records queued so far are written
+        """
+        if self.thread is None or not self.thread.is_alive():
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+
+    def stop(self, timeout=5):
+        if self.thread is None or not self.thread.is_alive():
+            return
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+
+class WriterHandler(logging.Handler):
+    """
+    render the record in the calling thread and queue it for the writer
+    """
+
+    def __init__(self, writer):
+        super().__init__()
+        self.writer = writer
+
+    def emit(self, record):
+        try:
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = formatter.formatException(record.exc_info)
+                record.exc_info = None
+            self.writer.put(record)
+        except Exception:
+            self.handleError(record)
+
+
+class LevelHandler(logging.StreamHandler):
+    """
+    console handler, its level is also applied to the logger so disabled
+    calls return before a record is created
+    """
+
+    def setLevel(self, level):
+        super().setLevel(level)
+        refresh_level()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    one json object per line
+    """
+
+    def format(self, record):
+        data = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def get_handlers():
+    if writer is not None:
+        return writer.handlers
+    return [h for h in logger.handlers if h is not queue_handler]
+
+
+def refresh_level():
+    """
+    logger level is the lowest level of the handlers
+    """
+    levels = [h.level for h in get_handlers()] or [logging.DEBUG]
+    logger.setLevel(max(min(levels), 1))
+
+
+def add_handler(handler):
+    if writer is not None:
+        writer.handlers.append(handler)
+    else:
+        logger.addHandler(handler)
+    refresh_level()
+
+
+def remove_handler(handler):
+    if writer is not None:
+        if handler in writer.handlers:
+            writer.handlers.remove(handler)
+    else:
+        logger.removeHandler(handler)
+    refresh_level()
+
+
+def enable_json_log(log_dir, level=None):
+    """
+    write this process's records to <log_dir>/flybirds-<pid>.jsonl
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    path = os.path.join(log_dir, f"flybirds-{os.getpid()}.jsonl")
+    handler = logging.FileHandler(path, encoding="utf-8", delay=True)
+    handler.setFormatter(JsonFormatter())
+    handler.setLevel(ch.level if level is None else level)
+    add_handler(handler)
+    return handler
+
+
+_sample_counts = {}
+
+
+def sampled(key, every):
+    """
+    True on the first and then every n-th call for the key, used to thin
+    out logs of high-frequency call sites
+    """
+    count = _sample_counts.get(key, 0)
+    _sample_counts[key] = count + 1
+    return count % every == 0
+
+
+def flush():
+    if writer is not None:
+        writer.flush()
+
+
+def use_sync_writer():
+    """
+    write from the calling thread, used in forked children where the
+    writer thread does not exist
+    """
+    global writer
+    if writer is None:
+        return
+    handlers = writer.handlers
+    writer = None
+    logger.removeHandler(queue_handler)
+    for handler in handlers:
+        logger.addHandler(handler)
+    refresh_level()
+
+
+def is_async_enabled():
+    if os.environ.get("FLYBIRDS_LOG_ASYNC", "1") == "0":
+        return False
+    # multiprocessing workers may exit without running atexit
+    mp = sys.modules.get("multiprocessing")
+    if mp is not None and mp.parent_process() is not None:
+        return False
+    return True
+
+
 # create logger
 logger = logging.getLogger("flybirds_log")
 logger.setLevel(logging.DEBUG)
 
-# create console handler and set level to debug
-ch = logging.StreamHandler()
-ch.setLevel(logging.DEBUG)
-
 # create formatter
 formatter = logging.Formatter(
     "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
-# add formatter to ch
+writer = None
+queue_handler = None
+
+# create console handler and set level to debug
+ch = LevelHandler()
 ch.setFormatter(formatter)
 
-# add ch to logger
-logger.addHandler(ch)
+if is_async_enabled():
+    writer = AsyncWriter([ch])
+    queue_handler = WriterHandler(writer)
+    logger.addHandler(queue_handler)
+    atexit.register(writer.stop)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=use_sync_writer)
+else:
+    logger.addHandler(ch)
+
+ch.setLevel(logging.DEBUG)
 
 
 def debug_debug(*args, level):
@@ -32,8 +268,8 @@ def debug_debug(*args, level):
             if hasattr(GlobalContext, "debug_console"):
                 data = ""
                 for arg in args:
-                    if isinstance(arg, str):
-                        data = data + arg
+                    if isinstance(arg, (str, Lazy)):
+                        data = data + str(arg)
                 GlobalContext.debug_console.set_case_step_log(data, level)
     except Exception as e:
         print(e)
@@ -43,6 +279,8 @@ def debug(*args):
     """
     log debug
     """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     debug_debug(*args, level=2)
     for arg in args:
         logger.debug(arg)
@@ -52,6 +290,8 @@ def info(*args):
     """
     log info
     """
+    if not logger.isEnabledFor(logging.INFO):
+        return
     debug_debug(*args, level=0)
     for arg in args:
         logger.info(arg)
@@ -61,6 +301,8 @@ def warn(*args):
     """
     warn log
     """
+    if not logger.isEnabledFor(logging.WARNING):
+        return
     debug_debug(*args, level=3)
     for arg in args:
         logger.warning(arg)
@@ -70,6 +312,8 @@ def error(*args):
     """
     error log
     """
+    if not logger.isEnabledFor(logging.ERROR):
+        return
     debug_debug(*args, level=1)
     for arg in args:
         logger.error(arg)
@@ -1,15 +1,133 @@
 # -*- coding: utf-8 -*-
 """
 http help
+one session per worker keeps the connections to a backend alive, requests
+get a default timeout and idempotent calls are retried on connection
+errors and 502/503/504
 """
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import flybirds.core.global_resource as gr
+import flybirds.utils.flybirds_log as log
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 2
+DEFAULT_POOL_SIZE = 10
+RETRY_STATUS = (502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_config(key, default):
+    # the helper is also used before the config is loaded
+    try:
+        value = gr.get_frame_config_value(key, default)
+        return type(default)(value)
+    except Exception:
+        return default
+
+
+def create_session(retries=DEFAULT_RETRIES, pool_size=DEFAULT_POOL_SIZE):
+    session = requests.Session()
+    retry = Retry(total=retries, connect=retries, read=retries,
+                  status=retries, backoff_factor=0.2,
+                  status_forcelist=RETRY_STATUS, raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    """
+    shared session of the worker
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session(
+                    get_config("http_retries", DEFAULT_RETRIES),
+                    get_config("http_pool_size", DEFAULT_POOL_SIZE))
+    return _session
+
+
+def close_session():
+    global _session
+    with _session_lock:
+        session, _session = _session, None
+    if session is not None:
+        session.close()
+
+
+def request(method, url, **kwargs):
+    kwargs.setdefault("timeout", get_config("http_timeout", DEFAULT_TIMEOUT))
+    return get_session().request(method.upper(), url, **kwargs)
 
 
 def http_get(url, param=None, header=None):
     if url is not None and url != "":
-        result = requests.get(url, params=param, headers=header, )
+        result = request("GET", url, params=param, headers=header, )
         j_obj = result.json()
         result.close()
         return j_obj
     else:
         return None
+
+
+class CallResult:
+    """
+    result of one call of a batch, response is None when it raised
+    """
+
+    def __init__(self, call, response=None, error=None, elapsed=0.0):
+        self.call = call
+        self.response = response
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.error is None and self.response is not None \
+            and self.response.ok
+
+
+def timed_request(call):
+    start = time.perf_counter()
+    try:
+        response = request(call["method"], call["url"],
+                           **call.get("kwargs", {}))
+        return CallResult(call, response, None, time.perf_counter() - start)
+    except Exception as call_error:
+        return CallResult(call, None, call_error,
+                          time.perf_counter() - start)
+
+
+def request_batch(calls, max_workers=None):
+    """
+    issue the calls concurrently on the shared session and wait for all,
+    calls are dicts with method, url and the kwargs of the request,
+    results in call order
+    """
+    if not calls:
+        return []
+    if max_workers is None:
+        max_workers = get_config("http_pool_size", DEFAULT_POOL_SIZE)
+    workers = max(1, min(len(calls), max_workers))
+    with ThreadPoolExecutor(max_workers=workers,
+                            thread_name_prefix="http-batch") as executor:
+        results = list(executor.map(timed_request, calls))
+    for result in results:
+        log.info(f"[http batch] {result.call['method'].upper()} "
+                 f"{result.call['url']} "
+                 f"{getattr(result.response, 'status_code', result.error)} "
+                 f"{result.elapsed * 1000:.0f}ms")
+    return results
@@ -54,11 +54,11 @@ def app_start(page_name):
                 app.shut_app(package_name)
                 wait_time = gr.get_frame_config_value("app_start_time", 8)
                 app.wake_app(package_name, wait_time)
-                log.info("complete restartApp and sleep {}".format(wait_time))
+                log.info("complete restartApp, wait at most {}".format(wait_time))
             elif "startApp" == page_value:
                 wait_time = gr.get_frame_config_value("app_start_time", 6)
                 app.wake_app(package_name, wait_time)
-                log.info("complete startApp and sleep {}".format(wait_time))
+                log.info("complete startApp, wait at most {}".format(wait_time))
             elif "stopApp" == page_value:
                 app.shut_app(package_name)
                 log.info("stop app before running")
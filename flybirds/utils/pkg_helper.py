@@ -5,7 +5,6 @@ py ns load
 import importlib
 import os
 import pkgutil
-import pkg_resources
 
 
 def load_pkg_by_ns(pkg_ns):
@@ -31,6 +30,8 @@ def load_pkg_by_ns_file(pkg_ns, file_name):
 
 def find_package(pkg_query):
     if pkg_query is not None and pkg_query != "":
+        # pkg_resources scans every installed distribution on import
+        import pkg_resources
         working_set = pkg_resources.WorkingSet()
         pkg_list = []
         lst = [d for d in working_set]
@@ -51,6 +52,7 @@ def find_package(pkg_query):
 
 def find_package_base_path(pkg_query):
     if pkg_query is not None and pkg_query != "":
+        import pkg_resources
         working_set = pkg_resources.WorkingSet()
         pkg_list = []
         lst = [d for d in working_set]
@@ -5,9 +5,20 @@ snippet helper
 import os
 import subprocess
 import re
+from functools import lru_cache
+
 import flybirds.core.driver.device as device
 
 
+@lru_cache(maxsize=1)
+def get_adb_path():
+    """
+    path of the adb shipped with airtest, airtest is imported on first use
+    """
+    from airtest.core.android.adb import ADB
+    return ADB.builtin_adb_path()
+
+
 def create_sub_process(cmd):
     """
     Create a child process that executes a specific command
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+per-step span timings of a behave worker written as a chrome trace
+(chrome://tracing, perfetto), every subsystem span also adds its time, call
+count and bytes to the step that is running. the module functions do nothing
+until a tracer is started, so the instrumented calls cost one check
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+# categories of the instrumented subsystems
+STEP = "step"
+
+_tracer = None
+_local = threading.local()
+
+
+def now_us():
+    return time.time_ns() // 1000
+
+
+class Span:
+    """
+    span of the current thread, bytes are added by the traced code
+    """
+
+    def __init__(self, cat, name, args=None):
+        self.cat = cat
+        self.name = name
+        self.args = args
+        self.bytes = 0
+        self.ts = now_us()
+        self.start = time.perf_counter()
+
+    def add_bytes(self, size):
+        self.bytes += size or 0
+
+
+class Tracer:
+    """
+    writes one event per line, the closing bracket is optional for the
+    trace viewers so a worker that is killed leaves a readable trace.
+    step_begin/step_end are called from the behave thread
+    """
+
+    def __init__(self, path, process_name=None):
+        self.path = path
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write("[")
+        self._separator = "\n"
+        self.step = None
+        self.subsystems = {}
+        self.write({"name": "process_name", "ph": "M", "pid": self.pid,
+                    "tid": 0, "args": {"name": process_name or path}})
+
+    def write(self, event):
+        line = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            if self._file is not None:
+                self._file.write(self._separator + line)
+                self._separator = ",\n"
+
+    def add_span(self, span):
+        duration = time.perf_counter() - span.start
+        event = {"name": span.name, "cat": span.cat, "ph": "X",
+                 "ts": span.ts, "dur": int(duration * 1e6),
+                 "pid": self.pid, "tid": threading.get_ident()}
+        args = dict(span.args or {})
+        if span.bytes:
+            args["bytes"] = span.bytes
+        if args:
+            event["args"] = args
+        self.write(event)
+        if span.cat != STEP:
+            with self._lock:
+                total = self.subsystems.setdefault(
+                    span.cat, {"calls": 0, "ms": 0.0, "bytes": 0})
+                total["calls"] += 1
+                total["ms"] += duration * 1000
+                total["bytes"] += span.bytes
+
+    def step_begin(self, name, args=None):
+        with self._lock:
+            self.subsystems = {}
+        self.step = Span(STEP, name, args)
+
+    def step_end(self, status=None):
+        step, self.step = self.step, None
+        if step is None:
+            return
+        with self._lock:
+            subsystems, self.subsystems = self.subsystems, {}
+        step.args = dict(step.args or {})
+        step.args["status"] = status
+        step.args["subsystems"] = {
+            cat: {"calls": total["calls"], "ms": round(total["ms"], 3),
+                  "bytes": total["bytes"]}
+            for cat, total in subsystems.items()}
+        self.add_span(step)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.write("\n]\n")
+                self._file.close()
+                self._file = None
+
+
+def start(path, process_name=None):
+    global _tracer
+    stop()
+    _tracer = Tracer(path, process_name)
+    return _tracer
+
+
+def stop():
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.close()
+
+
+def get_tracer():
+    return _tracer
+
+
+def current_span():
+    stack = getattr(_local, "spans", None)
+    return stack[-1] if stack else None
+
+
+class span:  # pylint: disable=invalid-name
+    """
+    with trace.span("ocr", "ocr"): ...
+    """
+
+    def __init__(self, cat, name, **args):
+        self.cat = cat
+        self.name = name
+        self.args = args
+        self.span = None
+
+    def __enter__(self):
+        if _tracer is None:
+            return None
+        self.span = Span(self.cat, self.name, self.args)
+        if not hasattr(_local, "spans"):
+            _local.spans = []
+        _local.spans.append(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.span is None:
+            return False
+        _local.spans.pop()
+        tracer = _tracer
+        if tracer is not None:
+            if exc_type is not None:
+                self.span.args["error"] = exc_type.__name__
+            tracer.add_span(self.span)
+        return False
+
+
+def traced(cat, name=None):
+    """
+    decorator, a span around every call of the function
+    """
+
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with span(cat, span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def add_bytes(size):
+    """
+    bytes moved by the innermost span of the thread
+    """
+    cur = current_span()
+    if cur is not None:
+        cur.add_bytes(size)
+
+
+def sleep(seconds, name="sleep"):
+    with span("sleep", name):
+        time.sleep(seconds)
+
+
+def read_events(path):
+    """
+    events of a trace file, a truncated last line is ignored
+    """
+    events = []
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            line = line.strip().rstrip(",")
+            if line in ("", "[", "]"):
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
@@ -63,7 +63,7 @@ setup(
     ],
     license="MIT license",
     python_requires=">=3.8, <3.11",
-    packages=find_packages(exclude=["dist", "build", "tests", "docs"]),
+    packages=find_packages(exclude=["dist", "build", "tests", "docs", "benchmarks"]),
     include_package_data=True,
     install_requires=req,
     entry_points="""
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+adb shell channel unit test, the device is a fake adb that runs a local sh
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import TestCase
+from unittest import main
+from unittest import mock
+
+from airtest.core.error import AdbShellError
+
+from flybirds.utils import adb_channel
+
+FAKE_ADB = '''
+import os
+import subprocess
+import sys
+
+args = sys.argv[1:]
+with open(os.environ["FAKE_ADB_LOG"], "a") as f:
+    f.write(" ".join(args) + "\\n")
+if os.environ.get("FAKE_ADB_BROKEN_SHELL") == "1" and args[2:] == ["shell"]:
+    sys.exit(1)
+if args[2] == "shell" and len(args) == 3:
+    os.execv("/bin/sh", ["sh"])
+if args[2] == "shell":
+    sys.exit(subprocess.call(["/bin/sh", "-c", " ".join(args[3:])]))
+sys.exit(2)
+'''
+
+
+@unittest.skipIf(os.name == "nt", "fake adb device needs /bin/sh")
+class AdbChannelTest(TestCase):
+    """
+    adb shell channel test
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        fake_path = os.path.join(self.tmp_dir, "fake_adb.py")
+        with open(fake_path, "w", encoding="utf-8") as f:
+            f.write(FAKE_ADB)
+        self.log_path = os.path.join(self.tmp_dir, "adb.log")
+        os.environ["FAKE_ADB_LOG"] = self.log_path
+        self.adb = [sys.executable, fake_path]
+        err_dir = mock.patch.object(adb_channel, "ERR_DIR", self.tmp_dir)
+        err_dir.start()
+        self.addCleanup(err_dir.stop)
+        adb_channel.close_all()
+
+    def tearDown(self):
+        adb_channel.close_all()
+        os.environ.pop("FAKE_ADB_BROKEN_SHELL", None)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def adb_calls(self):
+        if not os.path.exists(self.log_path):
+            return []
+        with open(self.log_path, "r") as f:
+            return f.read().splitlines()
+
+    def test_one_process(self):
+        work_dir = os.path.join(self.tmp_dir, "sdcard")
+        results = []
+        for cmd in (f"mkdir -p {work_dir}/a/b", f"ls {work_dir}/a",
+                    f"ls {work_dir}/missing", "printf 'no newline'",
+                    "cd /; exit 3", "pwd; echo ok"):
+            results.append(adb_channel.shell("dev1", cmd, self.adb))
+        self.assertEqual(results[0], (0, ""))
+        self.assertEqual(results[1], (0, "b\n"))
+        self.assertNotEqual(results[2][0], 0)
+        self.assertEqual(results[3], (0, "no newline"))
+        self.assertEqual(results[4][0], 3)
+        self.assertEqual(results[5], (0, f"{os.getcwd()}\nok\n"))
+        self.assertEqual(self.adb_calls(), ["-s dev1 shell"])
+
+    def test_batch_in_order(self):
+        path = os.path.join(self.tmp_dir, "x", "y")
+        results = adb_channel.shell_batch(
+            "dev1", [f"ls {path}", f"mkdir -p {path}", f"ls -d {path}",
+                     "read line; echo read:$line"], self.adb)
+        self.assertNotEqual(results[0][0], 0)
+        self.assertEqual(results[1:3], [(0, ""), (0, f"{path}\n")])
+        # stdin is detached, the command cannot eat the next commands
+        self.assertEqual(results[3], (0, "read:\n"))
+        self.assertEqual(len(self.adb_calls()), 1)
+
+    def test_stderr_separate(self):
+        cmd = "echo out; echo warning >&2; echo more"
+        self.assertEqual(adb_channel.shell("dev7", cmd, self.adb),
+                         (0, "out\nmore\n"))
+        self.assertEqual(adb_channel.shell("dev7", cmd + "; exit 2", self.adb,
+                                           with_stderr=True),
+                         (2, "out\nmore\n", "warning\n"))
+        self.assertFalse([name for name in os.listdir(self.tmp_dir)
+                          if name.endswith(".err")])
+        os.environ["FAKE_ADB_BROKEN_SHELL"] = "1"
+        self.assertEqual(adb_channel.shell("dev8", cmd, self.adb,
+                                           with_stderr=True),
+                         (0, "out\nmore\n", "warning\n"))
+
+    def test_fallback(self):
+        os.environ["FAKE_ADB_BROKEN_SHELL"] = "1"
+        results = adb_channel.shell_batch(
+            "dev2", ["echo one", "exit 4"], self.adb)
+        self.assertEqual(results, [(0, "one\n"), (4, "")])
+        self.assertEqual(self.adb_calls(), ["-s dev2 shell",
+                                            "-s dev2 shell echo one",
+                                            "-s dev2 shell exit 4"])
+
+    def test_timeout_not_repeated(self):
+        count_path = os.path.join(self.tmp_dir, "count")
+        with self.assertRaises(AdbShellError):
+            adb_channel.shell_batch(
+                "dev4", [f"echo run >> {count_path}; sleep 5"], self.adb,
+                timeout=0.5)
+        with open(count_path, "r") as f:
+            self.assertEqual(f.read(), "run\n")
+        self.assertEqual(self.adb_calls(), ["-s dev4 shell"])
+
+    def test_fallback_error(self):
+        os.environ["FAKE_ADB_BROKEN_SHELL"] = "1"
+        with self.assertRaises(AdbShellError):
+            adb_channel.shell("dev5", "sleep 5", self.adb, timeout=0.5)
+
+    def test_no_timeout(self):
+        self.assertEqual(adb_channel.shell("dev6", "sleep 0.2; echo done",
+                                           self.adb, timeout=None),
+                         (0, "done\n"))
+
+    def test_restart_after_exit(self):
+        channel = adb_channel.get_channel("dev3", self.adb)
+        self.assertEqual(channel.run("echo a"), (0, "a\n", ""))
+        channel.proc.kill()
+        channel.proc.wait()
+        self.assertEqual(adb_channel.shell("dev3", "echo b", self.adb),
+                         (0, "b\n"))
+        self.assertEqual(len(self.adb_calls()), 2)
+
+
+if __name__ == "__main__":
+    main()
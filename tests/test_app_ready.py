@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+app readiness probe unit test
+"""
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest import main
+from unittest import mock
+
+import flybirds.core.global_resource as gr
+from flybirds.core.plugin.plugins.default import app_ready
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakePoco:
+    """
+    the hierarchy changes for the first dumps, then stays
+    """
+
+    def __init__(self, changes):
+        self.dumps = 0
+        self.changes = changes
+        self.agent = SimpleNamespace(
+            hierarchy=SimpleNamespace(dump=self.dump))
+
+    def dump(self):
+        self.dumps += 1
+        text = str(min(self.dumps, self.changes))
+        return {"name": "root", "payload": {"text": text, "pos": [0, 0]},
+                "children": []}
+
+
+class AppReadyTest(TestCase):
+    """
+    app ready test
+    """
+
+    def setUp(self):
+        gr.init_glb()
+        gr.set_value("configManage", SimpleNamespace(
+            frame_info=SimpleNamespace(app_ready_probe=True,
+                                       app_ready_interval=0.5),
+            device_info=SimpleNamespace(device_id=None)))
+
+    def tearDown(self):
+        gr.init_glb()
+
+    def test_ready_before_timeout(self):
+        fake = FakeClock()
+        poll = iter([False, False, True])
+        probe = app_ready.ReadyProbe([lambda: next(poll)], 0.5,
+                                     fake.clock, fake.sleep)
+        self.assertEqual(probe.wait(6), (True, 1.0))
+
+    def test_timeout_is_upper_bound(self):
+        fake = FakeClock()
+        probe = app_ready.ReadyProbe([lambda: False], 0.4,
+                                     fake.clock, fake.sleep)
+        ready, elapsed = probe.wait(1.0)
+        self.assertFalse(ready)
+        self.assertAlmostEqual(elapsed, 1.0)
+        self.assertAlmostEqual(fake.sleeps[-1], 0.2)
+
+    def test_check_error_is_not_ready(self):
+        fake = FakeClock()
+
+        def broken():
+            raise RuntimeError("poco service is restarting")
+
+        probe = app_ready.ReadyProbe([broken], 0.5, fake.clock, fake.sleep)
+        self.assertFalse(probe.wait(1)[0])
+
+    def test_hierarchy_stable(self):
+        stable = app_ready.HierarchyStable(FakePoco(changes=3))
+        self.assertEqual([stable() for _ in range(5)],
+                         [False, False, False, True, True])
+
+    def test_check_timeout_bounded(self):
+        from flybirds.utils import adb_channel
+
+        with mock.patch.object(adb_channel, "shell",
+                               return_value=(0, "com.example/.Main")) as shell:
+            check = app_ready.foreground_check(
+                "d1", "com.example", app_ready.get_deadline(2))
+            self.assertTrue(check())
+            self.assertLessEqual(shell.call_args.kwargs["timeout"], 2)
+            check = app_ready.package_removed_check(
+                "d1", "com.example", app_ready.get_deadline(-1))
+            check()
+            self.assertEqual(shell.call_args.kwargs["timeout"],
+                             app_ready.MIN_CHECK_TIMEOUT)
+
+    def test_wait_ready_records_saving(self):
+        with mock.patch.object(app_ready.time, "sleep") as sleep:
+            app_ready.wait_ready("app_start", [lambda: True], 6)
+            sleep.assert_not_called()
+        stats = app_ready.get_stats()
+        self.assertEqual(stats.probes, 1)
+        self.assertGreater(stats.scenario_saved, 5.9)
+        self.assertGreater(stats.end_scenario(), 5.9)
+        self.assertEqual(stats.scenario_saved, 0.0)
+        self.assertGreater(stats.total_saved, 5.9)
+
+    def test_disabled_probe_sleeps(self):
+        gr.get_value("configManage").frame_info.app_ready_probe = "false"
+        with mock.patch.object(app_ready.time, "sleep") as sleep:
+            app_ready.wait_ready("app_start", [lambda: True], 6)
+            sleep.assert_called_once_with(6.0)
+        with mock.patch.object(app_ready.time, "sleep") as sleep:
+            app_ready.wait_stable(None, None)
+            sleep.assert_not_called()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+attachment sidecar unit test
+"""
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest import main
+
+import flybirds.core.global_resource as gr
+from flybirds.report import attachment
+from flybirds.report import fail_feature_create
+from flybirds.report import json_format_deal
+
+
+class FakeScenario:
+    def __init__(self, location):
+        self.location = location
+        self.description = []
+
+
+def make_report(status):
+    return [{
+        "keyword": "Feature",
+        "name": "feature",
+        "location": "features/a.feature:1",
+        "status": status,
+        "elements": [{
+            "type": "scenario",
+            "keyword": "Scenario",
+            "name": "scenario",
+            "tags": [],
+            "location": "features/a.feature:3",
+            "status": status,
+            "description": ["initialization description_"],
+            "steps": [
+                {"keyword": "Given", "name": "start app",
+                 "result": {"status": "passed", "duration": 1.0}},
+                {"keyword": "Then", "name": "check page",
+                 "result": {"status": status, "duration": 1.0}},
+            ],
+        }],
+    }]
+
+
+class AttachmentTest(TestCase):
+    """
+    attachment test
+    """
+
+    def setUp(self):
+        gr.init_glb()
+        self.report_dir = tempfile.mkdtemp()
+        self.report_path = os.path.join(self.report_dir, "a.json")
+        with open(self.report_path, "w", encoding="utf-8") as f:
+            json.dump(make_report("passed"), f)
+        self.store = attachment.AttachmentStore(
+            attachment.get_sidecar_path(self.report_path))
+        gr.set_value("attachmentStore", self.store)
+
+    def tearDown(self):
+        self.store.close()
+        gr.set_value("attachmentStore", None)
+        shutil.rmtree(self.report_dir, ignore_errors=True)
+
+    def test_add_record(self):
+        png_path = os.path.join(self.report_dir, "a.png")
+        with open(png_path, "wb") as f:
+            f.write(b"1234")
+        scenario = FakeScenario("features/a.feature:3")
+        attachment.add_attachment(scenario, 1, '<image src="a.png" />',
+                                  "image/png", png_path)
+        self.assertEqual(scenario.description, [])
+        records = attachment.load_records(self.store.path)
+        record = records["features/a.feature:3"][0]
+        self.assertEqual(record["step_index"], 1)
+        self.assertEqual(record["mime_type"], "image/png")
+        self.assertEqual(record["size"], 4)
+
+    def test_fallback_to_description(self):
+        gr.set_value("attachmentStore", None)
+        scenario = FakeScenario("features/a.feature:3")
+        attachment.add_attachment(scenario, 0, "<p>a, b</p>")
+        self.assertEqual(scenario.description,
+                         ["embeddingsTags, stepIndex=0, <p>a, b</p>"])
+
+    def test_merge_once(self):
+        scenario = FakeScenario("features/a.feature:3")
+        attachment.add_attachment(scenario, 1, "<p>a, b</p>")
+        attachment.add_attachment(scenario, 5, "<p>out of range</p>")
+        for _ in range(2):
+            merged, error = json_format_deal.parse_report_file(
+                self.report_dir, "a.json", None, "android", False)
+            self.assertTrue(merged)
+            self.assertIsNone(error)
+        with open(self.report_path, "r", encoding="utf-8") as f:
+            steps = json.load(f)[0]["elements"][0]["steps"]
+        self.assertNotIn("embeddings", steps[0])
+        self.assertEqual(steps[1]["embeddings"],
+                         [{"mime_type": "text/html", "data": "<p>a, b</p>"}])
+
+    def test_rerun_keeps_attachments(self):
+        with open(self.report_path, "w", encoding="utf-8") as f:
+            json.dump(make_report("failed"), f)
+        scenario = FakeScenario("features/a.feature:3")
+        attachment.add_attachment(scenario, 1, "<video></video>",
+                                  "video/mp4")
+        features, _ = fail_feature_create.extract_rerun_file(
+            self.report_dir, "a.json")
+        records = features[0]["scenarios"][0]["attachments"]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["mime_type"], "video/mp4")
+        self.assertFalse(os.path.exists(self.store.path))
+
+
+if __name__ == "__main__":
+    main()
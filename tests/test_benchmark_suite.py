@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+benchmark suite unit test
+"""
+from unittest import TestCase
+from unittest import main
+
+from benchmarks import suite
+
+
+def result(**medians):
+    return {"cases": {
+        name: {"skipped": "no opencv"} if median is None
+        else {"median": median, "min": median}
+        for name, median in medians.items()}}
+
+
+class BenchmarkSuiteTest(TestCase):
+    """
+    benchmark suite test
+    """
+
+    def test_compare(self):
+        rows = suite.compare(result(a=1.0, b=1.0, c=1.0, d=None, e=1.0),
+                             result(a=1.1, b=1.5, c=0.5, d=None),
+                             0.2)
+        self.assertEqual([(row[0], row[4]) for row in rows], [
+            ("a", "ok"), ("b", "regression"), ("c", "faster"),
+            ("d", "skipped"), ("e", "skipped")])
+
+    def test_run_selected_case(self):
+        cases = suite.run_cases(["poco"], repeat=1)["cases"]
+        self.assertEqual(list(cases),
+                         ["poco.hierarchy_table", "poco.snap_find"])
+        self.assertGreater(cases["poco.snap_find"]["median"], 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+config_snapshot unit test
+"""
+import json
+import os
+import tempfile
+import time
+from unittest import TestCase
+from unittest import main
+
+from flybirds.core import config_snapshot
+from flybirds.core.config_manage import ConfigManage
+
+
+class ConfigSnapshotTest(TestCase):
+    """
+    ConfigSnapshot dump and load test
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.base_dir = self.tmp_dir.name
+        self.path = os.path.join(self.base_dir, "snapshot.pkl")
+        os.makedirs(os.path.join(self.base_dir, "config"))
+        os.makedirs(os.path.join(self.base_dir, "interfaceIgnoreConfig"))
+        self.write("config/flybirds_config.json", {
+            "device_info": {"deviceId": "127.0.0.1:5555",
+                            "platform": "android"},
+            "frame_info": {"waitEleTimeout": 20},
+        })
+        self.write("config/ele_locator.json", {"login": "text=login"})
+        self.write("interfaceIgnoreConfig/test.json", {"service": ["a"]})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, name, data):
+        with open(os.path.join(self.base_dir, name), "w") as f:
+            json.dump(data, f)
+
+    def test_dump_and_load(self):
+        dumped = config_snapshot.dump(self.base_dir, self.path)
+        loaded = config_snapshot.load(self.base_dir, self.path)
+        self.assertIsNotNone(loaded)
+        self.assertEqual(dumped.digest, loaded.digest)
+        self.assertEqual(loaded.sections["frame_info"]["waitEleTimeout"], 20)
+        self.assertEqual(loaded.ele_locator, {"login": "text=login"})
+        self.assertEqual(loaded.ignore_nodes, {"service": ["a"]})
+        self.assertRaises(AttributeError, setattr, loaded, "digest", "x")
+
+    def test_source_change_invalidates(self):
+        config_snapshot.dump(self.base_dir, self.path)
+        time.sleep(0.01)
+        self.write("interfaceIgnoreConfig/other.json", {"other": []})
+        self.assertIsNone(config_snapshot.load(self.base_dir, self.path))
+
+    def test_config_manage_from_snapshot(self):
+        snapshot = config_snapshot.dump(self.base_dir, self.path)
+        config_manage = ConfigManage({}, snapshot)
+        self.assertEqual(config_manage.frame_info.wait_ele_timeout, 20)
+        self.assertEqual(config_manage.device_info.device_id,
+                         "127.0.0.1:5555")
+        self.assertEqual(
+            config_manage.ele_locator_info.all_ele_locator["login"],
+            "text=login")
+
+
+if __name__ == "__main__":
+    main()
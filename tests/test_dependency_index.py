@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+feature dependency index unit test
+"""
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from unittest import TestCase
+from unittest import main
+
+from flybirds.core import dependency_index
+
+FEATURE = """# language: en
+Feature: search
+
+  Background:
+    Given go to url[searchPage]
+
+  Scenario: search a hotel
+    When open service [hotelList] bind mockCase[1001]
+    And click[searchButton]
+    Then compare service request [hotelList] with json file [compareData/hotel.json]
+
+  Scenario: open the detail
+    When click[[data-id='detail'], timeout=5]
+    Then element[detailTitle]exist
+
+  Scenario Outline: filter
+    When click[<filter>]
+    Examples:
+      | filter      |
+      | priceFilter |
+      | starFilter  |
+"""
+
+OTHER_FEATURE = """# language: en
+Feature: login
+
+  Scenario: login
+    When click[loginButton]
+"""
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content if isinstance(content, str) else json.dumps(content))
+
+
+def git(*args):
+    subprocess.run(["git", *args], check=True, stdout=subprocess.PIPE,
+                   stderr=subprocess.PIPE)
+
+
+class DependencyIndexTest(TestCase):
+    """
+    dependency index test
+    """
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp_dir = tempfile.mkdtemp()
+        os.chdir(self.tmp_dir)
+        write("features/search.feature", FEATURE)
+        write("features/login.feature", OTHER_FEATURE)
+        write("config/ele_locator.json",
+              {"searchButton": "#search", "loginButton": "#login",
+               "starFilter": ".star"})
+        write("config/schema_url.json", {"searchPage": "https://a.test/s"})
+        write("mockCaseData/hotel.json", {"1001": {"list": []}})
+        write("compareData/hotel.json", {"list": []})
+        git("init", "-q")
+        git("add", ".")
+        git("-c", "user.name=test", "-c", "user.email=test@test", "commit",
+            "-q", "-m", "base")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def select(self, feature_path="features"):
+        scenarios = dependency_index.index_features(feature_path)
+        changes = dependency_index.collect_changes("HEAD", feature_path)
+        return scenarios, changes, {
+            scenario.name: reasons for scenario, reasons in
+            dependency_index.select(scenarios, changes)}
+
+    def test_step_params(self):
+        self.assertEqual(
+            dependency_index.step_params(
+                "click[[data-id='detail'], timeout=5] and [a,b]"),
+            ["[data-id='detail'], timeout=5", "a,b"])
+        self.assertIn("b", dependency_index.param_tokens("a, b"))
+
+    def test_locator_and_mock_changes(self):
+        write("config/ele_locator.json",
+              {"searchButton": "#search-v2", "loginButton": "#login",
+               "starFilter": ".star"})
+        write("mockCaseData/hotel.json", {"1001": {"list": [1]}})
+        scenarios, changes, selected = self.select()
+        self.assertFalse(changes.full_run)
+        self.assertEqual(selected, {
+            "search a hotel": ["ele_locator:searchButton",
+                               "mock_case:1001"]})
+        report = dependency_index.selection_report(
+            changes, scenarios, dependency_index.select(scenarios, changes))
+        self.assertEqual((report["total"], report["selected"],
+                          report["skipped"]), (4, 1, 3))
+        self.assertEqual(report["scenarios"][0]["location"],
+                         os.path.join("features", "search.feature") + ":7")
+
+    def test_background_outline_and_data_file(self):
+        write("config/schema_url.json", {"searchPage": "https://b.test/s"})
+        _, _, selected = self.select()
+        self.assertEqual(len(selected), 3)
+        git("checkout", "--", "config/schema_url.json")
+        write("config/ele_locator.json",
+              {"searchButton": "#search", "loginButton": "#login",
+               "starFilter": ".star-v2"})
+        write("compareData/hotel.json", {"list": [2]})
+        _, _, selected = self.select()
+        self.assertEqual(selected, {
+            "search a hotel": ["file:compareData/hotel.json"],
+            "filter": ["ele_locator:starFilter"]})
+
+    def test_feature_and_code_changes(self):
+        write("features/login.feature", OTHER_FEATURE + "\n")
+        _, changes, selected = self.select()
+        self.assertEqual(selected, {"login": ["feature"]})
+        write("pscript/custom_handle/operation.py", "def login(): pass\n")
+        _, changes, _ = self.select()
+        self.assertTrue(changes.full_run)
+
+    def test_absolute_feature_path(self):
+        write("features/login.feature", OTHER_FEATURE + "\n")
+        feature_path = os.path.join(os.getcwd(), "features")
+        scenarios, _, selected = self.select(feature_path)
+        self.assertEqual(selected, {"login": ["feature"]})
+        self.assertIn(os.path.join("features", "login.feature"),
+                      {scenario.filename for scenario in scenarios})
+        write("features/shared/steps.txt", "notes\n")
+        _, changes, _ = self.select(feature_path)
+        self.assertTrue(changes.full_run)
+
+
+if __name__ == "__main__":
+    main()
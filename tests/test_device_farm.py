@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+device farm unit test
+"""
+import base64
+from unittest import TestCase
+from unittest import main
+
+from flybirds.core.config_manage import parse_device_list, parse_screen_size
+from flybirds.report import device_farm
+
+
+def make_devices(*device_ids):
+    return [device_farm.FarmDevice(device_id) for device_id in device_ids]
+
+
+def make_features(count):
+    return [f"features/f{i}.feature" for i in range(count)]
+
+
+class DeviceFarmTest(TestCase):
+    """
+    device farm scheduler test with the fake device backend
+    """
+
+    def run_farm(self, backend, devices, features, **kwargs):
+        farm = device_farm.DeviceFarm(backend, devices, backend.run_feature,
+                                      **kwargs)
+        return farm.run(features)
+
+    def test_features_spread_over_devices(self):
+        backend = device_farm.FakeDeviceBackend(
+            sizes={"a": [1080, 2400]}, failing={"features/f3.feature"},
+            duration=0.01)
+        devices = make_devices("a", "b", "c")
+        features = make_features(9)
+        results = self.run_farm(backend, devices, features)
+        self.assertEqual(sorted(results), sorted(features))
+        self.assertEqual(results["features/f3.feature"][0], device_farm.FAILED)
+        self.assertEqual(
+            len([r for r in results.values() if r[0] == device_farm.PASSED]), 8)
+        self.assertEqual(sum(len(d.features) for d in devices), 9)
+        self.assertTrue(all(len(d.features) > 0 for d in devices))
+        self.assertEqual(devices[0].screen_size, [1080, 2400])
+
+    def test_requeue_from_dropped_device(self):
+        backend = device_farm.FakeDeviceBackend(drop_after={"b": 2},
+                                                duration=0.01)
+        devices = make_devices("a", "b")
+        features = make_features(6)
+        results = self.run_farm(backend, devices, features)
+        self.assertTrue(all(status == device_farm.PASSED
+                            for status, _ in results.values()))
+        self.assertFalse(devices[1].online)
+        self.assertEqual(len(devices[1].features), 1)
+        self.assertEqual(len(devices[0].features), 5)
+        # the dropped feature ran once on b and again on a
+        dropped = [f for d, f in backend.runs if d == "b"][1]
+        self.assertEqual(results[dropped], (device_farm.PASSED, "a"))
+
+    def test_offline_device_skipped(self):
+        backend = device_farm.FakeDeviceBackend()
+        backend.offline.add("b")
+        devices = make_devices("a", "b")
+        results = self.run_farm(backend, devices, make_features(3))
+        self.assertEqual({device_id for _, device_id in results.values()},
+                         {"a"})
+        self.assertEqual([d for d, _ in backend.runs], ["a"] * 3)
+
+    def test_all_devices_lost(self):
+        backend = device_farm.FakeDeviceBackend(drop_after={"a": 1, "b": 1})
+        results = self.run_farm(backend, make_devices("a", "b"),
+                                make_features(4), max_requeue=5)
+        statuses = sorted(status for status, _ in results.values())
+        self.assertEqual(statuses, [device_farm.NOT_RUN] * 4)
+        self.assertEqual(len(backend.runs), 2)
+
+    def test_requeue_limit(self):
+        backend = device_farm.FakeDeviceBackend(
+            drop_after={"a": 1, "b": 1, "c": 1})
+        results = self.run_farm(backend, make_devices("a", "b", "c"),
+                                make_features(1), max_requeue=1)
+        self.assertEqual(results["features/f0.feature"][0],
+                         device_farm.FAILED)
+        self.assertEqual(len(backend.runs), 2)
+
+    def test_behave_cmd(self):
+        runner = device_farm.BehaveRunner(
+            "behave features -f json -o report/x/report.json --no-color",
+            "features")
+        device = device_farm.FarmDevice("10.0.0.2:5555", [1080, 2400])
+        cmd, report_path = runner.device_cmd(device,
+                                             "features/demo/a.feature")
+        self.assertTrue(cmd.startswith("behave features/demo/a.feature "))
+        self.assertTrue(report_path.startswith("report/x/a.10_0_0_2_5555."))
+        self.assertIn(report_path, cmd)
+        encoded = base64.b64encode(b"1080x2400").decode("utf-8")
+        self.assertIn(f"--define screenSize={encoded}", cmd)
+        encoded = base64.b64encode(b"10.0.0.2:5555").decode("utf-8")
+        self.assertIn(f"--define deviceId={encoded}", cmd)
+
+    def test_parse_device_config(self):
+        self.assertEqual(parse_screen_size("1080x2400"), [1080, 2400])
+        self.assertEqual(parse_screen_size([720, 1280]), [720, 1280])
+        self.assertIsNone(parse_screen_size("wide"))
+        devices = parse_device_list(
+            ["a", {"deviceId": "b", "screenSize": "720*1280"}, "a"])
+        self.assertEqual([d["deviceId"] for d in devices], ["a", "b"])
+        self.assertEqual(devices[1]["screenSize"], [720, 1280])
+        self.assertEqual(len(parse_device_list("a, b")), 2)
+        self.assertEqual(parse_device_list(None), [])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+dsl_helper params unit test
+"""
+import pickle
+import random
+import re
+from unittest import TestCase
+from unittest import main
+from unittest import mock
+
+from flybirds.core.plugin.plugins.default.screen import BaseScreen
+from flybirds.core.plugin.plugins.default.step import common
+from flybirds.utils import dsl_helper
+
+LEGACY_PATTERN = re.compile(r"([\S\s]+),\s*([a-zA-Z0-9_]+)\s*=\s*(\S+)")
+
+
+class ParamsToDicTest(TestCase):
+    """
+    params_to_dic test
+    """
+
+    def test_items(self):
+        result = dsl_helper.params_to_dic(
+            "text=freshmode, timeout=15, swipeCount=40")
+        self.assertEqual(result, {"swipeCount": "40", "timeout": "15",
+                                  "selector": "text=freshmode"})
+        result = dsl_helper.params_to_dic("15", "swipeNumber")
+        self.assertEqual(result, {"swipeNumber": "15"})
+        self.assertEqual(dsl_helper.params_to_dic(None), {})
+
+    def test_same_as_legacy_pattern(self):
+        alphabet = list("ab=, ​\n_x1") + [", k=", ",t = ", "=v"]
+        rand = random.Random(1)
+        for _ in range(20000):
+            text = "".join(rand.choice(alphabet)
+                           for _ in range(rand.randint(0, 14)))
+            legacy = dsl_helper.add_res_dic(text, LEGACY_PATTERN, "selector")
+            result = dsl_helper.tokenize_params(text, "selector")
+            self.assertEqual(list(legacy.items()), list(result.items()),
+                             repr(text))
+
+    def test_placeholder(self):
+        result = dsl_helper.params_to_dic(
+            "text=a@@空格@@b@#@换行#符号@#@c, timeout=5")
+        self.assertEqual(result["selector"], "text=a b\nc")
+
+    def test_cached_read_only(self):
+        first = dsl_helper.params_to_dic("text=cache, timeout=3")
+        second = dsl_helper.params_to_dic("text=cache, timeout=3")
+        self.assertIs(first, second)
+        with self.assertRaises(TypeError):
+            first["timeout"] = "4"
+        with self.assertRaises(TypeError):
+            first.pop("timeout")
+        copied = dict(first)
+        copied["timeout"] = "4"
+        self.assertEqual(first["timeout"], "3")
+        self.assertEqual(pickle.loads(pickle.dumps(first)), first)
+
+    def test_ocr_gap_param(self):
+        # the ocr step adds the gap of the selector to its own copy
+        context = mock.Mock(cur_step_index=1)
+        with mock.patch.object(BaseScreen, "screen_link_to_behave",
+                               return_value="screen.png"), \
+                mock.patch.object(BaseScreen, "image_ocr") as image_ocr:
+            common.ocr(context, "right_gap_max=0.3")
+            common.ocr(context, "right_gap_max=0.3")
+        image_ocr.assert_called_with("screen.png", 0.3, None, None, None)
+        self.assertNotIn("right_gap_max",
+                         dsl_helper.params_to_dic("right_gap_max=0.3"))
+
+
+if __name__ == "__main__":
+    main()
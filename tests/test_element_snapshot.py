@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+web element snapshot unit test
+"""
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest import main
+
+import flybirds.core.global_resource as gr
+from flybirds.core.plugin.plugins.default.web import element_snapshot
+from flybirds.core.plugin.plugins.default.web.element import Element
+
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+
+    def evaluate(self, script, timeout=None):
+        self.page.evaluates.append((self.selector, timeout))
+        return self.page.elements[self.selector]
+
+
+class FakePage:
+    def __init__(self, elements):
+        self.elements = elements
+        self.evaluates = []
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+
+class ElementSnapshotTest(TestCase):
+    """
+    element snapshot test
+    """
+
+    def setUp(self):
+        gr.init_glb()
+        gr.set_value("configManage", SimpleNamespace(
+            frame_info=SimpleNamespace(wait_ele_timeout=10)))
+        self.page = FakePage({
+            "#price": {"text": "¥ 99", "value": None,
+                       "attributes": {"class": "price red", "data-id": "7",
+                                      "tabindex": "0", "viewBox": "0 0 8 8"},
+                       "visible": True,
+                       "box": {"x": 1, "y": 2, "width": 30, "height": 10}},
+            "#name": {"text": "", "value": "tom",
+                      "attributes": {"type": "text"}, "visible": True},
+        })
+        gr.set_value("plugin_page", SimpleNamespace(page=self.page))
+        self.ele = Element()
+
+    def tearDown(self):
+        gr.init_glb()
+
+    def test_one_evaluate_per_step(self):
+        self.ele.ele_exist(None, "#price")
+        self.ele.ele_text_equal(None, "#price", "¥ 99")
+        self.ele.ele_text_include(None, "#price", "99")
+        self.ele.is_ele_attr_equal(None, "#price", "data-id", "7")
+        self.ele.is_ele_attr_container(None, "#price", "class", "red")
+        self.assertEqual(self.page.evaluates, [("#price", 10000.0)])
+        element_snapshot.clear()
+        self.ele.ele_exist(None, "#price")
+        self.assertEqual(len(self.page.evaluates), 2)
+
+    def test_value_and_text_fallback(self):
+        self.assertEqual(self.ele.get_ele_text("#name"), "tom")
+        self.ele.ele_exist_value(None, "#name", "tom")
+        self.assertIsNone(self.ele.get_ele_attr("#name", "value"))
+        snapshot = self.ele.get_ele_snapshot("#price")
+        self.assertTrue(snapshot.visible)
+        self.assertEqual(snapshot.box["width"], 30)
+        self.assertEqual(len(self.page.evaluates), 2)
+
+    def test_mixed_case_attribute(self):
+        self.assertEqual(self.ele.get_ele_attr("#price", "tabIndex"), "0")
+        self.ele.is_ele_attr_equal(None, "#price", "Data-Id", "7")
+        self.ele.is_ele_attr_container(None, "#price", "CLASS", "red")
+        # names of svg attributes keep their case
+        self.assertEqual(self.ele.get_ele_attr("#price", "viewBox"),
+                         "0 0 8 8")
+
+    def test_missing_element_is_not_cached(self):
+        with self.assertRaises(KeyError):
+            self.ele.ele_exist(None, "#missing")
+        self.page.elements["#missing"] = {"text": "late"}
+        self.assertEqual(self.ele.get_ele_text("#missing"), "late")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,42 @@
 """
 test_fail_feature_create unit test
 """
+import json
+import os
+import tempfile
 from unittest import TestCase
 from unittest import main
 
 from flybirds.report import fail_feature_create
+from flybirds.report import json_format_deal
+
+
+def make_feature(index, status):
+    return {
+        "keyword": "Feature",
+        "name": f"feature {index}",
+        "language": "en",
+        "tags": [],
+        "location": f"features/feature{index}.feature:1",
+        "status": status,
+        "elements": [{
+            "type": "scenario",
+            "keyword": "Scenario",
+            "name": f"scenario {index}",
+            "tags": ["smoke"],
+            "location": f"features/feature{index}.feature:3",
+            "status": status,
+            "description": [
+                "initialization description_",
+                "embeddingsTags, stepIndex=0, <image src=\"a.png\" />",
+            ],
+            "steps": [{
+                "keyword": "Given",
+                "name": "start app",
+                "result": {"status": status, "duration": 1.0},
+            }],
+        }],
+    }
 
 
 class FailFeatureCreateTest(TestCase):
@@ -24,6 +56,40 @@ class FailFeatureCreateTest(TestCase):
 
         self.assertEqual(result, False)
 
+    def test_extract_and_parse_report(self):
+        with tempfile.TemporaryDirectory() as report_dir:
+            for index in range(5):
+                status = "failed" if index == 0 else "passed"
+                with open(os.path.join(report_dir, f"f{index}.json"),
+                          "w") as f:
+                    json.dump([make_feature(index, status)], f)
+            result = fail_feature_create.create_rerun(
+                report_dir, report_dir, 1, 1.0, "android", False)
+            self.assertTrue(result)
+            rerun_dir = os.path.join(report_dir, "rerun1")
+            with open(os.path.join(rerun_dir, "feature0.feature"),
+                      encoding="utf-8") as f:
+                feature_text = f.read()
+            self.assertIn("Scenario: scenario 0", feature_text)
+            self.assertIn("Given start app", feature_text)
+            with open(os.path.join(rerun_dir, "fail_relevance.json")) as f:
+                relevance = list(json.load(f).values())
+            self.assertIn("embeddingsTags",
+                          json.loads(relevance[0])["description"][1])
+
+            json_format_deal.parse_json_data({"cur_platform": "android"},
+                                             report_dir)
+            for index in range(5):
+                with open(os.path.join(report_dir, f"f{index}.json")) as f:
+                    feature = json.load(f)[0]
+                scenario = feature["elements"][0]
+                self.assertEqual(feature["platform"], "android")
+                self.assertEqual(scenario["description"], [])
+                self.assertEqual(scenario["steps"][0]["embeddings"][0]["data"],
+                                 "<image src=\"a.png\" />")
+                self.assertEqual(scenario["status"],
+                                 "failed" if index == 0 else "passed")
+
 
 if __name__ == "__main__":
     main()
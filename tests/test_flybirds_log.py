@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+flybirds_log unit test
+"""
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest import main
+from unittest import mock
+
+from flybirds.utils import flybirds_log as log
+
+
+class FlybirdsLogTest(TestCase):
+    """
+    flybirds_log test
+    """
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.old_stream = log.ch.setStream(self.stream)
+        self.old_level = log.ch.level
+        log.ch.setLevel(logging.INFO)
+
+    def tearDown(self):
+        log.flush()
+        log.ch.setStream(self.old_stream)
+        log.ch.setLevel(self.old_level)
+
+    def test_level_check_before_render(self):
+        calls = []
+
+        def render(value):
+            calls.append(value)
+            return f"rendered {value}"
+
+        log.debug(log.lazy(render, 1))
+        log.info(log.lazy(render, 2))
+        log.flush()
+        self.assertEqual(calls, [2])
+        self.assertIn("rendered 2", self.stream.getvalue())
+        self.assertNotIn("rendered 1", self.stream.getvalue())
+        self.assertEqual(log.logger.level, logging.INFO)
+
+    def test_disabled_level_skips_debug_console(self):
+        with mock.patch.object(log.gr, "get_value") as get_value:
+            log.debug("not logged")
+            get_value.assert_not_called()
+            log.info("logged")
+            get_value.assert_called_once_with("debug", False)
+
+    def test_render_in_caller(self):
+        data = {"a": 1}
+        log.info(log.lazy(str, data))
+        data["a"] = 2
+        log.flush()
+        self.assertIn("{'a': 1}", self.stream.getvalue())
+
+    def test_json_lines(self):
+        log_dir = tempfile.mkdtemp()
+        handler = log.enable_json_log(log_dir)
+        try:
+            log.info("json line", {"k": "值"})
+            log.debug("not written")
+            log.flush()
+        finally:
+            log.remove_handler(handler)
+            handler.close()
+        try:
+            path = os.path.join(log_dir, f"flybirds-{os.getpid()}.jsonl")
+            with open(path, "r", encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual([line["message"] for line in lines],
+                             ["json line", "{'k': '值'}"])
+            self.assertEqual(lines[0]["level"], "INFO")
+            self.assertEqual(lines[0]["pid"], os.getpid())
+        finally:
+            shutil.rmtree(log_dir, ignore_errors=True)
+
+    def test_sampled(self):
+        result = [log.sampled("test_sampled", 3) for _ in range(7)]
+        self.assertEqual(result, [True, False, False, True, False, False,
+                                  True])
+
+
+if __name__ == "__main__":
+    main()
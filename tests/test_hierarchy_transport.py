@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+poco hierarchy table and dump cache unit test
+"""
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest import main
+from unittest import mock
+
+import flybirds.core.global_resource as gr
+from flybirds.core.plugin.plugins.default.step import swipe
+from flybirds.core.plugin.plugins.default.ui_driver.poco import findsnap
+from flybirds.core.plugin.plugins.default.ui_driver.poco import \
+    hierarchy_transport
+from flybirds.core.plugin.plugins.default.ui_driver.poco import swipe_probe
+
+
+def make_dump():
+    return {"name": "<Root>", "payload": {"pos": [0.5, 0.5]}, "children": [
+        {"name": "list", "payload": {"text": "", "pos": [0.5, 0.4],
+                                     "package": "com.example"},
+         "children": [
+             {"name": "item", "payload": {"text": "hotel\u200b 1",
+                                          "pos": [0.5, 0.1]},
+              "children": {"name": "item", "payload": {"text": "hotel 1"}}},
+             {"name": "item", "payload": {"text": "hotel 2",
+                                          "visible": False,
+                                          "pos": [0.5, 0.2]}}]},
+        {"name": "com.example:id/book", "payload": {
+            "name": "com.example:id/book", "text": "Book",
+            "pos": [0.5, 0.9]}}]}
+
+
+class FakePoco:
+
+    def __init__(self):
+        self.dumps = 0
+        self.clicks = []
+        self.agent = SimpleNamespace(
+            hierarchy=SimpleNamespace(dump=self.dump),
+            input=SimpleNamespace(click=self.click,
+                                  getTouchDownDuration=lambda: 0.01))
+
+    def click(self, x, y):
+        self.clicks.append((x, y))
+
+    def dump(self):
+        self.dumps += 1
+        return make_dump()
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class HierarchyTransportTest(TestCase):
+    """
+    hierarchy transport test
+    """
+
+    def setUp(self):
+        gr.init_glb()
+        gr.set_value("configManage", SimpleNamespace(
+            frame_info=SimpleNamespace(hierarchy_cache_ttl=0.5),
+            device_info=SimpleNamespace(device_id="d1")))
+
+    def tearDown(self):
+        gr.init_glb()
+        findsnap.clear_snap()
+
+    def test_table(self):
+        table = hierarchy_transport.HierarchyTable(make_dump())
+        self.assertEqual(len(table), 6)
+        self.assertEqual(table.parents, [-1, 0, 1, 2, 1, 0])
+        self.assertEqual(list(table.children(0)), [1, 5])
+        self.assertEqual(table.find(name="item"), [2, 4])
+        self.assertEqual(table.find(text="hotel 1"), [2])
+        self.assertEqual(table.find(text_matches=r"hotel \d"), [3, 4])
+        self.assertEqual(table.find(), [])
+        # attributes outside the table are dropped
+        self.assertNotIn("package", table.node(1)["payload"])
+        self.assertEqual(table.node(2)["children"][0]["payload"],
+                         {"text": "hotel 1"})
+        self.assertEqual(table.fingerprint(),
+                         swipe_probe.hierarchy_fingerprint(make_dump()))
+        self.assertIsNone(hierarchy_transport.HierarchyTable({}).fingerprint())
+
+    def test_snap_find(self):
+        findsnap.__SOURCE__ = make_dump()
+        found = findsnap.snap_find(None, {"text": "hotel 1"})
+        self.assertEqual([node["name"] for node in found], ["item"])
+        self.assertEqual(found[0]["payload"]["pos"], [0.5, 0.1])
+        self.assertIsNone(findsnap.snap_find(None, {"name": "missing"}))
+
+    def test_find_payload(self):
+        table = hierarchy_transport.HierarchyTable(make_dump())
+        payload = swipe.find_payload_with_resource_id(
+            table, "element=com.example:id/book")
+        self.assertEqual(payload["pos"], [0.5, 0.9])
+        self.assertEqual(payload, swipe.find_payload_with_resource_id(
+            make_dump(), "element=com.example:id/book"))
+        self.assertIsNone(table.find_payload("missing"))
+
+    @mock.patch.object(hierarchy_transport, "is_size_reported",
+                       return_value=False)
+    def test_cache(self, is_size_reported):
+        clock = FakeClock()
+        transport = hierarchy_transport.HierarchyTransport(0.5, clock)
+        poco = FakePoco()
+        first = transport.table(poco, "d1")
+        self.assertIs(transport.table(poco, "d1"), first)
+        self.assertIsNot(transport.table(poco, "d2"), first)
+        clock.now = 0.6
+        self.assertIsNot(transport.table(poco, "d1"), first)
+        self.assertIsNot(transport.table(poco, "d1", fresh=True), first)
+        self.assertEqual(poco.dumps, 4)
+        stats = transport.stats["d1"]
+        self.assertEqual((stats["requests"], stats["dumps"], stats["hits"]),
+                         (4, 3, 1))
+        self.assertEqual(stats["nodes"], 18)
+        # the json size is only measured while tracing or debug logging
+        self.assertEqual((stats["bytes"], stats["measured"]), (0, 0))
+        is_size_reported.return_value = True
+        transport.table(poco, "d1", fresh=True)
+        self.assertEqual(stats["bytes"],
+                         hierarchy_transport.dump_size(make_dump()))
+        self.assertEqual(stats["measured"], 1)
+
+        transport.ttl = 0
+        transport.invalidate()
+        transport.table(poco, "d1")
+        transport.table(poco, "d1")
+        self.assertEqual(poco.dumps, 7)
+
+    def test_input_invalidates(self):
+        poco = FakePoco()
+        table = hierarchy_transport.get_table(poco)
+        self.assertIs(hierarchy_transport.get_table(poco), table)
+        poco.agent.input.click(0.5, 0.5)
+        self.assertEqual(poco.clicks, [(0.5, 0.5)])
+        self.assertEqual(poco.agent.input.getTouchDownDuration(), 0.01)
+        self.assertIsNot(hierarchy_transport.get_table(poco), table)
+        self.assertEqual(poco.dumps, 2)
+        self.assertIn("d1", gr.get_value("hierarchyTransport").stats)
+
+    def test_refresh_snap(self):
+        poco = FakePoco()
+        gr.set_value("pocoInstance", poco)
+        findsnap.refresh_snap()
+        findsnap.refresh_snap()
+        # polling for an element needs a new screen within the cache ttl
+        self.assertEqual(poco.dumps, 2)
+        self.assertEqual(findsnap.snap_find(None, {"text": "Book"})[0]["name"],
+                         "com.example:id/book")
+
+
+if __name__ == "__main__":
+    main()
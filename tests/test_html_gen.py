@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+html_gen unit test
+"""
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest import main
+
+from flybirds.report.gen.html_gen import HtmlReportWriter
+
+
+def make_feature(index):
+    return {
+        "keyword": "Feature",
+        "name": f"feature {index}",
+        "location": f"features/f{index}.feature:1",
+        "status": "failed",
+        "elements": [{
+            "type": "scenario",
+            "keyword": "Scenario",
+            "name": f"scenario <{index}>",
+            "status": "failed",
+            "steps": [{
+                "keyword": "Then",
+                "name": "click text[ok]",
+                "result": {"status": "failed", "duration": 1.5,
+                           "error_message": "not found"},
+            }],
+        }],
+    }
+
+
+class HtmlGenTest(TestCase):
+    """
+    HtmlReportWriter test
+    """
+
+    def test_paginated_write(self):
+        with tempfile.TemporaryDirectory() as report_dir:
+            for index in range(5):
+                with open(os.path.join(report_dir, f"{index}.json"),
+                          "w") as f:
+                    json.dump([make_feature(index)], f)
+            writer = HtmlReportWriter(report_dir, "android", page_size=2)
+            self.assertTrue(writer.write())
+            pages = sorted(os.listdir(os.path.join(report_dir, "features")))
+            self.assertEqual(pages, ["page-0001.html", "page-0002.html",
+                                     "page-0003.html"])
+            with open(os.path.join(report_dir, "index.html")) as f:
+                index_html = f.read()
+            self.assertIn("features: 5", index_html)
+            self.assertIn("failed: 5", index_html)
+            with open(os.path.join(report_dir, "features",
+                                   "page-0001.html")) as f:
+                self.assertIn("scenario &lt;0&gt;", f.read())
+            # unchanged json is not rendered again
+            self.assertFalse(writer.write(force=False))
+
+
+if __name__ == "__main__":
+    main()
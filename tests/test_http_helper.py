@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+http helper unit test
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest import main
+from unittest import mock
+
+import flybirds.core.global_resource as gr
+from flybirds.utils import http_helper
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_GET(self):
+        Handler.connections.add(self.client_address)
+        if self.path.startswith("/slow"):
+            time.sleep(0.3)
+        status = 404 if self.path.startswith("/missing") else 200
+        body = json.dumps({"path": self.path}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpHelperTest(TestCase):
+    """
+    http helper test
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        gr.init_glb()
+        gr.set_value("configManage", SimpleNamespace(frame_info=SimpleNamespace(
+            http_timeout=5, http_retries=0, http_pool_size=4)))
+        http_helper.close_session()
+        Handler.connections.clear()
+
+    def tearDown(self):
+        http_helper.close_session()
+        gr.init_glb()
+
+    def test_session_reuses_connection(self):
+        for _ in range(3):
+            self.assertEqual(http_helper.http_get(f"{self.base}/a"),
+                             {"path": "/a"})
+        self.assertIs(http_helper.get_session(), http_helper.get_session())
+        self.assertEqual(len(Handler.connections), 1)
+
+    def test_batch_runs_concurrently(self):
+        calls = [{"method": "get", "url": f"{self.base}/slow/{index}"}
+                 for index in range(4)]
+        start = time.perf_counter()
+        results = http_helper.request_batch(calls)
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual([result.response.json()["path"] for result in results],
+                         [f"/slow/{index}" for index in range(4)])
+        self.assertTrue(all(result.ok for result in results))
+        self.assertTrue(all(result.elapsed >= 0.3 for result in results))
+
+    def test_batch_failures(self):
+        results = http_helper.request_batch([
+            {"method": "GET", "url": f"{self.base}/missing"},
+            {"method": "GET", "url": "http://127.0.0.1:1/refused"},
+            {"method": "GET", "url": f"{self.base}/ok"}])
+        self.assertEqual(results[0].response.status_code, 404)
+        self.assertFalse(results[0].ok)
+        self.assertIsNone(results[1].response)
+        self.assertIsNotNone(results[1].error)
+        self.assertTrue(results[2].ok)
+        self.assertEqual(http_helper.request_batch([]), [])
+
+    def test_null_call_data(self):
+        from flybirds.core.exceptions import FlybirdsException
+        from flybirds.core.plugin.plugins.default.web import interception
+        context = SimpleNamespace(scenario=None, cur_step_index=1)
+        calls = json.dumps([{"url": f"{self.base}/a", "data": None,
+                             "headers": None}])
+        with mock.patch.object(interception, "add_attachment"):
+            results = interception.Interception.call_external_party_apis(
+                context, calls)
+        self.assertTrue(results[0].ok)
+        with self.assertRaises(FlybirdsException):
+            interception.Interception.external_party_call(
+                "GET", f"{self.base}/a", "5", "{}")
+
+
+if __name__ == "__main__":
+    main()
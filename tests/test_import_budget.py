@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+web worker startup import budget
+"""
+import os
+from unittest import TestCase
+from unittest import main
+
+from flybirds.cli import profile_import
+
+# seconds, generous enough for a slow ci machine
+WEB_IMPORT_BUDGET = float(os.environ.get("FLYBIRDS_WEB_IMPORT_BUDGET", "3"))
+
+
+class ImportBudgetTest(TestCase):
+    """
+    import budget test
+    """
+
+    def test_parse_import_time(self):
+        entries = profile_import.parse_import_time(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        150 |   cv2.data\n"
+            "import time:       300 |        450 | cv2\n")
+        self.assertEqual(entries, [("cv2.data", 120, 150), ("cv2", 300, 450)])
+        self.assertEqual(profile_import.heavy_imports(entries), ["cv2"])
+
+    def test_web_startup(self):
+        elapsed, entries = profile_import.profile_imports("web")
+        modules = {name for name, _, _ in entries}
+        self.assertIn("flybirds.core.plugin.plugins.default.web.page",
+                      modules)
+        self.assertEqual(profile_import.heavy_imports(entries), [])
+        self.assertLess(elapsed, WEB_IMPORT_BUDGET)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+network record and replay unit test
+"""
+import os
+import shutil
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest import main
+
+import flybirds.core.global_resource as gr
+from flybirds.core.plugin.plugins.default.web import network_archive
+
+
+class FakeRoute:
+    def __init__(self, method, url, body=None, resource_type="xhr"):
+        self.request = SimpleNamespace(method=method, url=url,
+                                       post_data_buffer=body,
+                                       resource_type=resource_type)
+        self.fulfilled = None
+
+    def fulfill(self, **kwargs):
+        self.fulfilled = kwargs
+
+
+def make_response(method, url, body, status, response_body):
+    return SimpleNamespace(
+        request=SimpleNamespace(method=method, url=url,
+                                post_data_buffer=body, resource_type="fetch"),
+        status=status,
+        headers={"content-type": "application/json", "content-length": "9"},
+        body=lambda: response_body)
+
+
+class NetworkArchiveTest(TestCase):
+    """
+    network archive test
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        gr.init_glb()
+        self.web_info = SimpleNamespace(network_archive="record",
+                                        network_archive_dir=self.tmp_dir)
+        gr.set_value("configManage", SimpleNamespace(web_info=self.web_info))
+
+    def tearDown(self):
+        network_archive.close_archive()
+        gr.init_glb()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_request_key(self):
+        key = network_archive.request_key
+        self.assertEqual(
+            key("get", "https://api.test/list?b=2&a=1&_=1690000000"),
+            key("GET", "https://api.test/list?a=1&b=2&_=1690000099"))
+        self.assertEqual(
+            key("POST", "https://api.test/q", b'{"id": 1, "ts": 5}'),
+            key("POST", "https://api.test/q", '{"ts":6,"id":1}'))
+        self.assertNotEqual(
+            key("POST", "https://api.test/q", b'{"id": 1}'),
+            key("POST", "https://api.test/q", b'{"id": 2}'))
+        self.assertNotEqual(key("GET", "https://api.test/q"),
+                            key("GET", "https://cdn.test/q"))
+
+    def test_record_and_replay(self):
+        network_archive.open_archive("features/search.feature")
+        url = "https://api.test/search?q=phone"
+        for index in range(2):
+            network_archive.record_response(make_response(
+                "POST", url, b'{"page": 1}', 200,
+                f'{{"n":{index}}}'.encode()))
+        network_archive.record_response(make_response(
+            "GET", "https://api.test/redirect", None, 302, b""))
+        network_archive.close_archive()
+        base = os.path.join(self.tmp_dir, "chromium", "features", "search")
+        self.assertTrue(os.path.isfile(base + network_archive.INDEX_SUFFIX))
+
+        self.web_info.network_archive = "replay"
+        archive = network_archive.open_archive("features/search.feature")
+        self.assertEqual(len(archive.index), 1)
+        bodies = []
+        for _ in range(3):
+            route = FakeRoute("POST", url, b'{"page":1}')
+            self.assertTrue(network_archive.fulfill(route))
+            bodies.append(route.fulfilled["body"])
+            self.assertEqual(route.fulfilled["status"], 200)
+            self.assertNotIn("content-length", route.fulfilled["headers"])
+        # recorded order, the last response is repeated
+        self.assertEqual(bodies, [b'{"n":0}', b'{"n":1}', b'{"n":1}'])
+
+        miss = FakeRoute("POST", url, b'{"page":2}')
+        self.assertFalse(network_archive.fulfill(miss))
+        self.assertIsNone(miss.fulfilled)
+        document = FakeRoute("GET", url, resource_type="document")
+        self.assertFalse(network_archive.fulfill(document))
+        self.assertEqual((archive.hits, archive.misses), (3, 1))
+
+    def test_archive_path(self):
+        path = network_archive.archive_path
+        self.assertNotEqual(path("features/a/search.feature"),
+                            path("features/b/search.feature"))
+        chromium = path("features/a/search.feature")
+        gr.set_value("cur_browser", "firefox")
+        self.assertEqual(path("features/a/search.feature"), os.path.join(
+            self.tmp_dir, "firefox", "features", "a", "search"))
+        self.assertNotEqual(path("features/a/search.feature"), chromium)
+        outside = path(os.path.join(os.sep, "tmp", "x", "search.feature"))
+        self.assertTrue(outside.startswith(
+            os.path.join(self.tmp_dir, "firefox")))
+
+    def test_replay_without_archive(self):
+        self.web_info.network_archive = "replay"
+        network_archive.open_archive("features/missing.feature")
+        self.assertFalse(network_archive.fulfill(
+            FakeRoute("GET", "https://api.test/list")))
+
+    def test_off(self):
+        self.web_info.network_archive = "off"
+        self.assertIsNone(
+            network_archive.open_archive("features/search.feature"))
+        self.assertFalse(network_archive.fulfill(
+            FakeRoute("GET", "https://api.test/list")))
+
+
+if __name__ == "__main__":
+    main()
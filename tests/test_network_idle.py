@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+network idle waiter unit test
+"""
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest import main
+
+import flybirds.core.global_resource as gr
+from flybirds.core.plugin.plugins.default.web import network_idle
+
+
+class FakePage:
+    """
+    waiting moves the clock and delivers the events due by then
+    """
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self.now = 0.0
+        self.events = []
+        self.waits = []
+
+    def clock(self):
+        return self.now
+
+    def at(self, when, event):
+        self.events.append((when, event))
+
+    def wait_for_timeout(self, ms):
+        self.waits.append(ms)
+        self.now += ms / 1000
+        for when, event in list(self.events):
+            if when <= self.now:
+                self.events.remove((when, event))
+                event()
+
+
+def fake_request(resource_type="xhr"):
+    return SimpleNamespace(resource_type=resource_type)
+
+
+class NetworkIdleTest(TestCase):
+    """
+    network idle test
+    """
+
+    def setUp(self):
+        gr.init_glb()
+        self.page = FakePage(None)
+        self.tracker = network_idle.RequestTracker(self.page.clock)
+        gr.set_value("requestTracker", self.tracker)
+
+    def tearDown(self):
+        gr.init_glb()
+
+    def test_already_idle(self):
+        self.page.now = 10.0
+        self.assertEqual(network_idle.wait_idle(self.page, 0.5, 5),
+                         (True, 0.0))
+        self.assertEqual(self.page.waits, [])
+
+    def test_wait_for_inflight(self):
+        search = fake_request()
+        network_idle.on_request(search, "search")
+        self.page.at(1.0, lambda: network_idle.on_request_done(search))
+        idle, waited = network_idle.wait_idle(self.page, 0.5, 5)
+        self.assertTrue(idle)
+        self.assertAlmostEqual(waited, 1.5, places=1)
+
+    def test_operation_filter(self):
+        tracking = fake_request()
+        network_idle.on_request(tracking, "track")
+        network_idle.on_request(fake_request("websocket"), "socket")
+        # remembered, it completed before the wait
+        detail = fake_request()
+        network_idle.on_request(detail, "detail")
+        network_idle.on_request_done(detail)
+        self.page.now = 1.0
+        self.assertEqual(
+            network_idle.wait_idle(self.page, 0.5, 5, {"detail"}),
+            (True, 0.0))
+        self.assertFalse(network_idle.wait_idle(self.page, 0.5, 1)[0])
+        self.assertEqual(self.tracker.pending(), ["track"])
+
+    def test_waits_for_unseen_operation(self):
+        cart = fake_request()
+        self.page.at(0.5, lambda: network_idle.on_request(cart, "cart"))
+        self.page.at(0.8, lambda: network_idle.on_request_done(cart))
+        idle, waited = network_idle.wait_idle(self.page, 0.2, 5, {"cart"})
+        self.assertTrue(idle)
+        self.assertAlmostEqual(waited, 1.0, places=1)
+        self.assertFalse(network_idle.wait_idle(self.page, 0.2, 0.3,
+                                                {"missing"})[0])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+plugin manifest unit test
+"""
+import os
+import shutil
+import sys
+import tempfile
+from unittest import TestCase
+from unittest import main
+
+from flybirds.core.global_context import GlobalContext
+from flybirds.core.plugin.plugin_manager import DirectoryPluginManager
+from flybirds.core.plugin.plugin_manifest import PluginManifest
+from flybirds.core.plugin.plugin_proxy import LazyPlugin
+
+PLUGIN_SOURCE = '''
+import sys
+
+__open__ = ["Fake"]
+
+sys.modules[__name__].import_count = \\
+    getattr(sys.modules[__name__], "import_count", 0) + 1
+
+
+class Fake:
+    created = 0
+
+    def __init__(self):
+        Fake.created += 1
+        self.value = 1
+'''
+
+CLASS_PLUGIN_SOURCE = '''
+__open__ = ["FakeRecord"]
+
+
+class FakeRecord:
+    instantiation_timing = "plugin"
+
+    @staticmethod
+    def ping():
+        return "pong"
+'''
+
+
+class PluginManifestTest(TestCase):
+    """
+    plugin manifest test
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.plugin_dir = os.path.join(self.tmp_dir, "default", "fakeplat")
+        os.makedirs(self.plugin_dir)
+        with open(os.path.join(self.plugin_dir, "fake_plugin.py"), "w",
+                  encoding="utf-8") as f:
+            f.write(PLUGIN_SOURCE)
+        with open(os.path.join(self.plugin_dir, "fake_record.py"), "w",
+                  encoding="utf-8") as f:
+            f.write(CLASS_PLUGIN_SOURCE)
+        self.manifest_path = os.path.join(self.tmp_dir, "manifest.json")
+        self.old_platform = GlobalContext.platform
+        self.old_info = getattr(GlobalContext, "plugin_info", None)
+        GlobalContext.platform = "fakeplat"
+        GlobalContext.plugin_info = None
+
+    def tearDown(self):
+        GlobalContext.platform = self.old_platform
+        GlobalContext.plugin_info = self.old_info
+        for name in ("fake_plugin", "fake_record"):
+            if name in vars(GlobalContext):
+                delattr(GlobalContext, name)
+            sys.modules.pop(
+                f"flybirds.core.plugin.plugins.default.fakeplat.{name}", None)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def load(self):
+        manager = DirectoryPluginManager(config={
+            "directories": (self.tmp_dir,),
+            "manifest_path": self.manifest_path,
+        })
+        manager.load_plugins()
+        return manager
+
+    def test_scan_and_cache(self):
+        manager = self.load()
+        info = manager.manifest.module_info(
+            os.path.join(self.plugin_dir, "fake_record.py"))
+        self.assertEqual(info, {"classes": ["FakeRecord"],
+                                "timing": {"FakeRecord": "plugin"}})
+        self.assertTrue(os.path.exists(self.manifest_path))
+        manifest = PluginManifest(self.manifest_path)
+        self.assertEqual(manifest.list_dir(self.plugin_dir),
+                         ["fake_plugin.py", "fake_record.py"])
+        manifest.module_info(os.path.join(self.plugin_dir, "fake_plugin.py"))
+        self.assertFalse(manifest.dirty)
+
+    def test_lazy_instantiation(self):
+        self.load()
+        slot = GlobalContext.fake_plugin
+        self.assertIsInstance(slot, LazyPlugin)
+        self.assertFalse(hasattr(slot, "__fspath__"))
+        module_name = "flybirds.core.plugin.plugins.default.fakeplat." \
+                      "fake_plugin"
+        self.assertNotIn(module_name, sys.modules)
+
+        self.assertEqual(slot.value, 1)
+        slot.value = 2
+        self.assertEqual(GlobalContext.fake_plugin.value, 2)
+        self.assertNotIsInstance(GlobalContext.fake_plugin, LazyPlugin)
+        self.assertEqual(sys.modules[module_name].Fake.created, 1)
+
+        self.assertEqual(GlobalContext.fake_record.ping(), "pong")
+        self.assertIsInstance(GlobalContext.fake_record, type)
+
+    def test_call_class_plugin(self):
+        self.load()
+        self.assertIsInstance(GlobalContext.fake_record(),
+                              GlobalContext.fake_record)
+
+    def test_no_forced_reload(self):
+        self.load()
+        GlobalContext.fake_plugin.resolve()
+        self.load()
+        GlobalContext.fake_plugin.resolve()
+        module = sys.modules[
+            "flybirds.core.plugin.plugins.default.fakeplat.fake_plugin"]
+        self.assertEqual(module.import_count, 1)
+
+
+if __name__ == "__main__":
+    main()
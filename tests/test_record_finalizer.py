@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+screen record finalize pool unit test
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest import main
+
+import flybirds.core.global_resource as gr
+from flybirds.core.plugin.plugins.default import record_finalizer
+from flybirds.core.plugin.plugins.default import screen_record
+from flybirds.report import attachment
+
+
+class FakeScreenRecord:
+    support = True
+    stop_deadline = 0
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.detached = []
+        self.copied = []
+
+    def detach_record(self):
+        job = {"device_file": f"/sdcard/r{len(self.detached)}.mp4"}
+        self.detached.append(job)
+        return job
+
+    def finalize_detached(self, job, save_path):
+        time.sleep(self.delay)
+        with open(save_path, "wb") as f:
+            f.write(b"mp4")
+        self.copied.append(job["device_file"])
+
+    def copy_record(self, save_path):
+        with open(save_path, "wb") as f:
+            f.write(b"sync")
+
+    def crop_record(self, src_path):
+        pass
+
+
+class RecordFinalizerTest(TestCase):
+    """
+    record finalizer test
+    """
+
+    def setUp(self):
+        gr.init_glb()
+        self.tmp_dir = tempfile.mkdtemp()
+        gr.set_value("configManage", SimpleNamespace(
+            device_info=SimpleNamespace(platform="android"),
+            report_info=SimpleNamespace(screen_shot_dir=self.tmp_dir),
+            frame_info=SimpleNamespace(record_finalize_workers=2)))
+        self.store = attachment.AttachmentStore(
+            os.path.join(self.tmp_dir, "attachments", "a.jsonl"))
+        gr.set_value("attachmentStore", self.store)
+
+    def tearDown(self):
+        finalizer = gr.get_value("recordFinalizer")
+        if finalizer is not None:
+            finalizer.shutdown()
+        self.store.close()
+        gr.init_glb()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_bounded_pool(self):
+        finalizer = record_finalizer.RecordFinalizer(2)
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def job(index):
+            with lock:
+                running.append(index)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(index)
+            if index == 3:
+                raise ValueError("broken job")
+
+        for index in range(8):
+            finalizer.submit(job, index)
+        self.assertEqual(finalizer.flush(), 0)
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(len(peak), 8)
+        self.assertEqual(finalizer.pending(), 0)
+        finalizer.shutdown()
+
+    def link(self, fake, background):
+        gr.set_value("screenRecord", fake)
+        scenario = SimpleNamespace(
+            feature=SimpleNamespace(name="feature"), name="scenario",
+            steps=[1, 2, 3], location="features/a.feature:3",
+            description=[])
+        start = time.time()
+        screen_record.link_record(scenario, 1, background=background)
+        return time.time() - start
+
+    def test_background_link(self):
+        fake = FakeScreenRecord(0.3)
+        elapsed = self.link(fake, True)
+        self.assertLess(elapsed, 0.3)
+        self.assertEqual(attachment.load_records(self.store.path), {})
+        self.assertEqual(record_finalizer.flush_finalizer(), 0)
+        records = attachment.load_records(self.store.path)
+        record = records["features/a.feature:3"][0]
+        self.assertEqual(record["mime_type"], "video/mp4")
+        self.assertEqual(record["size"], 3)
+        self.assertEqual(fake.copied, ["/sdcard/r0.mp4"])
+
+    def test_sync_when_disabled(self):
+        gr.get_value("configManage").frame_info.record_finalize_workers = 0
+        fake = FakeScreenRecord(0)
+        self.link(fake, True)
+        self.assertEqual(fake.detached, [])
+        records = attachment.load_records(self.store.path)
+        self.assertEqual(records["features/a.feature:3"][0]["size"], 4)
+
+
+if __name__ == "__main__":
+    main()
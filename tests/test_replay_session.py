@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+replay session unit test
+"""
+import os
+import shutil
+import tempfile
+from base64 import b64encode
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest import main
+from unittest import mock
+
+from flybirds.core.plugin.plugins.default.replay import session
+from flybirds.core.plugin.plugins.default.replay.replay_poco import \
+    ReplayOcr, create_poco
+
+
+def node(name, pos, **payload):
+    payload.update({"pos": pos, "size": [0.2, 0.05],
+                    "anchorPoint": [0.5, 0.5], "visible": True})
+    return {"name": name, "payload": payload}
+
+
+def screen(*texts):
+    root = node("<Root>", [0.5, 0.5])
+    root["children"] = [
+        node("android.widget.TextView", [0.5, 0.1 * (index + 1)], text=text)
+        for index, text in enumerate(texts)]
+    return root
+
+
+class FakeHierarchy:
+    def __init__(self, dumps):
+        self.dumps = dumps
+
+    def dump(self):
+        return self.dumps.pop(0)
+
+
+class FakeScreen:
+    def getScreen(self, width):
+        return b64encode(b"png-bytes").decode("ascii"), "png"
+
+    def getPortSize(self):
+        return [1080, 2340]
+
+
+class FakeOcr:
+    def ocr(self, img, cls=True):
+        return [[[[1, 2], [3, 2], [3, 4], [1, 4]], ("login", 0.9)]]
+
+
+class ReplaySessionTest(TestCase):
+    """
+    record a session and replay it
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "session")
+        recorder = session.SessionRecorder(self.path, "android", "serial1")
+        poco = SimpleNamespace(agent=SimpleNamespace(
+            hierarchy=FakeHierarchy([
+                screen("splash"), screen("home"), screen("login"),
+                screen("login"), screen("login"), screen("loading"),
+                screen("welcome"), screen("welcome")]),
+            screen=FakeScreen()))
+        ocr = session.attach_recorder(recorder, poco, FakeOcr())
+        recorder.set_screen_size(poco.agent.screen.getPortSize())
+        # the step events dump the screen before and after every step
+        recorder.begin_step("f.feature:3|f.feature:4")
+        session.record_step_hierarchy(recorder, poco)
+        poco.agent.hierarchy.dump()
+        poco.agent.hierarchy.dump()
+        poco.agent.screen.getScreen(720)
+        ocr.ocr("a.png", cls=True)
+        session.record_step_hierarchy(recorder, poco)
+        recorder.begin_step("f.feature:3|f.feature:5")
+        session.record_step_hierarchy(recorder, poco)
+        poco.agent.hierarchy.dump()
+        poco.agent.hierarchy.dump()
+        session.record_step_hierarchy(recorder, poco)
+        recorder.save()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def check_replay(self, path):
+        replay = session.SessionReplay(path)
+        poco = create_poco(replay)
+        self.assertEqual(poco.get_screen_size(), [1080, 2340])
+        replay.begin_step("f.feature:3|f.feature:4")
+        self.assertTrue(poco(text="home").exists())
+        self.assertTrue(poco(text="login").exists())
+        poco(text="login").click()
+        self.assertEqual(poco.snapshot(), (b64encode(b"png-bytes").decode(
+            "ascii"), "png"))
+        self.assertEqual(ReplayOcr(replay).ocr("b.png")[0][1],
+                         ["login", 0.9])
+        replay.begin_step("f.feature:3|f.feature:5")
+        poco(text="welcome").wait_for_appearance(timeout=1)
+        # the last frame is kept once the step ran out of frames
+        self.assertTrue(poco(text="welcome").exists())
+        replay.begin_step("f.feature:9|f.feature:10")
+        self.assertTrue(poco(text="welcome").exists())
+        self.assertEqual(replay.stats["missing_steps"], 1)
+        self.assertEqual(replay.stats["inputs"], 1)
+
+    def test_replay_directory(self):
+        self.check_replay(self.path)
+
+    def test_replay_zip(self):
+        archive = shutil.make_archive(self.path, "zip", self.tmp_dir,
+                                      "session")
+        self.check_replay(archive)
+
+    def test_record_new_poco(self):
+        recorder = session.SessionRecorder(
+            os.path.join(self.tmp_dir, "second"), "android", "serial1")
+        poco = SimpleNamespace(agent=SimpleNamespace(
+            hierarchy=FakeHierarchy([screen("home")]), screen=FakeScreen()))
+        with mock.patch.object(session, "get_recorder",
+                               return_value=recorder), \
+                mock.patch.object(session, "get_replay", return_value=None):
+            self.assertIs(session.record_poco(poco), poco)
+            hierarchy = poco.agent.hierarchy
+            session.record_poco(poco)
+        # attached once
+        self.assertIs(poco.agent.hierarchy, hierarchy)
+        poco.agent.hierarchy.dump()
+        self.assertEqual(len(recorder.visit["hierarchy"]), 1)
+
+    def test_replay_plugin_info(self):
+        info = session.replay_plugin_info(
+            {"android": {"page": {"path": "page.py", "ns": "custom"}}},
+            "android")
+        self.assertEqual(info["android"]["page"]["ns"], "custom")
+        self.assertTrue(info["android"]["ui_driver"]["path"].endswith(
+            os.path.join("replay", "ui_driver.py")))
+        self.assertTrue(os.path.isfile(info["android"]["device"]["path"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+immediate scenario retry unit test
+"""
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest import main
+
+from flybirds.core.plugin.event.scenario_retry import ScenarioRetry
+from flybirds.report import attachment
+from flybirds.report import json_format_deal
+
+
+class FakeFormatter:
+    def __init__(self):
+        self.current_feature_data = {"elements": []}
+
+
+class FakeScenario:
+    """
+    runs report the scripted results, True is a failed run
+    """
+
+    def __init__(self, results, name="login"):
+        self.name = name
+        self.location = f"features/{name}.feature:3"
+        self.description = []
+        self.results = list(results)
+        self.steps = []
+        self.status = None
+        self.runs = 0
+
+    def run(self, runner):
+        self.runs += 1
+        failed = self.results.pop(0)
+        self.status = SimpleNamespace(name="failed" if failed else "passed")
+        self.steps = [SimpleNamespace(
+            name="click login", status=self.status,
+            error_message="element not found" if failed else None)]
+        for formatter in runner.formatters:
+            formatter.current_feature_data["elements"].append({
+                "type": "scenario",
+                "location": self.location,
+                "status": self.status.name,
+                "attempt_run": self.runs,
+                "steps": [],
+            })
+        return failed
+
+
+def make_runner():
+    return SimpleNamespace(formatters=[FakeFormatter()], aborted=False)
+
+
+class ScenarioRetryTest(TestCase):
+    """
+    scenario retry test
+    """
+
+    def test_passed_after_retry(self):
+        retry = ScenarioRetry(max_retry_count=2, max_fail_count=1.0, total=4)
+        scenario = FakeScenario([True, False])
+        retry.wrap(scenario)
+        runner = make_runner()
+        self.assertFalse(scenario.run(runner))
+        self.assertEqual(scenario.runs, 2)
+        elements = runner.formatters[0].current_feature_data["elements"]
+        self.assertTrue(elements[0]["retried"])
+        self.assertEqual(elements[0]["attempt"], 1)
+        self.assertNotIn("retried", elements[1])
+        self.assertEqual(elements[1]["attempt"], 2)
+        self.assertEqual(elements[1]["attempts"][0]["step"], "click login")
+        self.assertEqual(elements[1]["attempts"][0]["error"],
+                         "element not found")
+
+    def test_retry_count_is_bounded(self):
+        retry = ScenarioRetry(max_retry_count=2, max_fail_count=1.0, total=1)
+        scenario = FakeScenario([True, True, True, True])
+        retry.wrap(scenario)
+        runner = make_runner()
+        self.assertTrue(scenario.run(runner))
+        self.assertEqual(scenario.runs, 3)
+        elements = runner.formatters[0].current_feature_data["elements"]
+        self.assertEqual([e.get("retried", False) for e in elements],
+                         [True, True, False])
+        self.assertEqual(len(elements[-1]["attempts"]), 3)
+
+    def test_fail_count_gate(self):
+        # ratio: the second failure of four is above 0.3
+        retry = ScenarioRetry(max_retry_count=1, max_fail_count=0.3, total=4)
+        first = FakeScenario([True, False], "first")
+        second = FakeScenario([True, False], "second")
+        for scenario in (first, second):
+            retry.wrap(scenario)
+            scenario.run(make_runner())
+        self.assertEqual(first.runs, 2)
+        self.assertEqual(second.runs, 1)
+
+        # count: one failure is allowed
+        retry = ScenarioRetry(max_retry_count=1, max_fail_count=1, total=4)
+        first = FakeScenario([True, False], "first")
+        second = FakeScenario([True, False], "second")
+        for scenario in (first, second):
+            retry.wrap(scenario)
+            scenario.run(make_runner())
+        self.assertEqual(first.runs, 2)
+        self.assertEqual(second.runs, 1)
+
+    def test_wrap_once(self):
+        retry = ScenarioRetry(max_retry_count=3, max_fail_count=1.0, total=1)
+        scenario = FakeScenario([True, False])
+        retry.wrap(scenario)
+        retry.wrap(scenario)
+        scenario.run(make_runner())
+        self.assertEqual(scenario.runs, 2)
+
+    def test_report_keeps_last_attempt(self):
+        retry = ScenarioRetry(max_retry_count=1, max_fail_count=1.0, total=1)
+        scenario = FakeScenario([True, False])
+        retry.wrap(scenario)
+        runner = make_runner()
+        scenario.run(runner)
+        feature = {"elements": runner.formatters[0].current_feature_data[
+            "elements"]}
+        json_format_deal.parse_feature(feature, None)
+        self.assertEqual(len(feature["elements"]), 1)
+        self.assertEqual(feature["elements"][0]["status"], "passed")
+
+    def test_attachment_key_per_attempt(self):
+        scenario = FakeScenario([])
+        self.assertEqual(attachment.scenario_key(scenario),
+                         scenario.location)
+        scenario.flybirds_attempt = 2
+        self.assertEqual(attachment.scenario_key(scenario),
+                         f"{scenario.location}#2")
+        self.assertEqual(attachment.element_key(
+            {"location": scenario.location, "attempt": 2}),
+            f"{scenario.location}#2")
+        self.assertEqual(attachment.element_key(
+            {"location": scenario.location}), scenario.location)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+step dispatcher unit test
+"""
+import random
+from unittest import TestCase
+from unittest import main
+
+from behave.matchers import get_matcher
+from behave.step_registry import StepRegistry
+
+from flybirds.core.dsl.step import step_dispatcher
+from flybirds.core.dsl.step import step_loader
+
+PATTERNS = (
+    "wait[{param}]seconds",
+    "click[{selector}]",
+    "click text[{param}]",
+    "Click position[{x}],[{y}]",
+    "页面[{selector}]中存在元素",
+    "点击[{selector}]",
+    "点击文案[{param}]",
+    "screenshot",
+    "swipe {param} [{selector}]",
+    "{param} exists",
+    "ſtart app[{param}]",
+)
+
+TEXTS = (
+    "wait[3]seconds", "click[text=ok]", "click text[ok]", "CLICK TEXT[ok]",
+    "click position[1],[2]", "页面[a]中存在元素", "点击[a]", "点击文案[b]",
+    "screenshot", "SCREENSHOT", "swipe up [a]", "page exists",
+    "start app[a]", "ſwipe up [a]", "clıck[a]", "unknown step",
+)
+
+
+def plain_registry():
+    registry = StepRegistry()
+    for step_type, pattern in zip(
+            ("step", "given", "then", "step") * 3, PATTERNS):
+        func = (lambda context, **kwargs: kwargs)
+        func.__name__ = f"func_{len(registry.steps[step_type])}"
+        registry.steps[step_type].append(get_matcher(func, pattern))
+    return registry
+
+
+class FakeStep:
+    def __init__(self, step_type, name):
+        self.step_type = step_type
+        self.name = name
+
+
+class StepDispatcherTest(TestCase):
+    """
+    step dispatcher test
+    """
+
+    def test_same_as_behave(self):
+        registry = plain_registry()
+        dispatcher = step_dispatcher.StepDispatcher(registry)
+        rand = random.Random(1)
+        texts = list(TEXTS) + ["".join(rand.choice(TEXTS))[:rand.randint(
+            0, 12)] for _ in range(200)]
+        for text in texts:
+            for step_type in ("given", "when", "then", "step"):
+                step = FakeStep(step_type, text)
+                expected = step_loader.step_registry_find_match(registry,
+                                                                step)
+                result = dispatcher.find_match(step_type, text)
+                self.assertEqual(expected, result, (step_type, text))
+                self.assertIs(
+                    step_loader.step_registry_find_step(registry, step),
+                    dispatcher.find_step_definition(step_type, text))
+
+    def test_memo_and_stats(self):
+        registry = plain_registry()
+        dispatcher = step_dispatcher.StepDispatcher(registry)
+        first = dispatcher.resolve("then", "click text[ok]")
+        second = dispatcher.resolve("then", "click text[ok]")
+        self.assertIs(first, second)
+        self.assertEqual(first[0].pattern, "click text[{param}]")
+        self.assertEqual(first[1].arguments[0].value, "ok")
+        dispatcher.resolve("then", "unknown step")
+        stats = dispatcher.stats.as_dict()
+        self.assertEqual(stats["lookups"], 3)
+        self.assertEqual(stats["memo_hits"], 1)
+        self.assertEqual(stats["undefined"], 1)
+        self.assertEqual(stats["definitions"], len(PATTERNS))
+        self.assertLess(stats["candidates_tried"], 2 * len(PATTERNS))
+
+    def test_registry_changed(self):
+        registry = plain_registry()
+        dispatcher = step_dispatcher.StepDispatcher(registry)
+        self.assertIsNone(dispatcher.find_match("step", "scroll down"))
+        registry.steps["step"].append(get_matcher(
+            lambda context: None, "scroll {direction}"))
+        self.assertIsNotNone(dispatcher.find_match("step", "scroll down"))
+
+    def test_indexed_add_step(self):
+        registry = StepRegistry()
+
+        def func(context, selector=None):
+            pass
+
+        step_loader.indexed_add_step(registry, "step", "tap[{selector}]",
+                                     func)
+        step_loader.indexed_add_step(registry, "step", "tap[{selector}]",
+                                     func)
+        self.assertEqual(len(registry.steps["step"]), 1)
+
+        def other(context):
+            pass
+
+        with self.assertRaises(Exception):
+            step_loader.indexed_add_step(registry, "step", "tap[a]", other)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+storage state login cache unit test
+"""
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest import main
+
+import flybirds.core.global_resource as gr
+from flybirds.core.plugin.plugins.default.web import storage_state
+
+
+class FakePage:
+    def __init__(self, session):
+        self.session = session
+
+    def evaluate(self, script):
+        return self.session
+
+
+class FakeContext:
+    def __init__(self, state=None, sessions=()):
+        self.state = state or {"cookies": [], "origins": []}
+        self.pages = [FakePage(session) for session in sessions]
+        self.init_scripts = []
+
+    def storage_state(self):
+        return self.state
+
+    def add_init_script(self, script):
+        self.init_scripts.append(script)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StorageStateTest(TestCase):
+    """
+    storage state test
+    """
+
+    def setUp(self):
+        gr.init_glb()
+        self.logged_out = False
+        gr.set_value("configManage", SimpleNamespace(
+            web_info=SimpleNamespace(storage_state_cache=True,
+                                     storage_state_ttl=60),
+            flow_behave=SimpleNamespace(before_run_login=True),
+            app_info=SimpleNamespace(default_user="tester")))
+        gr.set_value("projectScript", SimpleNamespace(
+            custom_operation=SimpleNamespace(
+                is_logged_out=lambda page: self.logged_out)))
+        self.logins = []
+
+    def tearDown(self):
+        gr.init_glb()
+
+    def login(self):
+        self.logins.append(gr.get_app_config_value("default_user"))
+
+    def new_context(self):
+        storage_state.forget_context()
+        options = storage_state.seed_context_options({"locale": "en"})
+        context = FakeContext(options.get("storage_state"))
+        storage_state.seed_context(context)
+        return context, options
+
+    def test_login_once(self):
+        state = {"cookies": [{"name": "sid", "value": "1"}], "origins": []}
+        self.assertTrue(storage_state.ensure_login(FakeContext(state),
+                                                   self.login))
+        for _ in range(3):
+            context, options = self.new_context()
+            self.assertEqual(options["storage_state"], state)
+            self.assertEqual(options["locale"], "en")
+            self.assertFalse(storage_state.ensure_login(context, self.login))
+        self.assertEqual(self.logins, ["tester"])
+        self.assertEqual(storage_state.get_cache().hits, 3)
+
+    def test_session_storage(self):
+        session = {"origin": "https://m.test", "items": {"token": "t1"}}
+        storage_state.ensure_login(FakeContext(sessions=[
+            session, {"origin": "null", "items": {"x": "1"}}]), self.login)
+        context, options = self.new_context()
+        self.assertNotIn(storage_state.SESSION_KEY,
+                         options["storage_state"])
+        self.assertEqual(len(context.init_scripts), 1)
+        self.assertIn('"token": "t1"', context.init_scripts[0])
+        self.assertIn('"origin": "https://m.test"', context.init_scripts[0])
+
+        # a context without the cached state gets no session storage
+        storage_state.invalidate()
+        context, _ = self.new_context()
+        self.assertEqual(context.init_scripts, [])
+
+    def test_logged_out_invalidates(self):
+        storage_state.ensure_login(FakeContext(), self.login)
+        self.assertFalse(storage_state.check_logged_out(object()))
+        self.logged_out = True
+        self.assertTrue(storage_state.check_logged_out(object()))
+        context, options = self.new_context()
+        self.assertNotIn("storage_state", options)
+        self.assertTrue(storage_state.ensure_login(context, self.login))
+        self.assertEqual(len(self.logins), 2)
+
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = storage_state.StorageStateCache(60, clock)
+        cache.save("tester", {"cookies": []})
+        clock.now = 59
+        self.assertIsNotNone(cache.get("tester"))
+        clock.now = 61
+        self.assertIsNone(cache.get("tester"))
+
+    def test_disabled(self):
+        gr.get_value("configManage").web_info.storage_state_cache = False
+        storage_state.get_cache().save("tester", {"cookies": []})
+        self.assertNotIn("storage_state", self.new_context()[1])
+
+
+if __name__ == "__main__":
+    main()
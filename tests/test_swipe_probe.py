@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+swipe search change detection unit test
+"""
+import os
+import shutil
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest import main
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+import flybirds.core.global_resource as gr
+from flybirds.core.exceptions import FlybirdNotFoundException
+from flybirds.core.global_context import GlobalContext
+from flybirds.core.plugin.plugins.default.ui_driver.poco import poco_swipe
+from flybirds.core.plugin.plugins.default.ui_driver.poco import swipe_probe
+
+
+def make_hierarchy(texts):
+    return {"name": "root", "payload": {"pos": [0.5, 0.5]}, "children": [
+        {"name": "item", "payload": {"text": text, "pos": [0.5, 0.1 * i]}}
+        for i, text in enumerate(texts)]}
+
+
+class FakeObject:
+
+    def __init__(self, found):
+        self.found = found
+
+    def exists(self):
+        return self.found
+
+    def get_position(self):
+        return [0.5, 0.5]
+
+
+class FakeList:
+    """
+    list of 12 rows with 5 visible, swiping moves by 2 rows
+    """
+
+    def __init__(self):
+        self.top = 0
+        self.swipes = 0
+        self.dumps = 0
+
+    def visible(self):
+        return [f"row {i}" for i in range(self.top, min(self.top + 5, 12))]
+
+    def freeze(self):
+        self.dumps += 1
+        hierarchy = make_hierarchy(self.visible())
+        frozen = mock.Mock()
+        frozen.agent.hierarchy.dump.return_value = hierarchy
+        frozen.texts = self.visible()
+        return frozen
+
+    def swipe(self, *args, **kwargs):
+        self.swipes += 1
+        self.top = min(self.top + 2, 7)
+
+
+class SwipeProbeTest(TestCase):
+    """
+    swipe probe test
+    """
+
+    def setUp(self):
+        gr.init_glb()
+        gr.set_value("configManage", SimpleNamespace(frame_info=SimpleNamespace(
+            swipe_search_still_limit=1, use_snap=False)))
+        GlobalContext.set_current_language("en")
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        gr.init_glb()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_hierarchy_fingerprint(self):
+        first = swipe_probe.hierarchy_fingerprint(make_hierarchy(["a", "b"]))
+        self.assertEqual(
+            first, swipe_probe.hierarchy_fingerprint(make_hierarchy(["a", "b"])))
+        self.assertNotEqual(
+            first, swipe_probe.hierarchy_fingerprint(make_hierarchy(["b", "c"])))
+        hidden = make_hierarchy(["a", "b"])
+        hidden["children"].append(
+            {"name": "toast", "payload": {"visible": False, "text": "x"}})
+        self.assertEqual(first, swipe_probe.hierarchy_fingerprint(hidden))
+        self.assertIsNone(swipe_probe.hierarchy_fingerprint(None))
+
+    def test_probe_still_limit(self):
+        probe = swipe_probe.SwipeProbe(2)
+        self.assertTrue(probe.update("a"))
+        self.assertFalse(probe.update("a"))
+        self.assertFalse(probe.stopped())
+        self.assertFalse(probe.update("a"))
+        self.assertTrue(probe.stopped())
+        self.assertTrue(probe.update("b"))
+        self.assertFalse(probe.stopped())
+        never = swipe_probe.SwipeProbe(0)
+        never.update("a")
+        never.update("a")
+        self.assertFalse(never.stopped())
+
+    def save_frame(self, name, page, top):
+        # fixed 40px title bar above a scrolling page
+        frame = np.vstack([np.full((40, 60), 200, dtype=np.uint8),
+                           page[top:top + 360]])
+        path = os.path.join(self.tmp_dir, name)
+        Image.fromarray(frame).save(path)
+        return path
+
+    def test_frame_scan_revealed_strip(self):
+        page = np.random.RandomState(7).randint(
+            0, 255, (1200, 60)).astype(np.uint8)
+        page = np.repeat(page[::4], 4, axis=0)
+        scan = swipe_probe.FrameScan("up")
+        self.assertEqual(scan.update(self.save_frame("0.png", page, 0)),
+                         (0.0, 1.0))
+        start, end = scan.update(self.save_frame("1.png", page, 100))
+        # the bottom 100 of 400 rows are new
+        self.assertAlmostEqual(start, 0.75, delta=0.02)
+        self.assertEqual(end, 1.0)
+        self.assertIsNone(scan.update(self.save_frame("2.png", page, 100)))
+
+        strip_path, offset = scan.crop(os.path.join(self.tmp_dir, "1.png"),
+                                       (start, end), margin=0)
+        with Image.open(strip_path) as strip:
+            self.assertEqual(strip.size[1], 400 - offset)
+        result = scan.offset_ocr_result(
+            [[[[1, 2], [3, 2], [3, 4], [1, 4]], ("row", 0.9)]], offset)
+        self.assertEqual(result[0][0][0], [1, 2 + offset])
+        self.assertEqual(result[0][1], ("row", 0.9))
+
+    def search(self, fake, target):
+        def create(poco, dsl, optional):
+            return FakeObject(dsl in poco.texts)
+
+        with mock.patch.object(poco_swipe.pm, "create_poco_object_by_dsl",
+                               side_effect=create), \
+                mock.patch.object(poco_swipe, "air_bdd_full_screen_swipe",
+                                  side_effect=fake.swipe):
+            poco_swipe.full_screen_swipe_search(
+                fake, target, None, 10, "down", [1080, 1920])
+
+    def test_search_found(self):
+        fake = FakeList()
+        self.search(fake, "row 8")
+        self.assertEqual(fake.swipes, 2)
+
+    def test_search_stops_at_list_end(self):
+        fake = FakeList()
+        with self.assertRaises(FlybirdNotFoundException) as raised:
+            self.search(fake, "row 20")
+        # 4 swipes reach the end, the 5th shows the same rows
+        self.assertEqual(fake.swipes, 5)
+        self.assertEqual(fake.dumps, 6)
+        self.assertIn("5 times", raised.exception.message)
+
+
+if __name__ == "__main__":
+    main()
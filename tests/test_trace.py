@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+perf trace unit test
+"""
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest import main
+
+from flybirds.cli import perf
+from flybirds.utils import trace
+
+
+class TraceTest(TestCase):
+    """
+    trace test
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.trace_path = os.path.join(self.tmp_dir, "trace",
+                                       "report.trace.json")
+
+    def tearDown(self):
+        trace.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def run_step(self, tracer, name, shots):
+        tracer.step_begin(name, {"scenario": "login"})
+        for _ in range(shots):
+            with trace.span("screenshot", "screen_shot"):
+                trace.add_bytes(1024)
+        trace.sleep(0, "wait_exists")
+        tracer.step_end("passed")
+
+    def test_no_tracer(self):
+        @trace.traced("sift")
+        def match():
+            trace.add_bytes(10)
+            return 3
+
+        self.assertEqual(match(), 3)
+        with trace.span("ocr", "ocr") as cur:
+            self.assertIsNone(cur)
+        self.assertIsNone(trace.current_span())
+
+    def test_step_summary(self):
+        tracer = trace.start(self.trace_path, "report.json")
+        self.run_step(tracer, "click login", 2)
+        trace.stop()
+        with open(self.trace_path, encoding="utf-8") as f:
+            events = json.load(f)
+        step = [e for e in events if e.get("cat") == trace.STEP][0]
+        self.assertEqual(step["name"], "click login")
+        self.assertEqual(step["args"]["status"], "passed")
+        self.assertEqual(step["args"]["subsystems"]["screenshot"]["calls"], 2)
+        self.assertEqual(step["args"]["subsystems"]["screenshot"]["bytes"],
+                         2048)
+        self.assertEqual(step["args"]["subsystems"]["sleep"]["calls"], 1)
+        spans = [e for e in events if e.get("cat") == "screenshot"]
+        self.assertEqual(spans[0]["args"]["bytes"], 1024)
+
+    def test_error_span(self):
+        trace.start(self.trace_path)
+
+        @trace.traced("route")
+        def handle_route():
+            raise ValueError("abort")
+
+        with self.assertRaises(ValueError):
+            handle_route()
+        trace.stop()
+        events = trace.read_events(self.trace_path)
+        self.assertEqual(events[-1]["name"], "handle_route")
+        self.assertEqual(events[-1]["args"]["error"], "ValueError")
+
+    def test_read_truncated_trace(self):
+        tracer = trace.start(self.trace_path)
+        self.run_step(tracer, "click login", 1)
+        tracer._file.flush()
+        with open(self.trace_path, encoding="utf-8") as f:
+            content = f.read()
+        with open(self.trace_path, "w", encoding="utf-8") as f:
+            f.write(content + ',\n{"name":"cut')
+        events = trace.read_events(self.trace_path)
+        self.assertEqual(len([e for e in events
+                              if e.get("cat") == trace.STEP]), 1)
+
+    def test_perf_report(self):
+        tracer = trace.start(self.trace_path, "report.json")
+        self.run_step(tracer, "click login", 3)
+        self.run_step(tracer, "click login", 1)
+        self.run_step(tracer, "swipe", 0)
+        trace.stop()
+        trace_paths = perf.find_traces(self.tmp_dir)
+        self.assertEqual(trace_paths, [self.trace_path])
+        spans = perf.load_spans(trace_paths)
+        steps, names, subsystems = perf.aggregate(spans)
+        self.assertEqual(len(steps), 3)
+        self.assertEqual(dict(names)["click login"]["count"], 2)
+        screenshot = [s for s in subsystems if s[0] == "screenshot"][0]
+        self.assertEqual(screenshot[1]["calls"], 4)
+        self.assertEqual(screenshot[1]["bytes"], 4096)
+        self.assertEqual(screenshot[2][0][0], "screen_shot")
+        report = perf.format_report(trace_paths, spans, 5)
+        self.assertIn("slowest steps:", report)
+        self.assertIn("screenshot", report)
+
+
+if __name__ == "__main__":
+    main()